@@ -0,0 +1,398 @@
+"""
+Stand-in for the ``hou`` module and the ADAM pipeline modules.
+
+The ``hou`` functions and node methods used by the hooks answer from a
+synthetic node network generated with a given number of loader nodes,
+alembic archives, published HDAs, lookdev assets and materialX exports.
+Every call made from a hook is counted.
+"""
+
+import collections
+import contextlib
+import os
+import sys
+import types
+
+from sgtk_standin import PROJECT_ROOT, TEMPLATE_DEFINITIONS
+
+# The calls to the hou functions and node methods, by name.
+HOU_CALLS = collections.Counter()
+
+
+class _Enum(object):
+    """
+    A hou enumeration, e.g. hou.nodeEventType.
+    """
+
+    def __init__(self, *names):
+        for name in names:
+            setattr(self, name, name)
+
+
+class NodeTypeCategory(object):
+
+    def __init__(self, name):
+        self._name = name
+
+    def name(self):
+        return self._name
+
+    def nodeTypes(self):
+        HOU_CALLS["NodeTypeCategory.nodeTypes"] += 1
+        return dict(
+            (name, nodeType) for name, nodeType in _SCENE[0].nodeTypes.items() if nodeType._category is self
+        )
+
+
+_CATEGORIES = {
+    "Object"    : NodeTypeCategory("Object"),
+    "Driver"    : NodeTypeCategory("Driver"),
+    "Manager"   : NodeTypeCategory("Manager"),
+}
+
+
+class HDADefinition(object):
+
+    def __init__(self, libraryPath):
+        self._libraryPath = libraryPath
+
+    def libraryFilePath(self):
+        HOU_CALLS["HDADefinition.libraryFilePath"] += 1
+        return self._libraryPath
+
+
+class NodeType(object):
+
+    def __init__(self, name, category, definition=None):
+        self._name          = name
+        self._category      = category
+        self._definition    = definition
+        self._instances     = []
+
+    def name(self):
+        HOU_CALLS["NodeType.name"] += 1
+        return self._name
+
+    def nameComponents(self):
+        HOU_CALLS["NodeType.nameComponents"] += 1
+        name, _, version = self._name.partition("::")
+        return ("", "", name, version)
+
+    def category(self):
+        HOU_CALLS["NodeType.category"] += 1
+        return self._category
+
+    def definition(self):
+        HOU_CALLS["NodeType.definition"] += 1
+        return self._definition
+
+    def instances(self):
+        HOU_CALLS["NodeType.instances"] += 1
+        return tuple(self._instances)
+
+
+class Parm(object):
+
+    def __init__(self, node, name, value):
+        self._node  = node
+        self._name  = name
+        self._value = value
+
+    def name(self):
+        return self._name
+
+    def eval(self):
+        HOU_CALLS["Parm.eval"] += 1
+        return self._value
+
+    def evalAsString(self):
+        HOU_CALLS["Parm.evalAsString"] += 1
+        return str(self._value)
+
+    def evalAsInt(self):
+        HOU_CALLS["Parm.evalAsInt"] += 1
+        return int(self._value)
+
+    def getReferencedParm(self):
+        HOU_CALLS["Parm.getReferencedParm"] += 1
+        return self
+
+    def set(self, value):
+        HOU_CALLS["Parm.set"] += 1
+        self._value = value
+
+    def pressButton(self):
+        HOU_CALLS["Parm.pressButton"] += 1
+
+
+class Node(object):
+
+    def __init__(self, parent, name, nodeType, parms=None):
+        self._parent    = parent
+        self._name      = name
+        self._type      = nodeType
+        self._children  = []
+        self._parms     = dict((parmName, Parm(self, parmName, value)) for parmName, value in (parms or {}).items())
+        self._userData  = {}
+        self._path      = "{}/{}".format(parent._path.rstrip("/"), name) if parent else "/"
+        if(nodeType is not None):
+            nodeType._instances.append(self)
+
+    def path(self):
+        HOU_CALLS["Node.path"] += 1
+        return self._path
+
+    def name(self):
+        HOU_CALLS["Node.name"] += 1
+        return self._name
+
+    def type(self):
+        HOU_CALLS["Node.type"] += 1
+        return self._type
+
+    def parm(self, name):
+        HOU_CALLS["Node.parm"] += 1
+        return self._parms.get(name)
+
+    def userData(self, name):
+        HOU_CALLS["Node.userData"] += 1
+        return self._userData.get(name)
+
+    def setUserData(self, name, value):
+        HOU_CALLS["Node.setUserData"] += 1
+        self._userData[name] = value
+
+    def children(self):
+        HOU_CALLS["Node.children"] += 1
+        return tuple(self._children)
+
+    def isNetwork(self):
+        HOU_CALLS["Node.isNetwork"] += 1
+        return bool(self._children)
+
+    def isInsideLockedHDA(self):
+        HOU_CALLS["Node.isInsideLockedHDA"] += 1
+        return False
+
+    def allSubChildren(self, recurse_in_locked_nodes=True):
+        HOU_CALLS["Node.allSubChildren"] += 1
+        return tuple(self._walk())
+
+    def allNodes(self):
+        HOU_CALLS["Node.allNodes"] += 1
+        return tuple([self] + self._walk())
+
+    def _walk(self):
+        nodes = []
+        stack = list(reversed(self._children))
+        while(stack):
+            node = stack.pop()
+            nodes.append(node)
+            stack.extend(reversed(node._children))
+        return nodes
+
+    def addEventCallback(self, eventTypes, callback):
+        HOU_CALLS["Node.addEventCallback"] += 1
+
+    def removeEventCallback(self, eventTypes, callback):
+        HOU_CALLS["Node.removeEventCallback"] += 1
+
+    def __hash__(self):
+        return hash(self._path)
+
+    def __eq__(self, other):
+        return isinstance(other, Node) and other._path == self._path
+
+    def __ne__(self, other):
+        return not self == other
+
+
+class SyntheticHoudiniScene(object):
+    """
+    A synthetic Houdini scene.
+
+    /obj holds the ADAM loader nodes, the alembic archives, the published HDA
+    instances and the lookdev assets, /out the materialX export nodes. The
+    loader nodes of a same asset load the same published files, one loader
+    out of four is built from the transform track of a shot instance.
+    """
+
+    def __init__(self, loaders=10, alembicArchives=5, hdas=5, lookdevAssets=2, materialXExports=2,
+                 assetsShared=4, hipName="lighting_seq.v003.hip"):
+        self.nodeTypes  = {}
+        self.nodes      = {}
+        self.selection  = []
+        self.hipPath    = os.path.join(PROJECT_ROOT, "work", hipName)
+
+        self.root       = Node(None, "", None)
+        obj             = self._add(self.root, "obj", self._type("obj", "Manager"))
+        out             = self._add(self.root, "out", self._type("out", "Manager"))
+
+        alembicTemplate = os.path.join(PROJECT_ROOT, TEMPLATE_DEFINITIONS["asset_alembic_lod_publish"])
+        mtlxTemplate    = os.path.join(PROJECT_ROOT, TEMPLATE_DEFINITIONS["asset_materialX_publish"])
+        hdaTemplate     = os.path.join(PROJECT_ROOT, TEMPLATE_DEFINITIONS["houdini_sequence_digitalAsset_publish"])
+        trackTemplate   = os.path.join(PROJECT_ROOT, TEMPLATE_DEFINITIONS["shot_assetInstance_frames_json"])
+
+        for index in range(loaders):
+            asset = "asset{:04d}".format(index % max(1, assetsShared))
+            loader = self._add(obj, "loader{:04d}".format(index), self._type("assetAnimationLoader::2.0", "Object"), {
+                "geometryFilePath"  : alembicTemplate.format(
+                    sg_asset_type="prop", Asset=asset, Step="MOD", name="geo", lod="HI", version="001"
+                ),
+                "materialXFilePath" : mtlxTemplate.format(
+                    sg_asset_type="prop", Asset=asset, Step="SHD", lod="HI", variant="default", version="001"
+                ),
+            })
+            if(index % 4 == 0):
+                loader.setUserData("p3dTransformTrack", trackTemplate.format(
+                    Sequence="seq010", Shot="sh010", Step="ANI", name="anim", Asset=asset,
+                    instance="{:03d}".format(index), version="004"
+                ))
+
+        for index in range(alembicArchives):
+            asset = "asset{:04d}".format(index % max(1, assetsShared))
+            self._add(obj, "archive{:04d}".format(index), self._type("alembicarchive", "Object"), {
+                "fileName"          : alembicTemplate.format(
+                    sg_asset_type="prop", Asset=asset, Step="MOD", name="geo", lod="MI", version="002"
+                ),
+                "buildHierarchy"    : 0,
+            })
+
+        for index in range(hdas):
+            hdaName = "setDress{:04d}".format(index)
+            libraryPath = hdaTemplate.replace("{houdini.node}", hdaName).format(
+                Sequence="seq010", Step="SDR", version="002"
+            )
+            nodeType = self._type("{}::1.0".format(hdaName), "Object", HDADefinition(libraryPath))
+            node = self._add(obj, "{}1".format(hdaName), nodeType)
+            self.selection.append(node)
+
+        for index in range(lookdevAssets):
+            self._add(obj, "lookdevAsset{:04d}".format(index), self._type("lookdevAsset::1.0", "Object"), {
+                "toggleExportMtlx"      : 1,
+                "toggleExportGeometry"  : 1,
+            })
+
+        for index in range(materialXExports):
+            self._add(out, "materialXExport{:04d}".format(index), self._type("materialXExport::1.0", "Driver"))
+
+    def _type(self, name, category, definition=None):
+        if(name not in self.nodeTypes):
+            self.nodeTypes[name] = NodeType(name, _CATEGORIES[category], definition)
+        return self.nodeTypes[name]
+
+    def _add(self, parent, name, nodeType, parms=None):
+        node = Node(parent, name, nodeType, parms)
+        parent._children.append(node)
+        self.nodes[node._path] = node
+        return node
+
+
+# The scene answered by the hou functions.
+_SCENE = [SyntheticHoudiniScene()]
+# The hip file event callbacks.
+_HIP_CALLBACKS = []
+
+
+def setScene(scene):
+    """ Set the scene answered by the hou functions, as if a hip file was loaded. """
+    _SCENE[0] = scene
+    for callback in list(_HIP_CALLBACKS):
+        callback(hou.hipEventType.AfterLoad)
+
+
+def _node(path):
+    HOU_CALLS["node"] += 1
+    return _SCENE[0].nodes.get(path)
+
+
+def _nodeType(category, name):
+    HOU_CALLS["nodeType"] += 1
+    return _SCENE[0].nodeTypes.get(name)
+
+
+def _selectedNodes():
+    HOU_CALLS["selectedNodes"] += 1
+    return tuple(_SCENE[0].selection)
+
+
+class _HipFile(object):
+
+    def name(self):
+        HOU_CALLS["hipFile.name"] += 1
+        return _SCENE[0].hipPath
+
+    def path(self):
+        HOU_CALLS["hipFile.path"] += 1
+        return _SCENE[0].hipPath
+
+    def addEventCallback(self, callback):
+        _HIP_CALLBACKS.append(callback)
+
+    def removeEventCallback(self, callback):
+        if(callback not in _HIP_CALLBACKS):
+            raise OperationFailed("The callback is not registered.")
+        _HIP_CALLBACKS.remove(callback)
+
+    def eventCallbacks(self):
+        return tuple(_HIP_CALLBACKS)
+
+
+class OperationFailed(Exception):
+    pass
+
+
+class _Undos(object):
+
+    @contextlib.contextmanager
+    def group(self, label):
+        yield
+
+
+class LookdevAssetNode(object):
+    """
+    Stand-in for adamPipe.lookdevAssetNode.LookdevAssetNode.
+    """
+
+    @staticmethod
+    def getMaterialXExportNode(node):
+        return node
+
+    @staticmethod
+    def getResolutions(node):
+        return collections.OrderedDict(
+            (resolution, "{}/{}".format(node.path(), resolution)) for resolution in ("HI", "MI", "LO")
+        )
+
+
+hou = types.ModuleType("hou")
+
+
+def install():
+    """ Install the hou and ADAM pipeline stand-in modules. """
+    hou.node                    = _node
+    hou.nodeType                = _nodeType
+    hou.selectedNodes           = _selectedNodes
+    hou.hipFile                 = _HipFile()
+    hou.undos                   = _Undos()
+    hou.Error                   = Exception
+    hou.OperationFailed         = OperationFailed
+    hou.objNodeTypeCategory     = lambda: _CATEGORIES["Object"]
+    hou.ropNodeTypeCategory     = lambda: _CATEGORIES["Driver"]
+    hou.nodeEventType           = _Enum("ParmTupleChanged", "NameChanged", "BeingDeleted", "ChildCreated", "ChildDeleted")
+    hou.hipEventType            = _Enum("AfterLoad", "AfterClear", "AfterMerge", "BeforeSave", "AfterSave")
+    hou.updateMode              = _Enum("AutoUpdate", "OnMouseUp", "Manual")
+    hou.updateModeSetting       = lambda: hou.updateMode.AutoUpdate
+    hou.setUpdateMode           = lambda mode: None
+    sys.modules["hou"]          = hou
+
+    adamPipe                    = types.ModuleType("adamPipe")
+    lookdevModule               = types.ModuleType("adamPipe.lookdevAssetNode")
+    lookdevModule.LookdevAssetNode = LookdevAssetNode
+    adamPipe.lookdevAssetNode   = lookdevModule
+    sys.modules["adamPipe"]     = adamPipe
+    sys.modules["adamPipe.lookdevAssetNode"] = lookdevModule
+
+    adamScripts                 = types.ModuleType("adamScripts")
+    adamScripts.DigitalAssetsManager = types.ModuleType("adamScripts.DigitalAssetsManager")
+    sys.modules["adamScripts"]  = adamScripts
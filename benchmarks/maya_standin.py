@@ -0,0 +1,441 @@
+"""
+Stand-in for the ``maya`` package and the maya module of the P3D framework.
+
+The ``maya.cmds`` commands used by the hooks answer from a synthetic scene
+generated with a given number of assets, references, cameras, environments
+and LOD groups. Every command call is counted.
+"""
+
+import collections
+import os
+import sys
+import types
+
+from sgtk_standin import FRAMEWORK_CALLS, PROJECT_ROOT, TEMPLATE_DEFINITIONS
+
+# The calls to the maya.cmds commands, by command name.
+CMDS_CALLS = collections.Counter()
+
+# The LOD groups of the synthetic assets.
+LODS = ("HI", "MI", "LO")
+
+
+class SyntheticMayaScene(object):
+    """
+    A synthetic Maya scene.
+
+    Each asset is a ``<name>_RIG`` root holding one group per LOD with a few
+    meshes. The first assets are referenced, with their nodes in a namespace.
+    Cameras are ``<name>_CAMBUF`` roots and environments ``<name>_ENV`` roots
+    holding instances of meshes, each in its own namespace. One instance out of
+    three moves and one out of five deforms over the playback range.
+    """
+
+    def __init__(self, assets=10, references=5, cameras=1, environments=1,
+                 meshesPerLod=4, instancesPerEnvironment=20, sceneName="anim_shot.v003.ma"):
+        # The node types by long name, in creation order.
+        self.nodes          = collections.OrderedDict()
+        # The long names of the nodes by type.
+        self.nodesByType    = collections.defaultdict(list)
+        # The children long names by parent long name.
+        self.children       = collections.defaultdict(list)
+        # The long names by short name.
+        self.longNames      = collections.defaultdict(list)
+        # The file paths of the reference nodes, with their namespace.
+        self.references     = collections.OrderedDict()
+        self.selection      = []
+        self.playbackRange  = (1001.0, 1100.0)
+        self.currentTime    = 1001.0
+        self.projectRoot    = os.path.join(PROJECT_ROOT, "maya")
+        self.sceneName      = os.path.join(PROJECT_ROOT, "work", sceneName)
+
+        rigTemplate = os.path.join(PROJECT_ROOT, TEMPLATE_DEFINITIONS["maya_asset_rig_publish"])
+
+        for index in range(assets):
+            assetName = "asset{:04d}".format(index)
+            namespace = ""
+            if(index < references):
+                namespace = "{}:".format(assetName)
+                self.references["{}RN".format(assetName)] = (
+                    assetName,
+                    rigTemplate.format(
+                        sg_asset_type="prop", Asset=assetName, Step="RIG", name="rig", lod="HI", version="003"
+                    )
+                )
+
+            root = self._add("|{}{}_RIG".format(namespace, assetName), "transform")
+            self.selection.append(root)
+            geo = self._add("{}|{}geo".format(root, namespace), "transform")
+            for lod in LODS:
+                lodGroup = self._add("{}|{}{}".format(geo, namespace, lod), "transform")
+                for meshIndex in range(meshesPerLod):
+                    mesh = self._add("{}|{}mesh{}_{}".format(lodGroup, namespace, lod, meshIndex), "transform")
+                    self._add("{}|{}mesh{}_{}Shape".format(mesh, namespace, lod, meshIndex), "mesh")
+
+        for index in range(cameras):
+            root = self._add("|cam{:03d}_CAMBUF".format(index), "transform")
+            self.selection.append(root)
+            camera = self._add("{}|cam{:03d}".format(root, index), "transform")
+            self._add("{}|cam{:03d}Shape".format(camera, index), "camera")
+
+        for index in range(environments):
+            root = self._add("|env{:03d}_ENV".format(index), "transform")
+            self.selection.append(root)
+            for instanceIndex in range(instancesPerEnvironment):
+                instance = self._add("{}|instance{:04d}:root".format(root, instanceIndex), "transform")
+                self._add("{}|instance{:04d}:rootShape".format(instance, instanceIndex), "mesh")
+
+    def _add(self, longName, nodeType):
+        self.nodes[longName] = nodeType
+        self.nodesByType[nodeType].append(longName)
+        parent, shortName = longName.rsplit("|", 1)
+        self.longNames[shortName].append(longName)
+        if(parent):
+            self.children[parent].append(longName)
+        return longName
+
+    def resolve(self, name):
+        """ Return the long name of a node given by long or short name. """
+        if(name in self.nodes):
+            return name
+        longNames = self.longNames.get(name.rsplit("|", 1)[-1], [])
+        suffix = "|{}".format(name.lstrip("|"))
+        for longName in longNames:
+            if(longName.endswith(suffix)):
+                return longName
+        return None
+
+    def descendants(self, longName):
+        """ Return the long names of the nodes under a node. """
+        result = []
+        stack = list(reversed(self.children.get(longName, [])))
+        while(stack):
+            node = stack.pop()
+            result.append(node)
+            stack.extend(reversed(self.children.get(node, [])))
+        return result
+
+
+# The scene answered by the commands.
+_SCENE = [SyntheticMayaScene()]
+
+
+def setScene(scene):
+    """ Set the scene answered by the maya.cmds commands. """
+    _SCENE[0] = scene
+
+
+def _counted(function):
+    def countedFunction(*args, **kwargs):
+        CMDS_CALLS[function.__name__] += 1
+        return function(*args, **kwargs)
+    countedFunction.__name__ = function.__name__
+    return countedFunction
+
+
+def _format(names, long):
+    if(long):
+        return list(names)
+    return [name.rsplit("|", 1)[-1] for name in names]
+
+
+@_counted
+def ls(*objects, **kwargs):
+    scene       = _SCENE[0]
+    long        = kwargs.get("long", kwargs.get("l", False))
+    nodeType    = kwargs.get("type")
+    selection   = kwargs.get("selection", kwargs.get("sl", False))
+
+    if(selection):
+        names = scene.selection
+    elif(objects):
+        names = [scene.resolve(name) for name in objects]
+        names = [name for name in names if name]
+    elif(kwargs.get("shapes") or kwargs.get("geometry")):
+        names = scene.nodesByType["mesh"] + scene.nodesByType["camera"]
+        if(kwargs.get("geometry")):
+            names = scene.nodesByType["mesh"]
+    elif(nodeType == "reference"):
+        return list(scene.references)
+    elif(nodeType):
+        names = scene.nodesByType.get(nodeType, [])
+    else:
+        names = list(scene.nodes)
+
+    if(nodeType and nodeType != "reference"):
+        names = [name for name in names if scene.nodes[name] == nodeType]
+
+    result = _format(names, long)
+    if(kwargs.get("showType")):
+        typed = []
+        for name, formatted in zip(names, result):
+            typed.extend([formatted, scene.nodes[name]])
+        return typed
+    return result
+
+
+@_counted
+def listRelatives(*objects, **kwargs):
+    scene   = _SCENE[0]
+    long    = kwargs.get("fullPath", kwargs.get("f", False))
+    result  = []
+    for name in objects:
+        longName = scene.resolve(name)
+        if(not longName):
+            continue
+        if(kwargs.get("parent", kwargs.get("p", False))):
+            names = [longName.rsplit("|", 1)[0]]
+        elif(kwargs.get("allDescendents", kwargs.get("ad", False))):
+            names = scene.descendants(longName)
+        else:
+            names = scene.children.get(longName, [])
+        if(kwargs.get("type")):
+            names = [child for child in names if scene.nodes.get(child) == kwargs["type"]]
+        if(kwargs.get("shapes", kwargs.get("s", False))):
+            names = [child for child in names if scene.nodes.get(child) != "transform"]
+        result.extend(_format(names, long))
+    return result or None
+
+
+@_counted
+def nodeType(name, **kwargs):
+    scene = _SCENE[0]
+    return scene.nodes.get(scene.resolve(name))
+
+
+@_counted
+def objExists(name):
+    return _SCENE[0].resolve(name) is not None
+
+
+@_counted
+def file(*args, **kwargs):
+    scene = _SCENE[0]
+    if(kwargs.get("query", kwargs.get("q", False))):
+        if(kwargs.get("modified")):
+            return False
+        if(kwargs.get("sceneName", kwargs.get("sn", False))):
+            if(kwargs.get("shortName")):
+                return os.path.basename(scene.sceneName)
+            return scene.sceneName
+    return None
+
+
+@_counted
+def workspace(*args, **kwargs):
+    scene = _SCENE[0]
+    if(kwargs.get("rootDirectory")):
+        return scene.projectRoot
+    if(kwargs.get("fileRuleList")):
+        return ["movie", "alembicCache"]
+    if(kwargs.get("fileRuleEntry")):
+        return "movies"
+    return None
+
+
+@_counted
+def namespaceInfo(*args, **kwargs):
+    scene = _SCENE[0]
+    return [assetName for assetName, _ in scene.references.values()]
+
+
+@_counted
+def referenceQuery(node, **kwargs):
+    assetName, filePath = _SCENE[0].references[node]
+    if(kwargs.get("namespace")):
+        return ":{}".format(assetName)
+    if(kwargs.get("filename")):
+        return filePath
+    return None
+
+
+@_counted
+def playblast(*args, **kwargs):
+    if(kwargs.get("activeEditor")):
+        return "MainPane|modelPanel4"
+    return kwargs.get("filename")
+
+
+@_counted
+def modelPanel(*args, **kwargs):
+    if(kwargs.get("query")):
+        return "persp"
+    return None
+
+
+@_counted
+def renderSettings(*args, **kwargs):
+    return [os.path.join(PROJECT_ROOT, "images", "none.*.exr")]
+
+
+@_counted
+def playbackOptions(*args, **kwargs):
+    scene = _SCENE[0]
+    if(kwargs.get("minTime")):
+        return scene.playbackRange[0]
+    if(kwargs.get("maxTime")):
+        return scene.playbackRange[1]
+    return None
+
+
+@_counted
+def currentTime(*args, **kwargs):
+    scene = _SCENE[0]
+    if(kwargs.get("query")):
+        return scene.currentTime
+    scene.currentTime = float(args[0])
+    return scene.currentTime
+
+
+@_counted
+def getAttr(attribute, **kwargs):
+    if(attribute.endswith(".intermediateObject")):
+        return False
+    return None
+
+
+@_counted
+def listHistory(*objects, **kwargs):
+    # The deformed instances are moved by xform, the scene holds no deformer nodes.
+    return []
+
+
+@_counted
+def xform(*objects, **kwargs):
+    # The points of a unit cube, moved or deformed with the time by the instance index.
+    scene   = _SCENE[0]
+    shape   = scene.resolve(objects[0].split(".")[0])
+    index   = int(shape.rsplit("|", 1)[-1].split(":")[0][len("instance"):]) if ":" in shape else 1
+    time    = scene.currentTime - scene.playbackRange[0]
+    points  = []
+    for corner in range(8):
+        point = [float(corner & 1), float(corner >> 1 & 1), float(corner >> 2 & 1)]
+        if(index % 5 == 0 and corner == 0):
+            point[1] += time
+        elif(index % 3 == 0):
+            point[0] += time
+        points.extend(point)
+    return points
+
+
+class MayaAsset(object):
+    """
+    Stand-in for the P3D framework MayaAsset, listing the meshes of each LOD.
+    """
+
+    def __init__(self, assetRoot):
+        scene = _SCENE[0]
+        self.fullname   = scene.resolve(assetRoot) or assetRoot
+        self.name       = self.fullname.split("|")[-1]
+        self.meshesHI   = []
+        self.meshesMI   = []
+        self.meshesLO   = []
+        meshes = listRelatives(self.fullname, allDescendents=True, fullPath=True, type="mesh") or []
+        for mesh in meshes:
+            lod = mesh.split("|")[-3].split(":")[-1]
+            getattr(self, "meshes{}".format(lod)).append(mesh)
+
+
+class MayaObject(object):
+    """
+    Stand-in for the P3D framework MayaObject.
+    """
+
+    def __init__(self, fullname):
+        self.fullname   = fullname
+        self.name       = fullname.split("|")[-1]
+
+
+class MayaEnvironment(object):
+    """
+    Stand-in for the P3D framework MayaEnvironment. One instance out of three
+    is animated, one out of five is deformed.
+    """
+
+    def __init__(self, root):
+        scene = _SCENE[0]
+        self.fullname   = scene.resolve(root) or root
+        self.name       = self.fullname.split("|")[-1]
+
+    def getAssets(self):
+        return [MayaObject(child) for child in listRelatives(self.fullname, children=True, fullPath=True) or []]
+
+    def getAnimation(self):
+        assets = self.getAssets()
+        animated = [asset for index, asset in enumerate(assets) if index % 3 == 0]
+        deformed = [asset for index, asset in enumerate(assets) if index % 5 == 0]
+        return animated, deformed
+
+
+class PublishTools(object):
+    """
+    Stand-in for the P3D framework PublishTools.
+    """
+
+    def __init__(self):
+        FRAMEWORK_CALLS["PublishTools()"] += 1
+
+
+class LoadTools(object):
+    """
+    Stand-in for the P3D framework LoadTools.
+    """
+
+    def __init__(self):
+        FRAMEWORK_CALLS["LoadTools()"] += 1
+
+
+def install():
+    """ Install the maya stand-in modules.
+
+    Returns:
+        module  : The maya module of the P3D framework stand-in.
+    """
+    mayaModule      = types.ModuleType("maya")
+    cmdsModule      = types.ModuleType("maya.cmds")
+    utilsModule     = types.ModuleType("maya.utils")
+    melModule       = types.ModuleType("maya.mel")
+    apiModule       = types.ModuleType("maya.api")
+    openMaya1Module = types.ModuleType("maya.OpenMaya")
+    openMayaModule  = types.ModuleType("maya.api.OpenMaya")
+    animModule      = types.ModuleType("maya.api.OpenMayaAnim")
+
+    for name in ("ls", "listRelatives", "nodeType", "objExists", "file", "workspace", "namespaceInfo",
+                 "referenceQuery", "playblast", "modelPanel", "renderSettings", "playbackOptions", "currentTime",
+                 "getAttr", "listHistory", "xform"):
+        setattr(cmdsModule, name, globals()[name])
+
+    utilsModule.executeInMainThreadWithResult   = lambda function, *args: function(*args)
+    utilsModule.executeDeferred                 = lambda function, *args: function(*args)
+    melModule.eval                              = lambda command: None
+
+    # The API is only used while publishing, only the names read at import are defined.
+    openMayaModule.MFn  = types.ModuleType("MFn")
+    for name in ("kAnimCurveTimeToAngular", "kAnimCurveTimeToDistance", "kAnimCurveTimeToUnitless",
+                 "kAnimCurveTimeToTime"):
+        setattr(openMayaModule.MFn, name, name)
+    apiModule.OpenMaya      = openMayaModule
+    apiModule.OpenMayaAnim  = animModule
+
+    mayaModule.cmds     = cmdsModule
+    mayaModule.utils    = utilsModule
+    mayaModule.mel      = melModule
+    mayaModule.api      = apiModule
+    mayaModule.OpenMaya = openMaya1Module
+
+    sys.modules["maya"]         = mayaModule
+    sys.modules["maya.cmds"]    = cmdsModule
+    sys.modules["maya.utils"]   = utilsModule
+    sys.modules["maya.mel"]     = melModule
+    sys.modules["maya.api"]     = apiModule
+    sys.modules["maya.OpenMaya"]            = openMaya1Module
+    sys.modules["maya.api.OpenMaya"]        = openMayaModule
+    sys.modules["maya.api.OpenMayaAnim"]    = animModule
+
+    frameworkModule = types.ModuleType("P3D.maya")
+    frameworkModule.MayaAsset       = MayaAsset
+    frameworkModule.MayaEnvironment = MayaEnvironment
+    frameworkModule.MayaObject      = MayaObject
+    frameworkModule.PublishTools    = PublishTools
+    frameworkModule.LoadTools       = LoadTools
+    return frameworkModule
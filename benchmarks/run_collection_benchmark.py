@@ -0,0 +1,317 @@
+"""
+Benchmark of the collection time of the publish and breakdown hooks.
+
+The hooks are loaded against synthetic stand-ins of ``maya.cmds``, ``hou``,
+``sgtk`` and the P3D framework, so the benchmark runs on a plain Python
+install without any DCC. Each scenario is run on scenes of growing sizes and
+the report gives, for each size, the best wall time, the number of items
+created and the number of cmds/hou calls and ShotGrid requests issued. The
+scaling exponent is the slope of the time on a log-log scale between the two
+largest sizes: 1.0 is linear, 2.0 quadratic.
+
+The publisher open measure loads every Maya publish plugin using the P3D
+framework once, as the publisher does when it opens, and reports the time,
+the framework module imports and the framework tools instantiated. Pass
+``--hooks-dir`` to measure another copy of the hooks, e.g. an older revision
+extracted with ``git archive``.
+
+Usage::
+
+    python benchmarks/run_collection_benchmark.py --sizes 10 100 1000 --repeat 3 --json report.json
+"""
+
+import argparse
+import glob
+import io
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+BENCHMARK_DIR   = os.path.dirname(os.path.abspath(__file__))
+HOOKS_DIR       = os.path.join(os.path.dirname(BENCHMARK_DIR), "hooks")
+sys.path.insert(0, BENCHMARK_DIR)
+
+import houdini_standin
+import maya_standin
+import sgtk_standin
+
+# The number of review files per scene size unit.
+_REVIEW_FILES_PER_ITEM = 4
+
+
+class Scenario(object):
+    """
+    A benchmarked hook method run on scenes of growing sizes.
+    """
+
+    def __init__(self, name, dcc, hookPath, baseClass, context, buildScene, run):
+        self.name       = name
+        self.dcc        = dcc
+        self.hookPath   = os.path.join(HOOKS_DIR, hookPath)
+        self.baseClass  = baseClass
+        self.context    = context
+        self.buildScene = buildScene
+        self.run        = run
+
+
+def _mayaScene(size):
+    return maya_standin.SyntheticMayaScene(
+        assets          = size,
+        references      = size // 2,
+        cameras         = max(1, size // 20),
+        environments    = max(1, size // 50),
+    )
+
+
+def _houdiniScene(size):
+    return houdini_standin.SyntheticHoudiniScene(
+        loaders             = size,
+        alembicArchives     = size // 2,
+        hdas                = max(1, size // 10),
+        lookdevAssets       = max(1, size // 10),
+        materialXExports    = max(1, size // 10),
+        assetsShared        = max(1, size // 4),
+    )
+
+
+def _collect(hook, workTemplate):
+    rootItem = sgtk_standin.StandInItem("root", "Root", "Root")
+    settings = {"Work Template": sgtk_standin.StandInSetting(workTemplate)}
+    hook.process_current_session(settings, rootItem)
+    return rootItem.descendants()
+
+
+def _scenarios(reviewRoot):
+    return [
+        Scenario(
+            "maya.collector.shot_animation", "maya",
+            "tk-multi-publish2/maya/collector.py", sgtk_standin.StandInCollector,
+            sgtk_standin.StandInContext("Shot", "sh010", "Animation", "Animation"),
+            _mayaScene,
+            lambda hook: _collect(hook, "maya_shot_work"),
+        ),
+        Scenario(
+            "maya.collector.asset_rig", "maya",
+            "tk-multi-publish2/maya/collector.py", sgtk_standin.StandInCollector,
+            sgtk_standin.StandInContext("Asset", "asset0000", "Rig", "Rigging", [reviewRoot]),
+            _mayaScene,
+            lambda hook: _collect(hook, "maya_asset_work"),
+        ),
+        Scenario(
+            "houdini.collector.asset_shading", "houdini",
+            "tk-multi-publish2/houdini/collector.py", sgtk_standin.StandInCollector,
+            sgtk_standin.StandInContext("Asset", "asset0000", "Shading", "Shading", [reviewRoot]),
+            _houdiniScene,
+            lambda hook: _collect(hook, "houdini_asset_work"),
+        ),
+        Scenario(
+            "houdini.collector.sequence_lighting", "houdini",
+            "tk-multi-publish2/houdini/collector.py", sgtk_standin.StandInCollector,
+            sgtk_standin.StandInContext("Sequence", "seq010", "Lighting (Seq)", "Lighting", [reviewRoot]),
+            _houdiniScene,
+            lambda hook: _collect(hook, "houdini_sequence_work"),
+        ),
+        Scenario(
+            "houdini.breakdown.scan_scene", "houdini",
+            "tk-multi-breakdown2/houdini/P3D_houdini_operations.py", sgtk_standin.StandInHook,
+            sgtk_standin.StandInContext("Sequence", "seq010", "Lighting (Seq)", "Lighting"),
+            _houdiniScene,
+            lambda hook: len(hook.scan_scene()),
+        ),
+    ]
+
+
+def _writeReviewFolder(reviewRoot, size):
+    """ Fill the review folder with playblasts of several scenes and versions. """
+    reviewFolder = os.path.join(reviewRoot, "review")
+    if(os.path.isdir(reviewFolder)):
+        shutil.rmtree(reviewFolder)
+    os.makedirs(reviewFolder)
+    for index in range(size * _REVIEW_FILES_PER_ITEM):
+        version = index % 10 + 1
+        for stem in ("anim_shot", "lighting_seq"):
+            fileName = "{}_{:04d}.v{:03d}.mov".format(stem, index, version)
+            open(os.path.join(reviewFolder, fileName), "w").close()
+
+
+def _counters():
+    return (
+        sum(maya_standin.CMDS_CALLS.values()),
+        sum(houdini_standin.HOU_CALLS.values()),
+        sum(sgtk_standin.SHOTGUN_CALLS.values()),
+    )
+
+
+def runScenario(scenario, sizes, repeat, reviewRoot):
+    """ Run a scenario on scenes of growing sizes.
+
+    Args:
+        scenario    (:class:`Scenario`) : The scenario.
+        sizes       (list(int))         : The scene sizes.
+        repeat      (int)               : The number of runs per size, the best one is kept.
+        reviewRoot  (str)               : The entity root holding the review folder.
+
+    Returns:
+        list(dict)                      : The measures by size.
+    """
+    engine = sgtk_standin.StandInEngine(
+        scenario.context,
+        frameworks={"tk-framework-P3D": sgtk_standin.StandInFramework({"maya": maya_standin.install()})},
+    )
+    sgtk_standin.install(engine)
+    houdini_standin.install()
+    hook = sgtk_standin.load_hook(scenario.hookPath, scenario.baseClass, sgtk_standin.StandInApp(engine))
+
+    measures = []
+    for size in sizes:
+        scene = scenario.buildScene(size)
+        _writeReviewFolder(reviewRoot, size)
+
+        bestTime = None
+        for _ in range(repeat):
+            if(scenario.dcc == "maya"):
+                maya_standin.setScene(scene)
+            else:
+                houdini_standin.setScene(scene)
+
+            countersBefore = _counters()
+            stdout, sys.stdout = sys.stdout, io.StringIO()
+            try:
+                startTime = time.time()
+                items = scenario.run(hook)
+                duration = time.time() - startTime
+            finally:
+                sys.stdout = stdout
+            countersAfter = _counters()
+
+            if(bestTime is None or duration < bestTime):
+                bestTime = duration
+                cmdsCalls, houCalls, shotgunCalls = [after - before for after, before in zip(countersAfter, countersBefore)]
+
+        measures.append(
+            {
+                "size"          : size,
+                "seconds"       : bestTime,
+                "items"         : items,
+                "cmds_calls"    : cmdsCalls,
+                "hou_calls"     : houCalls,
+                "shotgun_calls" : shotgunCalls,
+            }
+        )
+
+    return measures
+
+
+def measurePublisherOpen(hooksDir, repeat):
+    """ Load the Maya publish plugins using the P3D framework, as when the publisher opens.
+
+    Args:
+        hooksDir    (str)   : The hooks folder to load the plugins from.
+        repeat      (int)   : The number of sessions, the best one is kept.
+
+    Returns:
+        dict                : The number of plugins, the time and the framework calls.
+    """
+    pluginPaths = []
+    for path in sorted(glob.glob(os.path.join(hooksDir, "tk-multi-publish2", "maya", "*.py"))):
+        with open(path, "rb") as hookFile:
+            source = hookFile.read()
+        if(b"tk-framework-P3D" in source or b"p3d_framework" in source):
+            pluginPaths.append(path)
+
+    best = None
+    for _ in range(repeat):
+        # Every session starts with empty hook caches.
+        engine = sgtk_standin.StandInEngine(
+            sgtk_standin.StandInContext("Asset", "asset0000", "Rig", "Rigging"),
+            frameworks={"tk-framework-P3D": sgtk_standin.StandInFramework({"maya": maya_standin.install()})},
+        )
+        sgtk_standin.install(engine)
+        sgtk_standin.clear_hook_cache()
+        sgtk_standin.CONFIG_HOOKS_DIR = hooksDir
+        sgtk_standin.FRAMEWORK_CALLS.clear()
+
+        app = sgtk_standin.StandInApp(engine)
+        startTime = time.time()
+        for path in pluginPaths:
+            sgtk_standin.load_hook(path, sgtk_standin.StandInHook, app)
+        duration = time.time() - startTime
+
+        if(best is None or duration < best["seconds"]):
+            best = {
+                "plugins"           : len(pluginPaths),
+                "seconds"           : duration,
+                "framework_calls"   : dict(sgtk_standin.FRAMEWORK_CALLS),
+            }
+
+    sgtk_standin.CONFIG_HOOKS_DIR = HOOKS_DIR
+    sgtk_standin.clear_hook_cache()
+    return best
+
+
+def scalingExponent(measures):
+    """ Return the slope of the time on a log-log scale between the two largest sizes. """
+    if(len(measures) < 2):
+        return None
+    small, large = measures[-2], measures[-1]
+    if(small["seconds"] <= 0 or large["seconds"] <= 0):
+        return None
+    return math.log(large["seconds"] / small["seconds"]) / math.log(float(large["size"]) / small["size"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 100, 500], help="The scene sizes.")
+    parser.add_argument("--repeat", type=int, default=3, help="The number of runs per size.")
+    parser.add_argument("--scenario", action="append", help="Only run the scenarios starting with this name.")
+    parser.add_argument("--json", help="Write the report to this JSON file.")
+    parser.add_argument("--hooks-dir", default=HOOKS_DIR, help="The hooks folder of the publisher open measure.")
+    args = parser.parse_args(argv)
+
+    report = {}
+    if(not args.scenario or any("publisher.open".startswith(name) for name in args.scenario)):
+        measure = measurePublisherOpen(os.path.abspath(args.hooks_dir), args.repeat)
+        report["publisher.open"] = measure
+        print("publisher.open")
+        print("    {:>8} {:>12}  {}".format("plugins", "ms", "framework calls"))
+        print("    {:>8} {:>12.2f}  {}".format(
+            measure["plugins"], measure["seconds"] * 1000.0,
+            ", ".join("{} x{}".format(name, count) for name, count in sorted(measure["framework_calls"].items())) or "none"
+        ))
+        print("")
+
+    reviewRoot = tempfile.mkdtemp(prefix="collection_benchmark_")
+    try:
+        for scenario in _scenarios(reviewRoot):
+            if(args.scenario and not any(scenario.name.startswith(name) for name in args.scenario)):
+                continue
+
+            measures = runScenario(scenario, sorted(args.sizes), args.repeat, reviewRoot)
+            exponent = scalingExponent(measures)
+            report[scenario.name] = {"measures": measures, "scaling_exponent": exponent}
+
+            print(scenario.name)
+            print("    {:>8} {:>12} {:>8} {:>10} {:>10} {:>8}".format("size", "ms", "items", "cmds", "hou", "sg"))
+            for measure in measures:
+                print("    {size:>8} {ms:>12.2f} {items:>8} {cmds_calls:>10} {hou_calls:>10} {shotgun_calls:>8}".format(
+                    ms=measure["seconds"] * 1000.0, **measure
+                ))
+            if(exponent is not None):
+                print("    scaling exponent: {:.2f}".format(exponent))
+            print("")
+    finally:
+        shutil.rmtree(reviewRoot, ignore_errors=True)
+
+    if(args.json):
+        with open(args.json, "w") as reportFile:
+            json.dump(report, reportFile, indent=2, sort_keys=True)
+
+    return report
+
+
+if __name__ == "__main__":
+    main()
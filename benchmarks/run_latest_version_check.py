@@ -0,0 +1,271 @@
+"""
+Check of the latest version resolution of the Houdini breakdown.
+
+A synthetic Houdini scene is scanned by the P3D_houdini_operations.py hook
+against a mocked ShotGrid connection holding several versions of the
+published files the loaders reference, and a publish of another type
+sharing their file names with a higher version. The report checks each
+item gets the latest version of its own published file, counts the
+queries against one per item, and checks the P3D_houdini_get_published_files.py
+hook gives the resolved publishes to the breakdown app without querying
+them again, both synchronously and through the data retriever the app
+model passes.
+
+Usage::
+
+    python benchmarks/run_latest_version_check.py --loaders 200 --json report.json
+"""
+
+import argparse
+import collections
+import json
+import os
+import random
+import sys
+
+BENCHMARK_DIR   = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCHMARK_DIR)
+
+import houdini_standin
+import sgtk_standin
+
+# The highest version of the mocked publishes.
+_MAX_VERSION = 9
+
+
+class MockShotgun(object):
+    """
+    ShotGrid connection answering the PublishedFile queries from publishes
+    stored in memory.
+    """
+
+    def __init__(self, publishes):
+        """
+        Args:
+            publishes   (list(dict))    : The publishes, with an "entity_code" and a "path_cache".
+        """
+        self.publishes  = publishes
+        self.requests   = collections.Counter()
+
+    def _matches(self, publish, filters):
+        for field, operator, value in filters:
+            if(field.startswith("entity.")):
+                if(publish["entity_code"] != value):
+                    return False
+            elif(field == "path_cache"):
+                if(operator == "contains" and value.lower() not in publish["path_cache"].lower()):
+                    return False
+                if(operator == "ends_with" and not publish["path_cache"].lower().endswith(value.lower())):
+                    return False
+        return True
+
+    def find_one(self, entityType, filters, fields=None, order=None, **kwargs):
+        self.requests["find_one"] += 1
+        publishes = [publish for publish in self.publishes if self._matches(publish, filters)]
+        if(not publishes):
+            return None
+        return max(publishes, key=lambda publish: publish["version_number"])
+
+
+class GetPublishedFilesBase(sgtk_standin.StandInHook):
+    """
+    Base get published files hook querying the latest publish of each item, as the breakdown app does.
+    """
+
+    queries = 0
+
+    def get_latest_published_file(self, item, data_retriever=None, **kwargs):
+        GetPublishedFilesBase.queries += 1
+        if(data_retriever is not None):
+            return data_retriever.execute_find_one("PublishedFile", [], [])
+        return {"type": "PublishedFile", "id": 0}
+
+
+class DataRetriever(object):
+    """
+    ShotGrid data retriever of the app model, answering its requests from the event loop.
+    """
+
+    def __init__(self):
+        self.work_completed = sgtk_standin.StandInSignal()
+        self._requestCount  = 0
+
+    def execute_find_one(self, entityType, filters, fields, order=None):
+        self._requestCount += 1
+        requestId = "find_one_{}".format(self._requestCount)
+        sgtk_standin.StandInTimer.singleShot(
+            0, lambda: self.work_completed.emit(requestId, "find_one", {"sg": {"type": entityType, "id": 0}})
+        )
+        return requestId
+
+
+class FileModel(object):
+    """
+    Model of the app, requesting the latest publish of its items through a data retriever.
+    """
+
+    def __init__(self, getPublishedFiles):
+        self._getPublishedFiles = getPublishedFiles
+        self._dataRetriever     = DataRetriever()
+        self._pendingRequests   = {}
+        self._dataRetriever.work_completed.connect(self._onWorkCompleted)
+
+    def request(self, item):
+        requestId = self._getPublishedFiles.get_latest_published_file(item, data_retriever=self._dataRetriever)
+        self._pendingRequests[requestId] = item
+
+    def _onWorkCompleted(self, uid, requestType, data):
+        item = self._pendingRequests.pop(uid, None)
+        if(item is not None):
+            item.latest_published_file = data["sg"]
+
+
+class FileItem(object):
+    """
+    Breakdown item built by the app from a scan_scene item.
+    """
+
+    def __init__(self, item):
+        self.node_name  = item["node_name"]
+        self.path       = item["path"]
+        self.extra_data = item["extra_data"]
+
+
+def buildPublishes(operations, items, templateIndex, seed):
+    """ Build several versions of the published files of the scanned items.
+
+    Args:
+        operations      (module)                    : The module of the breakdown operations hook.
+        items           (list(dict))                : The scanned items.
+        templateIndex   (:class:`TemplateIndex`)    : The index parsing the paths.
+        seed            (int)                       : The seed of the versions.
+
+    Returns:
+        list(dict), dict                            : The publishes and the expected
+                                                    latest version by item path.
+    """
+    randomizer = random.Random(seed)
+    publishes = []
+    expected = {}
+    for item in items:
+        path = item["path"]
+        if(path in expected):
+            continue
+        template, fields = templateIndex.match(path)
+        if(template is None or "version" not in fields):
+            continue
+        entity = operations._entity_from_fields(fields)
+        if(entity is None):
+            continue
+
+        latestVersion = randomizer.randint(1, _MAX_VERSION)
+        relativePath = os.path.relpath(path, sgtk_standin.PROJECT_ROOT).replace("\\", "/")
+        stem, extension = os.path.splitext(relativePath)
+        prefix = stem.rsplit(".v", 1)[0]
+        for version in range(1, latestVersion + 1):
+            publishes.append({
+                "type"          : "PublishedFile",
+                "id"            : len(publishes) + 1,
+                "entity_code"   : entity[1],
+                "version_number": version,
+                "path_cache"    : "{}.v{:03d}{}".format(prefix, version, extension),
+            })
+        # A publish of another type sharing the file name, with a higher version.
+        publishes.append({
+            "type"          : "PublishedFile",
+            "id"            : len(publishes) + 1,
+            "entity_code"   : entity[1],
+            "version_number": _MAX_VERSION + 1,
+            "path_cache"    : "{}.v{:03d}.decoy".format(prefix, _MAX_VERSION + 1),
+        })
+        expected[path] = latestVersion
+
+    return publishes, expected
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--loaders", type=int, default=200, help="The number of loader nodes of the scene.")
+    parser.add_argument("--seed", type=int, default=0, help="The seed of the published versions.")
+    parser.add_argument("--json", help="Write the report to this JSON file.")
+    args = parser.parse_args(argv)
+
+    houdini_standin.install()
+    engine = sgtk_standin.StandInEngine(sgtk_standin.StandInContext("Sequence", "seq010", "Lighting (Seq)", "Lighting"))
+    sgtk_standin.install(engine)
+    houdini_standin.setScene(houdini_standin.SyntheticHoudiniScene(
+        loaders=args.loaders, alembicArchives=args.loaders // 4, assetsShared=max(1, args.loaders // 10)
+    ))
+    app = sgtk_standin.StandInApp(engine)
+
+    operations = sgtk_standin.create_hook_instance(
+        "{config}/tk-multi-breakdown2/houdini/P3D_houdini_operations.py", sgtk_standin.StandInHook, app
+    )
+    templateIndex = sgtk_standin.create_hook_instance("{config}/common/template_index.py", None, app)
+
+    # The publishes of the paths of the scene.
+    engine.shotgun = MockShotgun([])
+    items = operations.scan_scene()
+    publishes, expected = buildPublishes(sys.modules[type(operations).__module__], items, templateIndex, args.seed)
+
+    shotgun = MockShotgun(publishes)
+    engine.shotgun = shotgun
+    items = operations.scan_scene()
+
+    mismatches = [
+        item["path"] for item in items
+        if item["path"] in expected and item["extra_data"].get("latest_version") != expected[item["path"]]
+    ]
+    resolvedItems = [item for item in items if "latest_published_file" in item["extra_data"]]
+
+    # The breakdown app asks the latest publish of each item.
+    getPublishedFiles = sgtk_standin.create_hook_instance(
+        "{config}/tk-multi-breakdown2/houdini/P3D_houdini_get_published_files.py", GetPublishedFilesBase, app
+    )
+    for item in items:
+        getPublishedFiles.get_latest_published_file(FileItem(item))
+    syncQueries = GetPublishedFilesBase.queries
+
+    # The app model asks them through its data retriever.
+    fileModel = FileModel(getPublishedFiles)
+    fileItems = [FileItem(item) for item in items]
+    for fileItem in fileItems:
+        fileModel.request(fileItem)
+    sgtk_standin.StandInCoreApplication.processEvents()
+    retrieverMismatches = [
+        fileItem.path for fileItem in fileItems
+        if "latest_published_file" in fileItem.extra_data
+        and getattr(fileItem, "latest_published_file", None) is not fileItem.extra_data["latest_published_file"]
+    ]
+    unanswered = [fileItem.path for fileItem in fileItems if not hasattr(fileItem, "latest_published_file")]
+
+    report = {
+        "items"                 : len(items),
+        "resolved_items"        : len(resolvedItems),
+        "queries"               : shotgun.requests["find_one"],
+        "app_queries"           : syncQueries,
+        "retriever_queries"     : GetPublishedFilesBase.queries - syncQueries,
+        "mismatches"            : mismatches,
+        "retriever_mismatches"  : retrieverMismatches + unanswered,
+    }
+    report["match"] = not mismatches and not report["retriever_mismatches"] and len(resolvedItems) == len(
+        [item for item in items if item["path"] in expected]
+    )
+
+    print("{} items, {} resolved with {} queries, {} queried by the app, {} through its data retriever".format(
+        report["items"], report["resolved_items"], report["queries"], report["app_queries"],
+        report["retriever_queries"]
+    ))
+    print("latest versions: {}".format(
+        "ok" if report["match"] else "MISMATCH {}".format(mismatches + report["retriever_mismatches"])
+    ))
+
+    if(args.json):
+        with open(args.json, "w") as reportFile:
+            json.dump(report, reportFile, indent=2, sort_keys=True)
+
+    return report
+
+
+if __name__ == "__main__":
+    main()
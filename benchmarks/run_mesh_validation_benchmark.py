@@ -0,0 +1,264 @@
+"""
+Benchmark of the vectorized mesh validation of the asset publish plugins.
+
+A grid mesh of the requested number of quads is generated as the arrays the
+maya/mesh_validation.py hook reads from the scene, with a known number of
+defects of each kind: a face added on an existing edge (non-manifold), a
+duplicated face (lamina), a collapsed face (zero area), a patch of faces
+whose UVs cross a UDIM tile border and leave the tiles, and a patch of faces
+whose UV shell is stacked on the main shell. The report gives the time of
+each check and checks the expected components are found. It also checks
+that two shells side by side, one of small faces and one of large faces,
+are not reported as overlapping.
+
+The arrays have the types read from Maya, 32 bits floats and ints. Their
+reading is not measured, it needs a Maya session.
+
+Usage::
+
+    python benchmarks/run_mesh_validation_benchmark.py --faces 2000000 --json report.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+BENCHMARK_DIR   = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCHMARK_DIR)
+
+import numpy
+
+import maya_standin
+import sgtk_standin
+
+# The number of faces of the UV patches.
+_PATCH_SIZE = 4
+
+
+def loadChecks():
+    """ Load the mesh validation hook with the stand-ins.
+
+    Returns:
+        module  : The module of the hook.
+    """
+    engine = sgtk_standin.StandInEngine(sgtk_standin.StandInContext("Asset", "bench", "Model", "Model"))
+    engine.frameworks = {"tk-framework-P3D": sgtk_standin.StandInFramework({"maya": maya_standin.install()})}
+    sgtk_standin.install(engine)
+    hook = sgtk_standin.create_hook_instance(
+        "{config}/tk-multi-publish2/maya/mesh_validation.py", None, sgtk_standin.StandInApp(engine)
+    )
+    return sys.modules[type(hook).__module__]
+
+
+def buildGrid(module, faceCount):
+    """ Build the arrays of a grid mesh with the defects of the benchmark.
+
+    Args:
+        module      (module)    : The module of the mesh validation hook.
+        faceCount   (int)       : The approximate number of quads of the grid.
+
+    Returns:
+        MeshArrays, dict        : The arrays and the expected components by check.
+    """
+    side = int(numpy.sqrt(faceCount))
+    rows = numpy.arange(side)
+    # The vertices of the grid, in a unit square.
+    coords = numpy.linspace(0.0, 1.0, side + 1)
+    gridUs, gridVs = numpy.meshgrid(coords, coords, indexing="ij")
+    points = numpy.stack((gridUs.ravel(), numpy.zeros(gridUs.size), gridVs.ravel()), axis=1)
+
+    # The quads, counter clockwise.
+    corners = (rows[:, None] * (side + 1) + rows[None, :]).ravel()
+    quads = numpy.stack((corners, corners + side + 1, corners + side + 2, corners + 1), axis=1)
+    faceCounts = [numpy.full(len(quads), 4)]
+    faceVertices = [quads.ravel()]
+    # The UVs are the grid coordinates, shared with the vertices.
+    us = [gridUs.ravel()]
+    vs = [gridVs.ravel()]
+    uvIds = [quads.ravel()]
+    uvCounts = [numpy.full(len(quads), 4)]
+    shellIds = [numpy.zeros(gridUs.size, numpy.int64)]
+    expected = {}
+
+    def addFace(vertices, uvs, shell):
+        firstPoint = len(points) + sum(len(newPoints) for newPoints in addedPoints)
+        firstUV = sum(len(values) for values in us)
+        addedPoints.append(numpy.array([vertex for vertex in vertices if not isinstance(vertex, int)]))
+        ids, pointIndex = [], firstPoint
+        for vertex in vertices:
+            if(isinstance(vertex, int)):
+                ids.append(vertex)
+            else:
+                ids.append(pointIndex)
+                pointIndex += 1
+        faceCounts.append(numpy.array([len(ids)]))
+        faceVertices.append(numpy.array(ids))
+        us.append(numpy.array([uv[0] for uv in uvs]))
+        vs.append(numpy.array([uv[1] for uv in uvs]))
+        uvIds.append(numpy.arange(firstUV, firstUV + len(uvs)))
+        uvCounts.append(numpy.array([len(uvs)]))
+        shellIds.append(numpy.full(len(uvs), shell))
+        return sum(len(counts) for counts in faceCounts) - 1, numpy.arange(firstUV, firstUV + len(uvs))
+
+    addedPoints = []
+    quad = quads[side // 2 * side + side // 2]
+    square = [(0.0, 0.0), (0.01, 0.0), (0.01, 0.01), (0.0, 0.01)]
+
+    # A face on the first edge of a quad, which is then shared by three faces.
+    addFace([int(quad[0]), int(quad[1]), (0.5, 1.0, 0.5)], [(0.1, 0.1), (0.11, 0.1), (0.1, 0.11)], 1)
+
+    # The same vertices as a quad, reversed.
+    laminaFace, _ = addFace([int(vertex) for vertex in quad[::-1]], [(0.2 + u, 0.2 + v) for u, v in square], 2)
+    expected["Lamina faces"] = [side // 2 * side + side // 2, laminaFace]
+    # The edges of the lamina face are also shared by three faces.
+    expected["Non-manifold edges"] = sorted(int(vertex) for vertex in quad)
+
+    # Three aligned points.
+    flatFace, _ = addFace([(2.0, 0.0, 0.0), (3.0, 0.0, 0.0), (4.0, 0.0, 0.0)], [(0.3, 0.3), (0.31, 0.3), (0.3, 0.31)], 3)
+    expected["Zero-area faces"] = [flatFace]
+
+    # Faces crossing the border of the first tile and leaving the tiles.
+    crossingFaces, outsideUVs = [], []
+    for index in range(_PATCH_SIZE):
+        offset = (index + 1) * 0.02
+        face, uvs = addFace(
+            [(5.0 + index, 0.0, 0.0), (6.0 + index, 0.0, 0.0), (6.0 + index, 0.0, 1.0), (5.0 + index, 0.0, 1.0)],
+            [(0.99, offset), (1.01, offset), (1.01, offset + 0.01), (0.99, offset + 0.01)] if index % 2 == 0
+            else [(-0.02, offset), (-0.01, offset), (-0.01, offset + 0.01), (-0.02, offset + 0.01)],
+            4 + index
+        )
+        # The faces left of the tiles are in a single tile, out of the UDIM range.
+        if(index % 2 == 0):
+            crossingFaces.append(face)
+        else:
+            outsideUVs.extend(uvs.tolist())
+    expected["Faces crossing UDIM tiles"] = crossingFaces
+    expected["UVs outside UDIM tiles"] = outsideUVs
+
+    # A shell stacked on the main shell.
+    stackedUVs = []
+    for row in range(_PATCH_SIZE):
+        for column in range(_PATCH_SIZE):
+            u, v = 0.5 + column * 0.01, 0.5 + row * 0.01
+            _, uvs = addFace(
+                [(10.0 + column, 1.0, row), (11.0 + column, 1.0, row), (11.0 + column, 1.0, row + 1), (10.0 + column, 1.0, row + 1)],
+                [(u, v), (u + 0.01, v), (u + 0.01, v + 0.01), (u, v + 0.01)],
+                100
+            )
+            stackedUVs.extend(uvs.tolist())
+    expected["Overlapping UV shells"] = stackedUVs
+
+    arrays = module.MeshArrays(
+        numpy.concatenate(
+            [points] + [newPoints.reshape(-1, 3) for newPoints in addedPoints if len(newPoints)]
+        ).astype(numpy.float32),
+        numpy.concatenate(faceCounts).astype(numpy.int32),
+        numpy.concatenate(faceVertices).astype(numpy.int32),
+        numpy.concatenate(us).astype(numpy.float32),
+        numpy.concatenate(vs).astype(numpy.float32),
+        numpy.concatenate(uvCounts).astype(numpy.int32),
+        numpy.concatenate(uvIds).astype(numpy.int32),
+        numpy.concatenate(shellIds).astype(numpy.int32),
+    )
+    return arrays, expected
+
+
+def buildSideBySideShells(module, smallFaces=20000, largeFaces=50):
+    """ Build the arrays of two UV shells side by side, which do not overlap.
+
+    Args:
+        module      (module)    : The module of the mesh validation hook.
+        smallFaces  (int)       : The approximate number of quads of the shell of small faces.
+        largeFaces  (int)       : The approximate number of quads of the shell of large faces.
+
+    Returns:
+        MeshArrays              : The arrays.
+    """
+    grids = []
+    # The small faces on the left half of the tile, the large faces on the right half.
+    for faceCount, uStart, shell in ((smallFaces, 0.0, 0), (largeFaces, 0.5, 1)):
+        columns = max(1, int(numpy.sqrt(faceCount / 2.0)))
+        rows = max(1, faceCount // columns)
+        gridUs, gridVs = numpy.meshgrid(
+            numpy.linspace(uStart, uStart + 0.5, columns + 1), numpy.linspace(0.0, 1.0, rows + 1), indexing="ij"
+        )
+        corners = (numpy.arange(columns)[:, None] * (rows + 1) + numpy.arange(rows)[None, :]).ravel()
+        quads = numpy.stack((corners, corners + rows + 1, corners + rows + 2, corners + 1), axis=1)
+        grids.append((gridUs.ravel(), gridVs.ravel(), quads, shell))
+
+    points, faceVertices, us, vs, shellIds = [], [], [], [], []
+    firstPoint = 0
+    for gridUs, gridVs, quads, shell in grids:
+        points.append(numpy.stack((gridUs, numpy.zeros(len(gridUs)), gridVs), axis=1))
+        faceVertices.append((quads + firstPoint).ravel())
+        us.append(gridUs)
+        vs.append(gridVs)
+        shellIds.append(numpy.full(len(gridUs), shell))
+        firstPoint += len(gridUs)
+
+    faceVertices = numpy.concatenate(faceVertices).astype(numpy.int32)
+    faceCounts = numpy.full(len(faceVertices) // 4, 4, numpy.int32)
+    return module.MeshArrays(
+        numpy.concatenate(points).astype(numpy.float32),
+        faceCounts,
+        faceVertices,
+        numpy.concatenate(us).astype(numpy.float32),
+        numpy.concatenate(vs).astype(numpy.float32),
+        faceCounts.copy(),
+        faceVertices.copy(),
+        numpy.concatenate(shellIds).astype(numpy.int32),
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--faces", type=int, default=2000000, help="The number of faces of the mesh.")
+    parser.add_argument("--json", help="Write the report to this JSON file.")
+    args = parser.parse_args(argv)
+
+    module = loadChecks()
+    arrays, expected = buildGrid(module, args.faces)
+
+    report = {"faces": int(len(arrays.faceCounts)), "checks": {}}
+    totalSeconds = 0.0
+    for check, function, componentType, isError in module.CHECKS:
+        startTime = time.time()
+        indices = function(arrays)
+        seconds = time.time() - startTime
+        totalSeconds += seconds
+        found = sorted(set(int(index) for index in indices))
+        # The main shell the patch is stacked on is also reported.
+        matches = set(expected[check]) <= set(found) if check == "Overlapping UV shells" else found == sorted(expected[check])
+        report["checks"][check] = {"seconds": seconds, "found": len(found), "expected": len(expected[check]), "match": matches}
+
+    report["seconds"] = totalSeconds
+
+    # The shells side by side do not overlap.
+    sideBySide = buildSideBySideShells(module)
+    report["side_by_side_overlaps"] = int(len(module.overlappingShells(sideBySide)))
+
+    report["all_match"] = all(result["match"] for result in report["checks"].values()) and \
+        report["side_by_side_overlaps"] == 0
+
+    print("{} faces".format(report["faces"]))
+    for check, result in report["checks"].items():
+        print("    {:<28} {:>8.1f} ms {:>6} found {}".format(
+            check, result["seconds"] * 1000.0, result["found"], "ok" if result["match"] else "MISMATCH"
+        ))
+    print("    {:<28} {:>8.1f} ms".format("total", totalSeconds * 1000.0))
+    print("    {:<28} {:>11} {:>6} found {}".format(
+        "Side by side shells", "", report["side_by_side_overlaps"],
+        "ok" if report["side_by_side_overlaps"] == 0 else "MISMATCH"
+    ))
+
+    if(args.json):
+        with open(args.json, "w") as reportFile:
+            json.dump(report, reportFile, indent=2, sort_keys=True)
+
+    return report
+
+
+if __name__ == "__main__":
+    main()
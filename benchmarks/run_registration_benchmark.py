@@ -0,0 +1,314 @@
+"""
+Benchmark of the ShotGrid requests issued to register the publishes.
+
+An asset rig publish is simulated: the session publish, depending on the
+published files it references, and the HI/MI/LO maya, alembic and materialX
+publishes, depending on the session publish. The publish plugins, chained
+with the batch_register_plugin.py hook, register them against a mocked
+ShotGrid connection adding a fixed latency to each request, first one by one
+as toolkit does, then with the batch registration of the
+publish_registration_queue.py hook. The report gives the number of requests
+and the time of both, and checks they create the same dependency links.
+
+Usage::
+
+    python benchmarks/run_registration_benchmark.py --latency 50 --json report.json
+"""
+
+import argparse
+import collections
+import json
+import os
+import sys
+import time
+import types
+
+BENCHMARK_DIR   = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCHMARK_DIR)
+
+import sgtk_standin
+
+# The published files referenced by the session.
+_REFERENCE_PATHS = [
+    os.path.join(sgtk_standin.PROJECT_ROOT, "assets", "prop", "bench", "publishs", "MOD", "v003", "MOD_bench.v003.ma"),
+    os.path.join(sgtk_standin.PROJECT_ROOT, "assets", "prop", "bench", "publishs", "SHD", "v002", "SHD_bench.v002.ma"),
+]
+
+# The publishes of the LODs, by publish type and extension.
+_LOD_PUBLISHES = [
+    ("Maya Scene", "ma"),
+    ("Alembic Cache", "abc"),
+    ("MaterialX", "mtlx"),
+]
+
+
+class MockShotgun(object):
+    """
+    ShotGrid connection storing the created entities in memory and waiting
+    a fixed latency on each request.
+    """
+
+    def __init__(self, latency):
+        """
+        Args:
+            latency (float) : The latency of a request in seconds.
+        """
+        self.latency    = latency
+        self.requests   = collections.Counter()
+        self.entities   = collections.defaultdict(list)
+
+    def _request(self, method):
+        self.requests[method] += 1
+        time.sleep(self.latency)
+
+    def _create(self, entityType, data):
+        entity = dict(data, type=entityType, id=len(self.entities[entityType]) + 1)
+        self.entities[entityType].append(entity)
+        return entity
+
+    def _matches(self, entity, filters):
+        for field, operator, value in filters:
+            if(operator == "in" and entity.get(field) not in value):
+                return False
+            if(operator == "is" and entity.get(field) != value):
+                return False
+        return True
+
+    def find(self, entityType, filters, fields=None, **kwargs):
+        self._request("find")
+        return [entity for entity in self.entities[entityType] if self._matches(entity, filters)]
+
+    def create(self, entityType, data, **kwargs):
+        self._request("create")
+        return self._create(entityType, data)
+
+    def batch(self, requests):
+        self._request("batch")
+        return [self._create(request["entity_type"], request["data"]) for request in requests]
+
+    def upload_thumbnail(self, entityType, entityId, path):
+        self._request("upload_thumbnail")
+
+
+def _publishTypeEntity(tk, code):
+    """ Find or create a publish type, as toolkit does. """
+    publishTypes = tk.shotgun.find("PublishedFileType", [["code", "is", code]], ["code"])
+    if(publishTypes):
+        return {"type": "PublishedFileType", "id": publishTypes[0]["id"]}
+    publishType = tk.shotgun.create("PublishedFileType", {"code": code})
+    return {"type": "PublishedFileType", "id": publishType["id"]}
+
+
+def find_publish(tk, paths, fields=None):
+    """ Find the publishes of paths in a single query, as sgtk.util.find_publish. """
+    publishes = tk.shotgun.find("PublishedFile", [["path_cache", "in", list(paths)]], fields)
+    return dict((publish["path_cache"], publish) for publish in publishes)
+
+
+def register_publish(tk, context, path, name, version_number, **kwargs):
+    """ Register a publish with the requests of sgtk.util.register_publish. """
+    data = {
+        "code"              : os.path.basename(path),
+        "name"              : name,
+        "version_number"    : version_number,
+        "description"       : kwargs.get("comment"),
+        "project"           : context.project,
+        "entity"            : context.entity,
+        "task"              : context.task,
+        "created_by"        : kwargs.get("created_by"),
+        "path_cache"        : path,
+        "path"              : {"local_path": path},
+    }
+    # The core hook runs on the data of the dry runs too.
+    data = tk.execute_core_hook("before_register_publish", shotgun_data=data, context=context)
+    if(kwargs.get("dry_run")):
+        data["type"] = "PublishedFile"
+        return data
+
+    if(kwargs.get("published_file_type")):
+        data["published_file_type"] = _publishTypeEntity(tk, kwargs["published_file_type"])
+    publish = tk.shotgun.create("PublishedFile", data)
+
+    if(kwargs.get("thumbnail_path")):
+        tk.shotgun.upload_thumbnail("PublishedFile", publish["id"], kwargs["thumbnail_path"])
+
+    dependencyIds = list(kwargs.get("dependency_ids") or [])
+    if(kwargs.get("dependency_paths")):
+        dependencyIds += [
+            dependency["id"] for dependency in find_publish(tk, kwargs["dependency_paths"]).values()
+        ]
+    if(dependencyIds):
+        tk.shotgun.batch([
+            {
+                "request_type"  : "create",
+                "entity_type"   : "PublishedFileDependency",
+                "data"          : {
+                    "published_file"            : {"type": "PublishedFile", "id": publish["id"]},
+                    "dependent_published_file"  : {"type": "PublishedFile", "id": dependencyId},
+                },
+            }
+            for dependencyId in dependencyIds
+        ])
+    return publish
+
+
+class PublishFilePlugin(sgtk_standin.StandInHook):
+    """
+    Base publish plugin registering the publish of an item, as the
+    publish_file.py hook of the publish2 app.
+    """
+
+    def validate(self, settings, item):
+        return True
+
+    def publish(self, settings, item):
+        publishData = {
+            "tk"                    : self.parent.sgtk,
+            "context"               : self.parent.engine.context,
+            "comment"               : "Benchmark",
+            "path"                  : item.properties["path"],
+            "name"                  : item.name,
+            "created_by"            : self.parent.engine.context.user,
+            "version_number"        : 4,
+            "thumbnail_path"        : None,
+            "published_file_type"   : item.properties["publish_type"],
+            "dependency_paths"      : item.properties.get("publish_dependencies", []),
+        }
+        item.properties["sg_publish_data"] = sys.modules["sgtk"].util.register_publish(**publishData)
+
+    def finalize(self, settings, item):
+        if(item.properties["sg_publish_data"]["id"] is None):
+            raise Exception("The publish of {} is not registered.".format(item.name))
+
+
+def buildItems():
+    """ Build the items of an asset rig publish.
+
+    Returns:
+        list(:class:`StandInItem`)  : The items, the session first.
+    """
+    publishRoot = os.path.join(sgtk_standin.PROJECT_ROOT, "assets", "prop", "bench", "publishs", "RIG", "v004")
+    session = sgtk_standin.StandInItem("maya.session", "Maya Session", "RIG_bench")
+    session.properties["path"]                  = os.path.join(publishRoot, "RIG_bench.v004.ma")
+    session.properties["publish_type"]          = "Maya Scene"
+    session.properties["publish_dependencies"]  = list(_REFERENCE_PATHS)
+
+    items = [session]
+    for lod in ("HI", "MI", "LO"):
+        for publishType, extension in _LOD_PUBLISHES:
+            item = session.create_item("maya.asset.{}".format(extension), publishType, "RIG_bench_{}".format(lod))
+            item.properties["path"]                 = os.path.join(publishRoot, "RIG_bench_{}.v004.{}".format(lod, extension))
+            item.properties["publish_type"]         = publishType
+            item.properties["publish_dependencies"] = [session.properties["path"]]
+            items.append(item)
+    return items
+
+
+def runPublish(latency, batch):
+    """ Run the validate, publish and finalize passes of an asset rig publish.
+
+    Args:
+        latency (float) : The latency of a request in seconds.
+        batch   (bool)  : True to enable the batch registration.
+
+    Returns:
+        dict            : The requests, time and dependency links of the publish.
+    """
+    shotgun = MockShotgun(latency)
+    # The published files referenced by the session already exist.
+    for path in _REFERENCE_PATHS:
+        shotgun._create("PublishedFile", {"path_cache": path, "code": os.path.basename(path)})
+    shotgun._create("PublishedFileType", {"code": "Maya Scene"})
+
+    tk = sgtk_standin.StandInTk()
+    tk.shotgun = shotgun
+    hookCalls = collections.Counter()
+
+    def execute_core_hook(hookName, shotgun_data, context):
+        hookCalls[hookName] += 1
+        return shotgun_data
+    tk.execute_core_hook = execute_core_hook
+
+    engine = sgtk_standin.StandInEngine(sgtk_standin.StandInContext("Asset", "bench", "Rig", "Rig"))
+    engine.sgtk = tk
+    engine.shotgun = shotgun
+    sgtk_standin.install(engine)
+
+    utilModule = types.ModuleType("sgtk.util")
+    utilModule.register_publish                 = register_publish
+    utilModule.find_publish                     = find_publish
+    utilModule.get_published_file_entity_type   = lambda tk: "PublishedFile"
+    sys.modules["sgtk"].util = utilModule
+    sys.modules["sgtk.util"] = utilModule
+
+    if(batch):
+        os.environ["P3D_PUBLISH_BATCH_REGISTER"] = "1"
+    else:
+        os.environ.pop("P3D_PUBLISH_BATCH_REGISTER", None)
+
+    plugin = sgtk_standin.create_hook_instance(
+        "{config}/tk-multi-publish2/batch_register_plugin.py", PublishFilePlugin, sgtk_standin.StandInApp(engine)
+    )
+    items = buildItems()
+
+    startTime = time.time()
+    for item in items:
+        plugin.validate({}, item)
+    for item in items:
+        plugin.publish({}, item)
+    for item in items:
+        plugin.finalize({}, item)
+    seconds = time.time() - startTime
+
+    paths = dict((publish["id"], publish["path_cache"]) for publish in shotgun.entities["PublishedFile"])
+    links = sorted(
+        (paths[link["published_file"]["id"]], paths[link["dependent_published_file"]["id"]])
+        for link in shotgun.entities["PublishedFileDependency"]
+    )
+    return {
+        "requests"  : dict(shotgun.requests),
+        "total"     : sum(shotgun.requests.values()),
+        "seconds"   : seconds,
+        "publishes" : len(items),
+        "hook_calls": hookCalls["before_register_publish"],
+        "links"     : links,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=50.0, help="The latency of a request in milliseconds.")
+    parser.add_argument("--json", help="Write the report to this JSON file.")
+    args = parser.parse_args(argv)
+
+    latency = args.latency / 1000.0
+    report = {
+        "latency_ms"    : args.latency,
+        "per_publish"   : runPublish(latency, batch=False),
+        "batched"       : runPublish(latency, batch=True),
+    }
+    report["links_match"] = report["per_publish"]["links"] == report["batched"]["links"]
+
+    print("{} publishes, {:.0f} ms per request".format(report["per_publish"]["publishes"], args.latency))
+    for mode in ("per_publish", "batched"):
+        result = report[mode]
+        print("    {:<12} {:>4} requests {:>10.1f} ms    {}".format(
+            mode, result["total"], result["seconds"] * 1000.0,
+            ", ".join("{} {}".format(count, method) for method, count in sorted(result["requests"].items()))
+        ))
+    print("    dependency links    {} {}".format(
+        len(report["batched"]["links"]), "match" if report["links_match"] else "DIFFER"
+    ))
+    print("    before_register_publish calls    {} per publish, {} batched".format(
+        report["per_publish"]["hook_calls"], report["batched"]["hook_calls"]
+    ))
+
+    if(args.json):
+        with open(args.json, "w") as reportFile:
+            json.dump(report, reportFile, indent=2, sort_keys=True)
+
+    return report
+
+
+if __name__ == "__main__":
+    main()
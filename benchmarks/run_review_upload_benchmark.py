@@ -0,0 +1,430 @@
+"""
+Benchmark of the review upload queue against a local HTTP upload endpoint.
+
+The Maya review plugin publishes a synthetic movie with a stand-in of the
+P3D framework review publish, which creates the Version and uploads the
+movie to it. The upload goes through a mocked ShotGrid connection whose
+transfer rate is limited, or through a local HTTP endpoint implementing the
+chunked upload protocol of the review_upload_queue.py hook, with the same
+transfer rate and failures injected on some chunks.
+
+The report gives the time the publish blocks the publisher and the time
+until the movie is uploaded, for the synchronous upload, the queued upload
+through ShotGrid and the background chunked upload. It checks the queued
+publishes return before the movie is uploaded, that the publish gets the
+attachment id from the synchronous and chunked uploads, that an upload left
+in the spool folder by a previous session only
+sends the chunks the endpoint did not receive, and that the uploads owned
+by a running session are not resumed.
+
+Usage::
+
+    python benchmarks/run_review_upload_benchmark.py --size 64 --rate 100 --json report.json
+"""
+
+import argparse
+import collections
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+BENCHMARK_DIR   = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCHMARK_DIR)
+
+import maya_standin
+import sgtk_standin
+
+# The size of the chunks sent to the endpoint, smaller than in production to
+# exercise the resume with a small movie.
+_CHUNK_SIZE = 1024 * 1024
+
+
+class MockShotgun(object):
+    """
+    ShotGrid connection storing the created entities in memory and uploading
+    the files at a limited transfer rate.
+    """
+
+    def __init__(self, rate):
+        """
+        Args:
+            rate    (float) : The transfer rate in bytes per second.
+        """
+        self.rate       = rate
+        self.lock       = threading.Lock()
+        self.requests   = collections.Counter()
+        self.entities   = collections.defaultdict(dict)
+
+    def create(self, entityType, data, **kwargs):
+        with self.lock:
+            self.requests["create"] += 1
+            entity = dict(data, type=entityType, id=len(self.entities[entityType]) + 1)
+            self.entities[entityType][entity["id"]] = entity
+            return entity
+
+    def connection(self):
+        """ Open another connection to the same entities, as a worker does. """
+        connection = MockShotgun.__new__(MockShotgun)
+        connection.rate     = self.rate
+        connection.lock     = self.lock
+        connection.requests = self.requests
+        connection.entities = self.entities
+        return connection
+
+    def _attachment(self, data):
+        # The url fields are stored as attachments.
+        attachment = {"type": "Attachment", "id": len(self.entities["Attachment"]) + 1, "this_file": data}
+        self.entities["Attachment"][attachment["id"]] = attachment
+        return attachment
+
+    def update(self, entityType, entityId, data, **kwargs):
+        with self.lock:
+            self.requests["update"] += 1
+            for field, value in data.items():
+                if(entityType != "Attachment" and isinstance(value, dict) and "url" in value):
+                    value = self._attachment(value)
+                self.entities[entityType][entityId][field] = value
+            return self.entities[entityType][entityId]
+
+    def find_one(self, entityType, filters, fields=None, **kwargs):
+        with self.lock:
+            self.requests["find_one"] += 1
+            return self.entities[entityType].get(filters[0][2])
+
+    def upload(self, entityType, entityId, path, field_name=None, display_name=None, tag_list=None):
+        time.sleep(os.path.getsize(path) / self.rate)
+        with self.lock:
+            self.requests["upload"] += 1
+            attachment = self._attachment({"name": display_name or os.path.basename(path)})
+            self.entities[entityType][entityId][field_name] = attachment
+        return attachment["id"]
+
+    def uploadedMovie(self, entityType, entityId):
+        """ Get the movie uploaded to an entity, None if the upload is not done. """
+        attachment = self.entities[entityType][entityId].get("sg_uploaded_movie")
+        if(attachment is None):
+            return None
+        movie = self.entities["Attachment"][attachment["id"]]["this_file"]
+        # The endpoint url is linked before the upload.
+        if(movie.get("url", "").startswith("http://127.0.0.1")):
+            return None
+        return movie
+
+
+class UploadEndpoint(ThreadingMixIn, HTTPServer):
+    """
+    Local HTTP endpoint receiving the movies in chunks, at a limited
+    transfer rate and failing every given number of chunks.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, rate, failEvery):
+        """
+        Args:
+            rate        (float) : The transfer rate in bytes per second.
+            failEvery   (int)   : Fail one chunk out of this number, 0 to never fail.
+        """
+        HTTPServer.__init__(self, ("127.0.0.1", 0), _UploadHandler)
+        self.rate           = rate
+        self.failEvery      = failEvery
+        self.lock           = threading.Lock()
+        self.files          = {}
+        self.chunks         = 0
+        self.failures       = 0
+        self.bytesReceived  = 0
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:{}/upload".format(self.server_address[1])
+
+
+class _UploadHandler(BaseHTTPRequestHandler):
+    """
+    Handler of the chunked upload protocol of the review upload queue.
+    """
+
+    def log_message(self, format, *args):
+        pass
+
+    def _jobId(self):
+        return self.path.rstrip("/").split("/")[-1]
+
+    def do_HEAD(self):
+        with self.server.lock:
+            data = self.server.files.get(self._jobId())
+        if(data is None):
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Upload-Offset", str(len(data)))
+        self.end_headers()
+
+    def do_PUT(self):
+        jobId = self._jobId()
+        length = int(self.headers.get("Content-Length") or 0)
+        chunk = self.rfile.read(length)
+        rangeStart, rangeTotal = self.headers["Content-Range"].split(" ")[1].split("-")[0], \
+            self.headers["Content-Range"].split("/")[1]
+        time.sleep(len(chunk) / self.server.rate)
+
+        with self.server.lock:
+            self.server.chunks += 1
+            fail = self.server.failEvery and self.server.chunks % self.server.failEvery == 0
+            data = self.server.files.setdefault(jobId, bytearray())
+            if(not fail and int(rangeStart) == len(data)):
+                data.extend(chunk)
+                self.server.bytesReceived += len(chunk)
+            complete = len(data) == int(rangeTotal)
+        if(fail):
+            with self.server.lock:
+                self.server.failures += 1
+            self.send_response(500)
+            self.end_headers()
+            return
+
+        body = json.dumps({"url": "http://review/{}".format(jobId)}).encode("utf-8") if complete else b""
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def hookUploadReviewPublish(self, plugin, settings, item):
+    """ Stand-in of the P3D framework review publish, creating the Version and uploading the movie. """
+    shotgun = plugin.parent.shotgun
+    version = shotgun.create("Version", {"code": os.path.basename(item.properties["path"])})
+    item.properties["sg_version_data"] = version
+    item.properties["sg_attachment_id"] = shotgun.upload(
+        "Version", version["id"], item.properties["path"], "sg_uploaded_movie"
+    )
+
+
+class _StandInUser(object):
+    """
+    Authenticated user opening the connections of the upload workers.
+    """
+
+    def __init__(self, shotgun):
+        self.shotgun = shotgun
+
+    def create_sg_connection(self):
+        return self.shotgun.connection()
+
+
+def _openedConnections(uploadQueue):
+    """ Forget the connections opened by the workers for the previous session. """
+    sys.modules[type(uploadQueue).__module__]._LOCAL = threading.local()
+
+
+def setupSession(shotgun):
+    """ Install the stand-ins of a Maya session using a ShotGrid connection.
+
+    Returns:
+        :class:`StandInApp` : The publisher app.
+    """
+    engine = sgtk_standin.StandInEngine(
+        sgtk_standin.StandInContext("Shot", "sh0010", "Animation", "Animation"),
+        frameworks={"tk-framework-P3D": sgtk_standin.StandInFramework({"maya": maya_standin.install()})},
+    )
+    engine.shotgun = shotgun
+    sgtk_standin.install(engine)
+    sys.modules["sgtk"].get_authenticated_user = lambda: _StandInUser(shotgun)
+    maya_standin.PublishTools.hookUploadReviewPublish = hookUploadReviewPublish
+    return sgtk_standin.StandInApp(engine)
+
+
+def runPublish(moviePath, rate, mode, failEvery):
+    """ Publish a review movie and wait for its upload.
+
+    Args:
+        moviePath   (str)   : The path of the movie.
+        rate        (float) : The transfer rate in bytes per second.
+        mode        (str)   : sync, shotgun or chunked.
+        failEvery   (int)   : Fail one chunk out of this number on the endpoint.
+
+    Returns:
+        dict                : The publish and upload times and the requests.
+    """
+    shotgun = MockShotgun(rate)
+    app = setupSession(shotgun)
+    endpoint = None
+
+    os.environ.pop("P3D_REVIEW_UPLOAD_URL", None)
+    os.environ.pop("P3D_REVIEW_UPLOAD_SYNC", None)
+    if(mode == "sync"):
+        os.environ["P3D_REVIEW_UPLOAD_SYNC"] = "1"
+    elif(mode == "chunked"):
+        endpoint = UploadEndpoint(rate, failEvery)
+        threading.Thread(target=endpoint.serve_forever).start()
+        os.environ["P3D_REVIEW_UPLOAD_URL"] = endpoint.url
+
+    plugin = sgtk_standin.create_hook_instance("{config}/tk-multi-publish2/maya/review_playblast.py", None, app)
+    uploadQueue = app.create_hook_instance("{config}/tk-multi-publish2/review_upload_queue.py")
+    _openedConnections(uploadQueue)
+    item = sgtk_standin.StandInItem("maya.playblast.review", "Review", os.path.basename(moviePath))
+    item.properties["path"] = moviePath
+
+    startTime = time.time()
+    plugin.publish({}, item)
+    publishSeconds = time.time() - startTime
+    uploaded = uploadQueue.wait(timeout=600)
+    uploadSeconds = time.time() - startTime
+
+    version = shotgun.entities["Version"][item.properties["sg_version_data"]["id"]]
+    result = {
+        "publish_seconds"   : publishSeconds,
+        "upload_seconds"    : uploadSeconds,
+        "uploaded"          : uploaded and shotgun.uploadedMovie("Version", version["id"]) is not None,
+        # The captured upload returns the attachment linked to the Version, unless ShotGrid creates it.
+        "attachment_id"     : item.properties.get("sg_attachment_id") is None if mode == "shotgun" else
+                              item.properties.get("sg_attachment_id") == version["sg_uploaded_movie"]["id"],
+        # The queued publishes return before the upload.
+        "background"        : mode == "sync" or publishSeconds < uploadSeconds / 2.0,
+        "requests"          : dict(shotgun.requests),
+    }
+    if(endpoint):
+        with open(moviePath, "rb") as movieFile:
+            result["identical"] = any(bytes(data) == movieFile.read() for data in endpoint.files.values())
+        result["chunks"]    = endpoint.chunks
+        result["failures"]  = endpoint.failures
+        endpoint.shutdown()
+        endpoint.server_close()
+    return result
+
+
+def runResume(moviePath, rate, receivedChunks):
+    """ Resume an upload left in the spool folder after part of its chunks were received.
+
+    Args:
+        moviePath       (str)   : The path of the movie.
+        rate            (float) : The transfer rate in bytes per second.
+        receivedChunks  (int)   : The number of chunks received before the session closed.
+
+    Returns:
+        dict                    : The bytes sent by the resumed upload.
+    """
+    shotgun = MockShotgun(rate)
+    app = setupSession(shotgun)
+    endpoint = UploadEndpoint(rate, 0)
+    threading.Thread(target=endpoint.serve_forever).start()
+    os.environ.pop("P3D_REVIEW_UPLOAD_SYNC", None)
+    os.environ["P3D_REVIEW_UPLOAD_URL"] = endpoint.url
+
+    uploadQueue = app.create_hook_instance("{config}/tk-multi-publish2/review_upload_queue.py")
+    _openedConnections(uploadQueue)
+    queueModule = sys.modules[type(uploadQueue).__module__]
+    # The spool folder is read again, as when a new session starts.
+    queueModule._RESUMED[0] = False
+    version = shotgun.create("Version", {"code": os.path.basename(moviePath)})
+
+    # The job and the chunks left by the previous session.
+    job = queueModule.UploadJob("Version", version["id"], moviePath, "sg_uploaded_movie")
+    job.offset = receivedChunks * _CHUNK_SIZE
+    job.save()
+    with open(moviePath, "rb") as movieFile:
+        endpoint.files[job.id] = bytearray(movieFile.read(job.offset))
+
+    # A job uploaded by another running session, which must not be resumed.
+    ownedJob = queueModule.UploadJob("Version", version["id"], moviePath, "sg_uploaded_movie")
+    ownedJob.save()
+    ownedJob.acquire()
+
+    startTime = time.time()
+    uploadQueue.start()
+    uploaded = uploadQueue.wait(timeout=600)
+    seconds = time.time() - startTime
+
+    with open(moviePath, "rb") as movieFile:
+        identical = bytes(endpoint.files[job.id]) == movieFile.read()
+    result = {
+        "upload_seconds"    : seconds,
+        "uploaded"          : uploaded and shotgun.uploadedMovie("Version", version["id"]) is not None,
+        "identical"         : identical,
+        "bytes_resent"      : endpoint.bytesReceived,
+        "bytes_skipped"     : job.offset,
+        "owned_skipped"     : ownedJob.id not in endpoint.files and os.path.exists(ownedJob.jobPath),
+    }
+    ownedJob.release()
+    endpoint.shutdown()
+    endpoint.server_close()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=64, help="The size of the movie in MB.")
+    parser.add_argument("--rate", type=float, default=100.0, help="The transfer rate in MB per second.")
+    parser.add_argument("--fail-every", type=int, default=5, help="Fail one chunk out of this number.")
+    parser.add_argument("--json", help="Write the report to this JSON file.")
+    args = parser.parse_args(argv)
+
+    rate = args.rate * 1024 * 1024
+    tempRoot = tempfile.mkdtemp(prefix="review_upload_benchmark_")
+    os.environ["P3D_REVIEW_SPOOL_DIR"] = os.path.join(tempRoot, "spool")
+    moviePath = os.path.join(tempRoot, "review.mov")
+    with open(moviePath, "wb") as movieFile:
+        movieFile.write(os.urandom(args.size * 1024 * 1024))
+
+    # Short chunks and retries for the benchmark.
+    uploadQueue = setupSession(MockShotgun(rate)).create_hook_instance(
+        "{config}/tk-multi-publish2/review_upload_queue.py"
+    )
+    queueModule = sys.modules[type(uploadQueue).__module__]
+    queueModule.CHUNK_SIZE      = _CHUNK_SIZE
+    queueModule.MAX_RETRY_DELAY = 0.05
+
+    try:
+        report = {"size_mb": args.size, "rate_mb_s": args.rate}
+        for mode in ("sync", "shotgun", "chunked"):
+            report[mode] = runPublish(moviePath, rate, mode, args.fail_every)
+        report["resume"] = runResume(moviePath, rate, receivedChunks=args.size // 2)
+    finally:
+        shutil.rmtree(tempRoot, ignore_errors=True)
+
+    print("{} MB movie, {:.0f} MB/s".format(args.size, args.rate))
+    print("    {:<10} {:>12} {:>12}  {}".format("mode", "publish ms", "upload ms", "checks"))
+    for mode in ("sync", "shotgun", "chunked"):
+        result = report[mode]
+        checks = ["uploaded" if result["uploaded"] else "NOT UPLOADED"]
+        if(mode == "shotgun"):
+            checks.append("attachment created by the upload" if result["attachment_id"] else "UNEXPECTED ATTACHMENT ID")
+        else:
+            checks.append("attachment id" if result["attachment_id"] else "NO ATTACHMENT ID")
+        if(mode != "sync"):
+            checks.append("background" if result["background"] else "BLOCKED")
+        if("identical" in result):
+            checks.append("{} chunks, {} failed and retried".format(result["chunks"], result["failures"]))
+            checks.append("identical" if result["identical"] else "CORRUPTED")
+        print("    {:<10} {:>12.1f} {:>12.1f}  {}".format(
+            mode, result["publish_seconds"] * 1000.0, result["upload_seconds"] * 1000.0, ", ".join(checks)
+        ))
+    resume = report["resume"]
+    print("    {:<10} {:>12} {:>12.1f}  {} MB skipped, {} MB sent, {}, {}".format(
+        "resume", "-", resume["upload_seconds"] * 1000.0,
+        resume["bytes_skipped"] // (1024 * 1024), resume["bytes_resent"] // (1024 * 1024),
+        "identical" if resume["identical"] and resume["uploaded"] else "FAILED",
+        "owned job skipped" if resume["owned_skipped"] else "OWNED JOB RESUMED"
+    ))
+
+    if(args.json):
+        with open(args.json, "w") as reportFile:
+            json.dump(report, reportFile, indent=2, sort_keys=True)
+
+    return report
+
+
+if __name__ == "__main__":
+    main()
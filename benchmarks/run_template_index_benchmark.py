@@ -0,0 +1,138 @@
+"""
+Benchmark of the template index against the linear template scan.
+
+The path templates of core/templates.yml are loaded as stand-in templates and
+publish paths are generated from every publish template. Each path is then
+resolved both by validating it against every template, as
+tk.template_from_path does, and with the common/template_index.py hook. The
+report gives the time per path of both and checks they find the same
+templates.
+
+Usage::
+
+    python benchmarks/run_template_index_benchmark.py --paths 100000 --json report.json
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+
+BENCHMARK_DIR   = os.path.dirname(os.path.abspath(__file__))
+CONFIG_DIR      = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, BENCHMARK_DIR)
+
+import sgtk_standin
+
+# The values given to the string keys, by key name. The other keys get
+# generated values.
+_KEY_VALUES = {
+    "sg_asset_type"     : ["prop", "character", "set"],
+    "Step"              : ["MOD", "RIG", "SHD", "ANI", "LGT"],
+    "lod"               : ["HI", "MI", "LO"],
+    "maya_extension"    : ["ma", "mb"],
+    "houdini_extension" : ["hip", "hipnc"],
+}
+
+
+def _keyValue(key, index, keyFormats):
+    """ Get a value of a key for the path of the given index. """
+    if(key in keyFormats):
+        return index % 50 + 1
+    values = _KEY_VALUES.get(key)
+    if(values):
+        return values[index % len(values)]
+    return "{}{:04d}".format(key.replace(".", ""), index % 500)
+
+
+def generatePaths(tk, keyFormats, count):
+    """ Generate publish paths from the publish templates.
+
+    Args:
+        tk          (:class:`StandInTk`)    : The toolkit instance.
+        keyFormats  (dict)                  : The format of the integer keys.
+        count       (int)                   : The number of paths.
+
+    Returns:
+        list(str)                           : The paths.
+    """
+    templates = sorted(
+        (template for name, template in tk.templates.items() if "publish" in name),
+        key=lambda template: template.name
+    )
+    paths = []
+    for index, template in zip(range(count), itertools.cycle(templates)):
+        fields = dict((key, _keyValue(key, index, keyFormats)) for key in template.keys)
+        paths.append(template.apply_fields(fields))
+    return paths
+
+
+def linearScan(tk, path):
+    """ Get the templates matching a path by validating every template. """
+    return [template.name for template in tk.templates.values() if template.validate(path)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--paths", type=int, default=100000, help="The number of paths to resolve.")
+    parser.add_argument("--templates", default=os.path.join(CONFIG_DIR, "core", "templates.yml"),
+                        help="The templates.yml file.")
+    parser.add_argument("--json", help="Write the report to this JSON file.")
+    args = parser.parse_args(argv)
+
+    definitions, keyFormats = sgtk_standin.load_templates_yml(args.templates)
+    tk = sgtk_standin.StandInTk(definitions, keyFormats)
+
+    engine = sgtk_standin.StandInEngine(sgtk_standin.StandInContext("Project", "bench", "", ""))
+    engine.sgtk = tk
+    sgtk_standin.install(engine)
+    templateIndex = sgtk_standin.create_hook_instance(
+        "{config}/common/template_index.py", None, sgtk_standin.StandInApp(engine)
+    )
+
+    paths = generatePaths(tk, keyFormats, args.paths)
+
+    startTime = time.time()
+    index = templateIndex.index
+    buildTime = time.time() - startTime
+
+    startTime = time.time()
+    linearMatches = [linearScan(tk, path) for path in paths]
+    linearTime = time.time() - startTime
+
+    startTime = time.time()
+    indexMatches = [[template.name for template, _ in templateIndex.matches(path)] for path in paths]
+    indexTime = time.time() - startTime
+
+    mismatches = sum(1 for linear, indexed in zip(linearMatches, indexMatches) if sorted(linear) != sorted(indexed))
+    candidates = sum(len(index.candidates(path)) for path in paths[:10000]) / float(min(len(paths), 10000))
+
+    report = {
+        "templates"             : index.templateCount,
+        "paths"                 : len(paths),
+        "index_build_seconds"   : buildTime,
+        "linear_seconds"        : linearTime,
+        "index_seconds"         : indexTime,
+        "candidates_per_path"   : candidates,
+        "mismatches"            : mismatches,
+    }
+
+    print("{} path templates, {} paths".format(report["templates"], report["paths"]))
+    print("    index build         {:>10.2f} ms".format(buildTime * 1000.0))
+    print("    linear scan         {:>10.2f} us/path".format(linearTime / len(paths) * 1e6))
+    print("    template index      {:>10.2f} us/path".format(indexTime / len(paths) * 1e6))
+    print("    speedup             {:>10.1f} x".format(linearTime / indexTime if indexTime else float("inf")))
+    print("    candidates per path {:>10.2f}".format(candidates))
+    print("    mismatches          {:>10}".format(mismatches))
+
+    if(args.json):
+        with open(args.json, "w") as reportFile:
+            json.dump(report, reportFile, indent=2, sort_keys=True)
+
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,580 @@
+"""
+Stand-in for the ``sgtk`` module and the toolkit objects used by the hooks.
+
+It provides just enough of the toolkit API to load the collector and
+breakdown hooks of this configuration outside of a DCC: the hook base
+classes, an engine with its context, apps and frameworks, templates parsed
+from their definitions and a ShotGrid connection counting its requests.
+"""
+
+import collections
+import logging
+import os
+import re
+import sys
+import types
+
+# The root of the synthetic project on disk.
+PROJECT_ROOT = "/bench/project"
+
+# The hooks folder of the configuration, resolving the {config} token.
+CONFIG_HOOKS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "hooks")
+
+# The definitions of the templates used by the hooks, relative to the
+# project root. They follow the definitions of core/templates.yml.
+TEMPLATE_DEFINITIONS = {
+    "maya_asset_work"                       : "assets/{sg_asset_type}/{Asset}/work/{Step}/maya/{Step}_{Asset}_{name}.v{version}.ma",
+    "maya_shot_work"                        : "sequences/{Sequence}/{Shot}/work/{Step}/maya/{Step}_{Sequence}_{Shot}_{name}.v{version}.ma",
+    "houdini_asset_work"                    : "assets/{sg_asset_type}/{Asset}/work/{Step}/houdini/{Step}_{Asset}_{name}.v{version}.hip",
+    "houdini_sequence_work"                 : "sequences/{Sequence}/work/{Step}/houdini/{Step}_{Sequence}_{name}.v{version}.hip",
+    "maya_asset_rig_publish"                : "assets/{sg_asset_type}/{Asset}/publishs/{Step}/v{version}/maya/{Step}_{Asset}_{name}_{lod}.v{version}.ma",
+    "asset_alembic_lod_publish"             : "assets/{sg_asset_type}/{Asset}/publishs/{Step}/v{version}/alembic/{Step}_{Asset}_{name}_{lod}.v{version}.abc",
+    "asset_materialX_publish"               : "assets/{sg_asset_type}/{Asset}/publishs/{Step}/v{version}/{Step}_{Asset}_{lod}_{variant}.v{version}.mtlx",
+    "shot_assetInstance_frames_json"        : "sequences/{Sequence}/{Shot}/publishs/{Step}/v{version}/json/{Step}_{Sequence}_{Shot}_{name}_{Asset}_{instance}.v{version}.json",
+    "houdini_sequence_digitalAsset_publish" : "sequences/{Sequence}/publishs/{Step}/houdini/v{version}/{Step}_{Sequence}_{houdini.node}.v{version}.hda",
+}
+
+# The ShotGrid requests issued through the stand-in connection, by method.
+SHOTGUN_CALLS = collections.Counter()
+
+# The framework module imports and tool instantiations, by name.
+FRAMEWORK_CALLS = collections.Counter()
+
+# The hook base class returned by get_hook_baseclass while a hook is loaded.
+_HOOK_BASE = [None]
+
+# The hook classes by path, as cached by toolkit for the session.
+_HOOK_CLASSES = {}
+
+
+class StandInTemplate(object):
+    """
+    Template parsing and building paths from a template definition.
+
+    As for the toolkit path templates, the definition is relative to the
+    root path and the optional sections between brackets give several
+    variations of the template.
+    """
+
+    def __init__(self, name, definition, rootPath=PROJECT_ROOT, keyFormats=None):
+        self.name       = name
+        self.definition = definition
+        self.root_path  = rootPath
+        self.keyFormats = keyFormats if keyFormats is not None else {"version": "03"}
+        self.keys       = []
+        # The definitions without optional section, with the regular expression
+        # matching their paths and their keys, the longest first.
+        self._variants  = []
+
+        variants = [""]
+        for part in re.split(r"(\[[^\]]*\])", definition):
+            if(part.startswith("[") and part.endswith("]")):
+                variants = [start + end for start in variants for end in ("", part[1:-1])]
+            else:
+                variants = [start + part for start in variants]
+
+        for variant in sorted(variants, key=len, reverse=True):
+            fullDefinition = os.path.join(rootPath, variant.replace("/", os.path.sep))
+            keys = []
+            pattern = ""
+            position = 0
+            for match in re.finditer(r"{([^}]+)}", fullDefinition):
+                pattern += re.escape(fullDefinition[position:match.start()])
+                key = match.group(1)
+                group = key.replace(".", "_")
+                if(key in keys):
+                    pattern += "(?P={})".format(group)
+                else:
+                    keys.append(key)
+                    pattern += "(?P<{}>[^{}]+?)".format(group, re.escape(os.path.sep))
+                position = match.end()
+            pattern += re.escape(fullDefinition[position:])
+            self._variants.append((fullDefinition, re.compile("^{}$".format(pattern)), keys))
+            self.keys.extend(key for key in keys if key not in self.keys)
+
+    def get_fields(self, path):
+        path = os.path.normpath(path)
+        for _, regex, keys in self._variants:
+            match = regex.match(path)
+            if(not match):
+                continue
+            fields = {}
+            for key in keys:
+                value = match.group(key.replace(".", "_"))
+                if(key in self.keyFormats):
+                    if(not value.isdigit()):
+                        break
+                    value = int(value)
+                fields[key] = value
+            else:
+                return fields
+        raise ValueError("The path {} does not match the template {}.".format(path, self.name))
+
+    def validate_and_get_fields(self, path):
+        try:
+            return self.get_fields(path)
+        except ValueError:
+            return None
+
+    def validate(self, path):
+        return self.validate_and_get_fields(path) is not None
+
+    def apply_fields(self, fields):
+        for fullDefinition, _, keys in self._variants:
+            if(any(key not in fields for key in keys)):
+                continue
+            path = fullDefinition
+            for key in keys:
+                value = fields[key]
+                if(self.keyFormats.get(key)):
+                    value = "{{:{}d}}".format(self.keyFormats[key]).format(value)
+                path = path.replace("{%s}" % key, str(value))
+            return path
+        raise ValueError("Missing fields to build a path from the template {}.".format(self.name))
+
+
+class StandInTk(object):
+    """
+    Toolkit instance resolving the paths against the stand-in templates.
+    """
+
+    def __init__(self, definitions=None, keyFormats=None):
+        """
+        Args:
+            definitions (dict, optional)    : The template definitions by name, relative to the
+                                            project root. TEMPLATE_DEFINITIONS by default.
+            keyFormats  (dict, optional)    : The format of the integer keys, by key name.
+        """
+        definitions = definitions if definitions is not None else TEMPLATE_DEFINITIONS
+        self.templates = dict(
+            (name, StandInTemplate(name, definition, keyFormats=keyFormats))
+            for name, definition in definitions.items()
+        )
+
+    def template_from_path(self, path):
+        for template in self.templates.values():
+            if(template.validate(path)):
+                return template
+        return None
+
+
+def load_templates_yml(path):
+    """ Read the path templates of a core/templates.yml file.
+
+    Args:
+        path    (str)   : The path of the templates.yml file.
+
+    Returns:
+        dict, dict      : The path template definitions by name, with the aliases
+                        resolved, and the format of the integer keys by name.
+    """
+    import yaml
+
+    with open(path) as templatesFile:
+        data = yaml.safe_load(templatesFile)
+
+    keyFormats = dict(
+        (name, key.get("format_spec", ""))
+        for name, key in data["keys"].items() if key.get("type") in ("int", "sequence")
+    )
+
+    # The aliases are the top level strings and the path templates.
+    aliases = dict((name, value) for name, value in data.items() if isinstance(value, str))
+    for name, value in data["paths"].items():
+        aliases[name] = value["definition"] if isinstance(value, dict) else value
+
+    def resolve(definition):
+        match = re.match(r"^@([^/\\]+)(.*)$", definition)
+        if(not match):
+            return definition
+        return resolve(aliases[match.group(1)]) + match.group(2)
+
+    definitions = {}
+    for name in data["paths"]:
+        try:
+            definitions[name] = resolve(aliases[name])
+        except KeyError:
+            # An alias with a typo, the template can not be used.
+            continue
+    return definitions, keyFormats
+
+
+class StandInShotgun(object):
+    """
+    ShotGrid connection answering every published file query with a fixed
+    version and counting the requests.
+    """
+
+    def __init__(self, latestVersion=3):
+        self.latestVersion = latestVersion
+
+    def find(self, entityType, filters, fields=None, order=None, **kwargs):
+        SHOTGUN_CALLS["find"] += 1
+        return [{"type": entityType, "id": 1, "version_number": self.latestVersion}]
+
+    def find_one(self, entityType, filters, fields=None, order=None, **kwargs):
+        SHOTGUN_CALLS["find_one"] += 1
+        return {"type": entityType, "id": 1, "version_number": self.latestVersion}
+
+    def batch(self, requests):
+        SHOTGUN_CALLS["batch"] += 1
+        return [dict(request.get("data", {}), type=request["entity_type"], id=index + 1)
+                for index, request in enumerate(requests)]
+
+
+class StandInContext(object):
+    """
+    Toolkit context of the benchmarked session.
+    """
+
+    def __init__(self, entityType, entityName, stepName, taskName, entityLocations=None):
+        self.project            = {"type": "Project", "id": 1, "name": "bench"}
+        self.entity             = {"type": entityType, "id": 1, "name": entityName}
+        self.step               = {"type": "Step", "id": 1, "name": stepName}
+        self.task               = {"type": "Task", "id": 1, "name": taskName}
+        self.user               = {"type": "HumanUser", "id": 1, "name": "bench"}
+        self.entity_locations   = entityLocations or []
+
+
+class StandInFramework(object):
+    """
+    Framework giving access to stand-in modules.
+    """
+
+    def __init__(self, modules):
+        self._modules = modules
+
+    def import_module(self, name):
+        FRAMEWORK_CALLS["import_module({})".format(name)] += 1
+        return self._modules[name]
+
+
+class StandInEngine(object):
+    """
+    Engine of the benchmarked session.
+    """
+
+    def __init__(self, context, frameworks=None, apps=None):
+        self.context    = context
+        self.frameworks = frameworks or {}
+        self.apps       = apps or {}
+        self.sgtk       = StandInTk()
+        self.shotgun    = StandInShotgun()
+        self.logger     = logging.getLogger("benchmark.engine")
+
+    def get_template_by_name(self, name):
+        return self.sgtk.templates.get(name)
+
+    def create_hook_instance(self, hook_expression, base_class=None):
+        return create_hook_instance(hook_expression, base_class, self)
+
+
+class StandInUtil(object):
+    """
+    The util module of the publish2 app.
+    """
+
+    def get_file_path_components(self, path):
+        folder, filename = os.path.split(path)
+        return {
+            "path"      : path,
+            "folder"    : folder,
+            "filename"  : filename,
+            "extension" : os.path.splitext(filename)[1].lstrip("."),
+        }
+
+
+class StandInApp(object):
+    """
+    App owning the benchmarked hooks.
+    """
+
+    def __init__(self, engine):
+        self.engine     = engine
+        self.sgtk       = engine.sgtk
+        self.shotgun    = engine.shotgun
+        self.util       = StandInUtil()
+
+    def create_hook_instance(self, hook_expression, base_class=None):
+        return create_hook_instance(hook_expression, base_class, self)
+
+
+class StandInSetting(object):
+    """
+    A collector setting.
+    """
+
+    def __init__(self, value):
+        self.value = value
+
+
+class StandInItem(object):
+    """
+    Publish item recording the items created under it.
+    """
+
+    def __init__(self, type_spec, type_display, name, parent=None):
+        self.type_spec          = type_spec
+        self.type_display       = type_display
+        self.name               = name
+        self.parent             = parent
+        self.properties         = {}
+        self.children           = []
+        self.thumbnail_enabled  = True
+
+    def create_item(self, type_spec, type_display, name):
+        item = StandInItem(type_spec, type_display, name, parent=self)
+        self.children.append(item)
+        return item
+
+    def remove_item(self, item):
+        self.children.remove(item)
+
+    def set_icon_from_path(self, path):
+        pass
+
+    def set_thumbnail_from_path(self, path):
+        pass
+
+    def descendants(self):
+        """ Return the number of items under this item. """
+        return sum(1 + child.descendants() for child in self.children)
+
+
+class StandInHook(object):
+    """
+    Base class of the hooks.
+    """
+
+    def __init__(self, parent):
+        self.parent = parent
+        self.logger = logging.getLogger("benchmark.hook")
+
+
+class StandInCollector(StandInHook):
+    """
+    Base class of the collector hooks, mirroring the basic collector of the
+    publish2 app.
+    """
+
+    _IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".exr", ".tif", ".tiff", ".dpx")
+    _VIDEO_EXTENSIONS = (".mov", ".mp4", ".avi")
+
+    @property
+    def settings(self):
+        return {}
+
+    def _get_item_info(self, path):
+        extension = os.path.splitext(path)[1].lower()
+        if(extension in self._IMAGE_EXTENSIONS):
+            itemType = "file.image"
+        elif(extension in self._VIDEO_EXTENSIONS):
+            itemType = "file.video"
+        elif(extension == ".abc"):
+            itemType = "file.alembic"
+        else:
+            itemType = "file"
+        return {"item_type": itemType, "type_display": itemType, "icon_path": ""}
+
+    def _collect_file(self, parent_item, path, frame_sequence=False):
+        itemInfo = self._get_item_info(path)
+        item = parent_item.create_item(itemInfo["item_type"], itemInfo["type_display"], os.path.basename(path))
+        item.properties["path"] = path
+        return item
+
+
+def get_hook_baseclass():
+    return _HOOK_BASE[0]
+
+
+def create_hook_instance(hookExpression, baseClass, parent):
+    """ Create a hook from a hook expression, loading its file once per session.
+
+    Args:
+        hookExpression  (str)       : The hook expression, e.g. {config}/common/p3d_framework.py.
+        baseClass       (type)      : The base class of the hook, StandInHook if None.
+        parent          (object)    : The bundle owning the hook.
+
+    Returns:
+        object                      : The hook instance.
+    """
+    path = os.path.normpath(hookExpression.replace("{config}", CONFIG_HOOKS_DIR))
+    baseClass = baseClass or StandInHook
+    key = (path, baseClass)
+    if(key not in _HOOK_CLASSES):
+        _HOOK_CLASSES[key] = type(load_hook(path, baseClass, parent))
+    hook = _HOOK_CLASSES[key](parent)
+    hook.disk_location = os.path.dirname(path)
+    return hook
+
+
+def clear_hook_cache():
+    """ Forget the loaded hook classes, as when a new session starts. """
+    _HOOK_CLASSES.clear()
+
+
+def load_hook(path, baseClass, parent):
+    """ Load a hook file and instantiate its hook class.
+
+    Args:
+        path        (str)           : The path of the hook file.
+        baseClass   (type)          : The base class of the hook.
+        parent      (:class:`StandInApp`)   : The app owning the hook.
+
+    Returns:
+        object                      : The hook instance.
+    """
+    previousBase = _HOOK_BASE[0]
+    _HOOK_BASE[0] = baseClass
+    moduleName = "benchmark_hook_{}".format(re.sub(r"\W", "_", os.path.relpath(path)))
+    module = types.ModuleType(moduleName)
+    module.__file__ = path
+    sys.modules[moduleName] = module
+    with open(path, "rb") as hookFile:
+        source = hookFile.read().decode("utf-8-sig")
+    try:
+        exec(compile(source, path, "exec"), module.__dict__)
+    finally:
+        _HOOK_BASE[0] = previousBase
+
+    hookClasses = [
+        value for value in vars(module).values()
+        if isinstance(value, type) and issubclass(value, baseClass) and value is not baseClass
+    ]
+    hook = hookClasses[-1](parent)
+    hook.disk_location = os.path.dirname(path)
+    return hook
+
+
+class StandInCoreApplication(object):
+    """
+    Stand-in of the Qt application, counting the yields to the event loop.
+    """
+
+    processedEvents = 0
+    eventFilters    = []
+
+    @classmethod
+    def instance(cls):
+        return cls
+
+    @classmethod
+    def processEvents(cls, *args):
+        cls.processedEvents += 1
+        # Run the timers due.
+        while(StandInTimer.pending):
+            StandInTimer.pending.pop(0)()
+
+    @classmethod
+    def installEventFilter(cls, eventFilter):
+        cls.eventFilters.append(eventFilter)
+
+    @classmethod
+    def removeEventFilter(cls, eventFilter):
+        cls.eventFilters.remove(eventFilter)
+
+
+class StandInTimer(object):
+    """
+    Stand-in of the Qt timers, the single shots run on the next processing of the events.
+    """
+
+    pending = []
+
+    @classmethod
+    def singleShot(cls, msec, callback):
+        cls.pending.append(callback)
+
+
+class StandInQObject(object):
+    """
+    Stand-in of the Qt objects.
+    """
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+
+class StandInSignal(object):
+    """
+    Stand-in of a Qt signal.
+    """
+
+    def __init__(self):
+        self.callbacks = []
+
+    def connect(self, callback):
+        self.callbacks.append(callback)
+
+    def emit(self, *args):
+        for callback in self.callbacks:
+            callback(*args)
+
+
+class StandInProgressDialog(StandInQObject):
+    """
+    Stand-in of the progress dialog shown during the collection.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.canceled = StandInSignal()
+
+    def __getattr__(self, name):
+        # setWindowTitle, setValue, close...
+        return lambda *args, **kwargs: None
+
+
+class StandInEvent(object):
+    """
+    Stand-in of the Qt events, with their types.
+    """
+
+    MouseButtonPress, MouseButtonRelease, MouseButtonDblClick, KeyPress, KeyRelease, ShortcutOverride, \
+        Shortcut, Wheel, ContextMenu, DragEnter, DragMove, Drop, Close = range(13)
+
+
+def install(engine):
+    """ Install the sgtk stand-in module with the engine of the session.
+
+    Args:
+        engine  (:class:`StandInEngine`)    : The current engine.
+    """
+    sgtkModule      = sys.modules.get("sgtk") or types.ModuleType("sgtk")
+    platformModule  = sys.modules.get("sgtk.platform") or types.ModuleType("sgtk.platform")
+    qtModule        = sys.modules.get("sgtk.platform.qt") or types.ModuleType("sgtk.platform.qt")
+
+    qtModule.QtCore = types.ModuleType("QtCore")
+    qtModule.QtGui  = types.ModuleType("QtGui")
+    # The collection yields to the event loop, which has no events to process.
+    qtModule.QtCore.QCoreApplication    = StandInCoreApplication
+    qtModule.QtCore.QObject             = StandInQObject
+    qtModule.QtCore.QEvent              = StandInEvent
+    qtModule.QtCore.QTimer              = StandInTimer
+    qtModule.QtGui.QWidget              = StandInQObject
+    qtModule.QtGui.QWindow              = StandInQObject
+    qtModule.QtGui.QProgressDialog      = StandInProgressDialog
+
+    platformModule.current_engine   = lambda: engine
+    platformModule.qt               = qtModule
+
+    sgtkModule.get_hook_baseclass   = get_hook_baseclass
+    sgtkModule.platform             = platformModule
+    sgtkModule.TankError            = Exception
+
+    sys.modules["sgtk"]             = sgtkModule
+    sys.modules["sgtk.platform"]    = platformModule
+    sys.modules["sgtk.platform.qt"] = qtModule
+
+    # The hooks import six from the toolkit vendor package.
+    if("tank_vendor" not in sys.modules):
+        tankVendorModule = types.ModuleType("tank_vendor")
+        try:
+            import six
+        except ImportError:
+            six = types.ModuleType("six")
+            six.PY2             = sys.version_info[0] == 2
+            six.PY3             = sys.version_info[0] == 3
+            six.string_types    = (str,)
+        tankVendorModule.six = six
+        sys.modules["tank_vendor"]      = tankVendorModule
+        sys.modules["tank_vendor.six"]  = six
@@ -0,0 +1,222 @@
+"""
+Shared progress of the collection, yielding to the event loop of the DCC.
+
+The collectors run the whole collection in a single call of the publish2
+app, on the main thread of the DCC, which froze the UI on heavy scenes. The
+collect methods now go through checkpoints: a checkpoint processes the
+pending Qt events once per time slice, so the UI keeps drawing and the
+publish2 log reports the progress, and stops the collection when it was
+cancelled from the Cancel button of the progress dialog shown during the
+collection.
+
+The user input sent to the other windows, like the Refresh and Publish
+buttons, a drop of files or an edit of the scene, is discarded while the
+collection runs: it would use the half-built tree. The items of a cancelled
+collection are removed, the tree is collected again by a refresh.
+
+Load it from any hook with::
+
+    self.parent.create_hook_instance("{config}/common/collection_progress.py")
+"""
+
+import threading
+import time
+
+import sgtk
+from sgtk.platform.qt import QtCore, QtGui
+
+HookBaseClass = sgtk.get_hook_baseclass()
+
+# Number of seconds between two yields to the event loop.
+YIELD_INTERVAL = 0.1
+
+# Number of seconds between two progress messages of a loop.
+PROGRESS_INTERVAL = 1.0
+
+# The events discarded while the collection runs, unless sent to the progress dialog.
+_USER_INPUT_EVENTS = (
+    QtCore.QEvent.MouseButtonPress,
+    QtCore.QEvent.MouseButtonRelease,
+    QtCore.QEvent.MouseButtonDblClick,
+    QtCore.QEvent.KeyPress,
+    QtCore.QEvent.KeyRelease,
+    QtCore.QEvent.ShortcutOverride,
+    QtCore.QEvent.Shortcut,
+    QtCore.QEvent.Wheel,
+    QtCore.QEvent.ContextMenu,
+    QtCore.QEvent.DragEnter,
+    QtCore.QEvent.DragMove,
+    QtCore.QEvent.Drop,
+    QtCore.QEvent.Close,
+)
+
+# The state of the running collection, shared by every hook of the session.
+_LOCK   = threading.Lock()
+_STATE  = {
+    "running"       : False,
+    "cancelled"     : False,
+    "processing"    : False,
+    "dialog"        : None,
+    "lastYield"     : 0.0,
+    "lastProgress"  : 0.0,
+}
+
+
+class CollectionCancelled(Exception):
+    """
+    Raised by a checkpoint when the collection is cancelled.
+    """
+    pass
+
+
+class _CancelOnlyFilter(QtCore.QObject):
+    """
+    Application event filter discarding the user input, except the one sent to the progress dialog.
+    """
+
+    def __init__(self, dialog):
+        """
+        Args:
+            dialog  (:class:`QProgressDialog`)  : The progress dialog of the collection.
+        """
+        super(_CancelOnlyFilter, self).__init__()
+        self.dialog = dialog
+
+    def eventFilter(self, receiver, event):
+        if(event.type() not in _USER_INPUT_EVENTS):
+            return False
+        # The window of the dialog receives the input before its widgets.
+        if(isinstance(receiver, QtGui.QWindow)):
+            return receiver is not self.dialog.windowHandle()
+        if(isinstance(receiver, QtGui.QWidget)):
+            return not (receiver is self.dialog or self.dialog.isAncestorOf(receiver))
+        return True
+
+
+class CollectionProgress(HookBaseClass):
+    """
+    Hook yielding to the event loop and reporting the progress of the collection.
+    """
+
+    @property
+    def running(self):
+        """ bool: True while a collection runs. """
+        with _LOCK:
+            return _STATE["running"]
+
+    @property
+    def cancelled(self):
+        """ bool: True if the running collection is cancelled. """
+        with _LOCK:
+            return _STATE["cancelled"]
+
+    def cancel(self):
+        """ Cancel the running collection at its next checkpoint. """
+        with _LOCK:
+            _STATE["cancelled"] = True
+
+    def run(self, label, parentItem, function, *args, **kwargs):
+        """ Run a collection, which can be cancelled at its checkpoints.
+
+        Args:
+            label       (str)                   : The name of the collected session, for the log.
+            parentItem  (:class:`PublishItem`)  : The root item the collection parents its items under.
+            function    (callable)              : The function collecting the items.
+
+        Returns:
+            bool                                : False if the collection was cancelled or
+                                                another collection is running.
+        """
+        with _LOCK:
+            if(_STATE["running"]):
+                self.logger.warning("A collection is already running, {} is not collected.".format(label))
+                return False
+            _STATE["running"]       = True
+            _STATE["cancelled"]     = False
+            _STATE["lastYield"]     = time.time()
+            _STATE["lastProgress"]  = time.time()
+
+        startTime = time.time()
+        self.logger.info("Collecting {}.".format(label))
+        collectedItems = list(parentItem.children)
+
+        # Only the Cancel button of the dialog gets the user input during the collection.
+        dialog = QtGui.QProgressDialog("Collecting {}...".format(label), "Cancel", 0, 0)
+        dialog.setWindowTitle("Publish")
+        dialog.setMinimumDuration(int(PROGRESS_INTERVAL * 1000))
+        dialog.canceled.connect(self.cancel)
+        eventFilter = _CancelOnlyFilter(dialog)
+        application = QtCore.QCoreApplication.instance()
+        application.installEventFilter(eventFilter)
+        with _LOCK:
+            _STATE["dialog"] = dialog
+
+        try:
+            function(*args, **kwargs)
+        except CollectionCancelled:
+            # Do not leave a half-built tree which could be published.
+            for item in list(parentItem.children):
+                if(not any(item is collectedItem for collectedItem in collectedItems)):
+                    parentItem.remove_item(item)
+            self.logger.error("Collection of {} cancelled, refresh to collect it again.".format(label))
+            return False
+        finally:
+            application.removeEventFilter(eventFilter)
+            dialog.close()
+            dialog.deleteLater()
+            with _LOCK:
+                _STATE["running"]   = False
+                _STATE["dialog"]    = None
+
+        self.logger.debug("Collected {} in {:.2f}s.".format(label, time.time() - startTime))
+        return True
+
+    def checkpoint(self, message=None):
+        """ Yield to the event loop once per time slice and stop if the collection is cancelled.
+
+        Args:
+            message (str, optional) : The progress to log, once per progress interval.
+        """
+        now = time.time()
+        with _LOCK:
+            # A checkpoint reached from an event processed by a checkpoint does not process the events again.
+            processEvents = not _STATE["processing"] and now - _STATE["lastYield"] >= YIELD_INTERVAL
+            logProgress = message and now - _STATE["lastProgress"] >= PROGRESS_INTERVAL
+            if(processEvents):
+                _STATE["lastYield"] = now
+                _STATE["processing"] = True
+            dialog = _STATE["dialog"]
+            if(logProgress):
+                _STATE["lastProgress"] = now
+
+        if(logProgress):
+            self.logger.info(message)
+        if(processEvents):
+            # Draw the UI and run the clicks on the Cancel button, the other
+            # user input is discarded by the filter installed by run.
+            try:
+                # Shows the dialog once the collection lasts its minimum duration.
+                if(dialog is not None):
+                    dialog.setValue(0)
+                QtCore.QCoreApplication.processEvents()
+            finally:
+                with _LOCK:
+                    _STATE["processing"] = False
+
+        if(self.cancelled):
+            raise CollectionCancelled()
+
+    def iterate(self, values, label):
+        """ Iterate over values, going through a checkpoint before each one.
+
+        Args:
+            values  (list)  : The values.
+            label   (str)   : The name of the values, for the progress messages.
+
+        Returns:
+            generator       : The values.
+        """
+        values = list(values)
+        for index, value in enumerate(values):
+            self.checkpoint("Collecting {} {}/{}.".format(label, index + 1, len(values)))
+            yield value
@@ -0,0 +1,176 @@
+"""
+Shared cache of the ShotGrid cut ranges.
+
+The publish plugins and the tk-multi-setframerange hooks read the cut range
+of the current entity from this cache instead of querying ShotGrid each time.
+Entries expire after a TTL and can be invalidated explicitly. On a miss, the
+ranges of every shot of the same sequence are fetched in a single query.
+
+Load it from any hook with::
+
+    self.parent.create_hook_instance("{config}/common/cut_range_cache.py")
+"""
+
+import threading
+import time
+
+import sgtk
+
+HookBaseClass = sgtk.get_hook_baseclass()
+
+# Fields holding the cut range on the shots.
+CUT_IN_FIELD    = "sg_cut_in"
+CUT_OUT_FIELD   = "sg_cut_out"
+
+# Number of seconds a cut range is kept in the cache.
+DEFAULT_TTL     = 300
+
+# The cache, shared by every hook of the session.
+# {(entityType, entityId): (timestamp, {"sg_cut_in": int, "sg_cut_out": int})}
+_LOCK   = threading.Lock()
+_CACHE  = {}
+
+
+class CutRangeCache(HookBaseClass):
+    """
+    Hook giving access to the cut ranges of the ShotGrid entities.
+    """
+
+    def getCutRange(self, entity, ttl=DEFAULT_TTL):
+        """ Get the cut range of an entity.
+
+        Args:
+            entity  (dict)          : The ShotGrid entity.
+            ttl     (int, optional) : The maximum age in seconds of the cached value.
+
+        Returns:
+            dict                    : The entity data with the sg_cut_in and sg_cut_out
+                                    fields or None if the entity does not exist.
+        """
+        key = _key(entity)
+
+        with _LOCK:
+            cached = _CACHE.get(key)
+        if(cached and time.time() - cached[0] < ttl):
+            return cached[1]
+
+        self.logger.debug("Cut range cache miss for {} {}.".format(*key))
+
+        # Fetch the entity and the other shots of its sequence in one query.
+        if(entity["type"] == "Shot"):
+            filters = [
+                {
+                    "filter_operator"   : "any",
+                    "filters"           : [
+                        ["id", "is", entity["id"]],
+                        ["sg_sequence.Sequence.shots", "is", {"type": "Shot", "id": entity["id"]}],
+                    ],
+                }
+            ]
+        else:
+            filters = [["id", "is", entity["id"]]]
+
+        results = self.parent.shotgun.find(entity["type"], filters, [CUT_IN_FIELD, CUT_OUT_FIELD])
+        self._store(results)
+
+        with _LOCK:
+            cached = _CACHE.get(key)
+        return cached[1] if cached else None
+
+    def resolveFrameRange(self, entity, inFrame, outFrame):
+        """ Share the frame range given to a tk-multi-setframerange hook through the cache.
+
+        The range given by the app is stored in the cache so the publish
+        plugins don't query it again. If the app did not give a range, it is
+        read from the cache.
+
+        Args:
+            entity      (dict)  : The ShotGrid entity of the context, None if there is none.
+            inFrame     (int)   : The in frame given by the app or None.
+            outFrame    (int)   : The out frame given by the app or None.
+
+        Returns:
+            int, int            : The in and out frames.
+        """
+        if(not entity):
+            return (inFrame, outFrame)
+
+        if(inFrame is None or outFrame is None):
+            entityData = self.getCutRange(entity) or {}
+            return (entityData.get(CUT_IN_FIELD), entityData.get(CUT_OUT_FIELD))
+
+        self.setCutRange(entity, inFrame, outFrame)
+        return (inFrame, outFrame)
+
+    def prefetchSequence(self, sequence):
+        """ Fetch the cut ranges of every shot of a sequence in a single query.
+
+        Args:
+            sequence    (dict)  : The ShotGrid sequence entity.
+
+        Returns:
+            int                 : The number of shots cached.
+        """
+        results = self.parent.shotgun.find(
+            "Shot",
+            [["sg_sequence", "is", {"type": "Sequence", "id": sequence["id"]}]],
+            [CUT_IN_FIELD, CUT_OUT_FIELD]
+        )
+        self._store(results)
+        return len(results)
+
+    def setCutRange(self, entity, cutIn, cutOut):
+        """ Store a cut range already known by the caller.
+
+        Args:
+            entity  (dict)  : The ShotGrid entity.
+            cutIn   (int)   : The cut in.
+            cutOut  (int)   : The cut out.
+        """
+        self._store([
+            {
+                "type"          : entity["type"],
+                "id"            : entity["id"],
+                CUT_IN_FIELD    : cutIn,
+                CUT_OUT_FIELD   : cutOut,
+            }
+        ])
+
+    def invalidate(self, entity=None):
+        """ Remove an entity from the cache.
+
+        Args:
+            entity  (dict, optional)    : The ShotGrid entity. Clear the whole
+                                        cache if not specified.
+        """
+        with _LOCK:
+            if(entity is None):
+                _CACHE.clear()
+            else:
+                _CACHE.pop(_key(entity), None)
+
+    def _store(self, results):
+        """ Add the ShotGrid results to the cache.
+
+        Args:
+            results (list(dict))    : The entities returned by ShotGrid.
+        """
+        now = time.time()
+        with _LOCK:
+            for result in results:
+                _CACHE[_key(result)] = (
+                    now,
+                    {
+                        "type"          : result["type"],
+                        "id"            : result["id"],
+                        CUT_IN_FIELD    : result.get(CUT_IN_FIELD),
+                        CUT_OUT_FIELD   : result.get(CUT_OUT_FIELD),
+                    }
+                )
+
+
+def _key(entity):
+    """
+    Return the cache key of an entity.
+    """
+    return (entity["type"], entity["id"])
@@ -0,0 +1,303 @@
+"""
+Shared promotion of the saved files to their publish and version paths.
+
+The session plugins used to write the same scene several times: saved to the
+work file, copied to the publish file, then saved again to the next version.
+A promotion writes the data of an already saved file to another path with
+the cheapest method available:
+
+- a reflink, the copy-on-write clone of the data on btrfs, XFS or APFS;
+- a hardlink, only for the immutable publish files and when the
+  ``P3D_PROMOTE_HARDLINK`` environment variable is set to 1, as a hardlinked
+  work file saved in place would also change the publish;
+- a server-side copy, run by the file server on NFS 4.2 and SMB shares;
+- a streaming copy, verified with a checksum of both files.
+
+The file is written next to the destination and renamed once complete, so a
+failed promotion never leaves a partial file at the destination.
+
+The publish file plugins promote their work file to the publish path with
+``promoteWorkFile``, in place of the copy of the base publish_file.py hook.
+
+Load it from any hook with::
+
+    self.parent.create_hook_instance("{config}/common/file_promotion.py")
+"""
+
+import ctypes
+import hashlib
+import os
+import sys
+import time
+import traceback
+
+import sgtk
+from sgtk.util.filesystem import ensure_folder_exists
+
+HookBaseClass = sgtk.get_hook_baseclass()
+
+# The environment variable enabling the hardlinks of the publish files.
+HARDLINK_ENV = "P3D_PROMOTE_HARDLINK"
+
+# The size of the chunks of the streaming copy.
+CHUNK_SIZE = 8 * 1024 * 1024
+
+# The ioctl cloning a file on Linux.
+_FICLONE = 0x40049409
+
+# The suffix of the file written next to the destination.
+_TEMP_SUFFIX = ".promoting"
+
+
+def _replace(source, destination):
+    """ Rename a file, replacing the destination. """
+    if(hasattr(os, "replace")):
+        os.replace(source, destination)
+    else:
+        # Python 2 cannot rename over an existing file on Windows.
+        if(sys.platform == "win32" and os.path.exists(destination)):
+            os.remove(destination)
+        os.rename(source, destination)
+
+
+def _remove(path):
+    """ Remove a file if it exists. """
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _unicodePath(path):
+    """ Get a path as unicode, the byte paths of Python 2 are decoded with the encoding of the file system. """
+    if(isinstance(path, bytes)):
+        return path.decode(sys.getfilesystemencoding() or "utf-8")
+    return path
+
+
+def _bytesPath(path):
+    """ Get a path as bytes, encoded with the encoding of the file system. """
+    if(isinstance(path, bytes)):
+        return path
+    return path.encode(sys.getfilesystemencoding() or "utf-8")
+
+
+def _checksum(path):
+    """ Get the sha1 checksum of a file, reading it by chunks. """
+    checksum = hashlib.sha1()
+    with open(path, "rb") as fileObject:
+        chunk = fileObject.read(CHUNK_SIZE)
+        while chunk:
+            checksum.update(chunk)
+            chunk = fileObject.read(CHUNK_SIZE)
+    return checksum.hexdigest()
+
+
+class FilePromotion(HookBaseClass):
+    """
+    Hook promoting the saved files to other paths without copying their data.
+    """
+
+    @property
+    def hardlinkEnabled(self):
+        """ bool: True if the publish files can be hardlinked. """
+        return os.environ.get(HARDLINK_ENV, "0") not in ("", "0")
+
+    def promote(self, source, destination, allowHardlink=False, permissions=0o666):
+        """ Write the data of a file to another path.
+
+        Args:
+            source          (str)               : The path of the saved file.
+            destination     (str)               : The path to promote the file to.
+            allowHardlink   (bool, optional)    : True if the destination is never written again, e.g. a publish.
+            permissions     (int, optional)     : The permissions of the destination, as toolkit copy_file.
+
+        Returns:
+            str                                 : The method used, reflink, hardlink, server_copy or copy.
+        """
+        startTime = time.time()
+        ensure_folder_exists(os.path.dirname(destination))
+
+        # Write next to the destination, renamed once complete.
+        temporary = destination + _TEMP_SUFFIX
+        _remove(temporary)
+
+        method = None
+        try:
+            if(self._reflink(source, temporary)):
+                method = "reflink"
+            elif(allowHardlink and self.hardlinkEnabled and self._hardlink(source, temporary)):
+                method = "hardlink"
+            elif(self._serverCopy(source, temporary)):
+                method = "server_copy"
+            else:
+                self._streamCopy(source, temporary)
+                method = "copy"
+
+            # The fast methods do not read the data, only check the size.
+            if(method != "copy" and os.path.getsize(temporary) != os.path.getsize(source)):
+                raise Exception("The {} of {} to {} is incomplete.".format(method, source, destination))
+
+            # The permissions of a hardlink are the ones of the source.
+            if(method != "hardlink"):
+                os.chmod(temporary, permissions)
+
+            _replace(temporary, destination)
+        except Exception:
+            _remove(temporary)
+            raise
+
+        self.logger.debug(
+            "Promoted {} to {} with a {} in {:.2f}s.".format(source, destination, method, time.time() - startTime)
+        )
+        return method
+
+    def promoteWorkFile(self, plugin, settings, item):
+        """ Promote the saved work file of an item to its publish path.
+
+        Replaces the copy of the _copy_work_to_publish method of the base
+        publish_file.py hook, the publish file is never written again.
+
+        Args:
+            plugin      (:class:`PublishPlugin`)    : The publish plugin of the item.
+            settings    (dict)                      : The settings of the plugin.
+            item        (:class:`PublishItem`)      : The item to process.
+        """
+        # ---- ensure templates are available
+        work_template = item.properties.get("work_template")
+        if not work_template:
+            self.logger.debug(
+                "No work template set on the item. "
+                "Skipping copy file to publish location."
+            )
+            return
+
+        publish_template = plugin.get_publish_template(settings, item)
+        if not publish_template:
+            self.logger.debug(
+                "No publish template set on the item. "
+                "Skipping copying file to publish location."
+            )
+            return
+
+        # ---- get the publish path from the fields of the work file
+        work_file = item.properties["path"]
+        template_index = self.parent.create_hook_instance("{config}/common/template_index.py")
+        matches = template_index.matches(work_file, [work_template.name])
+        if not matches:
+            self.logger.warning(
+                "Work file '%s' did not match work template '%s'. "
+                "Publishing in place." % (work_file, work_template)
+            )
+            return
+
+        work_fields = matches[0][1]
+        missing_keys = publish_template.missing_keys(work_fields)
+        if missing_keys:
+            self.logger.warning(
+                "Work file '%s' missing keys required for the publish "
+                "template: %s" % (work_file, missing_keys)
+            )
+            return
+
+        publish_file = publish_template.apply_fields(work_fields)
+
+        # ---- promote the work file, the publish file is never written again
+        try:
+            method = self.promote(work_file, publish_file, allowHardlink=True)
+        except Exception:
+            raise Exception(
+                "Failed to copy work file from '%s' to '%s'.\n%s"
+                % (work_file, publish_file, traceback.format_exc())
+            )
+
+        self.logger.debug(
+            "Promoted work file '%s' to publish file '%s' with a %s."
+            % (work_file, publish_file, method)
+        )
+
+    def _reflink(self, source, destination):
+        """ Clone the data of a file, sharing its blocks until one is modified.
+
+        Returns:
+            bool    : True if the file was cloned.
+        """
+        try:
+            if(sys.platform.startswith("linux")):
+                import fcntl
+                with open(source, "rb") as sourceFile:
+                    with open(destination, "wb") as destinationFile:
+                        fcntl.ioctl(destinationFile.fileno(), _FICLONE, sourceFile.fileno())
+                return True
+
+            if(sys.platform == "darwin"):
+                libc = ctypes.CDLL("libc.dylib", use_errno=True)
+                if(libc.clonefile(_bytesPath(source), _bytesPath(destination), 0) == 0):
+                    return True
+
+        except (IOError, OSError, AttributeError, UnicodeError):
+            pass
+
+        # The file system does not support the clones.
+        _remove(destination)
+        return False
+
+    def _serverCopy(self, source, destination):
+        """ Copy a file without sending its data through the workstation, where the system supports it.
+
+        Returns:
+            bool    : True if the file was copied.
+        """
+        try:
+            if(sys.platform == "win32"):
+                # CopyFileW offloads the copy to the server of an SMB share.
+                if(ctypes.windll.kernel32.CopyFileW(_unicodePath(source), _unicodePath(destination), False)):
+                    return True
+
+            elif(hasattr(os, "copy_file_range")):
+                # copy_file_range is run by the server on NFS 4.2 and SMB 3 shares.
+                with open(source, "rb") as sourceFile:
+                    with open(destination, "wb") as destinationFile:
+                        remaining = os.fstat(sourceFile.fileno()).st_size
+                        while remaining > 0:
+                            copied = os.copy_file_range(sourceFile.fileno(), destinationFile.fileno(), remaining)
+                            if(copied == 0):
+                                break
+                            remaining -= copied
+                if(remaining == 0):
+                    return True
+
+        except (IOError, OSError, AttributeError, UnicodeError):
+            pass
+
+        _remove(destination)
+        return False
+
+    def _hardlink(self, source, destination):
+        """ Link a file to another path of the same volume.
+
+        Returns:
+            bool    : True if the file was linked.
+        """
+        try:
+            os.link(source, destination)
+            return True
+        except (OSError, AttributeError):
+            # The paths are on different volumes or the file system has no hardlinks.
+            return False
+
+    def _streamCopy(self, source, destination):
+        """ Copy a file by chunks and check the checksum of the copy. """
+        checksum = hashlib.sha1()
+        with open(source, "rb") as sourceFile:
+            with open(destination, "wb") as destinationFile:
+                chunk = sourceFile.read(CHUNK_SIZE)
+                while chunk:
+                    checksum.update(chunk)
+                    destinationFile.write(chunk)
+                    chunk = sourceFile.read(CHUNK_SIZE)
+                destinationFile.flush()
+                os.fsync(destinationFile.fileno())
+
+        if(_checksum(destination) != checksum.hexdigest()):
+            raise Exception("The copy of {} to {} does not match its checksum.".format(source, destination))
@@ -0,0 +1,194 @@
+"""
+Shared cache of the file existence checks and folder listings.
+
+The collectors and loaders check the existence of many files on the network
+share, one remote round trip each. This hook caches the results, positive
+and negative, for the length of a publish session: the cache is reset when
+a collection starts and the entries expire after a TTL. Batches of checks
+are run on a bounded thread pool, and the files of a listed folder are
+answered from the listing.
+
+Load it from any hook with::
+
+    self.parent.create_hook_instance("{config}/common/filesystem_probe.py")
+"""
+
+import os
+import sys
+import threading
+import time
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
+
+import sgtk
+
+HookBaseClass = sgtk.get_hook_baseclass()
+
+# Number of seconds a result is kept in the cache.
+DEFAULT_TTL = 300
+
+# Maximum number of threads checking the files of a batch.
+_MAX_WORKERS = max(2, min(8, cpu_count() * 2))
+
+# The cache, shared by every hook of the session.
+_LOCK       = threading.Lock()
+# {path: (timestamp, exists)}
+_EXISTS     = {}
+# {folder: (timestamp, fileNames)}, fileNames is None if the folder does not exist.
+_LISTINGS   = {}
+# The number of checks answered from the cache and from the file system.
+_COUNTERS   = {"hits": 0, "misses": 0}
+
+
+def _key(path):
+    """ Get the cache key of a path, not case sensitive on Windows. """
+    path = os.path.normpath(path)
+    if(sys.platform == "win32"):
+        path = path.lower()
+    return path
+
+
+def _listdir(folder):
+    """ List a folder.
+
+    Returns:
+        list(str)   : The names in the folder, None if the folder does not exist.
+    """
+    try:
+        return os.listdir(folder)
+    except OSError:
+        return None
+
+
+class FilesystemProbe(HookBaseClass):
+    """
+    Hook checking the existence of files through the session cache.
+    """
+
+    @property
+    def counters(self):
+        """ dict: The number of checks answered from the cache (hits) and from the file system (misses). """
+        with _LOCK:
+            return dict(_COUNTERS)
+
+    def reset(self):
+        """ Forget the cached results and counters, as when a publish session starts. """
+        with _LOCK:
+            _EXISTS.clear()
+            _LISTINGS.clear()
+            _COUNTERS["hits"]   = 0
+            _COUNTERS["misses"] = 0
+
+    def invalidate(self, path):
+        """ Forget the cached results of a path and of its folder, e.g. after writing it.
+
+        Args:
+            path    (str)   : The path of the file or folder.
+        """
+        key = _key(path)
+        with _LOCK:
+            _EXISTS.pop(key, None)
+            _LISTINGS.pop(key, None)
+            _LISTINGS.pop(os.path.dirname(key), None)
+
+    def _cached(self, key, ttl):
+        """ Get the cached existence of a path.
+
+        Returns:
+            bool    : True or False, None if not cached. Must be called with the lock.
+        """
+        now = time.time()
+        entry = _EXISTS.get(key)
+        if(entry and now - entry[0] <= ttl):
+            return entry[1]
+
+        # Answer from the listing of the folder.
+        folder, name = os.path.split(key)
+        listing = _LISTINGS.get(folder)
+        if(listing and now - listing[0] <= ttl):
+            if(listing[1] is None):
+                return False
+            names = listing[1] if sys.platform != "win32" else [fileName.lower() for fileName in listing[1]]
+            return name in names
+
+        return None
+
+    def exists(self, path, ttl=DEFAULT_TTL):
+        """ Check if a file or folder exists.
+
+        Args:
+            path    (str)           : The path.
+            ttl     (int, optional) : The maximum age in seconds of the cached result.
+
+        Returns:
+            bool                    : True if the path exists.
+        """
+        return self.existsMany([path], ttl)[path]
+
+    def existsMany(self, paths, ttl=DEFAULT_TTL):
+        """ Check if files or folders exist, the uncached ones in parallel.
+
+        Args:
+            paths   (list(str))     : The paths.
+            ttl     (int, optional) : The maximum age in seconds of the cached results.
+
+        Returns:
+            dict                    : True if the path exists, by path.
+        """
+        results = {}
+        missing = {}
+        with _LOCK:
+            for path in paths:
+                key = _key(path)
+                exists = self._cached(key, ttl)
+                if(exists is None):
+                    missing.setdefault(key, []).append(path)
+                else:
+                    results[path] = exists
+                    _COUNTERS["hits"] += 1
+
+        if(missing):
+            keys = list(missing)
+            if(len(keys) == 1):
+                checks = [os.path.exists(keys[0])]
+            else:
+                pool = ThreadPool(min(_MAX_WORKERS, len(keys)))
+                try:
+                    checks = pool.map(os.path.exists, keys)
+                finally:
+                    pool.close()
+                    pool.join()
+
+            now = time.time()
+            with _LOCK:
+                for key, exists in zip(keys, checks):
+                    _EXISTS[key] = (now, exists)
+                    _COUNTERS["misses"] += 1
+                    for path in missing[key]:
+                        results[path] = exists
+
+        return results
+
+    def listdir(self, folder, ttl=DEFAULT_TTL):
+        """ List the names in a folder.
+
+        Args:
+            folder  (str)           : The path of the folder.
+            ttl     (int, optional) : The maximum age in seconds of the cached listing.
+
+        Returns:
+            list(str)               : The names in the folder, empty if the folder does not exist.
+        """
+        key = _key(folder)
+        with _LOCK:
+            listing = _LISTINGS.get(key)
+            if(listing and time.time() - listing[0] <= ttl):
+                _COUNTERS["hits"] += 1
+                return list(listing[1] or [])
+
+        fileNames = _listdir(folder)
+        with _LOCK:
+            _LISTINGS[key] = (time.time(), fileNames)
+            _EXISTS[key] = (time.time(), fileNames is not None)
+            _COUNTERS["misses"] += 1
+        return list(fileNames or [])
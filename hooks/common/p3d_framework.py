@@ -0,0 +1,190 @@
+"""
+Shared, lazily resolved access to the P3D framework.
+
+The hooks used to import the framework module and instantiate its tools at
+module import time, so opening the publisher or the loader imported the
+framework and built the same tools once per hook file. The accessors
+returned by this hook are proxies: the framework module is imported and the
+tools are instantiated on first attribute access only, once per session for
+all the hooks.
+
+Use it at the top of a hook file with::
+
+    P3D         = sgtk.platform.current_engine().create_hook_instance("{config}/common/p3d_framework.py")
+    P3Dfw       = P3D.module("maya")
+    publihTools = P3D.tools("maya", "PublishTools")
+"""
+
+import threading
+
+import sgtk
+
+HookBaseClass = sgtk.get_hook_baseclass()
+
+# The name of the framework in the environment.
+FRAMEWORK_NAME = "tk-framework-P3D"
+
+# The proxies, shared by every hook of the session.
+_LOCK       = threading.RLock()
+_MODULES    = {}
+_TOOLS      = {}
+
+
+class LazyFrameworkModule(object):
+    """
+    Proxy importing a module of the framework on first attribute access.
+    """
+
+    def __init__(self, moduleName):
+        object.__setattr__(self, "_moduleName", moduleName)
+        object.__setattr__(self, "_module", None)
+
+    def resolve(self):
+        """ Import the framework module if not done yet.
+
+        Returns:
+            module  : The framework module.
+        """
+        module = object.__getattribute__(self, "_module")
+        if(module is None):
+            with _LOCK:
+                module = object.__getattribute__(self, "_module")
+                if(module is None):
+                    moduleName = object.__getattribute__(self, "_moduleName")
+                    engine = sgtk.platform.current_engine()
+                    module = engine.frameworks[FRAMEWORK_NAME].import_module(moduleName)
+                    engine.logger.debug("Imported the {} module of the {}.".format(moduleName, FRAMEWORK_NAME))
+                    object.__setattr__(self, "_module", module)
+        return module
+
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+
+
+class LazyFrameworkObject(object):
+    """
+    Proxy instantiating a class of the framework on first attribute access.
+    Setting an attribute on the proxy sets it on the instance.
+    """
+
+    def __init__(self, module, className):
+        object.__setattr__(self, "_frameworkModule", module)
+        object.__setattr__(self, "_className", className)
+        object.__setattr__(self, "_instance", None)
+
+    def resolve(self):
+        """ Instantiate the framework class if not done yet.
+
+        Returns:
+            object  : The framework object.
+        """
+        instance = object.__getattribute__(self, "_instance")
+        if(instance is None):
+            with _LOCK:
+                instance = object.__getattribute__(self, "_instance")
+                if(instance is None):
+                    module      = object.__getattribute__(self, "_frameworkModule")
+                    className   = object.__getattribute__(self, "_className")
+                    instance    = getattr(module, className)()
+                    object.__setattr__(self, "_instance", instance)
+        return instance
+
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self.resolve(), name, value)
+
+    def __delattr__(self, name):
+        delattr(self.resolve(), name)
+
+
+class LazySceneObject(LazyFrameworkObject):
+    """
+    Proxy building a framework object of a scene node on first attribute
+    access other than the full name of the node, e.g. a MayaAsset. The
+    object queries the scene when it is built, the collectors store the
+    proxies on the items and the plugins build the objects they read.
+    """
+
+    def __init__(self, module, className, fullname, **kwargs):
+        super(LazySceneObject, self).__init__(module, className)
+        object.__setattr__(self, "fullname", fullname)
+        object.__setattr__(self, "_kwargs", kwargs)
+
+    def resolve(self):
+        """ Build the framework object if not done yet.
+
+        Returns:
+            object  : The framework object.
+        """
+        instance = object.__getattribute__(self, "_instance")
+        if(instance is None):
+            with _LOCK:
+                instance = object.__getattribute__(self, "_instance")
+                if(instance is None):
+                    module      = object.__getattribute__(self, "_frameworkModule")
+                    className   = object.__getattribute__(self, "_className")
+                    instance    = getattr(module, className)(**object.__getattribute__(self, "_kwargs"))
+                    object.__setattr__(self, "_instance", instance)
+        return instance
+
+    @property
+    def __class__(self):
+        # The type checks of the framework see the class of the object.
+        return type(self.resolve())
+
+    @property
+    def resolved(self):
+        """ bool: True once the framework object is built. """
+        return object.__getattribute__(self, "_instance") is not None
+
+
+class P3DFramework(HookBaseClass):
+    """
+    Hook giving access to the P3D framework.
+    """
+
+    def module(self, moduleName):
+        """ Get a module of the framework, imported on first use.
+
+        Args:
+            moduleName  (str)               : The name of the module, e.g. maya or houdini.
+
+        Returns:
+            :class:`LazyFrameworkModule`    : The module proxy.
+        """
+        with _LOCK:
+            if(moduleName not in _MODULES):
+                _MODULES[moduleName] = LazyFrameworkModule(moduleName)
+            return _MODULES[moduleName]
+
+    def tools(self, moduleName, className):
+        """ Get the shared instance of a framework class, created on first use.
+
+        Args:
+            moduleName  (str)               : The name of the module, e.g. maya or houdini.
+            className   (str)               : The name of the class, e.g. PublishTools.
+
+        Returns:
+            :class:`LazyFrameworkObject`    : The object proxy.
+        """
+        key = (moduleName, className)
+        with _LOCK:
+            if(key not in _TOOLS):
+                _TOOLS[key] = LazyFrameworkObject(self.module(moduleName), className)
+            return _TOOLS[key]
+
+    def sceneObject(self, moduleName, className, fullname, **kwargs):
+        """ Get a framework object of a scene node, built on first use.
+
+        Args:
+            moduleName  (str)           : The name of the module, e.g. maya.
+            className   (str)           : The name of the class, e.g. MayaAsset.
+            fullname    (str)           : The full path of the node, readable without building the object.
+            kwargs      (dict)          : The arguments of the class.
+
+        Returns:
+            :class:`LazySceneObject`    : The object proxy.
+        """
+        return LazySceneObject(self.module(moduleName), className, fullname, **kwargs)
@@ -0,0 +1,271 @@
+"""
+Index matching the paths against the templates of the configuration.
+
+Toolkit finds the template of a path by validating it against every template
+of core/templates.yml in turn. The index splits each template definition in
+folders and stores them in a prefix tree: the static folders are looked up
+in a dictionary and the folders holding keys are matched with a regular
+expression compiled once. Resolving a path walks down the tree once, so only
+the few templates sharing its folder structure are validated.
+
+Load it from any hook with::
+
+    self.parent.create_hook_instance("{config}/common/template_index.py")
+"""
+
+import re
+import sys
+import threading
+
+import sgtk
+
+HookBaseClass = sgtk.get_hook_baseclass()
+
+# The keys and optional sections of a template definition.
+_KEY_REGEX      = re.compile(r"{[^}]*}")
+_OPTIONAL_REGEX = re.compile(r"(\[[^\]]*\])")
+
+# The maximum number of paths whose matches are cached.
+MAX_CACHED_PATHS = 10000
+
+# The indexes by toolkit instance, shared by every hook of the session.
+_LOCK       = threading.Lock()
+_INDEXES    = {}
+
+
+def _splitPath(path):
+    """ Split a path in folders.
+
+    Args:
+        path    (str)   : The path, with either separator.
+
+    Returns:
+        list(str)       : The folders, lower case on Windows.
+    """
+    path = path.replace("\\", "/")
+    # The paths are not case sensitive on Windows.
+    if(sys.platform == "win32"):
+        path = path.lower()
+    return [folder for folder in path.split("/") if folder]
+
+
+def _expandOptionalSections(definition):
+    """ Get the definitions with and without each optional section.
+
+    Args:
+        definition  (str)   : The template definition, e.g. {name}[_{layer}].v{version}.tif
+
+    Returns:
+        list(str)           : The definitions without optional section.
+    """
+    definitions = [""]
+    for part in _OPTIONAL_REGEX.split(definition):
+        if(part.startswith("[") and part.endswith("]")):
+            definitions = [start + end for start in definitions for end in ("", part[1:-1])]
+        else:
+            definitions = [start + part for start in definitions]
+    return definitions
+
+
+class _TemplateNode(object):
+    """
+    A folder of the template prefix tree.
+    """
+
+    __slots__ = ("static", "dynamic", "templates")
+
+    def __init__(self):
+        # The child nodes by folder name.
+        self.static     = {}
+        # The child nodes by folder pattern, with the compiled pattern.
+        self.dynamic    = {}
+        # The templates ending with this folder.
+        self.templates  = []
+
+
+class TemplatePathIndex(object):
+    """
+    Prefix tree of the path templates of a toolkit instance.
+    """
+
+    def __init__(self, templates):
+        """
+        Args:
+            templates   (dict)  : The templates by name, as returned by tk.templates.
+        """
+        self._root          = _TemplateNode()
+        # The compiled folder patterns, shared by the templates.
+        self._regexes       = {}
+        # The candidate templates by path.
+        self._matches       = {}
+        # The path templates by name.
+        self._templates     = {}
+
+        for name, template in templates.items():
+            # Only the path templates have a root.
+            rootPath = getattr(template, "root_path", None)
+            if(rootPath is None):
+                continue
+            self._templates[name] = template
+            for definition in _expandOptionalSections(template.definition):
+                self._add(_splitPath(rootPath) + _splitPath(definition), template)
+
+    @property
+    def templateCount(self):
+        """ int: The number of path templates in the index. """
+        return len(self._templates)
+
+    def _add(self, folders, template):
+        """ Add a template definition to the tree.
+
+        Args:
+            folders     (list(str))         : The folders of the definition.
+            template    (:class:`Template`) : The template.
+        """
+        node = self._root
+        for folder in folders:
+            if(not _KEY_REGEX.search(folder)):
+                node = node.static.setdefault(folder, _TemplateNode())
+                continue
+
+            # Any value can be given to a key, the template validates it.
+            if(folder not in self._regexes):
+                pattern = "".join(
+                    ".*?" if _KEY_REGEX.match(part) else re.escape(part)
+                    for part in re.split(r"({[^}]*})", folder)
+                )
+                self._regexes[folder] = re.compile("^{}$".format(pattern), re.IGNORECASE)
+            if(folder not in node.dynamic):
+                node.dynamic[folder] = (self._regexes[folder], _TemplateNode())
+            node = node.dynamic[folder][1]
+
+        if(template not in node.templates):
+            node.templates.append(template)
+
+    def candidates(self, path):
+        """ Get the templates whose folder structure matches a path.
+
+        Args:
+            path    (str)               : The path.
+
+        Returns:
+            list(:class:`Template`)     : The templates to validate the path with.
+        """
+        folders = _splitPath(path)
+        nodes = [self._root]
+        for folder in folders:
+            nextNodes = []
+            for node in nodes:
+                child = node.static.get(folder)
+                if(child is not None):
+                    nextNodes.append(child)
+                for regex, child in node.dynamic.values():
+                    if(regex.match(folder)):
+                        nextNodes.append(child)
+            nodes = nextNodes
+            if(not nodes):
+                return []
+
+        templates = []
+        for node in nodes:
+            for template in node.templates:
+                if(template not in templates):
+                    templates.append(template)
+        return templates
+
+    def matches(self, path, templateNames=None):
+        """ Get the templates matching a path, with the fields of the path.
+
+        Args:
+            path            (str)                   : The path.
+            templateNames   (list(str), optional)   : Only match these templates.
+
+        Returns:
+            list(tuple(:class:`Template`, dict))    : The templates and fields.
+        """
+        if(templateNames is not None):
+            # The given templates are validated directly.
+            candidates = [self._templates[name] for name in templateNames if name in self._templates]
+        else:
+            candidates = self._matches.get(path)
+            if(candidates is None):
+                candidates = self.candidates(path)
+                # Forget the cached paths when too many were resolved.
+                if(len(self._matches) >= MAX_CACHED_PATHS):
+                    self._matches.clear()
+                self._matches[path] = candidates
+
+        result = []
+        for template in candidates:
+            fields = template.validate_and_get_fields(path)
+            if(fields is not None):
+                result.append((template, fields))
+        return result
+
+
+class TemplateIndex(HookBaseClass):
+    """
+    Hook matching the paths against the templates.
+    """
+
+    @property
+    def index(self):
+        """ :class:`TemplatePathIndex`: The index of the templates of the current toolkit instance. """
+        tk = self.parent.sgtk
+        with _LOCK:
+            entry = _INDEXES.get(id(tk))
+            # The templates are read again when the configuration is reloaded.
+            if(entry is None or entry[0] is not tk.templates):
+                entry = (tk.templates, TemplatePathIndex(tk.templates))
+                _INDEXES[id(tk)] = entry
+                self.logger.debug("Indexed {} path templates.".format(entry[1].templateCount))
+            return entry[1]
+
+    def matches(self, path, templateNames=None):
+        """ Get the templates matching a path, with the fields of the path.
+
+        Args:
+            path            (str)                   : The path.
+            templateNames   (list(str), optional)   : Only match these templates.
+
+        Returns:
+            list(tuple(:class:`Template`, dict))    : The templates and fields.
+        """
+        return self.index.matches(path, templateNames)
+
+    def match(self, path):
+        """ Get the template matching a path with the fields of the path.
+
+        Args:
+            path    (str)           : The path.
+
+        Returns:
+            :class:`Template`, dict : The template and fields, None and None if no
+                                    template matches.
+
+        Raises:
+            :class:`sgtk.TankError` : If several templates match the path, as
+                                    tk.template_from_path.
+        """
+        matches = self.index.matches(path)
+        if(len(matches) > 1):
+            raise sgtk.TankError(
+                "{} templates are matching the path {}: {}".format(
+                    len(matches), path, ", ".join(template.name for template, _ in matches)
+                )
+            )
+        return matches[0] if matches else (None, None)
+
+    def template_from_path(self, path):
+        """ Get the template matching a path, as tk.template_from_path.
+
+        Args:
+            path    (str)           : The path.
+
+        Returns:
+            :class:`Template`       : The template, None if no template matches.
+
+        Raises:
+            :class:`sgtk.TankError` : If several templates match the path.
+        """
+        return self.match(path)[0]
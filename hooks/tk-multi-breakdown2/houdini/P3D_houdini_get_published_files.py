@@ -0,0 +1,61 @@
+# Copyright (c) 2021 Autodesk, Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Autodesk, Inc.
+
+import uuid
+
+import sgtk
+from sgtk.platform.qt import QtCore
+
+HookBaseClass = sgtk.get_hook_baseclass()
+
+
+class GetPublishedFiles(HookBaseClass):
+    """
+    Published file queries of the breakdown for Houdini.
+
+    The scan_scene method of P3D_houdini_operations.py resolves the latest
+    published file of the items with one query per published file and
+    stores it in their extra data. It is returned here instead of querying
+    it again for every item. When the app queries it asynchronously, the
+    resolved publish is answered through the completion signal of its data
+    retriever, as a find_one request would be.
+    """
+
+    def get_latest_published_file(self, item, data_retriever=None, **kwargs):
+        """ Get the latest published file of a breakdown item.
+
+        Args:
+            item            (:class:`FileItem`)             : The breakdown item.
+            data_retriever  (:class:`ShotgunDataRetriever`) : The retriever of the asynchronous queries.
+
+        Returns:
+            dict                                            : The latest published file, or the id of the
+                                                            request when it is queried asynchronously.
+        """
+        extraData = getattr(item, "extra_data", None) or {}
+        latestPublish = extraData.get("latest_published_file")
+
+        # The items not resolved by the scan are queried by the app itself.
+        if(latestPublish is None):
+            return super(GetPublishedFiles, self).get_latest_published_file(
+                item, data_retriever=data_retriever, **kwargs
+            )
+
+        if(data_retriever is None):
+            return latestPublish
+
+        # The app registers the id of the request once it is returned: the answer
+        # is emitted from the event loop, with the data of a find_one request.
+        requestId = "p3d_latest_published_file_{}".format(uuid.uuid4().hex)
+        QtCore.QTimer.singleShot(
+            0,
+            lambda: data_retriever.work_completed.emit(requestId, "find_one", {"sg": latestPublish})
+        )
+        return requestId
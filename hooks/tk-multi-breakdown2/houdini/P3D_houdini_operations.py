@@ -8,9 +8,12 @@
 # agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
 # not expressly granted therein are reserved by Autodesk, Inc.
 
+import collections
 import os
+import time
 import sgtk
 import hou
+from sgtk.platform.qt import QtCore
 
 # Import the adam pipe nodes.
 import adamPipe
@@ -19,6 +22,608 @@ from adamScripts import DigitalAssetsManager
 
 HookBaseClass = sgtk.get_hook_baseclass()
 
+# The loader nodes handled by the breakdown, by type name with the parameters
+# holding the file paths.
+_LOADER_PARMS = {
+    # Scene Description Loader nodes.
+    "sceneDescriptionLoader::2.0"   : ["filePath"],
+    # Scene Animation Loader nodes.
+    "sceneAnimation::2.0"           : ["filePath"],
+    # Asset Deformed Loader nodes both for the geo and the materialX.
+    "assetDeformedLoader::1.0"      : ["geometryFilePath", "materialXFilePath"],
+    # Asset Animation Loader nodes both for the geo and the materialX.
+    "assetAnimationLoader::2.0"     : ["geometryFilePath", "materialXFilePath"],
+    # Alembic archives.
+    "alembicarchive"                : ["fileName"],
+}
+
+# The loader nodes whose geometry can be a transform track, with the parameter holding it.
+_TRACK_LOADERS = {
+    "assetAnimationLoader::2.0"     : "geometryFilePath",
+}
+
+# The user data of a loader holding the transform track it was built from, set by the transform_track loader hook.
+_TRACK_USER_DATA = "p3dTransformTrack"
+
+# The extension of the transform tracks published by the Maya shot plugins.
+_TRACK_EXTENSION = ".json"
+
+# The templates of the published HDAs.
+_HDA_TEMPLATE_NAMES = ["houdini_sequence_digitalAsset_publish"]
+
+# The node events making a node dirty.
+_NODE_EVENTS = (
+    hou.nodeEventType.ParmTupleChanged,
+    hou.nodeEventType.NameChanged,
+    hou.nodeEventType.BeingDeleted,
+)
+
+# The node events of the networks which are neither a loader nor an HDA:
+# renaming them changes the paths of their children.
+_RENAME_EVENTS = (
+    hou.nodeEventType.NameChanged,
+)
+
+# The network events adding or removing nodes.
+_NETWORK_EVENTS = (
+    hou.nodeEventType.ChildCreated,
+    hou.nodeEventType.ChildDeleted,
+)
+
+# The fields of the latest published files given to the breakdown app.
+_PUBLISH_FIELDS = [
+    "code",
+    "name",
+    "path",
+    "version_number",
+    "published_file_type",
+    "entity",
+    "task",
+    "project",
+    "image",
+    "description",
+    "created_by",
+    "created_at",
+]
+
+# The template keys identifying the entity of a published file, by entity type.
+# The first key found in the fields of a path gives the entity.
+_ENTITY_KEYS = [
+    ("Shot"             , "Shot"),
+    ("Asset"            , "Asset"),
+    ("Sequence"         , "Sequence"),
+    ("CustomEntity03"   , "CustomEntity03"),
+]
+
+
+class IncrementalSceneScanner(object):
+    """
+    Scanner keeping the breakdown items of the scene between two scans.
+
+    The first scan walks the /obj network once for the HDAs and lists the
+    instances of the loader node types, wherever they are. Node event
+    callbacks then flag the nodes created, deleted or edited, and the
+    following scans only process those nodes. The scene is scanned fully
+    again when a hip file is loaded, cleared or merged, or when the number
+    of loader instances does not match the scanned loaders, e.g. for a
+    loader created in a network without callbacks. The HDA template matches
+    are memoized by library path.
+
+    A single scanner listens to the hip file events: the scanner of a
+    previous load of the hook is torn down when a new one is created.
+    """
+
+    def __init__(self):
+        # The breakdown items by node path, in traversal order.
+        self._itemsByNode       = collections.OrderedDict()
+        # The template matches by HDA library path.
+        self._templateMatches   = {}
+        # The paths of the nodes to scan again.
+        self._dirtyNodes        = set()
+        # True if the whole scene has to be scanned again.
+        self._fullScanNeeded    = True
+        # The event callbacks installed on the nodes.
+        self._callbacks         = []
+        # The number of loader instances found by the last full scan.
+        self._loaderCount       = 0
+
+        # Replace the scanners of the previous loads of the hook.
+        for callback in hou.hipFile.eventCallbacks():
+            scanner = getattr(callback, "__self__", None)
+            if(type(scanner).__name__ == type(self).__name__):
+                scanner.teardown()
+        hou.hipFile.addEventCallback(self._onHipFileEvent)
+
+    def teardown(self):
+        """ Remove the callbacks of the scanner. """
+        self._removeCallbacks()
+        try:
+            hou.hipFile.removeEventCallback(self._onHipFileEvent)
+        except hou.OperationFailed:
+            # The callback was already removed.
+            pass
+        self._itemsByNode       = collections.OrderedDict()
+        self._fullScanNeeded    = True
+
+    def scan(self, templateIndex, logger):
+        """ Get the breakdown items of the scene.
+
+        Args:
+            templateIndex   (:class:`TemplateIndex`)    : The index matching the HDA library paths.
+            logger          (:class:`logging.Logger`)   : The hook logger.
+
+        Returns:
+            list(dict)                                  : The breakdown items.
+        """
+        # A loader was created or deleted without its event being caught.
+        if(not self._fullScanNeeded and len(self._loaders()) != self._loaderCount):
+            logger.debug("The loaders of the scene do not match the scanned ones.")
+            self._fullScanNeeded = True
+
+        if(self._fullScanNeeded):
+            self._fullScan(templateIndex)
+            logger.debug("Breakdown full scan: {} nodes.".format(len(self._itemsByNode)))
+
+        elif(self._dirtyNodes):
+            dirtyNodes = self._dirtyNodes
+            self._dirtyNodes = set()
+            for nodePath in dirtyNodes:
+                self._scanNode(nodePath, templateIndex)
+            logger.debug("Breakdown incremental scan: {} nodes.".format(len(dirtyNodes)))
+
+        items = []
+        for nodeItems in self._itemsByNode.values():
+            items.extend(nodeItems)
+        return items
+
+    def _fullScan(self, templateIndex):
+        """ Scan every node of the scene and install the event callbacks.
+
+        Args:
+            templateIndex   (:class:`TemplateIndex`)    : The index matching the HDA library paths.
+        """
+        self._removeCallbacks()
+        self._itemsByNode       = collections.OrderedDict()
+        self._dirtyNodes        = set()
+        self._fullScanNeeded    = False
+
+        rootNode = hou.node("/obj")
+        self._addNetworkCallbacks(rootNode)
+
+        # Walk the network once.
+        nodes = collections.OrderedDict(
+            (node.path(), node) for node in rootNode.allSubChildren(recurse_in_locked_nodes=False)
+        )
+        # The loaders outside of /obj, found from their node types.
+        loaders = self._loaders()
+        self._loaderCount = len(loaders)
+        for loader in loaders:
+            if(loader.path() not in nodes and not loader.isInsideLockedHDA()):
+                nodes[loader.path()] = loader
+
+        for nodePath, node in nodes.items():
+            self._addNodeCallbacks(node)
+            nodeItems = self._getNodeItems(node, templateIndex)
+            if(nodeItems):
+                self._itemsByNode[nodePath] = nodeItems
+
+    def markDirty(self, nodePath):
+        """ Flag a node to scan again, e.g. when its edit does not trigger any watched event.
+
+        Args:
+            nodePath    (str)   : The path of the node.
+        """
+        self._dirtyNodes.add(nodePath)
+
+    def _loaders(self):
+        """ Get the instances of the loader node types.
+
+        Returns:
+            list(:class:`hou.Node`) : The loader nodes.
+        """
+        loaders = []
+        for nodeTypeName in _LOADER_PARMS:
+            nodeType = hou.nodeType(hou.objNodeTypeCategory(), nodeTypeName)
+            if(nodeType):
+                loaders.extend(nodeType.instances())
+        return loaders
+
+    def _scanNode(self, nodePath, templateIndex):
+        """ Update the items of a node flagged as dirty.
+
+        Args:
+            nodePath    (str)                           : The path of the node.
+            templateIndex   (:class:`TemplateIndex`)    : The index matching the HDA library paths.
+        """
+        node = hou.node(nodePath)
+        if(not node or node.isInsideLockedHDA()):
+            self._itemsByNode.pop(nodePath, None)
+            return
+
+        nodeItems = self._getNodeItems(node, templateIndex)
+        if(nodeItems):
+            self._itemsByNode[nodePath] = nodeItems
+        else:
+            self._itemsByNode.pop(nodePath, None)
+
+    def _getNodeItems(self, node, templateIndex):
+        """ Get the breakdown items of a node.
+
+        Args:
+            node        (:class:`hou.Node`)             : The node.
+            templateIndex   (:class:`TemplateIndex`)    : The index matching the HDA library paths.
+
+        Returns:
+            list(dict)                                  : The breakdown items of the node.
+        """
+        items = []
+        nodeType = node.type()
+        nodeTypeName = nodeType.name()
+
+        # The ADAM Pipeline loader nodes and the alembic archives.
+        if(nodeTypeName in _LOADER_PARMS and nodeType.category() == hou.objNodeTypeCategory()):
+            for filenameParameter in _LOADER_PARMS[nodeTypeName]:
+                # Get the file path parameter.
+                parm = node.parm(filenameParameter)
+                # Check if the parameter is referenced.
+                if(parm is None or parm.getReferencedParm() != parm):
+                    continue
+
+                path = os.path.normpath(parm.evalAsString())
+                extraData = {"parm": filenameParameter}
+                # A transform track set as the geometry is applied on update.
+                if(_TRACK_LOADERS.get(nodeTypeName) == filenameParameter and path.endswith(_TRACK_EXTENSION)):
+                    extraData["track"] = True
+
+                items.append(
+                    {
+                        "node_name"     : node.path(),
+                        "node_type"     : nodeTypeName,
+                        "path"          : path,
+                        "extra_data"    : extraData,
+                    }
+                )
+
+            # The transform track the loader was built from, updated beside the asset geometry.
+            trackPath = node.userData(_TRACK_USER_DATA) if nodeTypeName in _TRACK_LOADERS else None
+            if(trackPath):
+                items.append(
+                    {
+                        "node_name"     : node.path(),
+                        "node_type"     : nodeTypeName,
+                        "path"          : os.path.normpath(trackPath),
+                        "extra_data"    : {"parm": _TRACK_LOADERS[nodeTypeName], "track": True},
+                    }
+                )
+
+        # The published HDAs.
+        definition = nodeType.definition()
+        if(definition):
+            libraryPath = definition.libraryFilePath()
+            matched = self._templateMatches.get(libraryPath)
+            if(matched is None):
+                matched = bool(templateIndex.matches(libraryPath, _HDA_TEMPLATE_NAMES))
+                self._templateMatches[libraryPath] = matched
+
+            if(matched):
+                items.append(
+                    {
+                        "node_name"     : node.path(),
+                        "node_type"     : "HDA",
+                        "path"          : libraryPath,
+                        "extra_data"    : {},
+                    }
+                )
+
+        return items
+
+    def _addNodeCallbacks(self, node):
+        """ Install the callbacks flagging a node as dirty.
+
+        Only the loaders and the HDAs are watched for their edits, and the
+        networks for their children, the other nodes cannot give items.
+
+        Args:
+            node    (:class:`hou.Node`) : The node.
+        """
+        nodeType = node.type()
+        isNetwork = node.isNetwork()
+        if(nodeType.name() in _LOADER_PARMS or nodeType.definition() is not None):
+            eventTypes = _NODE_EVENTS
+        elif(isNetwork):
+            eventTypes = _RENAME_EVENTS
+        else:
+            return
+
+        node.addEventCallback(eventTypes, self._onNodeEvent)
+        self._callbacks.append((node, eventTypes, self._onNodeEvent))
+        if(isNetwork):
+            self._addNetworkCallbacks(node)
+
+    def _addNetworkCallbacks(self, node):
+        """ Install the callbacks tracking the children of a network.
+
+        Args:
+            node    (:class:`hou.Node`) : The network node.
+        """
+        node.addEventCallback(_NETWORK_EVENTS, self._onNetworkEvent)
+        self._callbacks.append((node, _NETWORK_EVENTS, self._onNetworkEvent))
+
+    def _removeCallbacks(self):
+        """ Remove the callbacks installed by the previous full scan. """
+        for node, eventTypes, callback in self._callbacks:
+            try:
+                node.removeEventCallback(eventTypes, callback)
+            except hou.Error:
+                # The node does not exist anymore.
+                pass
+        self._callbacks = []
+
+    def _onNodeEvent(self, event_type, node, **kwargs):
+        """ Flag an edited node as dirty. """
+        if(event_type == hou.nodeEventType.NameChanged):
+            # The paths of the node and of its children changed.
+            self._fullScanNeeded = True
+        elif(event_type == hou.nodeEventType.BeingDeleted):
+            self._dropNode(node.path())
+        else:
+            self._dirtyNodes.add(node.path())
+
+    def _onNetworkEvent(self, event_type, node, child_node=None, **kwargs):
+        """ Track the nodes created and deleted in a network. """
+        if(child_node is None):
+            return
+
+        if(event_type == hou.nodeEventType.ChildDeleted):
+            self._dropNode(child_node.path())
+            return
+
+        # Scan the new node and its children.
+        self._addNodeCallbacks(child_node)
+        self._dirtyNodes.add(child_node.path())
+        for subChild in child_node.allSubChildren(recurse_in_locked_nodes=False):
+            self._addNodeCallbacks(subChild)
+            self._dirtyNodes.add(subChild.path())
+
+    def _dropNode(self, nodePath):
+        """ Remove a node and its children from the items. """
+        prefix = nodePath + "/"
+        for path in [path for path in self._itemsByNode if path == nodePath or path.startswith(prefix)]:
+            del self._itemsByNode[path]
+        self._dirtyNodes = set(path for path in self._dirtyNodes if path != nodePath and not path.startswith(prefix))
+
+    def _onHipFileEvent(self, event_type):
+        """ Scan the whole scene again when a new file is loaded. """
+        if(event_type in (hou.hipEventType.AfterLoad, hou.hipEventType.AfterClear, hou.hipEventType.AfterMerge)):
+            # The nodes kept by a merge still have their callbacks.
+            self._removeCallbacks()
+            self._fullScanNeeded    = True
+
+
+class LatestVersionResolver(object):
+    """
+    Resolver finding the latest published version of the breakdown items.
+
+    The item paths are parsed with the templates and grouped by entity, name
+    and lod, i.e. by every template field except the version. A single
+    ShotGrid query is then issued per group, however many nodes load a
+    version of the same published file. The latest published file is given
+    to the breakdown app by the P3D_houdini_get_published_files.py hook.
+    """
+
+    def __init__(self, templateIndex, shotgun, project):
+        """
+        Args:
+            templateIndex   (:class:`TemplateIndex`)    : The index used to parse the paths.
+            shotgun         (:class:`Shotgun`)          : The ShotGrid connection. A mockgun
+                                                        connection can be used for testing.
+            project         (dict)                      : The ShotGrid project entity.
+        """
+        self._templateIndex = templateIndex
+        self._shotgun   = shotgun
+        self._project   = project
+
+    def resolve(self, items):
+        """ Add the latest published version to the extra data of the items.
+
+        The items whose path matches a published file template get a
+        "latest_version", a "latest_path" and a "latest_published_file" key
+        in their extra data.
+
+        Args:
+            items   (list(dict))    : The breakdown items.
+
+        Returns:
+            int                     : The number of ShotGrid queries issued.
+        """
+        groups = self._groupItems(items)
+
+        for (templateName, entity, prefix, extension), group in groups.items():
+            template = group[0][1]
+            fields   = group[0][2]
+
+            latestPublish = self._findLatestPublish(entity, prefix, extension)
+            if(latestPublish is None):
+                continue
+            latestVersion = latestPublish["version_number"]
+
+            # Build the path of the latest version from the template.
+            latestFields = dict(fields)
+            latestFields["version"] = latestVersion
+            latestPath = os.path.normpath(template.apply_fields(latestFields))
+
+            for item, _, _ in group:
+                item.setdefault("extra_data", {})
+                item["extra_data"]["latest_version"]        = latestVersion
+                item["extra_data"]["latest_path"]           = latestPath
+                item["extra_data"]["latest_published_file"] = latestPublish
+
+        return len(groups)
+
+    def _groupItems(self, items):
+        """ Group the items loading a version of the same published file.
+
+        Args:
+            items   (list(dict))    : The breakdown items.
+
+        Returns:
+            dict                    : The items with their template and fields, by
+                                    (template name, entity, file name prefix, extension).
+        """
+        groups = collections.OrderedDict()
+        for item in items:
+            path = item["path"]
+            template, fields = self._templateIndex.match(path)
+            if(template is None or "version" not in fields):
+                continue
+
+            entity = _entity_from_fields(fields)
+            if(entity is None):
+                continue
+
+            # The file name without the version is shared by every version
+            # of the published file, e.g. MOD_chair_geo_HI.
+            prefix = os.path.basename(path).rsplit(".v", 1)[0]
+            # The publishes of another type share the prefix, e.g. a transform track.
+            extension = os.path.splitext(path)[1].lower()
+
+            key = (template.name, entity, prefix, extension)
+            groups.setdefault(key, []).append((item, template, fields))
+
+        return groups
+
+    def _findLatestPublish(self, entity, prefix, extension):
+        """ Query the latest version of a published file.
+
+        Args:
+            entity      (tuple(str, str))   : The type and code of the entity.
+            prefix      (str)               : The file name of the published file
+                                            without the version.
+            extension   (str)               : The extension of the published file, with the dot.
+
+        Returns:
+            dict                            : The latest published file, None if the
+                                            file has never been published.
+        """
+        entityType, entityCode = entity
+        return self._shotgun.find_one(
+            "PublishedFile",
+            [
+                ["project", "is", self._project],
+                ["entity.{}.code".format(entityType), "is", entityCode],
+                ["path_cache", "contains", "/{}.v".format(prefix)],
+                ["path_cache", "ends_with", extension],
+            ],
+            _PUBLISH_FIELDS,
+            order=[{"field_name": "version_number", "direction": "desc"}],
+        )
+
+
+def _entity_from_fields(fields):
+    """
+    Return the (type, code) of the entity of the template fields, None if not found.
+    """
+    for key, entityType in _ENTITY_KEYS:
+        if(key in fields):
+            return (entityType, fields[key])
+    return None
+
+
+class UpdateBatch(object):
+    """
+    Updates of breakdown items run in a single undo group with the cooking
+    held off.
+
+    The parameters are set as the items are added. The hierarchies of the
+    alembic archives are rebuilt once per node when the batch is closed,
+    then the cooking resumes and the time spent on each node is reported.
+    """
+
+    def __init__(self, logger):
+        """
+        Args:
+            logger  (:class:`logging.Logger`)   : The logger of the report.
+        """
+        self._logger            = logger
+        self._itemCount         = 0
+        # The time spent updating each node, by node path.
+        self._timings           = collections.defaultdict(float)
+        # The alembic archives whose hierarchy must be rebuilt.
+        self._hierarchyNodes    = set()
+
+        self._updateMode = hou.updateModeSetting()
+        self._undoGroup  = hou.undos.group("Breakdown update")
+        self._undoGroup.__enter__()
+        # Hold the cooking until every parameter is set.
+        hou.setUpdateMode(hou.updateMode.Manual)
+
+    def add(self, item, updateNode):
+        """ Update the node of an item.
+
+        Args:
+            item        (dict)      : The item generated by the scan_scene hook, with the
+                                    path key holding the path to update the node to.
+            updateNode  (callable)  : Updating the node, called with the node, the item and
+                                    the set of the alembic archives to rebuild.
+        """
+        self._itemCount += 1
+        nodePath = item["node_name"]
+        node = hou.node(nodePath)
+        if(not node):
+            self._logger.error("Node '{}' not found.".format(nodePath))
+            return
+
+        startTime = time.time()
+        updateNode(node, item, self._hierarchyNodes)
+        self._timings[nodePath] += time.time() - startTime
+
+    def close(self):
+        """ Rebuild the alembic hierarchies, resume the cooking and report the timings.
+
+        Returns:
+            list(tuple(str, float)) : The node paths with the time spent updating them in seconds,
+                                    the slowest first.
+        """
+        try:
+            # Rebuild each alembic hierarchy once.
+            for hierarchyNode in self._hierarchyNodes:
+                startTime = time.time()
+                hierarchyNode.parm("buildHierarchy").pressButton()
+                self._timings[hierarchyNode.path()] += time.time() - startTime
+        finally:
+            # Restore the update mode, cooking the updated nodes.
+            hou.setUpdateMode(self._updateMode)
+            self._undoGroup.__exit__(None, None, None)
+
+        # Report the timings.
+        timings = sorted(self._timings.items(), key=lambda timing: timing[1], reverse=True)
+        self._logger.debug(
+            "Updated {} items on {} nodes in {:.3f}s.".format(
+                self._itemCount, len(timings), sum(timing[1] for timing in timings)
+            )
+        )
+        for nodePath, duration in timings:
+            self._logger.debug("    {:.3f}s : {}".format(duration, nodePath))
+
+        return timings
+
+
+def _closeUpdateBatch():
+    """
+    Close the batch of the update calls of the breakdown app.
+    """
+    global _UPDATE_BATCH
+    batch, _UPDATE_BATCH = _UPDATE_BATCH, None
+    if(batch is not None):
+        batch.close()
+
+
+# The scanner, shared by the hook instances of the session.
+_SCANNER = IncrementalSceneScanner()
+
+# The batch of the update calls made by the breakdown app before it returns to the event loop.
+_UPDATE_BATCH = None
+
 
 class BreakdownSceneOperations(HookBaseClass):
     """
@@ -105,105 +710,21 @@ class BreakdownSceneOperations(HookBaseClass):
         available. Any such versions are then displayed in the UI as out of date.
         """
 
-        items = []
-
-        # Get all the ADAM Pipeline nodes in the current file.
-
-        # Scene Description Loader nodes.
-        items.extend(self.getNodes(
-            hou.objNodeTypeCategory(),
-            "sceneDescriptionLoader::2.0",
-            "filePath"
-        ))
-
-        # Scene Animation Loader nodes.
-        items.extend(self.getNodes(
-            hou.objNodeTypeCategory(),
-            "sceneAnimation::2.0",
-            "filePath"
-        ))
-
-        # Asset Deformed Loader nodes both for the geo and the materialX.
-        items.extend(self.getNodes(
-            hou.objNodeTypeCategory(),
-            "assetDeformedLoader::1.0",
-            "geometryFilePath"
-        ))
-        items.extend(self.getNodes(
-            hou.objNodeTypeCategory(),
-            "assetDeformedLoader::1.0",
-            "materialXFilePath"
-        ))
-
-        # Asset Animation Loader nodes both for the geo and the materialX.
-        items.extend(self.getNodes(
-            hou.objNodeTypeCategory(),
-            "assetAnimationLoader::2.0",
-            "geometryFilePath"
-        ))
-        items.extend(self.getNodes(
-            hou.objNodeTypeCategory(),
-            "assetAnimationLoader::2.0",
-            "materialXFilePath"
-        ))
-
-        # Get the alembic archives.
-        items.extend(self.getNodes(
-            hou.objNodeTypeCategory(),
-            "alembicarchive",
-            "fileName"
-        ))
-
-        # Get all the loaded HDA published.
         # Get the engine.
         engine = sgtk.platform.current_engine()
-        # Define a list of templates to look for.
-        templateNames = ['houdini_sequence_digitalAsset_publish']
-        # Get the templates.
-        templates = []
-        for templateName in templateNames:
-            templates.append( engine.get_template_by_name(templateName) )
-        
-        # Get all the nodes inside the OBJ context.
-        nodes = hou.node('/obj').allSubChildren(recurse_in_locked_nodes=False)
-        # Loop over the nodes.
-        for node in nodes:
-            # Check if the node is an HDA.
-            definition = node.type().definition()
-            if(not definition):
-                continue
-            
-            # Get the library path of the node.
-            libraryPath = definition.libraryFilePath()
-            # Check if one of the template is validated.
-            for template in templates:
-                if(template.validate(libraryPath)):
+        # Get the index matching the paths against the templates.
+        templateIndex = self.parent.create_hook_instance("{config}/common/template_index.py")
 
-                    # Add the node to the list.
-                    items.append({
-                        "node_name"     : node.path(),
-                        "node_type"     : "HDA",
-                        "path"          : libraryPath,
-                        "extra_data"    : {},
-                    })
-                    break
-
-
-        # # Get all the alembic nodes in the current file.
-        # items.extend(self.getNodes(
-        #     hou.sopNodeTypeCategory(),
-        #     "alembic",
-        #     "fileName"
-        # ))
+        # Only the nodes changed since the last scan are processed.
+        items = _SCANNER.scan(templateIndex, self.logger)
 
-        # # Get all the materialX nodes in the current file.
-        # items.extend(self.getNodes(
-        #     hou.ropNodeTypeCategory(),
-        #     "arnold::materialx",
-        #     "filename"
-        # ))
+        # Resolve the latest versions with one query per published file.
+        resolver = LatestVersionResolver(templateIndex, engine.shotgun, engine.context.project)
+        queryCount = resolver.resolve(items)
+        self.logger.debug(
+            "Resolved the latest versions of {} items with {} queries.".format(len(items), queryCount)
+        )
 
-        # Return the list of items.
         return items
 
     def update(self, item):
@@ -213,9 +734,55 @@ class BreakdownSceneOperations(HookBaseClass):
         Once a selection has been performed in the main UI and the user clicks
         the update button, this method is called.
 
+        The app calls it once per item: the calls made before the app returns
+        to the event loop are run as a single batch, see update_items.
+
         :param item: Dictionary on the same form as was generated by the scan_scene hook above.
                      The path key now holds the path that the node should be updated *to* rather than the current path.
         """
+        global _UPDATE_BATCH
+        if(_UPDATE_BATCH is None):
+            _UPDATE_BATCH = UpdateBatch(self.logger)
+            QtCore.QTimer.singleShot(0, _closeUpdateBatch)
+
+        _UPDATE_BATCH.add(item, self._updateNode)
+
+    def update_items(self, items):
+        """ Update a list of scene items at once.
+
+        Every parameter change is done in a single undo group with the cooking
+        held off. The hierarchies of the alembic archives are rebuilt once all
+        the parameters are set, once per node.
+
+        Args:
+            items   (list(dict))    : The items generated by the scan_scene hook, with the
+                                    path key holding the path to update the node to.
+
+        Returns:
+            list(tuple(str, float)) : The node paths with the time spent updating them in seconds,
+                                    the slowest first.
+        """
+        # Run the pending update calls of the app first.
+        _closeUpdateBatch()
+
+        batch = UpdateBatch(self.logger)
+        try:
+            for item in items:
+                batch.add(item, self._updateNode)
+        finally:
+            timings = batch.close()
+
+        return timings
+
+    def _updateNode(self, node, item, hierarchyNodes):
+        """ Update the file path of a node.
+
+        Args:
+            node            (:class:`hou.Node`)     : The node to update.
+            item            (dict)                  : The item generated by the scan_scene hook.
+            hierarchyNodes  (set(:class:`hou.Node`)): The alembic archives whose hierarchy
+                                                    must be rebuilt. Filled by the method.
+        """
         # Extract data from the item.
         nodePath    = item["node_name"]
         nodeType    = item["node_type"]
@@ -224,12 +791,6 @@ class BreakdownSceneOperations(HookBaseClass):
         extraData   = item["extra_data"]
         parm        = extraData.get("parm", None)
 
-        # Get the node.
-        node = hou.node(nodePath)
-        if(not node):
-            self.logger.error("Node '{}' not found.".format(nodePath))
-            return
-
         # Format the path.
         path = os.path.normpath(path).replace("\\", "/")
 
@@ -270,7 +831,9 @@ class BreakdownSceneOperations(HookBaseClass):
             self.logger.debug(
                 "Updating Asset Animation Loader node '{}' to: {}".format(nodePath, path)
             )
-            if(parm == "geometryFilePath"):
+            if(extraData.get("track")):
+                self._applyTransformTrack(node, path)
+            elif(parm == "geometryFilePath"):
                 adamPipe.AssetAnimationLoaderNode.updateGeometryFilePath(node, path)
             elif(parm == "materialXFilePath"):
                 adamPipe.AssetAnimationLoaderNode.updateMaterialXFilePath(node, path)
@@ -280,8 +843,11 @@ class BreakdownSceneOperations(HookBaseClass):
                 "Updating Alembic Archive node '{}' to: {}".format(nodePath, path)
             )
             node.parm(parm).set(path)
-            # Press the button to update the hierarchy.
-            node.parm("buildHierarchy").pressButton()
+            # The hierarchy is rebuilt by the caller.
+            hierarchyNodes.add(node)
+
+        # Scan the node again, an HDA definition swap may not trigger any watched event.
+        _SCANNER.markDirty(nodePath)
 
         # if(node_type == "alembic"):
         #     alembic_node = hou.node(node_name)
@@ -296,3 +862,13 @@ class BreakdownSceneOperations(HookBaseClass):
         #         "Updating materialX node '{}' to: {}".format(node_name, path)
         #     )
         #     materialx_node.parm("filename").set(path)
+
+    def _applyTransformTrack(self, node, trackPath):
+        """ Load the asset geometry of a transform track and key the transform of a loader from it.
+
+        Args:
+            node        (:class:`hou.Node`) : The asset animation loader.
+            trackPath   (str)               : The path of the transform track.
+        """
+        transformTrack = self.parent.create_hook_instance("{config}/tk-multi-loader2/houdini/transform_track.py")
+        transformTrack.apply(node, trackPath)
@@ -22,9 +22,10 @@ from tank_vendor import six
 
 HookBaseClass = sgtk.get_hook_baseclass()
 
-# Import the maya module of the P3D framework.
-P3Dfw = sgtk.platform.current_engine().frameworks["tk-framework-P3D"].import_module("houdini")
-loadTools = P3Dfw.LoadTools()
+# The maya module of the P3D framework, imported on first use.
+P3D = sgtk.platform.current_engine().create_hook_instance("{config}/common/p3d_framework.py")
+P3Dfw = P3D.module("houdini")
+loadTools = P3D.tools("houdini", "LoadTools")
 
 
 class HoudiniActions(HookBaseClass):
@@ -88,6 +89,26 @@ class HoudiniActions(HookBaseClass):
                 }
             )
 
+        if("importTransformTrack_obj" in actions):
+            action_instances.append(
+                {
+                    "name": "importTransformTrack_obj",
+                    "params": None,
+                    "caption": "Import Transform Track in OBJ",
+                    "description": "Load the asset alembic of each instance of the track, keyed with its transforms.",
+                }
+            )
+
+        if("importAlembicInstances_obj" in actions):
+            action_instances.append(
+                {
+                    "name": "importAlembicInstances_obj",
+                    "params": None,
+                    "caption": "Import Alembic Instances in OBJ",
+                    "description": "Copy the assets of the environment alembic on every instance of the manifest.",
+                }
+            )
+
         if("importMtlx_rop" in actions):
             action_instances.append(
                 {
@@ -185,6 +206,12 @@ class HoudiniActions(HookBaseClass):
         if(name == "importAlembic_sop"):
             self._importAlembicSop(path, sg_publish_data)
 
+        if(name == "importTransformTrack_obj"):
+            self._importTransformTrackObj(path, sg_publish_data)
+
+        if(name == "importAlembicInstances_obj"):
+            self._importAlembicInstancesObj(path, sg_publish_data)
+
         if(name == "importMtlx_rop"):
             self._importMtlxRop(path, sg_publish_data)
 
@@ -235,6 +262,41 @@ class HoudiniActions(HookBaseClass):
             sg_publish_data
         )
 
+    def _importTransformTrackObj(self, path, sg_publish_data):
+        """ Create an asset animation loader in the Object context for each instance of a transform track.
+
+        Args:
+            path            (str)   : The path of the transform track.
+            sg_publish_data (dict)  : The publish data of the transform track.
+        """
+        if(not os.path.exists(path)):
+            raise Exception("File not found on disk - '%s'" % path)
+
+        transformTrack = self.parent.create_hook_instance("{config}/tk-multi-loader2/houdini/transform_track.py")
+        nodes = transformTrack.load(_get_current_context("/obj"), path)
+        if(nodes):
+            _show_node(nodes[0])
+
+    def _importAlembicInstancesObj(self, path, sg_publish_data):
+        """ Create a geometry object in the Object context instancing the assets of an environment alembic.
+
+        Args:
+            path            (str)   : The path of the instancing manifest.
+            sg_publish_data (dict)  : The publish data of the instancing manifest.
+        """
+        if(not os.path.exists(path)):
+            raise Exception("File not found on disk - '%s'" % path)
+
+        environmentInstances = self.parent.create_hook_instance(
+            "{config}/tk-multi-loader2/houdini/environment_instances.py"
+        )
+        node = environmentInstances.load(
+            _get_current_context("/obj"),
+            path,
+            sg_publish_data.get("entity").get("name")
+        )
+        _show_node(node)
+
     def _importMtlxRop(self, path, sg_publish_data):
         loadTools.importMaterialXRop(
             sg_publish_data.get("entity").get("name"),
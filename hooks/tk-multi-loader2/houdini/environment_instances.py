@@ -0,0 +1,155 @@
+"""
+Loading of the instancing manifests published with the environment alembics.
+
+Once the repeated assets of an environment are instanced, its alembic only
+holds one copy of each asset, the prototype, and the assets which are not
+repeated. The manifest lists the world matrix of every copy of each
+prototype. The loader builds a geometry object copying the prototypes of the
+alembic on a point for each copy:
+
+- the primitives of the alembic are tagged with the prototype whose root is
+  in their path;
+- a point per copy holds the inverse of the prototype matrix followed by the
+  copy matrix, a point at the origin keeps the assets which are not instanced;
+- a Copy to Points SOP copies each prototype on its own points only.
+
+The Python SOPs read the manifest of the object when they cook.
+
+Load it from any hook with::
+
+    self.parent.create_hook_instance("{config}/tk-multi-loader2/houdini/environment_instances.py")
+"""
+
+import json
+
+import hou
+import sgtk
+
+HookBaseClass = sgtk.get_hook_baseclass()
+
+# The parameter of the geometry object holding the path of the manifest.
+MANIFEST_PARM = "manifestPath"
+
+# The attribute matching the primitives of the prototypes with their points.
+INSTANCE_ATTRIB = "instance"
+
+# The Python SOP tagging the primitives of the alembic with their prototype.
+_PROTOTYPE_NAMES_CODE = '''import json
+
+node = hou.pwd()
+geo = node.geometry()
+with open(node.parent().evalParm("{manifestParm}"), "r") as manifestFile:
+    prototypes = json.load(manifestFile)["prototypes"]
+
+# The prototypes by the name of their root, with and without its namespaces.
+names = {{}}
+for prototype in prototypes:
+    names[prototype["name"]] = prototype["name"]
+    names.setdefault(prototype["name"].split(":")[-1], prototype["name"])
+
+instanceAttrib = geo.addAttrib(hou.attribType.Prim, "{instanceAttrib}", "")
+pathAttrib = geo.findPrimAttrib("path")
+if(pathAttrib is not None):
+    for prim in geo.prims():
+        for part in prim.attribValue(pathAttrib).split("/"):
+            if(part in names):
+                prim.setAttribValue(instanceAttrib, names[part])
+                break
+'''.format(manifestParm=MANIFEST_PARM, instanceAttrib=INSTANCE_ATTRIB)
+
+# The Python SOP creating a point for each copy of the prototypes.
+_INSTANCE_POINTS_CODE = '''import json
+
+node = hou.pwd()
+geo = node.geometry()
+with open(node.parent().evalParm("{manifestParm}"), "r") as manifestFile:
+    prototypes = json.load(manifestFile)["prototypes"]
+
+instanceAttrib = geo.addAttrib(hou.attribType.Point, "{instanceAttrib}", "")
+transformAttrib = geo.addAttrib(hou.attribType.Point, "transform", (1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0))
+
+# The assets which are not instanced are kept where they are.
+geo.createPoint()
+
+# The matrices transform the row vectors, as the ones of Maya.
+for prototype in prototypes:
+    inverse = hou.Matrix4(prototype["matrix"]).inverted()
+    for instance in prototype["instances"]:
+        matrix = inverse * hou.Matrix4(instance["matrix"])
+        point = geo.createPoint()
+        point.setPosition(matrix.extractTranslates())
+        point.setAttribValue(instanceAttrib, prototype["name"])
+        point.setAttribValue(transformAttrib, [matrix.at(row, column) for row in range(3) for column in range(3)])
+'''.format(manifestParm=MANIFEST_PARM, instanceAttrib=INSTANCE_ATTRIB)
+
+
+class EnvironmentInstances(HookBaseClass):
+    """
+    Hook loading the instancing manifests of the environment alembics.
+    """
+
+    def read(self, manifestPath):
+        """ Read an instancing manifest.
+
+        Args:
+            manifestPath    (str)   : The path of the manifest.
+
+        Returns:
+            dict                    : The manifest, with the path of the alembic and the prototypes.
+        """
+        with open(manifestPath, "r") as manifestFile:
+            return json.load(manifestFile)
+
+    def load(self, parent, manifestPath, name):
+        """ Create the geometry object instancing the prototypes of an environment alembic.
+
+        Args:
+            parent          (:class:`hou.Node`) : The network of the object.
+            manifestPath    (str)               : The path of the manifest.
+            name            (str)               : The name of the object.
+
+        Returns:
+            :class:`hou.Node`                   : The geometry object.
+        """
+        manifest = self.read(manifestPath)
+
+        geo = parent.createNode("geo", hou.text.variableName(name), run_init_scripts=False)
+        parmTemplates = geo.parmTemplateGroup()
+        parmTemplates.append(
+            hou.StringParmTemplate(
+                MANIFEST_PARM, "Instancing Manifest", 1, string_type=hou.stringParmType.FileReference
+            )
+        )
+        geo.setParmTemplateGroup(parmTemplates)
+        geo.parm(MANIFEST_PARM).set(manifestPath.replace("\\", "/"))
+
+        alembic = geo.createNode("alembic", "prototypes")
+        alembic.parm("fileName").set(manifest["alembic"].replace("\\", "/"))
+
+        prototypeNames = geo.createNode("python", "prototype_names")
+        prototypeNames.setInput(0, alembic)
+        prototypeNames.parm("python").set(_PROTOTYPE_NAMES_CODE)
+
+        instancePoints = geo.createNode("python", "instance_points")
+        instancePoints.parm("python").set(_INSTANCE_POINTS_CODE)
+
+        # Each prototype is only copied on the points of its copies.
+        copies = geo.createNode("copytopoints", "instances")
+        copies.setInput(0, prototypeNames)
+        copies.setInput(1, instancePoints)
+        copies.parm("useidattrib").set(True)
+        copies.parm("idattrib").set(INSTANCE_ATTRIB)
+        copies.setDisplayFlag(True)
+        copies.setRenderFlag(True)
+
+        geo.layoutChildren()
+
+        self.logger.debug(
+            "Loaded {} copies of {} prototypes from {} in '{}'.".format(
+                sum(len(prototype["instances"]) for prototype in manifest["prototypes"]),
+                len(manifest["prototypes"]),
+                manifestPath,
+                geo.path()
+            )
+        )
+        return geo
@@ -0,0 +1,129 @@
+"""
+Loading of the transform tracks published by the Maya shot plugins.
+
+A transform track replaces the baked geometry of a shot asset instance that
+does not deform: it holds the path of the published asset alembic and the
+world matrix of the instance on each frame. An asset animation loader loads
+the asset alembic and its transform is keyed from the matrices. The loader
+keeps the path of the track and the name of the instance in its user data,
+the breakdown updates the track beside the asset geometry.
+
+Load it from any hook with::
+
+    self.parent.create_hook_instance("{config}/tk-multi-loader2/houdini/transform_track.py")
+"""
+
+import json
+
+import hou
+import sgtk
+
+# Import the adam pipe nodes.
+import adamPipe
+
+HookBaseClass = sgtk.get_hook_baseclass()
+
+# The loader node built from a transform track.
+LOADER_TYPE = "assetAnimationLoader::2.0"
+
+# The user data of a loader holding the transform track it was built from, and the name of its instance.
+USER_DATA           = "p3dTransformTrack"
+INSTANCE_USER_DATA  = USER_DATA + "Instance"
+
+
+class TransformTrack(HookBaseClass):
+    """
+    Hook loading the transform tracks into asset animation loaders.
+    """
+
+    LOADER_TYPE         = LOADER_TYPE
+    USER_DATA           = USER_DATA
+    INSTANCE_USER_DATA  = INSTANCE_USER_DATA
+
+    def read(self, trackPath):
+        """ Read the instances of a transform track.
+
+        Args:
+            trackPath   (str)   : The path of the transform track.
+
+        Returns:
+            list(dict)          : The track of each instance, with the asset path, the frames and their world matrices.
+        """
+        with open(trackPath, "r") as trackFile:
+            return json.load(trackFile)["instances"]
+
+    def load(self, parent, trackPath):
+        """ Create an asset animation loader for each instance of a transform track.
+
+        Args:
+            parent      (:class:`hou.Node`) : The network of the loaders.
+            trackPath   (str)               : The path of the transform track.
+
+        Returns:
+            list(:class:`hou.Node`)         : The loaders.
+        """
+        nodes = []
+        for track in self.read(trackPath):
+            node = parent.createNode(LOADER_TYPE, hou.text.variableName(track["instance"]))
+            self.apply(node, trackPath, track)
+            nodes.append(node)
+        if(nodes):
+            parent.layoutChildren(items=nodes)
+        return nodes
+
+    def apply(self, node, trackPath, track=None):
+        """ Load the asset geometry of a transform track and key the transform of a loader from it.
+
+        Args:
+            node        (:class:`hou.Node`) : The asset animation loader.
+            trackPath   (str)               : The path of the transform track.
+            track       (dict, optional)    : The track of the instance, the one the loader
+                                              was built from by default.
+        """
+        if(track is None):
+            instances = self.read(trackPath)
+            # A track of an environment holds several instances, keep the one the loader was built from.
+            instanceName = node.userData(INSTANCE_USER_DATA)
+            track = instances[0]
+            for instance in instances:
+                if(instance["instance"] == instanceName):
+                    track = instance
+                    break
+
+        adamPipe.AssetAnimationLoaderNode.updateGeometryFilePath(node, track["asset"].replace("\\", "/"))
+        node.setUserData(USER_DATA, trackPath.replace("\\", "/"))
+        node.setUserData(INSTANCE_USER_DATA, track["instance"])
+
+        # The matrices of the track transform the row vectors, as the ones of Houdini.
+        node.parm("xOrd").set("srt")
+        node.parm("rOrd").set("xyz")
+        components = {"t": "translate", "r": "rotate", "s": "scale", "shear": "shear"}
+        values = dict((name, []) for name in components)
+        for matrix in track["matrices"]:
+            exploded = hou.Matrix4([matrix[row * 4:row * 4 + 4] for row in range(4)]).explode(
+                transform_order="srt", rotate_order="xyz"
+            )
+            for name, component in components.items():
+                values[name].append(list(exploded[component]))
+
+        # Keep the rotations continuous between the frames.
+        for previous, current in zip(values["r"], values["r"][1:]):
+            for axis in range(3):
+                current[axis] += 360.0 * round((previous[axis] - current[axis]) / 360.0)
+
+        for name in components:
+            for axis, parm in enumerate(node.parmTuple(name)):
+                parm.deleteAllKeyframes()
+                if(len(track["frames"]) == 1):
+                    parm.set(values[name][0][axis])
+                    continue
+                keyframes = []
+                for frame, value in zip(track["frames"], values[name]):
+                    keyframe = hou.Keyframe(value[axis], hou.frameToTime(frame))
+                    keyframe.setExpression("linear()")
+                    keyframes.append(keyframe)
+                parm.setKeyframes(keyframes)
+
+        self.logger.debug(
+            "Applied the {} transform track of {} to '{}'.".format(track["motion"], track["instance"], node.path())
+        )
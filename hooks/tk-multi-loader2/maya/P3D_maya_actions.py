@@ -23,17 +23,13 @@ from tank_vendor import six
 
 HookBaseClass = sgtk.get_hook_baseclass()
 
-# Import the maya module of the P3D framework.
-P3Dfw = sgtk.platform.current_engine().frameworks["tk-framework-P3D"].import_module("maya")
-loadTools = P3Dfw.LoadTools()
+# The maya module of the P3D framework, imported on first use.
+P3D = sgtk.platform.current_engine().create_hook_instance("{config}/common/p3d_framework.py")
+P3Dfw = P3D.module("maya")
+loadTools = P3D.tools("maya", "LoadTools")
 
 class MayaActions(HookBaseClass):
 
-    def __init__(self, *args):
-        super(MayaActions, self).__init__(*args)
-
-        self.P3Dfw = self.load_framework("tk-framework-P3D_v0.x.x")
-
     ##############################################################################################################
     # public interface - to be overridden by deriving classes
 
@@ -0,0 +1,51 @@
+"""
+Publish plugin hook queuing the publish registration of the plugin it is
+appended to, when the batch registration of the publish registration queue
+is enabled. The queue is committed at the start of the finalize pass.
+
+Append it to a publish plugin hook chain, before the trace plugin::
+
+    hook: "{self}/publish_file.py:{config}/tk-multi-publish2/maya/publish_session.py:{config}/tk-multi-publish2/batch_register_plugin.py:{config}/tk-multi-publish2/trace_plugin.py"
+"""
+
+import sgtk
+
+HookBaseClass = sgtk.get_hook_baseclass()
+
+
+class BatchRegisterPublishPlugin(HookBaseClass):
+    """
+    Hook queuing the publish registrations of a publish plugin.
+    """
+
+    # Skipped by the trace hook naming the traced plugin.
+    chainWrapper = True
+
+    @property
+    def registrationQueue(self):
+        """ :class:`PublishRegistrationQueue`: The shared publish registration queue. """
+        if(not hasattr(self, "_registrationQueue")):
+            self._registrationQueue = self.parent.create_hook_instance(
+                "{config}/tk-multi-publish2/publish_registration_queue.py"
+            )
+        return self._registrationQueue
+
+    def validate(self, settings, item):
+        if(self.registrationQueue.enabled):
+            # The whole tree is validated before the publish pass starts,
+            # forget the registrations of a publish which did not finalize.
+            self.registrationQueue.clear()
+        return super(BatchRegisterPublishPlugin, self).validate(settings, item)
+
+    def publish(self, settings, item):
+        if(not self.registrationQueue.enabled):
+            return super(BatchRegisterPublishPlugin, self).publish(settings, item)
+
+        with self.registrationQueue.capture():
+            return super(BatchRegisterPublishPlugin, self).publish(settings, item)
+
+    def finalize(self, settings, item):
+        if(self.registrationQueue.enabled):
+            # The first finalize registers the publishes of the whole tree.
+            self.registrationQueue.commit()
+        return super(BatchRegisterPublishPlugin, self).finalize(settings, item)
@@ -11,7 +11,6 @@
 import os
 import hou
 import sgtk
-import re
 
 try:
     from    adamPipe.lookdevAssetNode       import LookdevAssetNode
@@ -33,6 +32,83 @@ _HOUDINI_OUTPUTS = {
 }
 
 
+class HoudiniNodeIndex(object):
+    """
+    Index of the nodes of the Houdini session, by node type.
+
+    The collect methods used to walk the /obj and /out networks to find the
+    nodes of a type. The index reads the node types of a category once and
+    gets the nodes from the instance lists Houdini keeps for each type. It is
+    built once per collection.
+    """
+
+    def __init__(self):
+        # The node types by category name, by type name and by name component.
+        self._typesByName       = {}
+        self._typesByComponent  = {}
+
+    def _indexCategory(self, category):
+        """ Index the node types of a category.
+
+        Args:
+            category    (:class:`hou.NodeTypeCategory`) : The node type category.
+
+        Returns:
+            str                                         : The name of the category.
+        """
+        categoryName = category.name()
+        if(categoryName in self._typesByName):
+            return categoryName
+
+        typesByName         = {}
+        typesByComponent    = {}
+        for typeName, nodeType in category.nodeTypes().items():
+            typesByName[typeName] = nodeType
+            # The name without namespace and version, e.g. lookdevAsset.
+            typesByComponent.setdefault(nodeType.nameComponents()[2], []).append(nodeType)
+
+        self._typesByName[categoryName]         = typesByName
+        self._typesByComponent[categoryName]    = typesByComponent
+        return categoryName
+
+    def instances(self, category, typeName):
+        """ Get the nodes of a type.
+
+        Args:
+            category    (:class:`hou.NodeTypeCategory`) : The node type category.
+            typeName    (str)                           : The full name of the node type, e.g. alembic.
+
+        Returns:
+            list(:class:`hou.Node`)                     : The nodes.
+        """
+        categoryName = self._indexCategory(category)
+        nodeType = self._typesByName[categoryName].get(typeName)
+        return list(nodeType.instances()) if nodeType else []
+
+    def nodes(self, category, nameComponent, rootPath):
+        """ Get the nodes of every version of a type under a network.
+
+        Args:
+            category        (:class:`hou.NodeTypeCategory`) : The node type category.
+            nameComponent   (str)                           : The name of the node type without
+                                                            namespace and version, e.g. lookdevAsset.
+            rootPath        (str)                           : The path of the network, e.g. /obj.
+
+        Returns:
+            list(:class:`hou.Node`)                         : The nodes, sorted by path.
+        """
+        categoryName = self._indexCategory(category)
+        prefix = "{}/".format(rootPath.rstrip("/"))
+
+        nodes = []
+        for nodeType in self._typesByComponent[categoryName].get(nameComponent, []):
+            for node in nodeType.instances():
+                nodePath = node.path()
+                if(nodePath.startswith(prefix)):
+                    nodes.append((nodePath, node))
+        return [node for _, node in sorted(nodes, key=lambda pathNode: pathNode[0])]
+
+
 class HoudiniSessionCollector(HookBaseClass):
     """
     Collector that operates on the current houdini session. Should inherit from
@@ -85,6 +161,33 @@ class HoudiniSessionCollector(HookBaseClass):
         Analyzes the current Houdini session and parents a subtree of items
         under the parent_item passed in.
 
+        :param dict settings: Configured settings for this collector
+        :param parent_item: Root item instance
+        """
+        # The collection of a refresh reached while a collection runs would replace its data.
+        if(self.collectionProgress.running):
+            self.logger.warning("A collection is already running.")
+            return
+
+        # Index the nodes of the session once for all the collect methods.
+        self._nodeIndex = HoudiniNodeIndex()
+        # Check the files on disk again for the new publish session.
+        self.filesystemProbe.reset()
+
+        # Collect the items, yielding to the Houdini UI between the collect steps.
+        self.collectionProgress.run(
+            "the Houdini session", parent_item, self.collect_current_session, settings, parent_item
+        )
+
+        self.logger.debug(
+            "File checks: {hits} cached, {misses} on disk.".format(**self.filesystemProbe.counters)
+        )
+
+    def collect_current_session(self, settings, parent_item):
+        """
+        Parents the items of the current session under the parent_item,
+        depending on the context.
+
         :param dict settings: Configured settings for this collector
         :param parent_item: Root item instance
         """
@@ -142,6 +245,46 @@ class HoudiniSessionCollector(HookBaseClass):
 
 
 
+    @property
+    def filesystemProbe(self):
+        """ The cache of the file checks of the publish session.
+
+        Returns:
+            :class:`FilesystemProbe`    : The filesystem probe hook.
+        """
+        filesystemProbe = getattr(self, "_filesystemProbe", None)
+        if(filesystemProbe is None):
+            filesystemProbe = self._filesystemProbe = self.parent.create_hook_instance(
+                "{config}/common/filesystem_probe.py"
+            )
+        return filesystemProbe
+
+    @property
+    def collectionProgress(self):
+        """ The progress of the collection, yielding to the Houdini UI.
+
+        Returns:
+            :class:`CollectionProgress` : The collection progress hook.
+        """
+        collectionProgress = getattr(self, "_collectionProgress", None)
+        if(collectionProgress is None):
+            collectionProgress = self._collectionProgress = self.parent.create_hook_instance(
+                "{config}/common/collection_progress.py"
+            )
+        return collectionProgress
+
+    @property
+    def nodeIndex(self):
+        """ The index of the nodes for the current collection.
+
+        Returns:
+            :class:`HoudiniNodeIndex`   : The node index.
+        """
+        nodeIndex = getattr(self, "_nodeIndex", None)
+        if(nodeIndex is None):
+            nodeIndex = self._nodeIndex = HoudiniNodeIndex()
+        return nodeIndex
+
 # COLLECT BY STEP FUNCTIONS.
 
     def collect_for_shd_publish(self, settings, parent_item):
@@ -210,7 +353,7 @@ class HoudiniSessionCollector(HookBaseClass):
         # Get the path to the review folder.
         reviewFolder = os.path.join(entityRoot, 'review')
         # Check if the folder exists.
-        if(not os.path.exists(reviewFolder)):
+        if(not self.filesystemProbe.exists(reviewFolder)):
             self.logger.debug("No review folder found.")
             return
 
@@ -227,43 +370,39 @@ class HoudiniSessionCollector(HookBaseClass):
         sceneName       = sceneNameSplit[0]
         sceneversion    = sceneNameSplit[1]
 
-        # Use regex to find the correct file.
-        reExpr = "^({})(|[_].*)([.]v{})$".format(sceneName, sceneversion)
+        # Get the files of this scene version from the review folder index.
+        reviewIndex = self.parent.create_hook_instance("{config}/tk-multi-publish2/review_folder_index.py")
+        reviewFiles = reviewIndex.find(reviewFolder, sceneName, sceneversion)
 
-        # Loop over all the files in the review folder.
-        for file in os.listdir(reviewFolder):
+        # Loop over the review files of the scene.
+        for file in reviewFiles:
             # Get the info of the item.
             itemInfo = self._get_item_info(file)
             # Skip if it is neither a video nor an image.
             if(itemInfo["item_type"] not in ["file.image", "file.video"]):
                 continue
 
-            # Get the file name without extension.
-            fileName        = os.path.splitext(file)[0]
-
-            # Check if the file name matches the regex.
-            if(re.search(reExpr, fileName)):
-                # create the review item for the publish hierarchy
-                review_item = parent_item.create_item(
-                    "houdini.playblast.review", "Review", file
-                )
+            # create the review item for the publish hierarchy
+            review_item = parent_item.create_item(
+                "houdini.playblast.review", "Review", file
+            )
 
-                # Get the icon path to display for this item.
-                icon_path = os.path.join(self.disk_location, os.pardir, "icons", "review.png")
-                #review_item.set_icon_from_path(icon_path)
-                review_item.set_icon_from_path(itemInfo["icon_path"])
+            # Get the icon path to display for this item.
+            icon_path = os.path.join(self.disk_location, os.pardir, "icons", "review.png")
+            #review_item.set_icon_from_path(icon_path)
+            review_item.set_icon_from_path(itemInfo["icon_path"])
 
-                # Get the path to the file.
-                filePath = os.path.join(reviewFolder, file)
+            # Get the path to the file.
+            filePath = os.path.join(reviewFolder, file)
 
-                # Add the path to the item properties
-                review_item.properties["path"] = filePath
+            # Add the path to the item properties
+            review_item.properties["path"] = filePath
 
-                # if the supplied path is an image, use the path as the thumbnail.
-                if(itemInfo["item_type"].startswith("file.image")):
-                    review_item.set_thumbnail_from_path(filePath)
-                    # disable thumbnail creation since we get it for free
-                    review_item.thumbnail_enabled = False
+            # if the supplied path is an image, use the path as the thumbnail.
+            if(itemInfo["item_type"].startswith("file.image")):
+                review_item.set_thumbnail_from_path(filePath)
+                # disable thumbnail creation since we get it for free
+                review_item.thumbnail_enabled = False
 
 # DEFAULT COLLECT FUNCTIONS.
 
@@ -357,16 +496,18 @@ class HoudiniSessionCollector(HookBaseClass):
                 path_parm_name = _HOUDINI_OUTPUTS[node_category][node_type]
 
                 # get all the nodes for the category and type
-                nodes = hou.nodeType(node_category, node_type).instances()
+                nodes = self.nodeIndex.instances(node_category, node_type)
 
-                # iterate over each node
-                for node in nodes:
+                # get the evaluated path parm values and check them on disk
+                # in a single batch
+                paths = [node.parm(path_parm_name).eval() for node in nodes]
+                existing = self.filesystemProbe.existsMany(paths)
 
-                    # get the evaluated path parm value
-                    path = node.parm(path_parm_name).eval()
+                # iterate over each node
+                for node, path in self.collectionProgress.iterate(zip(nodes, paths), "{} nodes".format(node_type)):
 
                     # ensure the output path exists
-                    if not os.path.exists(path):
+                    if not existing[path]:
                         continue
 
                     self.logger.info(
@@ -419,11 +560,13 @@ class HoudiniSessionCollector(HookBaseClass):
         # on the collected alembicnode items for use during publishing.
         work_template = alembicnode_app.get_work_file_template()
 
-        for node in tk_alembic_nodes:
+        # check the output paths on disk in a single batch
+        out_paths = [alembicnode_app.get_output_path(node) for node in tk_alembic_nodes]
+        existing = self.filesystemProbe.existsMany(out_paths)
 
-            out_path = alembicnode_app.get_output_path(node)
+        for node, out_path in zip(tk_alembic_nodes, out_paths):
 
-            if not os.path.exists(out_path):
+            if not existing[out_path]:
                 continue
 
             self.logger.info("Processing sgtk_alembic node: %s" % (node.path(),))
@@ -479,11 +622,13 @@ class HoudiniSessionCollector(HookBaseClass):
         # on the collected alembicnode items for use during publishing.
         work_template = mantranode_app.get_work_file_template()
 
-        for node in tk_mantra_nodes:
+        # check the output paths on disk in a single batch
+        out_paths = [mantranode_app.get_output_path(node) for node in tk_mantra_nodes]
+        existing = self.filesystemProbe.existsMany(out_paths)
 
-            out_path = mantranode_app.get_output_path(node)
+        for node, out_path in zip(tk_mantra_nodes, out_paths):
 
-            if not os.path.exists(out_path):
+            if not existing[out_path]:
                 continue
 
             self.logger.info("Processing sgtk_mantra node: %s" % (node.path(),))
@@ -514,12 +659,11 @@ class HoudiniSessionCollector(HookBaseClass):
             list(sgItemUI)              : List of collected items
         '''
         # Get all the Adam materialX export nodes
-        rootNode = hou.node('/out')
-        nodes = [node for node in rootNode.allNodes() if node.type().nameComponents()[2] == 'materialXExport']
+        nodes = self.nodeIndex.nodes(hou.ropNodeTypeCategory(), 'materialXExport', '/out')
 
         # Loop through all the Adam materialX export nodes
         itemCreated = []
-        for node in nodes:
+        for node in self.collectionProgress.iterate(nodes, "materialX export nodes"):
 
             self.logger.info("Processing materialX export node: {}".format(node.path()))
 
@@ -565,11 +709,10 @@ class HoudiniSessionCollector(HookBaseClass):
         nodesItem.set_icon_from_path(iconPath)
 
         # Get all the nodes
-        rootNode = hou.node('/obj')
-        nodes = [node for node in rootNode.allNodes() if node.type().nameComponents()[2] == 'lookdevAsset']
+        nodes = self.nodeIndex.nodes(hou.objNodeTypeCategory(), 'lookdevAsset', '/obj')
 
         # Loop through all the Adam materialX export nodes
-        for node in nodes:
+        for node in self.collectionProgress.iterate(nodes, "lookdev asset nodes"):
 
             self.logger.info("Processing lookdev asset node: {}".format(node.path()))
 
@@ -657,7 +800,7 @@ class HoudiniSessionCollector(HookBaseClass):
         selectedNodes = hou.selectedNodes()
 
         # Loop through all the nodes
-        for node in selectedNodes:
+        for node in self.collectionProgress.iterate(selectedNodes, "selected nodes"):
 
             self.logger.info("Processing selected nodes: {}".format(node.path()))
 
@@ -7,12 +7,13 @@ from    tank_vendor import six
 # Import the node definition.
 from    adamPipe.materialXExportNode    import MaterialXExportNode
 
-# Import the houdini module of the P3D framework.
-P3Dfw = sgtk.platform.current_engine().frameworks["tk-framework-P3D"].import_module("houdini")
-publihTools = P3Dfw.PublishTools()
-
 HookBaseClass = sgtk.get_hook_baseclass()
 
+# The houdini module of the P3D framework, imported on first use.
+P3D = sgtk.platform.current_engine().create_hook_instance("{config}/common/p3d_framework.py")
+P3Dfw = P3D.module("houdini")
+publihTools = P3D.tools("houdini", "PublishTools")
+
 class HoudiniAssetMaterialXPublishPlugin(HookBaseClass):
 
     @property
@@ -138,6 +138,13 @@ class HoudiniSessionPublishPlugin(HookBaseClass):
         """
         return ["houdini.session"]
 
+    @property
+    def filePromotion(self):
+        """ :class:`FilePromotion`: The shared promotion of the saved files. """
+        if(not hasattr(self, "_filePromotion")):
+            self._filePromotion = self.parent.create_hook_instance("{config}/common/file_promotion.py")
+        return self._filePromotion
+
     def accept(self, settings, item):
         """
         Method called by the publisher to determine if an item is of any
@@ -250,14 +257,13 @@ class HoudiniSessionPublishPlugin(HookBaseClass):
         # disk. if so, warn the user and provide the ability to jump to save
         # to that version now
         (next_version_path, version) = self._get_next_version_info(path, item)
-        if next_version_path and os.path.exists(next_version_path):
+        (free_version_path, free_version) = self._get_free_version_info(
+            path, next_version_path, version, item
+        )
+        if next_version_path and free_version_path != next_version_path:
 
-            # determine the next available version_number. just keep asking for
-            # the next one until we get one that doesn't exist.
-            while os.path.exists(next_version_path):
-                (next_version_path, version) = self._get_next_version_info(
-                    next_version_path, item
-                )
+            # the next available version_number.
+            (next_version_path, version) = (free_version_path, free_version)
 
             error_msg = "The next version of this file already exists on disk."
             self.logger.error(
@@ -290,6 +296,58 @@ class HoudiniSessionPublishPlugin(HookBaseClass):
         # run the base class validation
         return super(HoudiniSessionPublishPlugin, self).validate(settings, item)
 
+    def _get_free_version_info(self, path, next_version_path, version, item):
+        """
+        Get the path and number of the first version of the work file after
+        the current one not existing on disk.
+
+        :param path: The path of the current session
+        :param next_version_path: The path of the next version
+        :param version: The number of the next version
+        :param item: Item to process
+        :returns: The path and number of the free version
+        """
+        if not next_version_path:
+            return (next_version_path, version)
+
+        # the next version is usually free, only look further when it is not.
+        if not os.path.exists(next_version_path):
+            return (next_version_path, version)
+
+        # list the work folder once instead of testing each version.
+        work_template = item.properties.get("work_template")
+        if work_template:
+            version_index = self.parent.create_hook_instance(
+                "{config}/tk-multi-publish2/work_version_index.py"
+            )
+            (free_version_path, free_version, _) = version_index.nextFreeVersion(
+                path, work_template
+            )
+            if free_version_path:
+                return (free_version_path, free_version)
+
+        # just keep asking for the next one until we get one that doesn't exist.
+        while os.path.exists(next_version_path):
+            (next_version_path, version) = self._get_next_version_info(
+                next_version_path, item
+            )
+        return (next_version_path, version)
+
+    def _copy_work_to_publish(self, settings, item):
+        """
+        Promote the saved work file to the publish path.
+
+        Overrides the copy of the base class: the publish file shares the data
+        of the work file when the file system allows it, see the
+        file_promotion.py hook.
+
+        :param settings: Dictionary of Settings. The keys are strings, matching
+            the keys returned in the settings property. The values are `Setting`
+            instances.
+        :param item: Item to process
+        """
+        self.filePromotion.promoteWorkFile(self, settings, item)
+
     def publish(self, settings, item):
         """
         Executes the publish logic for the given item and settings.
@@ -327,18 +385,40 @@ class HoudiniSessionPublishPlugin(HookBaseClass):
         # do the base class finalization
         super(HoudiniSessionPublishPlugin, self).finalize(settings, item)
 
-        # bump the session file to the next version
-        self._save_to_next_version(item.properties["path"], item, _save_session)
+        # bump the session file to the next version, promoting the file saved
+        # by the publish if the session was not modified since.
+        path = item.properties["path"]
+        file_promotion = self.filePromotion
+        self._save_to_next_version(
+            path,
+            item,
+            lambda next_version_path: _save_session(next_version_path, path, file_promotion),
+        )
 
 
-def _save_session(path):
+def _save_session(path, source_path=None, file_promotion=None):
     """
     Save the current session to the supplied path.
+
+    If the session was not modified since it was saved to the source path,
+    the saved file is promoted to the path instead of writing the scene again.
     """
     # We need to flip the slashes on Windows to avoid a bug in Houdini. If we don't
     # the next Save As dialog will have the filename box populated with the complete
     # file path.
     sanitized_path = six.ensure_str(path.replace("\\", "/"))
+
+    # the session is already saved, promote the saved file
+    if (
+        file_promotion
+        and source_path
+        and os.path.isfile(source_path)
+        and not hou.hipFile.hasUnsavedChanges()
+    ):
+        file_promotion.promote(source_path, path)
+        hou.hipFile.setName(sanitized_path)
+        return
+
     hou.hipFile.save(file_name=sanitized_path)
 
 
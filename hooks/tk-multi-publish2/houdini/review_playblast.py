@@ -9,14 +9,15 @@ import inspect
 
 from tank_vendor import six
 
-# Import the houdini module of the P3D framework.
-P3Dfw = sgtk.platform.current_engine().frameworks["tk-framework-P3D"].import_module("houdini")
-publihTools = P3Dfw.PublishTools()
-
 # Inherit from {self}/publish_file.py 
 # Check config.env.includes.settings.tk-multi-publish2.yml
 HookBaseClass = sgtk.get_hook_baseclass()
 
+# The houdini module of the P3D framework, imported on first use.
+P3D = sgtk.platform.current_engine().create_hook_instance("{config}/common/p3d_framework.py")
+P3Dfw = P3D.module("houdini")
+publihTools = P3D.tools("houdini", "PublishTools")
+
 
 class HoudiniPlayblastReviewPlugin(HookBaseClass):
     ''' Plugin for sending maya playblast to shotgrid for review.
@@ -51,11 +52,24 @@ class HoudiniPlayblastReviewPlugin(HookBaseClass):
 
     def publish(self, settings, item):
 
-        publihTools.hookUploadReviewPublish(
-            self,
-            settings,
-            item
+        reviewUploadQueue = self.parent.create_hook_instance(
+            "{config}/tk-multi-publish2/review_upload_queue.py"
         )
+        if(not reviewUploadQueue.enabled):
+            publihTools.hookUploadReviewPublish(
+                self,
+                settings,
+                item
+            )
+            return
+
+        # Create the version right away and upload the movie in the background.
+        with reviewUploadQueue.capture(self.parent.shotgun, self.parent.engine.shotgun):
+            publihTools.hookUploadReviewPublish(
+                self,
+                settings,
+                item
+            )
 
     def finalize(self, settings, item):
         ''' Execute the finalization pass. This pass executes once all the publish
@@ -0,0 +1,434 @@
+"""
+Shared scheduler batching the alembic exports of the Maya publish plugins.
+
+The alembic publish plugins defer their exports to this hook during the
+publish pass. The scheduler then writes every queued alembic at once:
+
+- Jobs sharing a frame range are merged into a single AbcExport command with
+  one ``-j`` job per output file, so the timeline is evaluated only once for
+  all of them. The job argument of each export is read from the framework,
+  by running its export with the AbcExport command recorded instead of run.
+- The other frame ranges are exported by a pool of background ``mayapy``
+  processes opening the saved scene, when the scene has no unsaved changes.
+- The LOD jobs whose geometry fingerprint matches the one of their previous
+  publish are not exported, the previous file is promoted instead.
+
+The publish registrations are only executed once the outputs are written.
+When the batch registration of the publish registration queue is enabled,
+they are queued too and the queue flushes the scheduler before its commit.
+The plugins which modify the scene during the publish pass, like the spline
+rekeying, flush the queue first so the queued alembics export the scene as
+it was collected.
+
+Load it from a publish plugin with::
+
+    self.parent.create_hook_instance("{config}/tk-multi-publish2/maya/alembic_export_scheduler.py")
+"""
+
+import contextlib
+import os
+import re
+import shlex
+import subprocess
+import sys
+import threading
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
+
+import maya.cmds as cmds
+import maya.mel as mel
+import sgtk
+
+HookBaseClass = sgtk.get_hook_baseclass()
+
+# The flags of the AbcExport job argument giving the output file.
+_FILE_FLAG_PATTERN = re.compile(r'\s*(?<!\S)-f(?:ile)?\s+("(?:[^"\\]|\\.)*"|\S+)')
+
+# The flags of the AbcExport MEL command giving a job argument.
+_MEL_JOB_FLAGS = ("-j", "-jobArg")
+
+# Maximum number of background mayapy processes.
+_MAX_WORKERS = max(1, min(4, cpu_count()))
+
+# Script run by the background mayapy processes.
+_WORKER_SCRIPT = """
+import sys
+import maya.standalone
+maya.standalone.initialize(name="python")
+import maya.cmds as cmds
+cmds.loadPlugin("AbcExport", quiet=True)
+cmds.file(sys.argv[1], open=True, force=True)
+cmds.AbcExport(jobArg=sys.argv[2:])
+maya.standalone.uninitialize()
+"""
+
+# State of the current publish, shared by every plugin.
+_LOCK           = threading.Lock()
+_JOBS           = []
+_REGISTRATIONS  = []
+
+
+class AlembicExportJob(object):
+    """
+    An alembic export queued by a publish plugin.
+    """
+
+    def __init__(self, exportFunction, roots, startFrame, endFrame, path, options):
+        self.exportFunction = exportFunction
+        self.roots          = list(roots)
+        self.startFrame     = startFrame
+        self.endFrame       = endFrame
+        self.path           = path
+        self.options        = options
+        # The fingerprint of the exported geometry, and the previous publish
+        # reused in place of the export when the geometry did not change.
+        self.fingerprint    = None
+        self.reusePath      = None
+        # The job argument of the framework export, read on first use.
+        self._jobArg        = None
+        self._jobArgRead    = False
+
+    @property
+    def mergeable(self):
+        """ bool: True if the job can be merged with other jobs. """
+        return self.frameworkJobArg() is not None
+
+    @property
+    def frameRange(self):
+        """ tuple(float, float): The frame range of the job. """
+        return (self.startFrame, self.endFrame)
+
+    def frameworkJobArg(self):
+        """ Read the job argument the framework exports the job with.
+
+        The framework export is run with the AbcExport command recorded
+        instead of run. Only an export issuing exactly one AbcExport command
+        with a single job argument, and no other flag, can be merged.
+
+        Returns:
+            str : The job argument, None if the export cannot be merged.
+        """
+        if(not self._jobArgRead):
+            self._jobArgRead = True
+            jobArgs = _recordAbcExports(
+                self.exportFunction, self.roots, self.startFrame, self.endFrame, self.path, **self.options
+            )
+            if(len(jobArgs) == 1):
+                self._jobArg = jobArgs[0]
+        return self._jobArg
+
+    def jobArg(self, withFile=True):
+        """ Build the AbcExport job argument.
+
+        Args:
+            withFile    (bool, optional)    : False to leave the output path out.
+
+        Returns:
+            str                             : The job argument.
+        """
+        jobArg = self.frameworkJobArg()
+        if(jobArg is None):
+            raise ValueError("The export of {} cannot be merged.".format(self.path))
+        if(not withFile):
+            jobArg = _FILE_FLAG_PATTERN.sub("", jobArg)
+        return jobArg
+
+    def exportArgs(self):
+        """ Get the arguments of the export changing the written data, without the output path.
+
+        Returns:
+            str : The arguments.
+        """
+        if(self.mergeable):
+            return self.jobArg(withFile=False)
+        return "{} {}".format(self.frameRange, sorted(self.options.items()))
+
+    def exportInProcess(self):
+        """ Export the job with the framework, in the current session. """
+        self.exportFunction(
+            self.roots,
+            self.startFrame,
+            self.endFrame,
+            self.path,
+            **self.options
+        )
+
+
+class AlembicExportScheduler(HookBaseClass):
+    """
+    Hook batching the alembic exports of a publish.
+    """
+
+    def reset(self):
+        """ Discard the jobs and registrations left by a previous publish. """
+        with _LOCK:
+            del _JOBS[:]
+            del _REGISTRATIONS[:]
+
+    @contextlib.contextmanager
+    def deferExports(self, publishTools):
+        """ Queue the alembic exports issued by the framework instead of running them.
+
+        Args:
+            publishTools    (:class:`PublishTools`) : The framework publish tools
+                                                    used by the plugin.
+        """
+        exportFunction = publishTools.exportAlembic
+
+        def queueExport(roots, startFrame, endFrame, path, **options):
+            with _LOCK:
+                _JOBS.append(
+                    AlembicExportJob(exportFunction, roots, startFrame, endFrame, path, options)
+                )
+
+        publishTools.exportAlembic = queueExport
+        try:
+            yield
+        finally:
+            # Restore the framework method.
+            publishTools.exportAlembic = exportFunction
+
+    def reuseUnchanged(self, item, template):
+        """ Reuse the previous publish of an item if the geometry of its pending export did not change.
+
+        The fingerprint of the geometry is stored beside the publish once written.
+
+        Args:
+            item        (:class:`PublishItem`)  : The item whose export is pending.
+            template    (:class:`TemplatePath`) : The publish template of the item.
+
+        Returns:
+            bool                                : True if the previous publish is reused.
+        """
+        path = _normpath(item.properties.get("path"))
+        with _LOCK:
+            jobs = [job for job in _JOBS if _normpath(job.path) == path]
+        if(len(jobs) != 1 or template is None):
+            return False
+        job = jobs[0]
+
+        lodFingerprint = self.parent.create_hook_instance("{config}/tk-multi-publish2/maya/lod_fingerprint.py")
+        job.fingerprint = lodFingerprint.compute(job.roots, job.startFrame, job.endFrame, job.exportArgs())
+        if(job.fingerprint is None):
+            return False
+
+        previousPath = lodFingerprint.previousPublish(job.path, template)
+        if(previousPath and lodFingerprint.read(previousPath) == job.fingerprint):
+            self.logger.info("The geometry of {} did not change, reusing {}.".format(item.name, previousPath))
+            job.reusePath = previousPath
+            return True
+        return False
+
+    def registerAfterExport(self, item, register):
+        """ Register the publish of an item once its alembic is written.
+
+        The registration waits for the pending export of the item path. When
+        no export matches it and the file is not written yet, it waits for
+        all the pending exports, the registration is done immediately if
+        there is none.
+
+        Args:
+            item        (:class:`PublishItem`)  : The item to register.
+            register    (callable)              : The function registering the publish.
+        """
+        path = item.properties.get("path")
+        written = bool(path) and os.path.exists(path)
+        with _LOCK:
+            matched = any(_normpath(job.path) == _normpath(path) for job in _JOBS)
+            deferred = matched or (bool(_JOBS) and not written)
+            if(deferred):
+                _REGISTRATIONS.append(register)
+
+        if(not matched):
+            log = self.logger.debug if written else self.logger.warning
+            log(
+                "No pending alembic export matches the path {} of {}, {}.".format(
+                    path, item.name, "registering it after the pending exports" if deferred else "registering it now"
+                )
+            )
+        if(not deferred):
+            register()
+            return
+
+        # Queue the registration before the batch registration commit.
+        registrationQueue = self._registrationQueue()
+        if(registrationQueue.enabled):
+            registrationQueue.beforeCommit("alembic_export_scheduler", self.flush)
+
+    def flush(self):
+        """ Export every queued alembic, then run the pending registrations. """
+        with _LOCK:
+            jobs            = list(_JOBS)
+            registrations   = list(_REGISTRATIONS)
+            del _JOBS[:]
+            del _REGISTRATIONS[:]
+
+        if(not jobs):
+            return
+
+        # Promote the previous publishes of the unchanged jobs.
+        filePromotion = self.parent.create_hook_instance("{config}/common/file_promotion.py")
+        for job in jobs:
+            if(job.reusePath):
+                filePromotion.promote(job.reusePath, job.path, allowHardlink=True)
+
+        # Group the jobs by frame range.
+        groups = {}
+        for job in jobs:
+            if(job.reusePath):
+                continue
+            if(not job.mergeable):
+                self.logger.debug("Exporting {} with the framework.".format(job.path))
+                job.exportInProcess()
+                continue
+            groups.setdefault(job.frameRange, []).append(job)
+
+        # The biggest group is exported in the current session, the other
+        # ones by background processes when possible.
+        orderedGroups   = sorted(groups.values(), key=len, reverse=True)
+        localGroups     = orderedGroups[:1]
+        remoteGroups    = orderedGroups[1:]
+
+        scenePath = cmds.file(query=True, sceneName=True)
+        mayapy    = _mayapy_path()
+        if(remoteGroups and (not scenePath or cmds.file(query=True, modified=True) or not mayapy)):
+            self.logger.debug(
+                "The scene has unsaved changes or mayapy was not found, "
+                "all the alembics are exported in the current session."
+            )
+            localGroups     = orderedGroups
+            remoteGroups    = []
+
+        pool    = None
+        results = []
+        if(remoteGroups):
+            pool    = ThreadPool(min(_MAX_WORKERS, len(remoteGroups)))
+            results = [
+                pool.apply_async(_export_in_worker, (mayapy, scenePath, group))
+                for group in remoteGroups
+            ]
+
+        try:
+            for group in localGroups:
+                self.logger.info(
+                    "Exporting {} alembic(s) for the frame range {}-{}.".format(
+                        len(group), group[0].startFrame, group[0].endFrame
+                    )
+                )
+                cmds.AbcExport(jobArg=[job.jobArg() for job in group])
+
+            # Wait for the background exports.
+            for result in results:
+                result.get()
+        finally:
+            if(pool):
+                pool.close()
+                pool.join()
+
+        # Check that the outputs landed.
+        missing = [job.path for job in jobs if not os.path.exists(job.path)]
+        if(missing):
+            errorMsg = "The following alembics have not been exported: {}".format(", ".join(missing))
+            self.logger.error(errorMsg)
+            raise Exception(errorMsg)
+
+        # Store the fingerprints beside the publishes, for the next publish.
+        lodFingerprint = self.parent.create_hook_instance("{config}/tk-multi-publish2/maya/lod_fingerprint.py")
+        for job in jobs:
+            if(job.fingerprint):
+                lodFingerprint.write(job.path, job.fingerprint)
+
+        # Register the publishes.
+        registrationQueue = self._registrationQueue()
+        for register in registrations:
+            if(not registrationQueue.enabled):
+                register()
+                continue
+            with registrationQueue.capture():
+                register()
+
+    def _registrationQueue(self):
+        """ Get the shared publish registration queue.
+
+        Returns:
+            :class:`PublishRegistrationQueue`   : The registration queue.
+        """
+        return self.parent.create_hook_instance("{config}/tk-multi-publish2/publish_registration_queue.py")
+
+
+def _normpath(path):
+    """
+    Return a path normalized to compare it with the paths of the jobs, None for no path.
+    """
+    if(not path):
+        return None
+    return os.path.normcase(os.path.normpath(path))
+
+
+def _recordAbcExports(function, *args, **kwargs):
+    """
+    Run a function with the AbcExport command recorded instead of run, through
+    Python or MEL. Return the job argument of each recorded command, None for
+    a command giving other flags or several jobs. Nothing is returned if the
+    function fails.
+    """
+    jobArgs = []
+
+    def recordCommand(*commandArgs, **commandKwargs):
+        jobArg = commandKwargs.pop("jobArg", commandKwargs.pop("j", None))
+        if(isinstance(jobArg, (list, tuple))):
+            jobArg = jobArg[0] if len(jobArg) == 1 else None
+        jobArgs.append(None if commandArgs or commandKwargs else jobArg)
+
+    def recordMel(command, *melArgs, **melKwargs):
+        if(not command.lstrip().startswith("AbcExport")):
+            return melEval(command, *melArgs, **melKwargs)
+        tokens = shlex.split(command.strip().rstrip(";"))
+        jobArgs.append(tokens[2] if len(tokens) == 3 and tokens[1] in _MEL_JOB_FLAGS else None)
+
+    # The command must exist before it is replaced.
+    cmds.loadPlugin("AbcExport", quiet=True)
+    abcExport   = cmds.AbcExport
+    melEval     = mel.eval
+    cmds.AbcExport  = recordCommand
+    mel.eval        = recordMel
+    try:
+        function(*args, **kwargs)
+    except Exception:
+        return []
+    finally:
+        cmds.AbcExport  = abcExport
+        mel.eval        = melEval
+    return jobArgs
+
+
+def _quote(value):
+    """
+    Return a value quoted for an AbcExport job argument.
+    """
+    return '"{}"'.format(value.replace('"', '\\"'))
+
+
+def _mayapy_path():
+    """
+    Return the path to the mayapy executable of the running Maya, None if not found.
+    """
+    executable = "mayapy.exe" if sys.platform == "win32" else "mayapy"
+    path = os.path.join(os.path.dirname(sys.executable), executable)
+    if(not os.path.isfile(path)):
+        return None
+    return path
+
+
+def _export_in_worker(mayapy, scenePath, jobs):
+    """
+    Export the jobs in a background mayapy process opening the saved scene.
+    """
+    command = [mayapy, "-c", _WORKER_SCRIPT, scenePath]
+    command.extend(job.jobArg() for job in jobs)
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    output, _ = process.communicate()
+    if(process.returncode != 0):
+        raise Exception(
+            "The alembic export worker failed:\n{}".format(output.decode("utf-8", "replace"))
+        )
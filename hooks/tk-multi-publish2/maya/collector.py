@@ -10,7 +10,6 @@
 
 import  glob
 import  os
-import  re
 from    maya                import  cmds, utils
 import  maya.mel            as      mel
 import  sgtk
@@ -19,8 +18,149 @@ from    sgtk.platform.qt    import  QtCore, QtGui
 
 HookBaseClass = sgtk.get_hook_baseclass()
 
-# Import the maya module of the P3D framework.
-P3Dfw = sgtk.platform.current_engine().frameworks["tk-framework-P3D"].import_module("maya")
+# The maya module of the P3D framework, imported on first use.
+P3D = sgtk.platform.current_engine().create_hook_instance("{config}/common/p3d_framework.py")
+P3Dfw = P3D.module("maya")
+
+# The number of items of a group above which they are collapsed in the tree.
+LAZY_GROUP_SIZE = 50
+
+# The icons of the items by path, loaded once for the session and shared by the items.
+_ICONS = {}
+
+
+class MayaSceneSnapshot(object):
+    """
+    In-memory index of the Maya scene graph.
+
+    The snapshot is built once per collection with a handful of bulk queries
+    (shapes, geometries and references). The collect methods read
+    from it instead of issuing new cmds calls for every item.
+    """
+
+    def __init__(self):
+
+        # Scene and workspace.
+        self.sceneName      = cmds.file(query=True, sceneName=True) or ""
+        self.sceneShortName = cmds.file(query=True, sceneName=True, shortName=True) or ""
+        self.projectRoot    = cmds.workspace(query=True, rootDirectory=True)
+
+        # Selection, both in long and short names as the collect methods
+        # use both representations.
+        self.selection      = cmds.ls(selection=True, long=True) or []
+        self.selectedTransforms      = cmds.ls(selection=True, long=True, type="transform") or []
+        self.selectedTransformsShort = cmds.ls(selection=True, type="transform") or []
+
+        # Shapes indexed by type.
+        self.shapesByType   = {}
+        shapes = cmds.ls(long=True, shapes=True, noIntermediate=True, showType=True) or []
+        for shape, shapeType in zip(shapes[0::2], shapes[1::2]):
+            self.shapesByType.setdefault(shapeType, []).append(shape)
+
+        # Geometries, as defined by Maya.
+        self.geometries     = cmds.ls(geometry=True, noIntermediate=True, long=True) or []
+
+        # Render layers.
+        self.renderLayers   = cmds.ls(type="renderLayer") or []
+
+        # References indexed by namespace.
+        self.referencesByNamespace = {}
+        for referenceNode in cmds.ls(type="reference") or []:
+            # Skip the maya internal reference nodes.
+            if(referenceNode == "sharedReferenceNode" or referenceNode.startswith("_UNKNOWN_REF_NODE_")):
+                continue
+            try:
+                namespace   = cmds.referenceQuery(referenceNode, namespace=True)
+                filePath    = cmds.referenceQuery(referenceNode, filename=True, withoutCopyNumber=True)
+            except RuntimeError:
+                # The reference node is not linked to a file.
+                continue
+            self.referencesByNamespace[namespace.lstrip(":")] = filePath
+
+        # The long names of the selected transforms by short name.
+        self._longNames = dict(zip(self.selectedTransformsShort, self.selectedTransforms))
+
+        # Framework objects, created on demand and shared between the items.
+        self._mayaAssets        = {}
+        self._mayaEnvironments  = {}
+
+    def longName(self, node):
+        """ Get the long name of a node.
+
+        Args:
+            node    (str)   : The short or long name of the node.
+
+        Returns:
+            str             : The long name, the given name if the node does not exist.
+        """
+        if(node.startswith("|")):
+            return node
+        if(node not in self._longNames):
+            longNames = cmds.ls(node, long=True) or [node]
+            self._longNames[node] = longNames[0]
+        return self._longNames[node]
+
+    def descendants(self, root, shapeType):
+        """ Get the shapes of a given type under a root transform.
+
+        Args:
+            root        (str)   : The long name of the root transform.
+            shapeType   (str)   : The node type of the shapes.
+
+        Returns:
+            list(str)           : The long names of the shapes.
+        """
+        prefix = "{}|".format(root)
+        return [shape for shape in self.shapesByType.get(shapeType, []) if shape.startswith(prefix)]
+
+    def referencePath(self, node):
+        """ Get the path of the reference containing the node.
+
+        Args:
+            node    (str)   : The name of the node.
+
+        Returns:
+            str             : The reference path or None if the node is not referenced.
+        """
+        namespace = node.split("|")[-1].rpartition(":")[0]
+        return self.referencesByNamespace.get(namespace)
+
+    def mayaAsset(self, assetRoot):
+        """ Get the P3D maya asset for a root.
+
+        The asset is built on first use, by the collector or by a plugin.
+        Its full name is read without building it.
+
+        Args:
+            assetRoot   (str)           : The asset root name.
+
+        Returns:
+            :class:`LazySceneObject`    : The proxy of the framework asset object.
+        """
+        if(assetRoot not in self._mayaAssets):
+            self._mayaAssets[assetRoot] = P3D.sceneObject(
+                "maya", "MayaAsset", self.longName(assetRoot), assetRoot=assetRoot
+            )
+        return self._mayaAssets[assetRoot]
+
+    def mayaEnvironment(self, environmentRoot):
+        """ Get the P3D maya environment for a root.
+
+        The environment is built on first use, by the collector or by a plugin.
+        Its full name is read without building it.
+
+        Args:
+            environmentRoot (str)       : The environment root name.
+
+        Returns:
+            :class:`LazySceneObject`    : The proxy of the framework environment object.
+        """
+        if(environmentRoot not in self._mayaEnvironments):
+            self._mayaEnvironments[environmentRoot] = P3D.sceneObject(
+                "maya", "MayaEnvironment", self.longName(environmentRoot), root=environmentRoot
+            )
+        return self._mayaEnvironments[environmentRoot]
+
 
 class MayaSessionCollector(HookBaseClass):
     """
@@ -67,6 +207,33 @@ class MayaSessionCollector(HookBaseClass):
         :param dict settings: Configured settings for this collector
         :param parent_item: Root item instance
 
+        """
+        # The collection of a refresh reached while a collection runs would replace its data.
+        if(self.collectionProgress.running):
+            self.logger.warning("A collection is already running.")
+            return
+
+        # Take a snapshot of the scene graph used by all the collect methods.
+        self._sceneSnapshot = MayaSceneSnapshot()
+        # Check the files on disk again for the new publish session.
+        self.filesystemProbe.reset()
+
+        # Collect the items, yielding to the Maya UI between the collect steps.
+        self.collectionProgress.run(
+            "the Maya session", parent_item, self.collect_current_session, settings, parent_item
+        )
+
+        self.logger.debug(
+            "File checks: {hits} cached, {misses} on disk.".format(**self.filesystemProbe.counters)
+        )
+
+    def collect_current_session(self, settings, parent_item):
+        """
+        Parents the items of the current session under the parent_item,
+        depending on the context.
+
+        :param dict settings: Configured settings for this collector
+        :param parent_item: Root item instance
         """
         # Get the current engine.
         currentEngine = sgtk.platform.current_engine()
@@ -167,9 +334,71 @@ class MayaSessionCollector(HookBaseClass):
                     },
                 )
 
-            if cmds.ls(geometry=True, noIntermediate=True):
+            if self.sceneSnapshot.geometries:
                 self._collect_session_geometry(item)
 
+    @property
+    def sceneSnapshot(self):
+        """ The snapshot of the scene graph for the current collection.
+
+        Returns:
+            :class:`MayaSceneSnapshot`  : The scene snapshot.
+        """
+        snapshot = getattr(self, "_sceneSnapshot", None)
+        if(snapshot is None):
+            snapshot = self._sceneSnapshot = MayaSceneSnapshot()
+        return snapshot
+
+    @property
+    def templateIndex(self):
+        """ The index matching the paths against the templates.
+
+        Returns:
+            :class:`TemplateIndex`      : The template index hook.
+        """
+        templateIndex = getattr(self, "_templateIndex", None)
+        if(templateIndex is None):
+            templateIndex = self._templateIndex = self.parent.create_hook_instance("{config}/common/template_index.py")
+        return templateIndex
+
+    @property
+    def filesystemProbe(self):
+        """ The cache of the file checks of the publish session.
+
+        Returns:
+            :class:`FilesystemProbe`    : The filesystem probe hook.
+        """
+        filesystemProbe = getattr(self, "_filesystemProbe", None)
+        if(filesystemProbe is None):
+            filesystemProbe = self._filesystemProbe = self.parent.create_hook_instance("{config}/common/filesystem_probe.py")
+        return filesystemProbe
+
+    @property
+    def collectionProgress(self):
+        """ :class:`CollectionProgress`: The shared progress of the collection.
+
+        Loaded on first use, the collect methods go through its checkpoints.
+        """
+        collectionProgress = getattr(self, "_collectionProgress", None)
+        if(collectionProgress is None):
+            collectionProgress = self._collectionProgress = self.parent.create_hook_instance(
+                "{config}/common/collection_progress.py"
+            )
+        return collectionProgress
+
+    @property
+    def deformationDetector(self):
+        """ :class:`DeformationDetector`: The detector of the deformed assets of the environments.
+
+        Loaded on first use, it splits the assets on their sampled points.
+        """
+        deformationDetector = getattr(self, "_deformationDetector", None)
+        if(deformationDetector is None):
+            deformationDetector = self._deformationDetector = self.parent.create_hook_instance(
+                "{config}/tk-multi-publish2/maya/deformation_detector.py"
+            )
+        return deformationDetector
+
 # COLLECT BY STEP FUNCTIONS.
 
     def collect_for_model_publish(self, settings, parent_item):
@@ -180,10 +409,10 @@ class MayaSessionCollector(HookBaseClass):
             parent_item     (sgItemUI)  : Root item instance
         '''
         # Get the selection.
-        mSelection = cmds.ls(sl=True, long=True, type="transform")
+        mSelection = self.sceneSnapshot.selectedTransforms
 
         # Loop over the selection and check the end tag.
-        for transform in mSelection:
+        for transform in self.collectionProgress.iterate(mSelection, "selected nodes"):
 
             # Check the end tag and create the corresponding item.
             if(self.check_end_tag(transform, 'RIG')):
@@ -206,14 +435,16 @@ class MayaSessionCollector(HookBaseClass):
             parent_item     (sgItemUI)  : Root item instance
         '''
         # Get the selection.
-        mSelection = cmds.ls(sl=True, long=True, type="transform")
+        mSelection = self.sceneSnapshot.selectedTransforms
 
         # Loop over the selection and check the end tag.
-        for transform in mSelection:
+        for transform in self.collectionProgress.iterate(mSelection, "selected nodes"):
             # Check the end tag and create the corresponding item.
             if(self.check_end_tag(transform, 'RIG')):
                 # Create the asset publish item.
-                self.collect_asset_rig(settings, parent_item, transform)
+                rigItem = self.collect_asset_rig(settings, parent_item, transform)
+                # Only show the asset rows of a large selection.
+                self.collapse_large_group(rigItem, len(mSelection))
 
     def collect_for_shd_publish(self, settings, parent_item):
         ''' Create an item represents the current selected asset shd.
@@ -223,13 +454,13 @@ class MayaSessionCollector(HookBaseClass):
             parent_item     (sgItemUI)  : Root item instance
         '''
         # Get the current maya selection.
-        mSelection = cmds.ls(sl=True, type="transform")
+        mSelection = self.sceneSnapshot.selectedTransformsShort
 
         # Check if the current selection is not empty.
         if(len(mSelection) > 0):
 
             # Create an item for each selected asset.
-            for asset in mSelection:
+            for asset in self.collectionProgress.iterate(mSelection, "selected assets"):
                 
                 # Create the main rig item.
                 mainItem = self.collect_mayaAsset(
@@ -240,14 +471,12 @@ class MayaSessionCollector(HookBaseClass):
                     "maya.asset"
                 )
                 # Create the child rig item.
-                mtlxIcon = os.path.join(self.disk_location, os.pardir, "icons", "materialX.png")
+                self.create_item(mainItem, "maya.asset.materialXLO", "Asset MaterialX LO", asset, "materialX.png")
+                self.create_item(mainItem, "maya.asset.materialXMI", "Asset MaterialX MI", asset, "materialX.png")
+                self.create_item(mainItem, "maya.asset.materialXHI", "Asset MaterialX HI", asset, "materialX.png")
 
-                shdLoItem = mainItem.create_item("maya.asset.materialXLO", "Asset MaterialX LO", asset)
-                shdLoItem.set_icon_from_path(mtlxIcon)
-                shdMiItem = mainItem.create_item("maya.asset.materialXMI", "Asset MaterialX MI", asset)
-                shdMiItem.set_icon_from_path(mtlxIcon)
-                shdHiItem = mainItem.create_item("maya.asset.materialXHI", "Asset MaterialX HI", asset)
-                shdHiItem.set_icon_from_path(mtlxIcon) 
+                # Only show the asset rows of a large selection.
+                self.collapse_large_group(mainItem, len(mSelection))
 
     def collect_for_env_publish(self, settings, parent_item):
         ''' Create an item represents the environments.
@@ -257,10 +486,10 @@ class MayaSessionCollector(HookBaseClass):
             parent_item     (sgItemUI)  : Root item instance
         '''
         # Get the selection.
-        mSelection = cmds.ls(sl=True, long=True, type="transform")
+        mSelection = self.sceneSnapshot.selectedTransforms
 
         # Loop over the selection and check the end tag.
-        for transform in mSelection:
+        for transform in self.collectionProgress.iterate(mSelection, "selected nodes"):
             # Check the end tag and create the corresponding item.
             if(self.check_end_tag(transform, 'ENV')):
                 # Create the asset publish item.
@@ -276,17 +505,19 @@ class MayaSessionCollector(HookBaseClass):
         publisher = self.parent
 
         # Get the current maya selection.
-        mSelection = cmds.ls(sl=True, type="transform")
+        mSelection = self.sceneSnapshot.selectedTransformsShort
 
         # Loop over the selection and check the end tag.
-        for transform in mSelection:
+        for transform in self.collectionProgress.iterate(mSelection, "selected nodes"):
             # Check the end tag and create the corresponding item.
             if(self.check_end_tag(transform, 'ENV')):
                 self.collect_animation_environment(settings, parent_item, transform)
             
             # Check the end tag and create the corresponding item.
             if(self.check_end_tag(transform, 'RIG')):
-                self.collect_animation_asset(settings, parent_item, transform)
+                assetItem = self.collect_animation_asset(settings, parent_item, transform)
+                # Only show the asset rows of a large selection.
+                self.collapse_large_group(assetItem, len(mSelection))
 
             # Check the end tag and create the corresponding item.
             if(self.check_end_tag(transform, 'CAMBUF')):
@@ -302,10 +533,10 @@ class MayaSessionCollector(HookBaseClass):
         publisher = self.parent
 
         # Get the selection.
-        mSelection = cmds.ls(sl=True, long=True, type="transform")
+        mSelection = self.sceneSnapshot.selectedTransforms
 
         # Loop over the selection and check the end tag.
-        for transform in mSelection:
+        for transform in self.collectionProgress.iterate(mSelection, "selected nodes"):
             # Check the end tag and create the corresponding item.
             if(self.check_end_tag(transform, 'CAMBUF')):
                 # Create the publish item.
@@ -326,7 +557,7 @@ class MayaSessionCollector(HookBaseClass):
         publisher = self.parent
 
         # Get the file name.
-        fileName = cmds.file(q=True, sn=True)
+        fileName = self.sceneSnapshot.sceneName
 
         # Create the item.
         item = parent_item.create_item("maya.workscene", "Maya Scene", os.path.split(fileName)[-1])
@@ -336,7 +567,7 @@ class MayaSessionCollector(HookBaseClass):
         item.set_icon_from_path(icon_path)
 
         # Add the project root to the item properties.
-        project_root = cmds.workspace(q=True, rootDirectory=True)
+        project_root = self.sceneSnapshot.projectRoot
         item.properties["project_root"] = project_root
 
         # If a work template is defined, add it to the item properties so
@@ -371,17 +602,16 @@ class MayaSessionCollector(HookBaseClass):
         # Create the ui item for the asset.
         assetItem = parent_item.create_item(itemType, itemName, assetRoot)
 
-        # Get the icon path to display for this item
-        icon_path = os.path.join(self.disk_location, os.pardir, "icons", "maya.png")
-        assetItem.set_icon_from_path(icon_path)
+        # Set the icon to display for this item
+        self.set_item_icon(assetItem, "maya.png")
 
         # Add the asset project root to the item properties.
-        project_root = cmds.workspace(q=True, rootDirectory=True)
+        project_root = self.sceneSnapshot.projectRoot
         assetItem.properties["project_root"] = project_root
 
         # Create the asset object an add it to the item properties.
         # That allow to share the MayaAsset Class with the publish plugin.
-        mayaAsset = P3Dfw.MayaAsset(assetRoot=assetRoot)
+        mayaAsset = self.sceneSnapshot.mayaAsset(assetRoot)
         assetItem.properties["assetObject"] = mayaAsset
 
         # if a work template is defined, add it to the item properties so
@@ -420,16 +650,15 @@ class MayaSessionCollector(HookBaseClass):
         # Create the ui item for the environment.
         environmentItem = parent_item.create_item(itemType, itemName, environmentRoot)
 
-        # Get the icon path to display for this item
-        icon_path = os.path.join(self.disk_location, os.pardir, "icons", "maya.png")
-        environmentItem.set_icon_from_path(icon_path)
+        # Set the icon to display for this item
+        self.set_item_icon(environmentItem, "maya.png")
 
         # Add the asset project root to the item properties.
-        project_root = cmds.workspace(q=True, rootDirectory=True)
+        project_root = self.sceneSnapshot.projectRoot
         environmentItem.properties["project_root"] = project_root
 
         # Create the environment object an add it to the item properties.
-        mayaObject = P3Dfw.MayaEnvironment(root=environmentRoot)
+        mayaObject = self.sceneSnapshot.mayaEnvironment(environmentRoot)
         environmentItem.properties["mayaObject"] = mayaObject
 
         # if a work template is defined, add it to the item properties so
@@ -468,9 +697,8 @@ class MayaSessionCollector(HookBaseClass):
         # Create the ui item for the object.
         objectItem = parent_item.create_item(itemType, itemName, mayaObject.fullname)
 
-        # Get the icon path to display for this item
-        icon_path = os.path.join(self.disk_location, os.pardir, "icons", "geometry.png")
-        objectItem.set_icon_from_path(icon_path)
+        # Set the icon to display for this item
+        self.set_item_icon(objectItem, "geometry.png")
 
         # Add the maya object to the item properties.
         objectItem.properties["mayaObject"] = mayaObject
@@ -489,7 +717,7 @@ class MayaSessionCollector(HookBaseClass):
             item                            : The new ui item.
         """
         # Create the Maya object for the asset.
-        mayaObject = P3Dfw.MayaAsset(assetRoot=assetRoot)
+        mayaObject = self.sceneSnapshot.mayaAsset(assetRoot)
 
         # Create the main item.
         mainItem = self.collect_mayaObject(
@@ -531,7 +759,7 @@ class MayaSessionCollector(HookBaseClass):
         abcAssetItem.set_icon_from_path(abcIconPath)
 
         # Add the asset project root to the item properties.
-        project_root = cmds.workspace(q=True, rootDirectory=True)
+        project_root = self.sceneSnapshot.projectRoot
         abcAssetItem.properties["project_root"] = project_root
 
         # Store the sculpt root in the item properties.
@@ -575,7 +803,7 @@ class MayaSessionCollector(HookBaseClass):
             item                            : The new ui item.
         """
         # Create the Maya object for the asset.
-        mayaObject = P3Dfw.MayaAsset(assetRoot=assetRoot)
+        mayaObject = self.sceneSnapshot.mayaAsset(assetRoot)
 
         # Create the main rig item.
         mainItem = self.collect_mayaObject(
@@ -621,6 +849,9 @@ class MayaSessionCollector(HookBaseClass):
                 'Alembic {}'.format(resolution.capitalize())
             )
 
+        # Return the main rig item.
+        return mainItem
+
     def collect_environment(self, settings, parent_item, environmentRoot):
         """ Collect an environment.
 
@@ -634,7 +865,7 @@ class MayaSessionCollector(HookBaseClass):
         """
 
         # Create the Maya object for the environment.
-        mayaObject = P3Dfw.MayaEnvironment(root=environmentRoot)
+        mayaObject = self.sceneSnapshot.mayaEnvironment(environmentRoot)
 
         # Create the main item.
         mainItem = self.collect_mayaObject(
@@ -653,12 +884,13 @@ class MayaSessionCollector(HookBaseClass):
             'Maya Ascii'
         )
 
-        # Get the animation.
-        animatedAssets, deformedAssets = mayaObject.getAnimation()
         # Get the assets.
         assets = mayaObject.getAssets()
-        # Gte the assets list without the deformedAssets.
-        notDeformedAssets = [asset for asset in assets if asset not in deformedAssets]
+        # Get the animation, split on the sampled points of the assets.
+        animatedAssets, deformedAssets = self.deformationDetector.split(assets, *mayaObject.getAnimation())
+        # Get the assets list without the deformedAssets.
+        deformedNames = set(asset.fullname for asset in deformedAssets)
+        notDeformedAssets = [asset for asset in assets if asset.fullname not in deformedNames]
 
         # Create the item for the not deformed assets.
         alembicEnvironment = self.create_item_alembic(
@@ -682,10 +914,14 @@ class MayaSessionCollector(HookBaseClass):
         deformedAssetsItem.properties["environmentObject"] = mayaObject
 
         # Loop over the deformed assets.
-        for deformedAsset in deformedAssets:
+        for deformedAsset in self.collectionProgress.iterate(deformedAssets, "deformed assets"):
             # Create the item for the deformed asset.
             self.collect_deformedAsset(settings, deformedAssetsItem, deformedAsset)
 
+        # Only show the group row of a large environment.
+        self.collapse_large_group(deformedAssetsItem, len(deformedAssets))
+        self.logger.info("{} deformed assets in {}.".format(len(deformedAssets), environmentRoot))
+
         # Return the environment item.
         return mainItem
 
@@ -717,8 +953,6 @@ class MayaSessionCollector(HookBaseClass):
         # Add the deformed asset to the item properties.
         item.properties["mayaObject"] = deformedAsset
 
-        self.logger.info("Deformed asset: {}".format(deformedAsset.fullname))
-
         return item
 
     def collect_camera(self, settings, parent_item, cameraRoot):
@@ -737,15 +971,14 @@ class MayaSessionCollector(HookBaseClass):
         # Create an item for the camera.
         cameraItem = parent_item.create_item('maya.camera', 'Camera', cameraRoot)
 
-        # Get the icon path to display for this item.
-        iconPath = os.path.join(self.disk_location, os.pardir, "icons", "camera.png")
-        cameraItem.set_icon_from_path(iconPath)
+        # Set the icon to display for this item.
+        self.set_item_icon(cameraItem, "camera.png")
 
         # Add the camera root to the item properties.
         cameraItem.properties["cameraRoot"] = cameraRoot
 
         # Add the project root to the item properties.
-        project_root = cmds.workspace(q=True, rootDirectory=True)
+        project_root = self.sceneSnapshot.projectRoot
         cameraItem.properties["project_root"] = project_root
 
         # If a work template is defined, add it to the item properties so
@@ -763,7 +996,7 @@ class MayaSessionCollector(HookBaseClass):
 
 
         # Get the camera shapes in the depedencies.
-        cameraShapes = cmds.listRelatives(cameraRoot, allDescendents=True, type="camera", fullPath=True)
+        cameraShapes = self.sceneSnapshot.descendants(cameraRoot, "camera")
         self.logger.debug(cameraShapes)
         if(cameraShapes):
             camera = cameraShapes[0]
@@ -838,7 +1071,7 @@ class MayaSessionCollector(HookBaseClass):
         """
         publisher = self.parent
 
-        selection = cmds.ls(selection=True, long=True)
+        selection = self.sceneSnapshot.selection
         if(not selection):
             return None
 
@@ -849,9 +1082,8 @@ class MayaSessionCollector(HookBaseClass):
             selection[0]
         )
 
-        # Get the icon path to display for this item.
-        iconPath = os.path.join(self.disk_location, os.pardir, "icons", "geometry.png")
-        item.set_icon_from_path(iconPath)
+        # Set the icon to display for this item.
+        self.set_item_icon(item, "geometry.png")
 
         # Create the item for the maya ascii export.
         self.create_item_maya(
@@ -886,7 +1118,7 @@ class MayaSessionCollector(HookBaseClass):
             item                        : The new ui item.
         """
         # Create the Maya object for the environment.
-        mayaObject = P3Dfw.MayaEnvironment(root=environmentRoot)
+        mayaObject = self.sceneSnapshot.mayaEnvironment(environmentRoot)
 
         # Create the main item.
         mainItem = self.collect_mayaObject(
@@ -897,8 +1129,11 @@ class MayaSessionCollector(HookBaseClass):
             "maya.shot.environment"
         )
 
-        # Get the animation.
-        animatedAssets, deformedAssets = mayaObject.getAnimation()
+        # Get the animation, split on the sampled points of the assets.
+        animatedAssets, deformedAssets = self.deformationDetector.split(
+            mayaObject.getAssets(),
+            *mayaObject.getAnimation()
+        )
 
         # Create the item for the animated assets.
         self.collect_animation_animatedAssets(settings, mainItem, animatedAssets)
@@ -915,9 +1150,14 @@ class MayaSessionCollector(HookBaseClass):
         deformedAssetsItem.properties["environmentObject"] = mayaObject
 
         # Loop over the deformed assets.
-        for deformedAsset in deformedAssets:
+        for deformedAsset in self.collectionProgress.iterate(deformedAssets, "deformed assets"):
             # Create the item for the deformed asset.
-            self.collect_animation_deformedAsset(settings, deformedAssetsItem, deformedAsset)
+            deformedItem = self.collect_animation_deformedAsset(settings, deformedAssetsItem, deformedAsset)
+            # Only show the asset rows of a large environment.
+            self.collapse_large_group(deformedItem, len(deformedAssets))
+
+        # Only show the group row of a large environment.
+        self.collapse_large_group(deformedAssetsItem, len(deformedAssets))
 
         # Return the environment item.
         return mainItem
@@ -999,7 +1239,7 @@ class MayaSessionCollector(HookBaseClass):
             item                        : The new ui item.
         """
         # Create the Maya object for the asset.
-        mayaObject = P3Dfw.MayaAsset(assetRoot=assetRoot)
+        mayaObject = self.sceneSnapshot.mayaAsset(assetRoot)
 
         # Create the main item.
         mainItem = self.collect_mayaObject(
@@ -1019,13 +1259,12 @@ class MayaSessionCollector(HookBaseClass):
         )
 
         # Check if the asset is referenced and extract the path.
-        refPath = mayaObject.referencePath
+        refPath = self.sceneSnapshot.referencePath(assetRoot)
         if(refPath):
-            # Get the asset rig publish template.
-            template = self.parent.engine.get_template_by_name('maya_asset_rig_publish')
-            # Check if the path matches the template.
-            fields = template.validate_and_get_fields(refPath)
-            if(fields):
+            # Check if the path matches the asset rig publish template.
+            matches = self.templateIndex.matches(refPath, ['maya_asset_rig_publish'])
+            if(matches):
+                fields = matches[0][1]
                 # Get the asset field.
                 assetField = fields.get('Asset')
                 # Create special publish for Yuri.
@@ -1066,15 +1305,14 @@ class MayaSessionCollector(HookBaseClass):
         # Create an item for the camera.
         cameraItem = parent_item.create_item('maya.shot.camera', 'Camera', cameraRoot)
 
-        # Get the icon path to display for this item.
-        iconPath = os.path.join(self.disk_location, os.pardir, "icons", "camera.png")
-        cameraItem.set_icon_from_path(iconPath)
+        # Set the icon to display for this item.
+        self.set_item_icon(cameraItem, "camera.png")
 
         # Add the camera root to the item properties.
         cameraItem.properties["cameraRoot"] = cameraRoot
 
         # Add the project root to the item properties.
-        project_root = cmds.workspace(q=True, rootDirectory=True)
+        project_root = self.sceneSnapshot.projectRoot
         cameraItem.properties["project_root"] = project_root
 
         # If a work template is defined, add it to the item properties so
@@ -1224,12 +1462,12 @@ class MayaSessionCollector(HookBaseClass):
         # Get the path to the review folder.
         reviewFolder = os.path.join(entityRoot, 'review')
         # Check if the folder exists.
-        if(not os.path.exists(reviewFolder)):
+        if(not self.filesystemProbe.exists(reviewFolder)):
             self.logger.debug("No review folder found.")
             return
 
         # Get the current scene name.
-        sceneName       = os.path.splitext(cmds.file(query=True, sceneName=True, shortName=True))[0]
+        sceneName       = os.path.splitext(self.sceneSnapshot.sceneShortName)[0]
         # Split the scene name and the version number.
         sceneNameSplit  = sceneName.split('.v')
 
@@ -1241,43 +1479,39 @@ class MayaSessionCollector(HookBaseClass):
         sceneName       = sceneNameSplit[0]
         sceneversion    = sceneNameSplit[1]
 
-        # Use regex to find the correct file.
-        reExpr = "^({})(|[_].*)([.]v{})$".format(sceneName, sceneversion)
+        # Get the files of this scene version from the review folder index.
+        reviewIndex = self.parent.create_hook_instance("{config}/tk-multi-publish2/review_folder_index.py")
+        reviewFiles = reviewIndex.find(reviewFolder, sceneName, sceneversion)
 
-        # Loop over all the files in the review folder.
-        for file in os.listdir(reviewFolder):
+        # Loop over the review files of the scene.
+        for file in reviewFiles:
             # Get the info of the item.
             itemInfo = self._get_item_info(file)
             # Skip if it is neither a video nor an image.
             if(itemInfo["item_type"] not in ["file.image", "file.video"]):
                 continue
 
-            # Get the file name without extension.
-            fileName        = os.path.splitext(file)[0]
-
-            # Check if the file name matches the regex.
-            if(re.search(reExpr, fileName)):
-                # create the review item for the publish hierarchy
-                review_item = parent_item.create_item(
-                    "maya.playblast.review", "Review", file
-                )
+            # create the review item for the publish hierarchy
+            review_item = parent_item.create_item(
+                "maya.playblast.review", "Review", file
+            )
 
-                # Get the icon path to display for this item.
-                icon_path = os.path.join(self.disk_location, os.pardir, "icons", "review.png")
-                #review_item.set_icon_from_path(icon_path)
-                review_item.set_icon_from_path(itemInfo["icon_path"])
+            # Get the icon path to display for this item.
+            icon_path = os.path.join(self.disk_location, os.pardir, "icons", "review.png")
+            #review_item.set_icon_from_path(icon_path)
+            review_item.set_icon_from_path(itemInfo["icon_path"])
 
-                # Get the path to the file.
-                filePath = os.path.join(reviewFolder, file)
+            # Get the path to the file.
+            filePath = os.path.join(reviewFolder, file)
 
-                # Add the path to the item properties
-                review_item.properties["path"] = filePath
+            # Add the path to the item properties
+            review_item.properties["path"] = filePath
 
-                # if the supplied path is an image, use the path as the thumbnail.
-                if(itemInfo["item_type"].startswith("file.image")):
-                    review_item.set_thumbnail_from_path(filePath)
-                    # disable thumbnail creation since we get it for free
-                    review_item.thumbnail_enabled = False
+            # if the supplied path is an image, use the path as the thumbnail.
+            if(itemInfo["item_type"].startswith("file.image")):
+                review_item.set_thumbnail_from_path(filePath)
+                # disable thumbnail creation since we get it for free
+                review_item.thumbnail_enabled = False
 
 # DEFAULT ITEMS FUNCTIONS.
 
@@ -1296,11 +1530,45 @@ class MayaSessionCollector(HookBaseClass):
             item                    : The new ui item.
         """
         item    = parent_item.create_item(itemType, itemTypeName, itemName)
-        icon    = os.path.join(self.disk_location, os.pardir, "icons", iconName)
-        item.set_icon_from_path(icon)
+        self.set_item_icon(item, iconName)
 
         return item
 
+    def set_item_icon(self, item, iconName):
+        """ Set the icon of an item from the icons folder, sharing the icon loaded once between the items.
+
+        The item keeps the path of its icon, so a saved tree keeps it. publish2
+        loads the pixmap of each item from the path when the item is drawn,
+        the items are given the same pixmap instead.
+
+        Args:
+            item        ()      : The item.
+            iconName    (str)   : The name of the icon in the icons folder.
+        """
+        iconPath = os.path.join(self.disk_location, os.pardir, "icons", iconName)
+        item.set_icon_from_path(iconPath)
+
+        # Only the publish2 items holding their pixmap can share it.
+        if(not hasattr(item, "_icon_pixmap")):
+            return
+        pixmap = _ICONS.get(iconPath)
+        if(pixmap is None):
+            pixmap = _ICONS[iconPath] = QtGui.QPixmap(iconPath)
+        item._icon_pixmap = pixmap
+
+    def collapse_large_group(self, item, count):
+        """ Collapse an item in the tree when it is part of a large group.
+
+        The tree only draws the row of a collapsed item, its children are
+        drawn once the user expands it.
+
+        Args:
+            item    ()      : The item.
+            count   (int)   : The number of items in the group.
+        """
+        if(count > LAZY_GROUP_SIZE):
+            item.expanded = False
+
     def create_item_maya(self, parent_item, itemType, itemTypeName, itemName):
         """
         Create an item to publish the transform as maya ascii.
@@ -1348,7 +1616,7 @@ class MayaSessionCollector(HookBaseClass):
         publisher = self.parent
 
         # get the path to the current file
-        path = cmds.file(query=True, sn=True)
+        path = self.sceneSnapshot.sceneName
 
         # determine the display name for the item
         if path:
@@ -1368,7 +1636,7 @@ class MayaSessionCollector(HookBaseClass):
 
         # discover the project root which helps in discovery of other
         # publishable items
-        project_root = cmds.workspace(q=True, rootDirectory=True)
+        project_root = self.sceneSnapshot.projectRoot
         session_item.properties["project_root"] = project_root
 
         # if a work template is defined, add it to the item properties so
@@ -1408,7 +1676,7 @@ class MayaSessionCollector(HookBaseClass):
 
         # ensure the alembic cache dir exists
         cache_dir = os.path.join(project_root, "cache", "alembic")
-        if not os.path.exists(cache_dir):
+        if not self.filesystemProbe.exists(cache_dir):
             return
 
         self.logger.info(
@@ -1417,7 +1685,7 @@ class MayaSessionCollector(HookBaseClass):
         )
 
         # look for alembic files in the cache folder
-        for filename in os.listdir(cache_dir):
+        for filename in self.filesystemProbe.listdir(cache_dir):
             cache_path = os.path.join(cache_dir, filename)
 
             # do some early pre-processing to ensure the file is of the right
@@ -1476,7 +1744,7 @@ class MayaSessionCollector(HookBaseClass):
 
         # ensure the movies dir exists
         movies_dir = os.path.join(project_root, movie_dir_name)
-        if not os.path.exists(movies_dir):
+        if not self.filesystemProbe.exists(movies_dir):
             return
 
         self.logger.info(
@@ -1485,7 +1753,7 @@ class MayaSessionCollector(HookBaseClass):
         )
 
         # look for movie files in the movies folder
-        for filename in os.listdir(movies_dir):
+        for filename in self.filesystemProbe.listdir(movies_dir):
 
             # do some early pre-processing to ensure the file is of the right
             # type. use the base class item info method to see what the item
@@ -1518,7 +1786,7 @@ class MayaSessionCollector(HookBaseClass):
 
         # iterate over defined render layers and query the render settings for
         # information about a potential render
-        for layer in cmds.ls(type="renderLayer"):
+        for layer in self.sceneSnapshot.renderLayers:
 
             self.logger.info("Processing render layer: %s" % (layer,))
 
@@ -0,0 +1,53 @@
+"""
+Base publish plugin of the Maya alembic plugins batched by the alembic export scheduler.
+
+The plugin publish queues its exports with ``exportScheduler.deferExports``
+and calls the base class publish as before: this hook registers the publish
+once the alembic is written. The queued alembics are written at the latest
+by the first finalize.
+
+Insert it in a publish plugin hook chain, before the plugin::
+
+    hook: "{self}/publish_file.py:{config}/tk-multi-publish2/maya/deferred_alembic_plugin.py:{config}/tk-multi-publish2/maya/publish_asset_alembic_hi.py:{config}/tk-multi-publish2/batch_register_plugin.py:{config}/tk-multi-publish2/trace_plugin.py"
+"""
+
+import sgtk
+
+HookBaseClass = sgtk.get_hook_baseclass()
+
+
+class DeferredAlembicPublishPlugin(HookBaseClass):
+    """
+    Base class of the publish plugins whose alembic exports are batched.
+    """
+
+    @property
+    def exportScheduler(self):
+        """ :class:`AlembicExportScheduler`: The scheduler shared by the alembic plugins. """
+        return self.parent.create_hook_instance(
+            "{config}/tk-multi-publish2/maya/alembic_export_scheduler.py"
+        )
+
+    def validate(self, settings, item):
+
+        # Discard the exports left by a previous publish.
+        self.exportScheduler.reset()
+
+        # run the base class validation
+        return super(DeferredAlembicPublishPlugin, self).validate(settings, item)
+
+    def publish(self, settings, item):
+
+        # Let the base class register the publish once the alembic is written.
+        self.exportScheduler.registerAfterExport(
+            item,
+            lambda: super(DeferredAlembicPublishPlugin, self).publish(settings, item)
+        )
+
+    def finalize(self, settings, item):
+
+        # Write the queued alembics and register their publishes.
+        self.exportScheduler.flush()
+
+        # Run the base class finalize
+        super(DeferredAlembicPublishPlugin, self).finalize(settings, item)
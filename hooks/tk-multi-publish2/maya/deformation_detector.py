@@ -0,0 +1,295 @@
+"""
+Detection of the deformed assets of an environment, from their sampled points.
+
+The collectors split the assets of an environment with the keyframes found
+by the framework: a keyed asset was exported as animated and an asset with a
+deformer as deformed, with a point cache on every frame, even when the
+deformer does not move it. The detector reads the world space points of the
+meshes of each asset on a few frames of the playback range into NumPy arrays
+and classifies the asset:
+
+- static, the points never move;
+- transform, the points of each mesh move with an affine transform, which
+  the alembic writes as the animation of the transforms;
+- deforming, the points of a mesh move relatively to each other, or its
+  topology changes, which needs a point cache.
+
+The static and transform animated assets are exported without point caches.
+The sampling only promotes assets: an asset deformed for the framework stays
+deformed while deformers are in the history of its meshes, as they can be at
+rest on the sampled frames or move the points rigidly. The framework
+keyframes are used when NumPy is not available in the Maya session, and for
+the assets without meshes.
+
+Load it from any hook with::
+
+    self.parent.create_hook_instance("{config}/tk-multi-publish2/maya/deformation_detector.py")
+"""
+
+import maya.cmds as cmds
+import sgtk
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+HookBaseClass = sgtk.get_hook_baseclass()
+
+# The kinds of motion of an asset.
+STATIC      = "static"
+TRANSFORM   = "transform"
+DEFORMING   = "deforming"
+
+# The number of sampled frames, spread over the playback range.
+SAMPLE_COUNT = 4
+
+# The distance below which two points match, relative to the size of the mesh.
+POINT_TOLERANCE = 1e-5
+
+
+def classifySamples(samples):
+    """ Classify the motion of a mesh from its sampled points.
+
+    Args:
+        samples (list(:class:`numpy.ndarray`))  : The world space points of the mesh on each sampled frame, as N x 3 arrays.
+
+    Returns:
+        str                                     : STATIC, TRANSFORM or DEFORMING.
+    """
+    reference = samples[0]
+    if(not len(reference)):
+        return DEFORMING if any(len(points) for points in samples) else STATIC
+
+    # The tolerance follows the size of the mesh, at least the one of a unit mesh.
+    diagonal = numpy.linalg.norm(reference.max(axis=0) - reference.min(axis=0))
+    tolerance = POINT_TOLERANCE * max(1.0, diagonal)
+
+    # The reference points in homogeneous coordinates, for the affine fits.
+    homogeneous = numpy.hstack((reference, numpy.ones((len(reference), 1))))
+
+    kind = STATIC
+    for points in samples[1:]:
+        # A change of topology needs a point cache.
+        if(points.shape != reference.shape):
+            return DEFORMING
+        if(numpy.abs(points - reference).max() <= tolerance):
+            continue
+
+        # The transforms move the points with an affine map, the least squares fit leaves no residual.
+        affine = numpy.linalg.lstsq(homogeneous, points, rcond=None)[0]
+        if(numpy.abs(homogeneous.dot(affine) - points).max() > tolerance):
+            return DEFORMING
+        kind = TRANSFORM
+
+    return kind
+
+
+class DeformationDetector(HookBaseClass):
+    """
+    Hook classifying the motion of the assets of an environment.
+    """
+
+    # The kinds of motion, for the hooks using the detector.
+    STATIC      = STATIC
+    TRANSFORM   = TRANSFORM
+    DEFORMING   = DEFORMING
+
+    @property
+    def available(self):
+        """ bool: True if NumPy is available to sample the points. """
+        return numpy is not None
+
+    def sampleFrames(self, startFrame, endFrame):
+        """ Get the frames to sample in a frame range.
+
+        Args:
+            startFrame  (float) : The first frame of the range.
+            endFrame    (float) : The last frame of the range.
+
+        Returns:
+            list(float)         : The frames, including the first and the last.
+        """
+        if(endFrame <= startFrame):
+            return [startFrame]
+        step = (endFrame - startFrame) / float(SAMPLE_COUNT - 1)
+        return [startFrame + step * index for index in range(SAMPLE_COUNT - 1)] + [endFrame]
+
+    def meshes(self, root):
+        """ Get the rendered meshes under a node.
+
+        Args:
+            root    (str)   : The full path of the node.
+
+        Returns:
+            list(str)       : The full paths of the meshes, without the intermediate objects.
+        """
+        meshes = cmds.listRelatives(root, allDescendents=True, fullPath=True, type="mesh") or []
+        return [mesh for mesh in meshes if not cmds.getAttr(mesh + ".intermediateObject")]
+
+    def hasDeformers(self, root):
+        """ Check if deformers are in the history of the meshes under a node.
+
+        Args:
+            root    (str)   : The full path of the node.
+
+        Returns:
+            bool            : True if a deformer, like a skinCluster, a cluster or a blendShape, changes a mesh.
+        """
+        meshes = self.meshes(root)
+        if(not meshes):
+            return False
+        # An empty list would make ls return every deformer of the scene.
+        history = cmds.listHistory(meshes, pruneDagObjects=True)
+        return bool(history and cmds.ls(history, type="geometryFilter"))
+
+    def sample(self, meshes, frames, checkpoint=None):
+        """ Read the world space points of meshes on frames.
+
+        The time is changed once per frame, the scene is evaluated on each change.
+
+        Args:
+            meshes      (list(str))             : The full paths of the meshes.
+            frames      (list(float))           : The frames.
+            checkpoint  (callable, optional)    : Called with a progress message before each mesh.
+
+        Returns:
+            dict                                : The points of each mesh on each frame, as N x 3 arrays, by mesh.
+        """
+        samplesByMesh = dict((mesh, []) for mesh in meshes)
+        currentFrame = cmds.currentTime(query=True)
+        try:
+            for frame in frames:
+                cmds.currentTime(frame, update=True)
+                # A mesh shared by several assets is read once.
+                for mesh in samplesByMesh:
+                    if(checkpoint):
+                        checkpoint("Sampling the points of the assets on frame {}.".format(frame))
+                    points = cmds.xform(mesh + ".vtx[*]", query=True, translation=True, worldSpace=True) or []
+                    samplesByMesh[mesh].append(numpy.array(points, dtype=numpy.float64).reshape(-1, 3))
+        finally:
+            cmds.currentTime(currentFrame, update=True)
+        return samplesByMesh
+
+    def classify(self, assets, startFrame=None, endFrame=None):
+        """ Classify the motion of assets on a frame range.
+
+        Args:
+            assets      (list)              : The assets, with the fullname of their root.
+            startFrame  (float, optional)   : The first frame, the start of the playback range by default.
+            endFrame    (float, optional)   : The last frame, the end of the playback range by default.
+
+        Returns:
+            dict                            : The kind of each asset by fullname, None for the assets without meshes.
+        """
+        if(startFrame is None):
+            startFrame = cmds.playbackOptions(query=True, minTime=True)
+        if(endFrame is None):
+            endFrame = cmds.playbackOptions(query=True, maxTime=True)
+
+        progress = self.parent.create_hook_instance("{config}/common/collection_progress.py")
+
+        # The rendered meshes of each asset.
+        meshesByAsset = dict((asset.fullname, self.meshes(asset.fullname)) for asset in assets)
+
+        # Read every mesh of every asset on each frame.
+        samplesByMesh = self.sample(
+            [mesh for meshes in meshesByAsset.values() for mesh in meshes],
+            self.sampleFrames(startFrame, endFrame),
+            progress.checkpoint
+        )
+
+        kinds = {}
+        for assetName, meshes in meshesByAsset.items():
+            if(not meshes):
+                kinds[assetName] = None
+                continue
+            meshKinds = set(classifySamples(samplesByMesh[mesh]) for mesh in meshes)
+            if(DEFORMING in meshKinds):
+                kinds[assetName] = DEFORMING
+            elif(TRANSFORM in meshKinds):
+                kinds[assetName] = TRANSFORM
+            else:
+                kinds[assetName] = STATIC
+
+        return kinds
+
+    def classifyBody(self, root, startFrame, endFrame):
+        """ Classify the motion of a hierarchy moving as a single body.
+
+        The points of all the meshes are fitted together, a hierarchy whose
+        meshes move with different transforms is deforming.
+
+        Args:
+            root        (str)   : The full path of the root of the hierarchy.
+            startFrame  (float) : The first frame.
+            endFrame    (float) : The last frame.
+
+        Returns:
+            str, list(str)      : STATIC, TRANSFORM or DEFORMING, None if the hierarchy has no meshes,
+                                  and the meshes of the hierarchy.
+        """
+        meshes = self.meshes(root)
+        if(not meshes):
+            return None, meshes
+
+        samplesByMesh = self.sample(meshes, self.sampleFrames(startFrame, endFrame))
+        samples = [
+            numpy.concatenate([samplesByMesh[mesh][index] for mesh in meshes])
+            for index in range(len(samplesByMesh[meshes[0]]))
+        ]
+        # A mesh changing its topology changes the size of the concatenated points.
+        topology = set(tuple(len(samplesByMesh[mesh][index]) for mesh in meshes) for index in range(len(samples)))
+        if(len(topology) > 1):
+            return DEFORMING, meshes
+
+        return classifySamples(samples), meshes
+
+    def split(self, assets, animatedAssets, deformedAssets):
+        """ Split the assets of an environment on their sampled motion.
+
+        The sampling only promotes the assets. The assets deformed for the
+        framework stay deformed while their meshes have deformers. The assets
+        keyed or deformed for the framework but sampled as static are kept as
+        animated, as their motion can be between the samples.
+
+        Args:
+            assets          (list)  : The assets of the environment.
+            animatedAssets  (list)  : The assets animated for the framework.
+            deformedAssets  (list)  : The assets deformed for the framework.
+
+        Returns:
+            list, list              : The animated assets, exported without point caches, and the deformed assets.
+        """
+        if(not self.available):
+            self.logger.debug("NumPy is not available, the assets are split with their keyframes.")
+            return animatedAssets, deformedAssets
+
+        kinds = self.classify(assets)
+        animatedNames = set(asset.fullname for asset in animatedAssets)
+        deformedNames = set(asset.fullname for asset in deformedAssets)
+
+        animated, deformed = [], []
+        for asset in assets:
+            kind = kinds.get(asset.fullname)
+            if(asset.fullname in deformedNames):
+                # The deformers can be at rest on the samples, or move the points rigidly.
+                # The assets without meshes keep the framework split.
+                if(kind is None or self.hasDeformers(asset.fullname)):
+                    kind = DEFORMING
+                elif(kind == STATIC):
+                    kind = TRANSFORM
+            elif(kind in (None, STATIC) and asset.fullname in animatedNames):
+                kind = TRANSFORM
+
+            if(kind == DEFORMING):
+                deformed.append(asset)
+            elif(kind == TRANSFORM):
+                animated.append(asset)
+
+        self.logger.debug(
+            "{} animated and {} deformed assets sampled, {} and {} with the keyframes.".format(
+                len(animated), len(deformed), len(animatedAssets), len(deformedAssets)
+            )
+        )
+        return animated, deformed
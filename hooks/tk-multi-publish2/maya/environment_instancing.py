@@ -0,0 +1,162 @@
+"""
+Instancing of the repeated assets of an environment alembic.
+
+The environment alembic plugin exported the geometry of every asset of the
+environment, so a set dress referencing the same rock 2,000 times wrote the
+rock 2,000 times. The copies of an asset are now grouped by the published
+file they reference: a copy is identical to the others when its reference
+has no edit other than the placement of its root. Only one copy of each
+group, the prototype, is exported in the alembic, with the assets which are
+not repeated or were edited. A companion manifest lists the world matrix of
+every copy of each prototype, the point instancer of the Houdini loader,
+built by its environment_instances hook, places each copy with the inverse
+of the prototype matrix followed by the copy matrix.
+
+Load it from any hook with::
+
+    self.parent.create_hook_instance("{config}/tk-multi-publish2/maya/environment_instancing.py")
+"""
+
+import collections
+import json
+import os
+
+import maya.cmds as cmds
+import sgtk
+from sgtk.util.filesystem import ensure_folder_exists
+
+HookBaseClass = sgtk.get_hook_baseclass()
+
+# The version of the format of the manifests.
+MANIFEST_VERSION = 1
+
+# The number of identical copies from which an asset is instanced.
+MIN_COPIES = 2
+
+
+class InstanceGroup(object):
+    """
+    The identical copies of an asset, exported once.
+    """
+
+    def __init__(self, referencePath):
+        self.referencePath  = referencePath
+        self.copies         = []
+
+    @property
+    def prototype(self):
+        """ The copy exported in the alembic. """
+        return self.copies[0]
+
+
+class EnvironmentInstancing(HookBaseClass):
+    """
+    Hook grouping the identical assets of an environment and writing their instancing manifest.
+    """
+
+    def group(self, assets):
+        """ Group the identical copies of the assets of an environment.
+
+        Args:
+            assets  (list)  : The assets, with the fullname of their root, as returned by
+                              MayaEnvironment.getAssets.
+
+        Returns:
+            list(:class:`InstanceGroup`), list  : The groups of copies to instance, and the assets to export.
+                                                  The prototypes of the groups are in the exported assets.
+        """
+        groups = collections.OrderedDict()
+        exported = []
+        for asset in assets:
+            referencePath = self._pristineReference(asset.fullname)
+            if(referencePath is None):
+                exported.append(asset)
+                continue
+            groups.setdefault(referencePath, InstanceGroup(referencePath)).copies.append(asset)
+
+        instanced = []
+        for group in groups.values():
+            if(len(group.copies) < MIN_COPIES):
+                exported.extend(group.copies)
+                continue
+            instanced.append(group)
+            exported.append(group.prototype)
+
+        # Keep the order of the environment.
+        order = dict((asset.fullname, index) for index, asset in enumerate(assets))
+        exported.sort(key=lambda asset: order[asset.fullname])
+
+        self.logger.debug(
+            "{} assets of the environment are copies of {} prototypes, {} assets are exported.".format(
+                sum(len(group.copies) for group in instanced), len(instanced), len(exported)
+            )
+        )
+        return instanced, exported
+
+    def write(self, path, alembicPath, groups):
+        """ Write the instancing manifest of an environment alembic.
+
+        Args:
+            path        (str)                           : The path of the manifest.
+            alembicPath (str)                           : The path of the alembic holding the prototypes.
+            groups      (list(:class:`InstanceGroup`))  : The groups of copies.
+        """
+        prototypes = []
+        for group in groups:
+            copies = [
+                {
+                    "name"      : copy.fullname.split("|")[-1],
+                    "matrix"    : cmds.xform(copy.fullname, query=True, matrix=True, worldSpace=True),
+                }
+                for copy in group.copies
+            ]
+            prototypes.append(
+                {
+                    "name"      : copies[0]["name"],
+                    "reference" : group.referencePath,
+                    "matrix"    : copies[0]["matrix"],
+                    "instances" : copies,
+                }
+            )
+
+        ensure_folder_exists(os.path.dirname(path))
+        with open(path, "w") as manifestFile:
+            json.dump(
+                {"version": MANIFEST_VERSION, "alembic": alembicPath, "prototypes": prototypes},
+                manifestFile
+            )
+
+    def _pristineReference(self, root):
+        """ Get the file referenced by an asset if the asset is identical to the published one.
+
+        The edits of a nested reference made from a parent file are stored
+        on the reference node of the parent, the edits of every reference
+        node holding the asset are read.
+
+        Args:
+            root    (str)   : The full path of the root of the asset.
+
+        Returns:
+            str             : The path of the referenced file, None if the asset is not referenced
+                              or has edits other than the placement of its root.
+        """
+        if(not cmds.referenceQuery(root, isNodeReferenced=True)):
+            return None
+        referenceNode = cmds.referenceQuery(root, referenceNode=True)
+
+        # The edits of the reference may only concern its root.
+        rootName = root.split("|")[-1]
+        if(":" not in rootName):
+            return None
+        namespace = rootName.rsplit(":", 1)[0] + ":"
+        editNode = referenceNode
+        while(editNode):
+            edits = cmds.referenceQuery(editNode, editStrings=True, successfulEdits=True, failedEdits=False) or []
+            for edit in edits:
+                for token in edit.replace('"', " ").split():
+                    node = token.split(".")[0].split("|")[-1]
+                    if(node.startswith(namespace) and node != rootName):
+                        return None
+            editNode = cmds.referenceQuery(editNode, referenceNode=True, parent=True)
+
+        return cmds.referenceQuery(referenceNode, filename=True, withoutCopyNumber=True)
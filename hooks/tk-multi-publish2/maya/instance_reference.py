@@ -0,0 +1,315 @@
+"""
+Transform tracks of the shot asset instances, referencing the published asset alembics.
+
+The shot alembic plugins baked the full geometry of every asset instance,
+even when it did not move or only moved as a rigid body. An instance whose
+meshes all move with a single affine transform, found by the
+deformation_detector hook, is published instead as a transform track: a
+JSON file holding the path of the alembic published for the asset with the
+rig or model the instance references, and the world matrix of the instance
+on each frame, a single one when it is static.
+
+The matrices map the published asset geometry to the world. They are fitted
+on a few anchor points of the instance, expressed relatively to its root on
+the first frame, so the instance must be in its published pose on the first
+frame apart from its placement. Its meshes are compared there with the ones
+of the asset alembic, imported once per publish, and a posed instance is
+baked. The Houdini loader loads the asset alembic and keys the transform of
+the loader from the track.
+
+Load it from any hook with::
+
+    self.parent.create_hook_instance("{config}/tk-multi-publish2/maya/instance_reference.py")
+"""
+
+import json
+import os
+
+import maya.cmds as cmds
+import sgtk
+from sgtk.util.filesystem import ensure_folder_exists
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+HookBaseClass = sgtk.get_hook_baseclass()
+
+# The version of the format of the transform track files.
+TRACK_VERSION = 1
+
+# The templates of the published files the instances reference.
+REFERENCE_TEMPLATES = ["maya_asset_rig_publish", "maya_asset_publish"]
+
+# The template of the published asset alembics.
+ASSET_ALEMBIC_TEMPLATE = "asset_alembic_lod_publish"
+
+# The LOD referenced when the referenced file has none, as written by the alembic LOD plugins.
+DEFAULT_LOD = "high"
+
+# The maximum number of points the matrices are fitted on.
+ANCHOR_COUNT = 64
+
+# The distance below which an instance is in the pose of its asset, relative to the size of the mesh.
+# The alembic stores the points in single precision.
+POSE_TOLERANCE = 1e-4
+
+# The points of the meshes of the asset alembics, by path. The published files do not change.
+_ASSET_POINTS = {}
+
+
+def _homogeneous(points):
+    """ Add the homogeneous coordinate to N x 3 points. """
+    return numpy.hstack((points, numpy.ones((len(points), 1))))
+
+
+def _shortName(path):
+    """ Get the name of a node without its parents and namespaces. """
+    return path.split("|")[-1].split(":")[-1]
+
+
+def _matrix(affine):
+    """ Get the 16 values of a Maya matrix from a 4 x 3 affine map of row vectors. """
+    matrix = numpy.zeros((4, 4))
+    matrix[:, :3] = affine
+    matrix[3, 3] = 1.0
+    return matrix.ravel().tolist()
+
+
+class InstanceReference(HookBaseClass):
+    """
+    Hook writing the transform tracks of the static and rigid shot asset instances.
+    """
+
+    @property
+    def deformationDetector(self):
+        """ :class:`DeformationDetector`: The detector classifying the motion of the instances. """
+        deformationDetector = getattr(self, "_deformationDetector", None)
+        if(deformationDetector is None):
+            deformationDetector = self._deformationDetector = self.parent.create_hook_instance(
+                "{config}/tk-multi-publish2/maya/deformation_detector.py"
+            )
+        return deformationDetector
+
+    @property
+    def available(self):
+        """ bool: True if NumPy is available to fit the tracks. """
+        return numpy is not None
+
+    def assetAlembicPath(self, root):
+        """ Get the published alembic of the asset an instance references.
+
+        Args:
+            root    (str)   : The full path of the root of the instance.
+
+        Returns:
+            str             : The path of the published alembic, None if the instance is not
+                              referenced from a publish or the alembic does not exist.
+        """
+        if(not cmds.referenceQuery(root, isNodeReferenced=True)):
+            return None
+        referencePath = cmds.referenceQuery(root, filename=True, withoutCopyNumber=True)
+
+        templateIndex = self.parent.create_hook_instance("{config}/common/template_index.py")
+        matches = templateIndex.matches(referencePath, REFERENCE_TEMPLATES)
+        if(not matches):
+            return None
+
+        # The alembic of the same version, published with the rig or the model.
+        fields = dict(matches[0][1])
+        fields.setdefault("lod", DEFAULT_LOD)
+        path = self.parent.engine.get_template_by_name(ASSET_ALEMBIC_TEMPLATE).apply_fields(fields)
+        if(not os.path.isfile(path)):
+            return None
+        return path
+
+    def referenceable(self, root, startFrame, endFrame):
+        """ Check if an instance can be published as a transform track.
+
+        Args:
+            root        (str)   : The full path of the root of the instance.
+            startFrame  (float) : The first frame.
+            endFrame    (float) : The last frame.
+
+        Returns:
+            str, str            : The path of the asset alembic and the kind of motion of the instance,
+                                  None and the reason if it must be baked.
+        """
+        if(not self.available):
+            return None, "NumPy is not available"
+
+        assetPath = self.assetAlembicPath(root)
+        if(not assetPath):
+            return None, "no published alembic of its asset was found"
+
+        kind, _ = self.deformationDetector.classifyBody(root, startFrame, endFrame)
+        if(kind is None):
+            return None, "it has no mesh"
+        if(kind == self.deformationDetector.DEFORMING):
+            return None, "it deforms"
+        if(not self.inAssetPose(root, assetPath, startFrame)):
+            return None, "it is not in the pose of its published asset on the first frame"
+
+        return assetPath, kind
+
+    def assetPoints(self, assetPath):
+        """ Read the points of the meshes of an asset alembic.
+
+        The alembic is imported in a temporary namespace, the points are read
+        in world space, as the asset root is at the origin in the published
+        asset, and the imported nodes are deleted.
+
+        Args:
+            assetPath   (str)   : The path of the asset alembic.
+
+        Returns:
+            dict                : The points of each mesh relatively to the asset root, as N x 3 arrays,
+                                  by mesh name without namespace.
+        """
+        if(assetPath in _ASSET_POINTS):
+            return _ASSET_POINTS[assetPath]
+
+        cmds.loadPlugin("AbcImport", quiet=True)
+        modified = cmds.file(query=True, modified=True)
+        nodes = cmds.file(
+            assetPath, i=True, type="Alembic", namespace="instanceReference", returnNewNodes=True
+        ) or []
+        # The namespace is renamed if it already exists.
+        namespace = nodes[0].split("|")[-1].split(":", 1)[0] if nodes else None
+        try:
+            points = {}
+            for mesh in cmds.ls(nodes, type="mesh", long=True) if nodes else []:
+                if(cmds.getAttr(mesh + ".intermediateObject")):
+                    continue
+                meshPoints = cmds.xform(mesh + ".vtx[*]", query=True, translation=True, worldSpace=True) or []
+                points[_shortName(mesh)] = numpy.array(meshPoints, dtype=numpy.float64).reshape(-1, 3)
+        finally:
+            if(namespace):
+                cmds.namespace(removeNamespace=namespace, deleteNamespaceContent=True)
+            cmds.file(modified=modified)
+
+        _ASSET_POINTS[assetPath] = points
+        return points
+
+    def inAssetPose(self, root, assetPath, startFrame):
+        """ Check if an instance is in the pose of its asset alembic on the first frame.
+
+        A posed rig, still or moving rigidly, would be replaced by the asset
+        in its published pose.
+
+        Args:
+            root        (str)   : The full path of the root of the instance.
+            assetPath   (str)   : The path of the asset alembic.
+            startFrame  (float) : The first frame.
+
+        Returns:
+            bool                : True if every mesh of the alembic matches the instance mesh of the same name.
+        """
+        assetPoints = self.assetPoints(assetPath)
+        if(not assetPoints):
+            return False
+
+        meshes = dict((_shortName(mesh), mesh) for mesh in self.deformationDetector.meshes(root))
+        if(any(name not in meshes for name in assetPoints)):
+            return False
+
+        instanceMeshes = [meshes[name] for name in assetPoints]
+        samplesByMesh = self.deformationDetector.sample(instanceMeshes, [startFrame])
+        inverseRoot = numpy.linalg.inv(numpy.array(cmds.getAttr(root + ".worldMatrix[0]", time=startFrame)).reshape(4, 4))
+
+        for name, mesh in zip(assetPoints, instanceMeshes):
+            reference = assetPoints[name]
+            points = _homogeneous(samplesByMesh[mesh][0]).dot(inverseRoot)[:, :3]
+            if(points.shape != reference.shape):
+                return False
+            if(not len(reference)):
+                continue
+            diagonal = numpy.linalg.norm(reference.max(axis=0) - reference.min(axis=0))
+            if(numpy.abs(points - reference).max() > POSE_TOLERANCE * max(1.0, diagonal)):
+                return False
+        return True
+
+    def track(self, root, assetPath, kind, startFrame, endFrame):
+        """ Get the transform track of an instance.
+
+        Args:
+            root        (str)   : The full path of the root of the instance.
+            assetPath   (str)   : The path of the asset alembic.
+            kind        (str)   : The kind of motion of the instance, STATIC or TRANSFORM.
+            startFrame  (float) : The first frame.
+            endFrame    (float) : The last frame.
+
+        Returns:
+            dict                : The track, with the asset path, the frames and their world matrices.
+        """
+        track = {
+            "asset"     : assetPath,
+            "instance"  : root.split("|")[-1],
+            "motion"    : kind,
+            "frames"    : [startFrame],
+            "matrices"  : [cmds.getAttr(root + ".worldMatrix[0]", time=startFrame)],
+        }
+        if(kind == self.deformationDetector.STATIC):
+            return track
+
+        frames = [float(frame) for frame in range(int(startFrame), int(endFrame) + 1)]
+        anchors = self._anchors(root)
+        inverseRoot = numpy.linalg.inv(numpy.array(track["matrices"][0]).reshape(4, 4))
+
+        matrices = []
+        currentFrame = cmds.currentTime(query=True)
+        try:
+            rest = None
+            for frame in frames:
+                cmds.currentTime(frame, update=True)
+                points = numpy.array(cmds.xform(anchors, query=True, translation=True, worldSpace=True)).reshape(-1, 3)
+                if(rest is None):
+                    # The anchors relatively to the root on the first frame, as in the published asset.
+                    rest = _homogeneous(_homogeneous(points).dot(inverseRoot)[:, :3])
+                matrices.append(_matrix(numpy.linalg.lstsq(rest, points, rcond=None)[0]))
+        finally:
+            cmds.currentTime(currentFrame, update=True)
+
+        track["frames"]     = frames
+        track["matrices"]   = matrices
+        return track
+
+    def write(self, path, tracks):
+        """ Write transform tracks to a file.
+
+        Args:
+            path    (str)           : The path of the file.
+            tracks  (list(dict))    : The tracks of the instances.
+        """
+        ensure_folder_exists(os.path.dirname(path))
+        with open(path, "w") as trackFile:
+            json.dump({"version": TRACK_VERSION, "instances": tracks}, trackFile)
+
+    def _anchors(self, root):
+        """ Get the vertices the matrices of an instance are fitted on.
+
+        The vertices are spread over the meshes of the instance. Every vertex
+        is used when the spread ones lie in a plane.
+
+        Args:
+            root    (str)   : The full path of the root of the instance.
+
+        Returns:
+            list(str)       : The vertex components.
+        """
+        meshes = self.deformationDetector.meshes(root)
+        counts = [cmds.polyEvaluate(mesh, vertex=True) for mesh in meshes]
+        offsets = numpy.cumsum([0] + counts)
+
+        indices = numpy.unique(numpy.linspace(0, offsets[-1] - 1, min(ANCHOR_COUNT, offsets[-1])).astype(numpy.int64))
+        meshIndices = numpy.searchsorted(offsets, indices, side="right") - 1
+        anchors = [
+            "{}.vtx[{}]".format(meshes[meshIndex], index - offsets[meshIndex])
+            for meshIndex, index in zip(meshIndices, indices)
+        ]
+
+        points = numpy.array(cmds.xform(anchors, query=True, translation=True, worldSpace=True)).reshape(-1, 3)
+        if(numpy.linalg.matrix_rank(_homogeneous(points)) < 4):
+            return ["{}.vtx[*]".format(mesh) for mesh in meshes]
+        return anchors
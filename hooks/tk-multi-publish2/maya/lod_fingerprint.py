@@ -0,0 +1,204 @@
+"""
+Fingerprint of the geometry of an asset LOD, to skip the unchanged exports.
+
+The alembic LOD plugins exported every LOD on every publish of the rig, even
+when only one of them changed. The fingerprint hashes the arguments of the
+export and every data it writes, read from the scene: the hierarchy names,
+the world matrices and visibility of the transforms, and for the meshes
+their points, topology, normals, creases, all their UV sets and color sets,
+and the shaders assigned to their faces, written as face sets. It is stored
+beside the published file, and the next publish reuses the previous file of
+the LOD when their fingerprints match.
+
+The LODs holding other shapes than meshes, or exported over several frames,
+have no fingerprint: they are always exported.
+
+Load it from any hook with::
+
+    self.parent.create_hook_instance("{config}/tk-multi-publish2/maya/lod_fingerprint.py")
+"""
+
+import array
+import hashlib
+import os
+
+import maya.api.OpenMaya as om
+import maya.cmds as cmds
+import sgtk
+
+HookBaseClass = sgtk.get_hook_baseclass()
+
+# The extension of the file storing the fingerprint beside a publish.
+FINGERPRINT_EXTENSION = ".fingerprint"
+
+# The template key holding the version.
+VERSION_KEY = "version"
+
+
+def _bytes(typeCode, values):
+    """ Pack values in bytes, in a single call. """
+    packed = array.array(typeCode, values)
+    if(hasattr(packed, "tobytes")):
+        return packed.tobytes()
+    return packed.tostring()
+
+
+class LODFingerprint(HookBaseClass):
+    """
+    Hook fingerprinting the geometry of the LODs and finding their previous publish.
+    """
+
+    def compute(self, roots, startFrame, endFrame, exportArgs=""):
+        """ Get the fingerprint of the geometry exported from root nodes.
+
+        Args:
+            roots       (list(str))     : The full paths of the exported root nodes.
+            startFrame  (float)         : The first exported frame.
+            endFrame    (float)         : The last exported frame.
+            exportArgs  (str, optional) : The arguments of the export, without its output path.
+
+        Returns:
+            str                         : The fingerprint, None if the export can not be fingerprinted.
+        """
+        # Only the current frame is read from the scene.
+        if(startFrame != endFrame):
+            return None
+
+        checksum = hashlib.sha1()
+        checksum.update("{} {}".format(startFrame, endFrame).encode("utf-8"))
+        checksum.update(exportArgs.encode("utf-8"))
+
+        for root in roots:
+            rootParent = root.rsplit("|", 1)[0]
+            nodes = [root] + sorted(cmds.listRelatives(root, allDescendents=True, fullPath=True) or [])
+            for node in nodes:
+                # The names of the exported hierarchy, below the parent of the root.
+                checksum.update(node[len(rootParent):].encode("utf-8"))
+
+                if(cmds.objectType(node, isAType="transform")):
+                    checksum.update(_bytes("d", cmds.xform(node, query=True, matrix=True, worldSpace=True)))
+                    checksum.update(_bytes("b", [cmds.getAttr(node + ".visibility")]))
+
+                elif(cmds.objectType(node, isAType="shape") and not cmds.getAttr(node + ".intermediateObject")):
+                    # The curves, surfaces, cameras... written by the export are not hashed.
+                    if(not cmds.objectType(node, isType="mesh")):
+                        self.logger.debug("{} is not a mesh, the LOD is exported.".format(node))
+                        return None
+                    checksum.update(_bytes("b", [cmds.getAttr(node + ".visibility")]))
+                    self._hashMesh(checksum, node)
+
+        return checksum.hexdigest()
+
+    def _hashMesh(self, checksum, mesh):
+        """ Add the data of a mesh written by the export to a checksum.
+
+        Args:
+            checksum    (:class:`hashlib.sha1`) : The checksum.
+            mesh        (str)                   : The full path of the mesh.
+        """
+        selection = om.MSelectionList()
+        selection.add(mesh)
+        fnMesh = om.MFnMesh(selection.getDagPath(0))
+        if(fnMesh.numVertices == 0):
+            return
+
+        # The points, with their tweaks, read in a single command.
+        checksum.update(_bytes("d", cmds.xform(mesh + ".vtx[*]", query=True, translation=True, objectSpace=True)))
+
+        # The topology.
+        vertexCounts, vertexIds = fnMesh.getVertices()
+        checksum.update(_bytes("i", vertexCounts))
+        checksum.update(_bytes("i", vertexIds))
+
+        # The normals of the face vertices, holding the hard edges and the locked normals.
+        normals = fnMesh.getNormals(om.MSpace.kObject)
+        checksum.update(_bytes("f", [value for normal in normals for value in (normal.x, normal.y, normal.z)]))
+        normalCounts, normalIds = fnMesh.getNormalIds()
+        checksum.update(_bytes("i", normalCounts))
+        checksum.update(_bytes("i", normalIds))
+
+        # The creases of the edges and vertices.
+        for getCreases in (fnMesh.getCreaseEdges, fnMesh.getCreaseVertices):
+            try:
+                creaseIds, creaseValues = getCreases()
+            except RuntimeError:
+                # The mesh has no creases.
+                continue
+            checksum.update(_bytes("i", creaseIds))
+            checksum.update(_bytes("d", creaseValues))
+
+        # The UVs of every UV set and their assignment to the face vertices.
+        for uvSet in fnMesh.getUVSetNames():
+            checksum.update(uvSet.encode("utf-8"))
+            uCoords, vCoords = fnMesh.getUVs(uvSet)
+            checksum.update(_bytes("f", uCoords))
+            checksum.update(_bytes("f", vCoords))
+            uvCounts, uvIds = fnMesh.getAssignedUVs(uvSet)
+            checksum.update(_bytes("i", uvCounts))
+            checksum.update(_bytes("i", uvIds))
+
+        # The colors of every color set on the face vertices.
+        for colorSet in fnMesh.getColorSetNames():
+            checksum.update(colorSet.encode("utf-8"))
+            colors = fnMesh.getFaceVertexColors(colorSet)
+            checksum.update(_bytes("f", [value for color in colors for value in (color.r, color.g, color.b, color.a)]))
+
+        # The shaders assigned to the faces, written as face sets.
+        shadingGroups, faceShaders = fnMesh.getConnectedShaders(fnMesh.dagPath().instanceNumber())
+        for shadingGroup in shadingGroups:
+            checksum.update(om.MFnDependencyNode(shadingGroup).name().encode("utf-8"))
+        checksum.update(_bytes("i", faceShaders))
+
+    def read(self, path):
+        """ Get the fingerprint stored beside a published file.
+
+        Args:
+            path    (str)   : The path of the published file.
+
+        Returns:
+            str             : The fingerprint, None if the file has none.
+        """
+        fingerprintPath = path + FINGERPRINT_EXTENSION
+        if(not os.path.isfile(fingerprintPath)):
+            return None
+        with open(fingerprintPath, "r") as fingerprintFile:
+            return fingerprintFile.read().strip() or None
+
+    def write(self, path, fingerprint):
+        """ Store the fingerprint of a published file beside it.
+
+        Args:
+            path        (str)   : The path of the published file.
+            fingerprint (str)   : The fingerprint.
+        """
+        with open(path + FINGERPRINT_EXTENSION, "w") as fingerprintFile:
+            fingerprintFile.write(fingerprint)
+
+    def previousPublish(self, path, template):
+        """ Get the latest version of a published file older than a path.
+
+        Args:
+            path        (str)                   : The path of the new publish.
+            template    (:class:`TemplatePath`) : The publish template.
+
+        Returns:
+            str                                 : The path of the previous publish, None if there is none.
+        """
+        fields = template.validate_and_get_fields(path)
+        if(not fields or not fields.get(VERSION_KEY)):
+            return None
+
+        # The versions can be in different folders, check all the older ones in a single batch.
+        candidates = []
+        for version in range(fields[VERSION_KEY] - 1, 0, -1):
+            versionFields = dict(fields)
+            versionFields[VERSION_KEY] = version
+            candidates.append(template.apply_fields(versionFields))
+        if(not candidates):
+            return None
+
+        existing = self.parent.create_hook_instance("{config}/common/filesystem_probe.py").existsMany(candidates)
+        for candidate in candidates:
+            if(existing[candidate]):
+                return candidate
+        return None
@@ -0,0 +1,725 @@
+"""
+Validation of the geometry of the published meshes, vectorized with NumPy.
+
+The vertex, face and UV arrays of each mesh are read in bulk through the
+Maya API into NumPy arrays, and every check runs on the whole arrays:
+
+- non-manifold edges, shared by more than two faces;
+- lamina faces, sharing all their vertices with another face;
+- zero-area faces;
+- UVs outside the UDIM tiles, and faces whose UVs cross a tile border;
+- overlapping UV shells.
+
+The geometry checks fail the validation, the UV checks are reported as
+warnings. The Mesh Validation setting of the asset plugins can downgrade the
+geometry checks to warnings or turn all the checks off. Each issue lists the
+offending components, which the publish log can select in the scene. The
+checks are skipped when NumPy is not available in the Maya session.
+
+Load it from any hook with::
+
+    self.parent.create_hook_instance("{config}/tk-multi-publish2/maya/mesh_validation.py")
+"""
+
+import ctypes
+
+import maya.OpenMaya as om1
+import maya.api.OpenMaya as om
+import maya.cmds as cmds
+import sgtk
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+HookBaseClass = sgtk.get_hook_baseclass()
+
+# The area below which a face is degenerate.
+ZERO_AREA = 1e-10
+
+# The number of UDIM tiles along U.
+UDIM_COLUMNS = 10
+
+# The tolerance of the UVs lying on a tile border.
+UV_TOLERANCE = 1e-5
+
+# The approximate number of points sampled in the UV faces to find the overlaps.
+OVERLAP_SAMPLES = 250000
+
+# The number of points covered by several faces for a shell to overlap.
+OVERLAP_POINTS = 2
+
+# The values of the Mesh Validation setting of the publish plugins: the geometry
+# errors fail the validation, are only logged as warnings, or are not checked.
+MODE_ERROR      = "error"
+MODE_WARNING    = "warning"
+MODE_OFF        = "off"
+MODES           = (MODE_ERROR, MODE_WARNING, MODE_OFF)
+
+# The maximum number of components listed in the log for an issue.
+_MAX_LOGGED_COMPONENTS = 20
+
+# The number of keys found more than once below which they are compared with all the keys.
+_FEW_REPEATED_KEYS = 16
+
+# The number of corners of the faces read a column at a time, the faces with
+# more corners are reduced vertex after vertex.
+_CORNER_COLUMNS = 4
+
+
+class MeshIssue(object):
+    """
+    Components of a mesh failing a check.
+    """
+
+    def __init__(self, check, mesh, componentType, indices, isError):
+        """
+        Args:
+            check           (str)           : The name of the check.
+            mesh            (str)           : The full path of the mesh.
+            componentType   (str)           : The Maya component type, vtx, f or map.
+            indices         (numpy.ndarray) : The indices of the offending components.
+            isError         (bool)          : True if the issue fails the validation.
+        """
+        self.check          = check
+        self.mesh           = mesh
+        self.componentType  = componentType
+        self.indices        = indices
+        self.isError        = isError
+
+    @property
+    def components(self):
+        """ list(str): The offending components, with the ranges of consecutive indices merged. """
+        indices = numpy.unique(self.indices)
+        if(len(indices) == 0):
+            return []
+        # Split the sorted indices where they are not consecutive.
+        breaks = numpy.flatnonzero(numpy.diff(indices) != 1) + 1
+        starts = numpy.concatenate(([indices[0]], indices[breaks]))
+        ends = numpy.concatenate((indices[breaks - 1], [indices[-1]]))
+        return [
+            "{}.{}[{}]".format(self.mesh, self.componentType, start) if start == end
+            else "{}.{}[{}:{}]".format(self.mesh, self.componentType, start, end)
+            for start, end in zip(starts, ends)
+        ]
+
+    @property
+    def message(self):
+        """ str: The description of the issue. """
+        return "{}: {} {} on {}.".format(
+            self.check, len(numpy.unique(self.indices)), _COMPONENT_NAMES[self.componentType], self.mesh
+        )
+
+
+# The names of the component types, for the messages.
+_COMPONENT_NAMES = {"vtx": "vertices", "f": "faces", "map": "UVs"}
+
+
+class MeshArrays(object):
+    """
+    The arrays of a mesh read from the scene.
+
+    The arrays keep the types of the Maya arrays, 32 bits floats and ints,
+    which halves the memory the checks go through.
+    """
+
+    def __init__(self, points, faceCounts, faceVertices, us=None, vs=None, uvCounts=None, uvIds=None, shellIds=None):
+        """
+        Args:
+            points          (numpy.ndarray) : The positions of the vertices, (V, 3) floats.
+            faceCounts      (numpy.ndarray) : The number of vertices of each face.
+            faceVertices    (numpy.ndarray) : The vertices of the faces, face after face.
+            us              (numpy.ndarray) : The U coordinates of the UVs.
+            vs              (numpy.ndarray) : The V coordinates of the UVs.
+            uvCounts        (numpy.ndarray) : The number of UVs of each face, 0 if the face has none.
+            uvIds           (numpy.ndarray) : The UVs of the faces, face after face.
+            shellIds        (numpy.ndarray) : The shell of each UV.
+        """
+        self.points         = points
+        self.faceCounts     = faceCounts
+        self.faceVertices   = faceVertices
+        self.us             = us
+        self.vs             = vs
+        self.uvCounts       = uvCounts
+        self.uvIds          = uvIds
+        self.shellIds       = shellIds
+        # The values derived from the arrays, shared by the checks.
+        self.cache          = {}
+
+    @classmethod
+    def fromMesh(cls, mesh):
+        """ Read the arrays of a mesh of the scene.
+
+        Args:
+            mesh    (str)   : The full path of the mesh.
+
+        Returns:
+            MeshArrays      : The arrays of the mesh.
+        """
+        selection = om.MSelectionList()
+        selection.add(mesh)
+        fnMesh = om.MFnMesh(selection.getDagPath(0))
+
+        faceCounts, faceVertices = fnMesh.getVertices()
+        arrays = cls(_rawPoints(mesh, fnMesh.numVertices), _intArray(faceCounts), _intArray(faceVertices))
+
+        if(fnMesh.numUVs() > 0):
+            us, vs = fnMesh.getUVs()
+            uvCounts, uvIds = fnMesh.getAssignedUVs()
+            _, shellIds = fnMesh.getUvShellsIds()
+            arrays.us       = numpy.fromiter(us, numpy.float32, len(us))
+            arrays.vs       = numpy.fromiter(vs, numpy.float32, len(vs))
+            arrays.uvCounts = _intArray(uvCounts)
+            arrays.uvIds    = _intArray(uvIds)
+            arrays.shellIds = _intArray(shellIds)
+        return arrays
+
+
+def _rawPoints(mesh, vertexCount):
+    """ Read the points of a mesh, with their tweaks, as a buffer.
+
+    The MFnMesh of the API 1.0 gives the address of the float positions of
+    the vertices, which NumPy reads without walking them in Python.
+    """
+    selection = om1.MSelectionList()
+    selection.add(mesh)
+    dagPath = om1.MDagPath()
+    selection.getDagPath(0, dagPath)
+    address = int(om1.MFnMesh(dagPath).getRawPoints())
+    values = (ctypes.c_float * (3 * vertexCount)).from_address(address)
+    # Copy the positions, the buffer belongs to the mesh.
+    return numpy.frombuffer(values, numpy.float32).reshape(-1, 3).copy()
+
+
+def _intArray(values):
+    """ Convert a Maya int array to a NumPy array, without an intermediate list. """
+    return numpy.fromiter(values, numpy.int32, len(values))
+
+
+def _cached(arrays, name, function):
+    """ Get a value derived from the arrays of a mesh, computed once for all the checks. """
+    if(name not in arrays.cache):
+        arrays.cache[name] = function()
+    return arrays.cache[name]
+
+
+def _faceOffsets(counts):
+    """ Get the index of the first face vertex of each face. """
+    return numpy.cumsum(counts) - counts
+
+
+def _faceVertexIndices(counts, offsets):
+    """ Get the indices of the face vertices of some faces, face after face. """
+    return numpy.arange(int(counts.sum())) + numpy.repeat(offsets - _faceOffsets(counts), counts)
+
+
+def _cornerIndices(counts, offsets):
+    """ Get the indices of the first face vertices of each face, a column per corner.
+
+    The columns are read with a single take each, rather than reducing the
+    face vertices face after face. The faces with fewer corners repeat their
+    last one, the checks complete the faces with more corners.
+
+    Args:
+        counts  (numpy.ndarray) : The number of face vertices of each face.
+        offsets (numpy.ndarray) : The index of the first face vertex of each face.
+
+    Returns:
+        list(numpy.ndarray)     : The index of the face vertex of each face at each corner.
+    """
+    minimumCount = int(counts.min()) if len(counts) > 0 else 0
+    return [
+        offsets + corner if corner < minimumCount else offsets + numpy.minimum(corner, counts - 1)
+        for corner in range(_CORNER_COLUMNS)
+    ]
+
+
+def _faceCorners(arrays):
+    """ Get the indices of the corners of the faces, and the vertices at these corners. """
+    def compute():
+        counts = arrays.faceCounts
+        offsets = _cached(arrays, "faceOffsets", lambda: _faceOffsets(counts))
+        indices = _cornerIndices(counts, offsets)
+        return indices, [arrays.faceVertices.take(cornerIndices) for cornerIndices in indices]
+    return _cached(arrays, "faceCorners", compute)
+
+
+def _fanTriangles(counts, offsets, ids):
+    """ Split the faces in fans of triangles.
+
+    Args:
+        counts  (numpy.ndarray) : The number of ids of each face.
+        offsets (numpy.ndarray) : The index of the first id of each face.
+        ids     (numpy.ndarray) : The ids of the faces, face after face.
+
+    Returns:
+        tuple(numpy.ndarray)    : The face, and the first, second and third ids of each triangle.
+    """
+    triangleCounts = numpy.maximum(counts - 2, 0)
+    faceIds = numpy.repeat(numpy.arange(len(counts)), triangleCounts)
+    triangleOffsets = numpy.cumsum(triangleCounts) - triangleCounts
+    # The triangles start at the second vertex of the face.
+    seconds = numpy.arange(len(faceIds)) - triangleOffsets[faceIds] + offsets[faceIds] + 1
+    return faceIds, ids[offsets[faceIds]], ids[seconds], ids[seconds + 1]
+
+
+def _faceBounds(uvs, counts, offsets, ids, cornerIndices):
+    """ Get the bounds of the UVs of each face.
+
+    The repeated corners of the faces with fewer corners do not change their
+    bounds, only the faces with more corners are reduced UV after UV.
+
+    Args:
+        uvs             (numpy.ndarray)         : The U and V of each UV, (N, 2) floats.
+        counts          (numpy.ndarray)         : The number of UVs of each face.
+        offsets         (numpy.ndarray)         : The index of the first UV of each face.
+        ids             (numpy.ndarray)         : The UVs of the faces, face after face.
+        cornerIndices   (list(numpy.ndarray))   : The columns of the corners of the faces.
+
+    Returns:
+        list(numpy.ndarray)                     : The minimum U, maximum U, minimum V and maximum V of each face.
+    """
+    bounds = None
+    for indices in cornerIndices:
+        cornerUVs = uvs.take(ids.take(indices), axis=0)
+        cornerUs, cornerVs = cornerUVs[:, 0], cornerUVs[:, 1]
+        if(bounds is None):
+            bounds = [cornerUs.copy(), cornerUs.copy(), cornerVs.copy(), cornerVs.copy()]
+            continue
+        numpy.minimum(bounds[0], cornerUs, out=bounds[0])
+        numpy.maximum(bounds[1], cornerUs, out=bounds[1])
+        numpy.minimum(bounds[2], cornerVs, out=bounds[2])
+        numpy.maximum(bounds[3], cornerVs, out=bounds[3])
+
+    polygons = numpy.flatnonzero(counts > _CORNER_COLUMNS)
+    if(len(polygons) > 0):
+        polygonUVs = uvs.take(ids.take(_faceVertexIndices(counts[polygons], offsets[polygons])), axis=0)
+        polygonOffsets = _faceOffsets(counts[polygons])
+        for bound, function, axis in zip(bounds, (numpy.minimum, numpy.maximum) * 2, (0, 0, 1, 1)):
+            bound[polygons] = function.reduceat(polygonUVs[:, axis], polygonOffsets)
+    return bounds
+
+
+def _mappedFaces(arrays):
+    """ Get the faces with UVs, with their UV counts and offsets, and the bounds of their UVs. """
+    def compute():
+        if(numpy.array_equal(arrays.uvCounts, arrays.faceCounts)):
+            # The UVs of all the faces are laid out as their vertices.
+            faces = numpy.arange(len(arrays.faceCounts))
+            counts = arrays.faceCounts
+            offsets = _cached(arrays, "faceOffsets", lambda: _faceOffsets(counts))
+            cornerIndices = _faceCorners(arrays)[0]
+        else:
+            faces = numpy.flatnonzero(arrays.uvCounts > 0)
+            counts = arrays.uvCounts[faces]
+            offsets = _faceOffsets(counts)
+            cornerIndices = _cornerIndices(counts, offsets)
+        if(len(faces) == 0):
+            bounds = [numpy.zeros(0, numpy.float32)] * 4
+        else:
+            uvs = numpy.stack((arrays.us, arrays.vs), axis=1)
+            bounds = _faceBounds(uvs, counts, offsets, arrays.uvIds, cornerIndices)
+        return [faces, counts, offsets] + bounds
+    return _cached(arrays, "mappedFaces", compute)
+
+
+def _duplicated(keys):
+    """ Get the mask of the keys found more than once. """
+    sortedKeys = numpy.sort(keys)
+    repeated = numpy.unique(sortedKeys[1:][sortedKeys[1:] == sortedKeys[:-1]])
+    # The few repeated keys of most meshes are compared with all the keys, rather than sorting their indices.
+    if(len(repeated) <= _FEW_REPEATED_KEYS):
+        return numpy.isin(keys, repeated)
+    order = numpy.argsort(keys)
+    equal = keys[order[1:]] == keys[order[:-1]]
+    duplicated = numpy.zeros(len(keys), bool)
+    duplicated[order[1:][equal]] = True
+    duplicated[order[:-1][equal]] = True
+    return duplicated
+
+
+def nonManifoldEdges(arrays):
+    """ Get the vertices of the edges shared by more than two faces.
+
+    Returns:
+        numpy.ndarray   : The vertices of the non-manifold edges.
+    """
+    counts = arrays.faceCounts
+    offsets = _cached(arrays, "faceOffsets", lambda: _faceOffsets(counts))
+    starts = arrays.faceVertices.astype(numpy.int32, copy=False)
+    # The lowest and highest vertex of each edge, read as a single 64 bits int
+    # keying the edge regardless of its direction.
+    edges = numpy.empty((len(starts), 2), numpy.int32)
+    # The next vertex of each face vertex, the last vertex of a face is followed by its first one.
+    ends = edges[:, 1]
+    ends[:-1] = starts[1:]
+    ends[offsets + counts - 1] = starts[offsets]
+    numpy.minimum(starts, ends, out=edges[:, 0])
+    numpy.maximum(starts, ends, out=ends)
+    keys = edges.view(numpy.int64).ravel()
+    keys.sort()
+    # The sorted keys of an edge found three times or more.
+    nonManifold = numpy.unique(keys[2:][keys[2:] == keys[:-2]])
+    return nonManifold.view(numpy.int32)
+
+
+def laminaFaces(arrays):
+    """ Get the faces sharing all their vertices with another face.
+
+    Returns:
+        numpy.ndarray   : The lamina faces.
+    """
+    counts = arrays.faceCounts
+    if(len(counts) == 0):
+        return numpy.zeros(0, numpy.int64)
+
+    # Key each face with the sum of random values of its vertices, which does
+    # not depend on the order of the vertices.
+    weights = numpy.random.RandomState(0).randint(1, 2 ** 62, len(arrays.points), dtype=numpy.int64)
+    keys = counts.astype(numpy.int64)
+    minimumCount = int(counts.min())
+    for corner, vertices in enumerate(_faceCorners(arrays)[1]):
+        cornerWeights = weights.take(vertices)
+        # The faces with fewer vertices repeat their last one.
+        if(corner >= minimumCount):
+            cornerWeights[counts <= corner] = 0
+        keys += cornerWeights
+
+    # The faces with more vertices.
+    polygons = numpy.flatnonzero(counts > _CORNER_COLUMNS)
+    if(len(polygons) > 0):
+        offsets = _cached(arrays, "faceOffsets", lambda: _faceOffsets(counts))
+        polygonWeights = weights.take(arrays.faceVertices.take(_faceVertexIndices(counts[polygons], offsets[polygons])))
+        keys[polygons] = numpy.add.reduceat(polygonWeights, _faceOffsets(counts[polygons])) + counts[polygons]
+
+    return numpy.flatnonzero(_duplicated(keys))
+
+
+def zeroAreaFaces(arrays):
+    """ Get the faces whose area is zero.
+
+    The area of the quads is computed from their diagonals, the triangles
+    repeat their last vertex, which gives the cross product of two of their
+    edges. The other faces are split in fans of triangles.
+
+    Returns:
+        numpy.ndarray   : The zero-area faces.
+    """
+    counts = arrays.faceCounts
+    points = arrays.points
+    # The X, Y and Z of the points, each read as a contiguous array.
+    coordinates = numpy.ascontiguousarray(points.T)
+    corners = _faceCorners(arrays)[1]
+
+    # Half the cross product of the diagonals.
+    areas = _crossNorms(
+        [values.take(corners[2]) - values.take(corners[0]) for values in coordinates],
+        [values.take(corners[3]) - values.take(corners[1]) for values in coordinates],
+    )
+
+    # The other faces.
+    polygons = numpy.flatnonzero(counts > 4)
+    if(len(polygons) > 0):
+        offsets = _cached(arrays, "faceOffsets", lambda: _faceOffsets(counts))
+        faceIds, first, second, third = _fanTriangles(counts[polygons], offsets[polygons], arrays.faceVertices)
+        areas[polygons] = numpy.bincount(
+            faceIds,
+            weights=_crossNorms(
+                (points.take(second, axis=0) - points.take(first, axis=0)).T,
+                (points.take(third, axis=0) - points.take(first, axis=0)).T,
+            ),
+            minlength=len(polygons),
+        )
+
+    return numpy.flatnonzero(areas <= ZERO_AREA)
+
+
+def _crossNorms(vectors1, vectors2):
+    """ Get half the norm of the cross products of two arrays of vectors, given as their X, Y and Z. """
+    crossXs = vectors1[1] * vectors2[2] - vectors1[2] * vectors2[1]
+    crossYs = vectors1[2] * vectors2[0] - vectors1[0] * vectors2[2]
+    crossZs = vectors1[0] * vectors2[1] - vectors1[1] * vectors2[0]
+    return 0.5 * numpy.sqrt(crossXs * crossXs + crossYs * crossYs + crossZs * crossZs)
+
+
+def uvsOutsideTiles(arrays):
+    """ Get the UVs outside the UDIM tiles.
+
+    Returns:
+        numpy.ndarray   : The UVs outside the tiles.
+    """
+    return numpy.flatnonzero(
+        (arrays.us < -UV_TOLERANCE) | (arrays.us > UDIM_COLUMNS + UV_TOLERANCE) | (arrays.vs < -UV_TOLERANCE)
+    )
+
+
+def facesCrossingTiles(arrays):
+    """ Get the faces whose UVs are not in a single UDIM tile.
+
+    Returns:
+        numpy.ndarray   : The faces crossing a tile border.
+    """
+    faces, _, _, minUs, maxUs, minVs, maxVs = _mappedFaces(arrays)
+    # The UVs on the border of a tile belong to it.
+    crossing = (
+        (numpy.floor(minUs + UV_TOLERANCE) != numpy.floor(maxUs - UV_TOLERANCE)) |
+        (numpy.floor(minVs + UV_TOLERANCE) != numpy.floor(maxVs - UV_TOLERANCE))
+    )
+    return faces[crossing]
+
+
+def _gridCells(minimums, maximums, cellSize):
+    """ Get the first cell of the grid whose center is in some ranges, and their number of cells.
+
+    The cells stay floats, computed in place, until the caller keeps the
+    ranges holding a cell.
+    """
+    firsts = minimums / cellSize
+    firsts -= 0.5
+    numpy.ceil(firsts, out=firsts)
+    cellCounts = maximums / cellSize
+    cellCounts -= 0.5
+    numpy.floor(cellCounts, out=cellCounts)
+    cellCounts -= firsts - 1
+    numpy.maximum(cellCounts, 0, out=cellCounts)
+    return firsts, cellCounts
+
+
+def overlappingShells(arrays):
+    """ Get the UVs of the shells overlapping another shell, or themselves.
+
+    The UV faces are rasterized: the centers of the cells of a regular grid
+    are tested against the faces whose bounds hold them. A point strictly
+    inside two faces is covered twice, which the faces sharing an edge or
+    lying side by side never do. The cells are sized to sample about
+    OVERLAP_SAMPLES points in the bounds of the faces, the overlaps smaller
+    than a cell can be missed.
+
+    Only the faces holding a cell center are split in triangles, and only
+    the centers in the bounds of several faces are tested against them, the
+    cost is bounded by the number of samples.
+
+    Returns:
+        numpy.ndarray   : The UVs of the overlapping shells.
+    """
+    faces, counts, offsets, minUs, maxUs, minVs, maxVs = _mappedFaces(arrays)
+    if(len(faces) == 0):
+        return faces
+
+    boundsArea = float(((maxUs - minUs) * (maxVs - minVs)).sum(dtype=numpy.float64))
+    cellSize = max(numpy.sqrt(boundsArea / OVERLAP_SAMPLES), 1e-9)
+    while(True):
+        # The columns of cells of each face, then the rows of the faces holding a column.
+        firstUs, columns = _gridCells(minUs, maxUs, cellSize)
+        holding = numpy.flatnonzero(columns)
+        firstVs, rows = _gridCells(minVs[holding], maxVs[holding], cellSize)
+        cellCounts = columns[holding] * rows
+        total = int(cellCounts.sum(dtype=numpy.float64))
+        # The bounds of the thin faces hold many more cells than the faces.
+        if(total <= 4 * OVERLAP_SAMPLES):
+            break
+        cellSize *= numpy.sqrt(total / (2.0 * OVERLAP_SAMPLES))
+    if(total == 0):
+        return numpy.zeros(0, numpy.int64)
+
+    # The cells of the faces holding a cell center.
+    keep = numpy.flatnonzero(cellCounts)
+    holding = holding[keep]
+    firstUs, firstVs, rows, cellCounts = (
+        values.astype(numpy.int64) for values in (firstUs[holding], firstVs[keep], rows[keep], cellCounts[keep])
+    )
+    samples = numpy.repeat(numpy.arange(len(holding)), cellCounts)
+    local = numpy.arange(total) - numpy.repeat(numpy.cumsum(cellCounts) - cellCounts, cellCounts)
+    cellUs = firstUs[samples] + local // rows[samples]
+    cellVs = firstVs[samples] + local % rows[samples]
+    # Key the cells from the lowest one.
+    keys = (cellUs - cellUs.min()) * (int(cellVs.max() - cellVs.min()) + 1) + (cellVs - cellVs.min())
+
+    # Only the centers in the bounds of several faces can be covered twice.
+    shared = _duplicated(keys) if keys.max() >= 8 * len(keys) else numpy.bincount(keys)[keys] > 1
+    if(not shared.any()):
+        return numpy.zeros(0, numpy.int64)
+    samples, keys = samples[shared], keys[shared]
+    pointUs = (cellUs[shared] + 0.5) * cellSize
+    pointVs = (cellVs[shared] + 0.5) * cellSize
+
+    # The points strictly inside a triangle of the fan of their face, whatever its winding.
+    sampleCounts = counts[holding][samples]
+    sampleOffsets = offsets[holding][samples]
+    firstIds = arrays.uvIds.take(sampleOffsets)
+    u0, v0 = arrays.us.take(firstIds), arrays.vs.take(firstIds)
+    inside = numpy.zeros(len(samples), bool)
+    active = numpy.arange(len(samples))
+    for triangle in range(int(sampleCounts.max()) - 2):
+        # The samples of the faces with this triangle.
+        active = active[sampleCounts[active] > triangle + 2]
+        secondIds = arrays.uvIds.take(sampleOffsets[active] + triangle + 1)
+        thirdIds = arrays.uvIds.take(sampleOffsets[active] + triangle + 2)
+        uA, vA = u0[active], v0[active]
+        uB, vB = arrays.us.take(secondIds), arrays.vs.take(secondIds)
+        uC, vC = arrays.us.take(thirdIds), arrays.vs.take(thirdIds)
+        signs = numpy.sign((uB - uA) * (vC - vA) - (uC - uA) * (vB - vA))
+        inTriangle = signs != 0
+        for startU, startV, endU, endV in ((uA, vA, uB, vB), (uB, vB, uC, vC), (uC, vC, uA, vA)):
+            inTriangle &= (
+                (endU - startU) * (pointVs[active] - startV) - (endV - startV) * (pointUs[active] - startU)
+            ) * signs > 0
+        inside[active[inTriangle]] = True
+    if(not inside.any()):
+        return numpy.zeros(0, numpy.int64)
+
+    # The points covered by several faces.
+    keys = keys[inside]
+    covered = _duplicated(keys)
+    shells = arrays.shellIds.take(arrays.uvIds.take(sampleOffsets[inside][covered]))
+    overlapCounts = numpy.bincount(shells, minlength=int(arrays.shellIds.max()) + 1)
+    return numpy.flatnonzero((overlapCounts >= OVERLAP_POINTS)[arrays.shellIds])
+
+
+# The checks, with the type of their components and whether they fail the validation.
+CHECKS = [
+    ("Non-manifold edges",          nonManifoldEdges,   "vtx",  True),
+    ("Lamina faces",                laminaFaces,        "f",    True),
+    ("Zero-area faces",             zeroAreaFaces,      "f",    True),
+    ("UVs outside UDIM tiles",      uvsOutsideTiles,    "map",  False),
+    ("Faces crossing UDIM tiles",   facesCrossingTiles, "f",    False),
+    ("Overlapping UV shells",       overlappingShells,  "map",  False),
+]
+
+# The checks needing the UVs of the mesh.
+_UV_CHECKS = (uvsOutsideTiles, facesCrossingTiles, overlappingShells)
+
+
+def checkArrays(mesh, arrays):
+    """ Run all the checks on the arrays of a mesh.
+
+    Args:
+        mesh    (str)           : The full path of the mesh.
+        arrays  (MeshArrays)    : The arrays of the mesh.
+
+    Returns:
+        list(MeshIssue)         : The issues found.
+    """
+    issues = []
+    for check, function, componentType, isError in CHECKS:
+        if(function in _UV_CHECKS and arrays.uvIds is None):
+            continue
+        indices = function(arrays)
+        if(len(indices) > 0):
+            issues.append(MeshIssue(check, mesh, componentType, indices, isError))
+    return issues
+
+
+class MeshValidation(HookBaseClass):
+    """
+    Hook validating the geometry of the meshes of a publish.
+    """
+
+    @property
+    def available(self):
+        """ bool: True if NumPy is available to run the checks. """
+        return numpy is not None
+
+    def validateHierarchy(self, root):
+        """ Validate the meshes under a node.
+
+        Args:
+            root    (str)   : The full path of the root node.
+
+        Returns:
+            list(MeshIssue) : The issues found.
+        """
+        return self.validateMeshes([root])
+
+    def validateMeshes(self, nodes):
+        """ Validate the meshes of nodes and of their descendants.
+
+        Args:
+            nodes   (list(str)) : The full paths of the meshes, or of their parents.
+
+        Returns:
+            list(MeshIssue)     : The issues found.
+        """
+        if(not self.available):
+            self.logger.warning("NumPy is not available, the geometry of {} is not validated.".format(", ".join(nodes)))
+            return []
+        # ls lists the whole scene when it is given no node.
+        if(not nodes):
+            return []
+
+        meshes = cmds.ls(nodes, dag=True, type="mesh", long=True, noIntermediate=True) or []
+
+        issues = []
+        for mesh in meshes:
+            issues.extend(checkArrays(mesh, MeshArrays.fromMesh(mesh)))
+        return issues
+
+    def validateItem(self, item, mode, lod=None):
+        """ Validate the meshes of the Maya object of a publish item, as set by the
+        Mesh Validation setting of its plugin.
+
+        Args:
+            item    (PublishItem)   : The item, or a child of the item, holding the Maya object.
+            mode    (str)           : error to fail the validation on the geometry errors,
+                                      warning to only log them, off to skip the checks.
+            lod     (str, optional) : HI, MI or LO to only validate the meshes of a LOD.
+
+        Raises:
+            Exception               : If the geometry is not valid and the mode is error.
+        """
+        mayaObject = None
+        while(item is not None and mayaObject is None):
+            mayaObject = item.properties.get("mayaObject")
+            item = item.parent
+        if(mayaObject is None):
+            self.logger.warning("No Maya object found for the item, its geometry is not validated.")
+            return
+
+        if(mode == MODE_OFF):
+            self.logger.debug("The mesh validation of {} is off.".format(mayaObject.fullname))
+            return
+        if(mode not in MODES):
+            self.logger.warning(
+                "Unknown mesh validation mode '{}', expected one of {}, using {}.".format(
+                    mode, ", ".join(MODES), MODE_ERROR
+                )
+            )
+            mode = MODE_ERROR
+
+        nodes = [mayaObject.fullname] if lod is None else getattr(mayaObject, "meshes" + lod)
+        if(not self.report(self.validateMeshes(nodes), asWarnings=mode == MODE_WARNING)):
+            errorMsg = "The geometry of {} is not valid.".format(mayaObject.fullname)
+            self.logger.error(errorMsg)
+            raise Exception(errorMsg)
+
+    def report(self, issues, asWarnings=False):
+        """ Log the issues, with a button selecting their components.
+
+        Args:
+            issues      (list(MeshIssue))   : The issues.
+            asWarnings  (bool, optional)    : True to log the errors as warnings, which
+                                              then do not fail the validation.
+
+        Returns:
+            bool                            : True if no issue fails the validation.
+        """
+        for issue in issues:
+            components = issue.components
+            extra = {
+                "action_button": {
+                    "label": "Select",
+                    "tooltip": "Select the offending components",
+                    "callback": lambda components=components: cmds.select(components, replace=True),
+                }
+            }
+            message = "{} {}".format(
+                issue.message,
+                " ".join(components[:_MAX_LOGGED_COMPONENTS]) + (" ..." if len(components) > _MAX_LOGGED_COMPONENTS else "")
+            )
+            if(issue.isError and not asWarnings):
+                self.logger.error(message, extra=extra)
+            else:
+                self.logger.warning(message, extra=extra)
+
+        return asWarnings or not any(issue.isError for issue in issues)
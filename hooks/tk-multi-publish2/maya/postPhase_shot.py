@@ -17,6 +17,12 @@ class PostPhaseShotHook(HookBaseClass):
     def post_publish(self, publish_tree):
         self.logger.debug("Executing post shot publish hook method...")
 
+        # Write the queued alembics before the scene is reloaded.
+        exportScheduler = self.parent.create_hook_instance(
+            "{config}/tk-multi-publish2/maya/alembic_export_scheduler.py"
+        )
+        exportScheduler.flush()
+
         # Check if the scene has unsaved changes.
         if(cmds.file(q=True, modified=True)):
             # Reload the scene.
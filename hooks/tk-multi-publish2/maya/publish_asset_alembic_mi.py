@@ -6,12 +6,13 @@ import sgtk
 
 from tank_vendor import six
 
-# Import the maya module of the P3D framework.
-P3Dfw = sgtk.platform.current_engine().frameworks["tk-framework-P3D"].import_module("maya")
-publihTools = P3Dfw.PublishTools()
-
 HookBaseClass = sgtk.get_hook_baseclass()
 
+# The maya module of the P3D framework, imported on first use.
+P3D = sgtk.platform.current_engine().create_hook_instance("{config}/common/p3d_framework.py")
+P3Dfw = P3D.module("maya")
+publihTools = P3D.tools("maya", "PublishTools")
+
 class MayaAssetAlembicMIPublishPlugin(HookBaseClass):
 
     def accept(self, settings, item):
@@ -35,26 +36,43 @@ class MayaAssetAlembicMIPublishPlugin(HookBaseClass):
             addFields={"lod":"mid"}
         )
 
+        # Check the geometry of the meshes of the LOD.
+        self.parent.create_hook_instance(
+            "{config}/tk-multi-publish2/maya/mesh_validation.py"
+        ).validateItem(item, settings[self.meshValidation].value, lod="MI")
+
         # run the base class validation
         return super(MayaAssetAlembicMIPublishPlugin, self).validate(settings, item)
 
     def publish(self, settings, item):
 
-        publihTools.hookPublishAlembicLODPublish(
-            self,
-            settings,
+        # Queue the alembic export, it is written with the other alembics of the publish.
+        with self.exportScheduler.deferExports(publihTools):
+            publihTools.hookPublishAlembicLODPublish(
+                self,
+                settings,
+                item,
+                "MI",
+                useFrameRange=False
+            )
+
+        # Reuse the previous publish of the LOD if its geometry did not change.
+        self.exportScheduler.reuseUnchanged(
             item,
-            "MI",
-            useFrameRange=False
+            self.parent.engine.get_template_by_name(settings[self.publishTemplate].value)
         )
 
-        # let the base class register the publish
+        # Let the base class register the publish once the alembic is written.
         super(MayaAssetAlembicMIPublishPlugin, self).publish(settings, item)
 
     @property
     def publishTemplate(self):
         return "Asset Alembic MI Publish Template"
 
+    @property
+    def meshValidation(self):
+        return "Mesh Validation"
+
     @property
     def propertiesPublishTemplate(self):
         return "asset_alembic_mi_publish_template"
@@ -79,7 +97,13 @@ class MayaAssetAlembicMIPublishPlugin(HookBaseClass):
                 "description": "Template path for published work files. Should"
                 "correspond to a template defined in "
                 "templates.yml.",
-            }      
+            },
+            self.meshValidation: {
+                "type": "str",
+                "default": "error",
+                "description": "How the geometry errors of the meshes are reported: error fails "
+                "the validation, warning only logs them, off skips the mesh checks.",
+            },
         }
 
         # update the base settings
@@ -12,14 +12,15 @@ import inspect
 
 from tank_vendor import six
 
-# Import the maya module of the P3D framework.
-P3Dfw = sgtk.platform.current_engine().frameworks["tk-framework-P3D"].import_module("maya")
-publihTools = P3Dfw.PublishTools()
-
 # Inherit from {self}/publish_file.py 
 # Check config.env.includes.settings.tk-multi-publish2.yml
 HookBaseClass = sgtk.get_hook_baseclass()
 
+# The maya module of the P3D framework, imported on first use.
+P3D = sgtk.platform.current_engine().create_hook_instance("{config}/common/p3d_framework.py")
+P3Dfw = P3D.module("maya")
+publihTools = P3D.tools("maya", "PublishTools")
+
 
 class MayaAssetScenePublishPlugin(HookBaseClass):
 
@@ -46,6 +47,11 @@ class MayaAssetScenePublishPlugin(HookBaseClass):
             self.propertiesPublishTemplate
         )
 
+        # Check the geometry of the asset meshes.
+        self.parent.create_hook_instance(
+            "{config}/tk-multi-publish2/maya/mesh_validation.py"
+        ).validateItem(item, settings[self.meshValidation].value)
+
         # run the base class validation
         return super(MayaAssetScenePublishPlugin, self).validate(settings, item)
 
@@ -67,6 +73,10 @@ class MayaAssetScenePublishPlugin(HookBaseClass):
     def publishTemplate(self):
         return "Publish Template"
 
+    @property
+    def meshValidation(self):
+        return "Mesh Validation"
+
     @property
     def propertiesPublishTemplate(self):
         return "publish_template"
@@ -91,7 +101,13 @@ class MayaAssetScenePublishPlugin(HookBaseClass):
                 "description": "Template path for published work files. Should"
                 "correspond to a template defined in "
                 "templates.yml.",
-            }
+            },
+            self.meshValidation: {
+                "type": "str",
+                "default": "error",
+                "description": "How the geometry errors of the meshes are reported: error fails "
+                "the validation, warning only logs them, off skips the mesh checks.",
+            },
         }
 
         # update the base settings
@@ -11,14 +11,15 @@ import inspect
 
 from tank_vendor import six
 
-# Import the maya module of the P3D framework.
-P3Dfw = sgtk.platform.current_engine().frameworks["tk-framework-P3D"].import_module("maya")
-publihTools = P3Dfw.PublishTools()
-
 # Inherit from {self}/publish_file.py 
 # Check config.env.includes.settings.tk-multi-publish2.yml
 HookBaseClass = sgtk.get_hook_baseclass()
 
+# The maya module of the P3D framework, imported on first use.
+P3D = sgtk.platform.current_engine().create_hook_instance("{config}/common/p3d_framework.py")
+P3Dfw = P3D.module("maya")
+publihTools = P3D.tools("maya", "PublishTools")
+
 
 class MayaShotEnvironmentDeformedAlembicPublishPlugin(HookBaseClass):
 
@@ -62,14 +63,16 @@ class MayaShotEnvironmentDeformedAlembicPublishPlugin(HookBaseClass):
 
     def publish(self, settings, item):
 
-        publihTools.hookPublishAlembicDeformationEnvironmentPublish(
-            self,
-            settings,
-            item,
-            useFrameRange=False
-        )
+        # Queue the alembic export, it is written with the other alembics of the publish.
+        with self.exportScheduler.deferExports(publihTools):
+            publihTools.hookPublishAlembicDeformationEnvironmentPublish(
+                self,
+                settings,
+                item,
+                useFrameRange=False
+            )
 
-        # let the base class register the publish
+        # Let the base class register the publish once the alembic is written.
         super(MayaShotEnvironmentDeformedAlembicPublishPlugin, self).publish(settings, item)
 
     @property
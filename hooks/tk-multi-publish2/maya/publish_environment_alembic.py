@@ -6,12 +6,13 @@ import sgtk
 
 from tank_vendor import six
 
-# Import the maya module of the P3D framework.
-P3Dfw = sgtk.platform.current_engine().frameworks["tk-framework-P3D"].import_module("maya")
-publihTools = P3Dfw.PublishTools()
-
 HookBaseClass = sgtk.get_hook_baseclass()
 
+# The maya module of the P3D framework, imported on first use.
+P3D = sgtk.platform.current_engine().create_hook_instance("{config}/common/p3d_framework.py")
+P3Dfw = P3D.module("maya")
+publihTools = P3D.tools("maya", "PublishTools")
+
 class MayaEnvironmentAlembicPublishPlugin(HookBaseClass):
 
     def accept(self, settings, item):
@@ -41,9 +42,44 @@ class MayaEnvironmentAlembicPublishPlugin(HookBaseClass):
         # Override the publish type.
         item.properties["publish_type"] = "Alembic Environment"
 
+        # Export the repeated assets once, the copies are listed in the instancing manifest.
+        if("collectedAssets" not in item.properties):
+            item.properties["collectedAssets"] = item.properties["assets"]
+        item.properties["assets"]           = item.properties["collectedAssets"]
+        item.properties["instanceGroups"]   = []
+        if(settings[self.instanceAssets].value):
+            self._validateInstancing(settings, item)
+
         # run the base class validation
         return super(MayaEnvironmentAlembicPublishPlugin, self).validate(settings, item)
 
+    def _validateInstancing(self, settings, item):
+        """ Only export one copy of the repeated assets of the environment.
+
+        Args:
+            settings    (dict)  : The plugin settings.
+            item        ()      : The item to publish.
+        """
+        instanceGroups, exportedAssets = self.environmentInstancing.group(item.properties["collectedAssets"])
+        if(not instanceGroups):
+            return
+
+        # The manifest has the fields of the alembic.
+        publishTemplate = item.properties[self.propertiesPublishTemplate]
+        manifestTemplate = self.parent.engine.get_template_by_name(settings[self.manifestTemplate].value)
+
+        item.properties["assets"]           = exportedAssets
+        item.properties["instanceGroups"]   = instanceGroups
+        item.properties["manifestPath"]     = manifestTemplate.apply_fields(
+            publishTemplate.validate_and_get_fields(item.properties["path"])
+        )
+
+        self.logger.info(
+            "{} assets are instances of {} prototypes, {} assets are exported.".format(
+                sum(len(group.copies) for group in instanceGroups), len(instanceGroups), len(exportedAssets)
+            )
+        )
+
     def publish(self, settings, item):
 
         self.logger.info("Environment Alembic Publish | publish")
@@ -59,10 +95,43 @@ class MayaEnvironmentAlembicPublishPlugin(HookBaseClass):
         # let the base class register the publish
         super(MayaEnvironmentAlembicPublishPlugin, self).publish(settings, item)
 
+        # Write and register the instancing manifest beside the alembic.
+        instanceGroups = item.properties.get("instanceGroups")
+        if(instanceGroups):
+            manifestPath = item.properties["manifestPath"]
+            self.environmentInstancing.write(manifestPath, item.properties["path"], instanceGroups)
+
+            manifestFields = self.parent.engine.get_template_by_name(
+                settings[self.manifestTemplate].value
+            ).get_fields(manifestPath)
+            sgtk.util.register_publish(
+                self.parent.sgtk,
+                item.context,
+                manifestPath,
+                os.path.basename(manifestPath),
+                manifestFields.get("version"),
+                published_file_type="Alembic Instances",
+                dependency_paths=[item.properties["path"]],
+            )
+
+    @property
+    def environmentInstancing(self):
+        return self.parent.create_hook_instance(
+            "{config}/tk-multi-publish2/maya/environment_instancing.py"
+        )
+
     @property
     def publishTemplate(self):
         return "Environment Alembic Publish Template"
 
+    @property
+    def manifestTemplate(self):
+        return "Instancing Manifest Template"
+
+    @property
+    def instanceAssets(self):
+        return "Instance Assets"
+
     @property
     def propertiesPublishTemplate(self):
         return "environment_alembic_publish_template"
@@ -87,7 +156,20 @@ class MayaEnvironmentAlembicPublishPlugin(HookBaseClass):
                 "description": "Template path for published work files. Should"
                 "correspond to a template defined in "
                 "templates.yml.",
-            }
+            },
+            self.manifestTemplate : {
+                "type": "template",
+                "default": None,
+                "description": "Template path for the instancing manifest listing the "
+                "copies of the repeated assets. Should correspond to a template defined in "
+                "templates.yml.",
+            },
+            self.instanceAssets : {
+                "type": "bool",
+                "default": False,
+                "description": "Export the geometry of the repeated assets once, their "
+                "copies are listed in the instancing manifest.",
+            },
         }
 
         # update the base settings
@@ -11,14 +11,15 @@ import inspect
 
 from tank_vendor import six
 
-# Import the maya module of the P3D framework.
-P3Dfw = sgtk.platform.current_engine().frameworks["tk-framework-P3D"].import_module("maya")
-publihTools = P3Dfw.PublishTools()
-
 # Inherit from {self}/publish_file.py 
 # Check config.env.includes.settings.tk-multi-publish2.yml
 HookBaseClass = sgtk.get_hook_baseclass()
 
+# The maya module of the P3D framework, imported on first use.
+P3D = sgtk.platform.current_engine().create_hook_instance("{config}/common/p3d_framework.py")
+P3Dfw = P3D.module("maya")
+publihTools = P3D.tools("maya", "PublishTools")
+
 
 class MayaShotAssetInstanceAlembicPublishPlugin(HookBaseClass):
 
@@ -48,26 +49,94 @@ class MayaShotAssetInstanceAlembicPublishPlugin(HookBaseClass):
             }
         )
 
+        # Publish a transform track referencing the asset alembic when the instance does not deform.
+        item.properties["transformTrack"] = None
+        if(settings[self.referenceInstances].value):
+            self._validateReference(settings, item, mayaObject)
+
         # run the base class validation
         return super(MayaShotAssetInstanceAlembicPublishPlugin, self).validate(settings, item)
 
 
-    def publish(self, settings, item):
+    def _validateReference(self, settings, item, mayaObject):
+        """ Switch the publish of an instance to a transform track if it does not deform.
 
-        publihTools.hookPublishAlembicAnimationPublish(
-            self,
-            settings,
-            item,
-            useFrameRange   = True
-        )
+        Args:
+            settings    (dict)  : The plugin settings.
+            item        ()      : The item to publish.
+            mayaObject  ()      : The asset instance.
+        """
+        startFrame, endFrame = publihTools.getSceneFrameRange()
+        assetPath, kind = self.instanceReference.referenceable(mayaObject.fullname, startFrame, endFrame)
+        if(not assetPath):
+            self.logger.info("The geometry of {} is baked, {}.".format(mayaObject.name, kind))
+            return
+
+        # The track has the fields of the alembic it replaces.
+        publishTemplate = item.properties[self.propertiesPublishTemplate]
+        trackTemplate = self.parent.engine.get_template_by_name(settings[self.trackTemplate].value)
+        fields = publishTemplate.validate_and_get_fields(item.properties["path"])
 
-        # let the base class register the publish
+        item.properties["path"]                         = trackTemplate.apply_fields(fields)
+        item.properties[self.propertiesPublishTemplate] = trackTemplate
+        item.properties["publish_type"]                 = "Transform Track"
+        item.properties["publish_dependencies"]         = [assetPath]
+        item.properties["transformTrack"]               = {"asset": assetPath, "motion": kind}
+
+        self.logger.info("{} is {}, it references {}.".format(mayaObject.name, kind, assetPath))
+
+    def publish(self, settings, item):
+
+        # Write the transform track instead of the alembic.
+        transformTrack = item.properties.get("transformTrack")
+        if(transformTrack):
+            mayaObject = publihTools.getItemProperty(item, "mayaObject")
+            startFrame, endFrame = publihTools.getSceneFrameRange()
+            self.instanceReference.write(
+                item.properties["path"],
+                [
+                    self.instanceReference.track(
+                        mayaObject.fullname,
+                        transformTrack["asset"],
+                        transformTrack["motion"],
+                        startFrame,
+                        endFrame
+                    )
+                ]
+            )
+            super(MayaShotAssetInstanceAlembicPublishPlugin, self).publish(settings, item)
+            return
+
+        # Queue the alembic export, it is written with the other alembics of the publish.
+        with self.exportScheduler.deferExports(publihTools):
+            publihTools.hookPublishAlembicAnimationPublish(
+                self,
+                settings,
+                item,
+                useFrameRange   = True
+            )
+
+        # Let the base class register the publish once the alembic is written.
         super(MayaShotAssetInstanceAlembicPublishPlugin, self).publish(settings, item)
 
+    @property
+    def instanceReference(self):
+        return self.parent.create_hook_instance(
+            "{config}/tk-multi-publish2/maya/instance_reference.py"
+        )
+
     @property
     def publishTemplate(self):
         return "Publish Template"
 
+    @property
+    def trackTemplate(self):
+        return "Transform Track Template"
+
+    @property
+    def referenceInstances(self):
+        return "Reference Instances"
+
     @property
     def propertiesPublishTemplate(self):
         return "publish_template"
@@ -92,7 +161,21 @@ class MayaShotAssetInstanceAlembicPublishPlugin(HookBaseClass):
                 "description": "Template path for published work files. Should"
                 "correspond to a template defined in "
                 "templates.yml.",
-            }
+            },
+            self.trackTemplate : {
+                "type": "template",
+                "default": None,
+                "description": "Template path for the transform tracks of the instances "
+                "that do not deform. Should correspond to a template defined in "
+                "templates.yml.",
+            },
+            self.referenceInstances : {
+                "type": "bool",
+                "default": False,
+                "description": "Publish the instances that do not deform as a transform "
+                "track referencing the published asset alembic, instead of baking "
+                "their geometry.",
+            },
         }
 
         # update the base settings
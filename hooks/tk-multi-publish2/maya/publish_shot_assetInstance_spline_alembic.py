@@ -6,19 +6,201 @@ Need to add the hook python file in the config.env.includes.settings.tk-multi-pu
 import os
 import maya.cmds as cmds
 import maya.mel as mel
+import maya.api.OpenMaya as om
+import maya.api.OpenMayaAnim as oma
 import sgtk
 import inspect
 
 from tank_vendor import six
 
-# Import the maya module of the P3D framework.
-P3Dfw = sgtk.platform.current_engine().frameworks["tk-framework-P3D"].import_module("maya")
-publihTools = P3Dfw.PublishTools()
-
 # Inherit from {self}/publish_file.py 
 # Check config.env.includes.settings.tk-multi-publish2.yml
 HookBaseClass = sgtk.get_hook_baseclass()
 
+# The maya module of the P3D framework, imported on first use.
+P3D = sgtk.platform.current_engine().create_hook_instance("{config}/common/p3d_framework.py")
+P3Dfw = P3D.module("maya")
+publihTools = P3D.tools("maya", "PublishTools")
+
+# The anim curves driven by time, the only ones the spline engine rekeys.
+_TIME_CURVE_TYPES = (
+    om.MFn.kAnimCurveTimeToAngular,
+    om.MFn.kAnimCurveTimeToDistance,
+    om.MFn.kAnimCurveTimeToUnitless,
+    om.MFn.kAnimCurveTimeToTime,
+)
+
+# The number of decimals used to compare the key times.
+_TIME_PRECISION = 6
+
+
+class SplineRekeyEngine(object):
+    """
+    Key every keyable attribute of the controllers on every keyed frame, as
+    the publish did by moving the current time to each keyed frame and
+    setting a stepped key on each controller.
+
+    A key set at a frame with a step out tangent holds its value up to the
+    next key, so the key added on a curve at a frame it had no key at takes
+    the value of the curve key before it, or the value of the curve itself
+    before its first key. The engine reads the curves once, computes these
+    values and adds all the keys of a curve in one call, without evaluating
+    the scene at each frame.
+
+    The controllers with an attribute the engine can not compute exactly,
+    driven by a constraint, an animation layer, a driven key or with a
+    post infinity that is not constant, are keyed frame by frame as before.
+    """
+
+    def __init__(self, controllers, keyedFrames):
+        """
+        Args:
+            controllers (list(str))     : The full path of the controllers.
+            keyedFrames (list(float))   : The keyed frames, sorted.
+        """
+        self.controllers    = controllers
+        self.keyedFrames    = keyedFrames
+        self.uiUnit         = om.MTime.uiUnit()
+
+        # The anim curves function sets and the unanimated attributes to key.
+        self.curves         = []
+        self.staticPlugs    = []
+        # The controllers keyed frame by frame.
+        self.fallback       = []
+
+        for controller in controllers:
+            curves, staticPlugs = self._readController(controller)
+            if(curves is None):
+                self.fallback.append(controller)
+            else:
+                self.curves.extend(curves)
+                self.staticPlugs.extend(staticPlugs)
+
+    def _readController(self, controller):
+        """ Get the anim curves and the unanimated attributes of a controller.
+
+        Args:
+            controller  (str)   : The full path of the controller.
+
+        Returns:
+            list(:class:`oma.MFnAnimCurve`), list(str)  : The anim curves and the unanimated plugs,
+                                                          None if the controller must be keyed frame by frame.
+        """
+        curves      = []
+        staticPlugs = []
+
+        # setKeyframe also keys the keyable attributes of the shapes.
+        nodes = [controller] + (cmds.listRelatives(controller, shapes=True, fullPath=True) or [])
+        for node in nodes:
+            for attribute in cmds.listAttr(node, keyable=True) or []:
+                plugName = "{}.{}".format(node, attribute)
+                selection = om.MSelectionList()
+                try:
+                    selection.add(plugName)
+                    plug = selection.getPlug(0)
+                except RuntimeError:
+                    return None, None
+
+                # setKeyframe skips the locked attributes.
+                if(plug.isLocked):
+                    continue
+
+                if(plug.isChild and plug.parent().isDestination):
+                    return None, None
+
+                sources = plug.connectedTo(True, False)
+                if(not sources):
+                    staticPlugs.append(plugName)
+                    continue
+
+                sourceNode = sources[0].node()
+                if(sourceNode.apiType() not in _TIME_CURVE_TYPES):
+                    return None, None
+
+                curve = oma.MFnAnimCurve(sourceNode)
+                # Past the last key the stepped keys follow the post infinity.
+                if(curve.postInfinityType != oma.MFnAnimCurve.kConstant):
+                    lastTime = curve.input(curve.numKeys - 1).asUnits(self.uiUnit) if curve.numKeys else None
+                    if(lastTime is None or self.keyedFrames[-1] > lastTime):
+                        return None, None
+                curves.append(curve)
+
+        return curves, staticPlugs
+
+    def _steppedKeys(self, curve):
+        """ Get the keys to add to a curve.
+
+        Args:
+            curve   (:class:`oma.MFnAnimCurve`) : The anim curve.
+
+        Returns:
+            list(:class:`om.MTime`), list(float)    : The times and values of the keys.
+        """
+        keyValues = {}
+        for index in range(curve.numKeys):
+            keyTime = round(curve.input(index).asUnits(self.uiUnit), _TIME_PRECISION)
+            keyValues[keyTime] = curve.value(index)
+
+        times   = []
+        values  = []
+        value   = None
+        for frame in self.keyedFrames:
+            keyTime = round(frame, _TIME_PRECISION)
+            if(keyTime in keyValues):
+                value = keyValues[keyTime]
+                continue
+
+            time = om.MTime(frame, self.uiUnit)
+            # Before the first key the curve is not modified yet.
+            if(value is None):
+                value = curve.evaluate(time)
+            times.append(time)
+            values.append(value)
+
+        return times, values
+
+    def run(self):
+        """ Key the controllers on every keyed frame.
+
+        Returns:
+            int     : The number of keys added by the engine.
+        """
+        keyCount = 0
+
+        # Add the stepped keys of each animated attribute in one call.
+        for curve in self.curves:
+            times, values = self._steppedKeys(curve)
+            if(times):
+                curve.addKeys(
+                    times,
+                    values,
+                    oma.MFnAnimCurve.kTangentClamped,
+                    oma.MFnAnimCurve.kTangentStep,
+                    True
+                )
+                keyCount += len(times)
+
+        # The unanimated attributes keep their value on every frame.
+        if(self.staticPlugs):
+            cmds.setKeyframe(
+                self.staticPlugs,
+                time=self.keyedFrames,
+                inTangentType='clamped',
+                outTangentType='step'
+            )
+            keyCount += len(self.staticPlugs) * len(self.keyedFrames)
+
+        # Key the other controllers frame by frame.
+        if(self.fallback):
+            currentTime = cmds.currentTime(query=True)
+            for frame in self.keyedFrames:
+                cmds.currentTime(frame)
+                for controller in self.fallback:
+                    cmds.setKeyframe(controller, time=frame, inTangentType='clamped', outTangentType='step')
+            cmds.currentTime(currentTime)
+
+        return keyCount
+
 
 class MayaShotAssetInstanceSplineAlembicPublishPlugin(HookBaseClass):
 
@@ -93,14 +275,20 @@ class MayaShotAssetInstanceSplineAlembicPublishPlugin(HookBaseClass):
             self.logger.error(errorMsg)
             raise Exception(errorMsg)
 
-        # Loop through the keyed frames.
-        for frame in keyedFrames:
-            # Set the current time.
-            cmds.currentTime(frame)
-            # Loop through the controllers.
-            for controller in controllers:
-                # Key every attributes with a step tangent.
-                cmds.setKeyframe(controller, time=frame, inTangentType='clamped', outTangentType='step')
+        # Write the queued alembics before the controllers are rekeyed, they
+        # export the animation of the scene as it was collected.
+        self.parent.create_hook_instance(
+            "{config}/tk-multi-publish2/maya/alembic_export_scheduler.py"
+        ).flush()
+
+        # Key every attributes of the controllers on every keyed frame with a step tangent.
+        rekeyEngine = SplineRekeyEngine(controllers, keyedFrames)
+        keyCount = rekeyEngine.run()
+        self.logger.debug(
+            "Added {} keys on {} controllers, {} keyed frame by frame.".format(
+                keyCount, len(controllers), len(rekeyEngine.fallback)
+            )
+        )
 
         # Set the tangents.
         cmds.keyTangent(controllers, inTangentType='auto', outTangentType='auto', time=(None,None))
@@ -6,12 +6,13 @@ import  sgtk
 
 from    tank_vendor     import  six
 
-# Import the maya module of the P3D framework.
-P3Dfw = sgtk.platform.current_engine().frameworks["tk-framework-P3D"].import_module("maya")
-publihTools = P3Dfw.PublishTools()
-
 HookBaseClass = sgtk.get_hook_baseclass()
 
+# The maya module of the P3D framework, imported on first use.
+P3D = sgtk.platform.current_engine().create_hook_instance("{config}/common/p3d_framework.py")
+P3Dfw = P3D.module("maya")
+publihTools = P3D.tools("maya", "PublishTools")
+
 class MayaShotCameraAlembicPublishPlugin(HookBaseClass):
 
     def accept(self, settings, item):
@@ -73,17 +74,18 @@ class MayaShotCameraAlembicPublishPlugin(HookBaseClass):
         # Get the scene start and end frame.
         startFrame, endFrame = publihTools.getSceneFrameRange()
 
-        # Export the alembic.
-        publihTools.exportAlembic(
-            [cameraParent],
-            startFrame,
-            endFrame,
-            publish_path,
-            exportABCVersion    = 1,
-            spaceType           = "world"
-        )
-
-        # Let the base class register the publish
+        # Queue the alembic export, it is written with the other alembics of the publish.
+        with self.exportScheduler.deferExports(publihTools):
+            publihTools.exportAlembic(
+                [cameraParent],
+                startFrame,
+                endFrame,
+                publish_path,
+                exportABCVersion    = 1,
+                spaceType           = "world"
+            )
+
+        # Let the base class register the publish once the alembic is written.
         super(MayaShotCameraAlembicPublishPlugin, self).publish(settings, item)
 
     @property
@@ -6,12 +6,13 @@ import sgtk
 
 from tank_vendor import six
 
-# Import the maya module of the P3D framework.
-P3Dfw = sgtk.platform.current_engine().frameworks["tk-framework-P3D"].import_module("maya")
-publihTools = P3Dfw.PublishTools()
-
 HookBaseClass = sgtk.get_hook_baseclass()
 
+# The maya module of the P3D framework, imported on first use.
+P3D = sgtk.platform.current_engine().create_hook_instance("{config}/common/p3d_framework.py")
+P3Dfw = P3D.module("maya")
+publihTools = P3D.tools("maya", "PublishTools")
+
 class MayaShotEnvironmentAnimatedAlembicPublishPlugin(HookBaseClass):
 
     def accept(self, settings, item):
@@ -67,13 +68,110 @@ class MayaShotEnvironmentAnimatedAlembicPublishPlugin(HookBaseClass):
         # Override the publish type.
         item.properties["publish_type"] = "Alembic Environment"
 
+        # Publish transform tracks referencing the asset alembics of the assets that do not deform.
+        item.properties["transformTracks"] = []
+        item.properties["animatedAssets"] = item.parent.properties["animatedAssets"]
+        if(settings[self.referenceInstances].value):
+            self._validateReferences(settings, item)
+
         # run the base class validation
         return super(MayaShotEnvironmentAnimatedAlembicPublishPlugin, self).validate(settings, item)
 
+    def _validateReferences(self, settings, item):
+        """ Split the animated assets between the transform tracks and the baked alembic.
+
+        Args:
+            settings    (dict)  : The plugin settings.
+            item        ()      : The item to publish.
+        """
+        startFrame, endFrame = publihTools.getSceneFrameRange()
+
+        # The assets collected for the environment.
+        transformTracks = []
+        bakedAssets = []
+        for asset in item.parent.properties["animatedAssets"]:
+            assetPath, kind = self.instanceReference.referenceable(asset.fullname, startFrame, endFrame)
+            if(assetPath):
+                transformTracks.append({"root": asset.fullname, "asset": assetPath, "motion": kind})
+            else:
+                self.logger.debug("The geometry of {} is baked, {}.".format(asset.fullname, kind))
+                bakedAssets.append(asset)
+
+        if(not transformTracks):
+            return
+
+        # The tracks have the fields of the alembic.
+        publishTemplate = item.properties[self.propertiesPublishTemplate]
+        trackTemplate = self.parent.engine.get_template_by_name(settings[self.trackTemplate].value)
+        trackPath = trackTemplate.apply_fields(publishTemplate.validate_and_get_fields(item.properties["path"]))
+
+        item.properties["transformTracks"]      = transformTracks
+        item.properties["transformTracksPath"]  = trackPath
+
+        # The alembic only holds the baked assets.
+        if(bakedAssets):
+            item.properties["animatedAssets"] = bakedAssets
+
+        # Only the tracks are published when no asset is baked.
+        else:
+            item.properties["path"]                         = trackPath
+            item.properties[self.propertiesPublishTemplate] = trackTemplate
+            item.properties["publish_type"]                 = "Transform Track"
+            item.properties["publish_dependencies"]         = sorted(set(track["asset"] for track in transformTracks))
+
+        self.logger.info(
+            "{} animated assets reference their asset alembic, {} are baked.".format(
+                len(transformTracks), len(bakedAssets)
+            )
+        )
+
+    def _publishTracks(self, settings, item):
+        """ Write the transform tracks of the animated assets that do not deform.
+
+        The tracks are registered beside the alembic of the baked assets.
+
+        Args:
+            settings    (dict)  : The plugin settings.
+            item        ()      : The item to publish.
+
+        Returns:
+            bool                : True if the tracks are the publish of the item.
+        """
+        startFrame, endFrame = publihTools.getSceneFrameRange()
+        transformTracks = item.properties["transformTracks"]
+        trackPath = item.properties["transformTracksPath"]
+
+        self.instanceReference.write(
+            trackPath,
+            [
+                self.instanceReference.track(track["root"], track["asset"], track["motion"], startFrame, endFrame)
+                for track in transformTracks
+            ]
+        )
+        if(trackPath == item.properties["path"]):
+            return True
+
+        trackFields = self.parent.engine.get_template_by_name(settings[self.trackTemplate].value).get_fields(trackPath)
+        sgtk.util.register_publish(
+            self.parent.sgtk,
+            item.context,
+            trackPath,
+            os.path.basename(trackPath),
+            trackFields.get("version"),
+            published_file_type="Transform Track",
+            dependency_paths=sorted(set(track["asset"] for track in transformTracks)),
+        )
+        return False
+
     def publish(self, settings, item):
 
         self.logger.info("Shot Environment Alembic Publish | publish")
 
+        # Write the transform tracks, the publish of the item when no asset is baked.
+        if(item.properties.get("transformTracks") and self._publishTracks(settings, item)):
+            super(MayaShotEnvironmentAnimatedAlembicPublishPlugin, self).publish(settings, item)
+            return
+
         publihTools.hookPublishAlembicAnimationEnvironmentPublish(
             self,
             settings,
@@ -84,10 +182,24 @@ class MayaShotEnvironmentAnimatedAlembicPublishPlugin(HookBaseClass):
         # let the base class register the publish
         super(MayaShotEnvironmentAnimatedAlembicPublishPlugin, self).publish(settings, item)
 
+    @property
+    def instanceReference(self):
+        return self.parent.create_hook_instance(
+            "{config}/tk-multi-publish2/maya/instance_reference.py"
+        )
+
     @property
     def publishTemplate(self):
         return "Publish Template"
 
+    @property
+    def trackTemplate(self):
+        return "Transform Track Template"
+
+    @property
+    def referenceInstances(self):
+        return "Reference Instances"
+
     @property
     def propertiesPublishTemplate(self):
         return "publish_template"
@@ -113,7 +225,21 @@ class MayaShotEnvironmentAnimatedAlembicPublishPlugin(HookBaseClass):
                 "description": "Template path for published work files. Should"
                 "correspond to a template defined in "
                 "templates.yml.",
-            }
+            },
+            self.trackTemplate : {
+                "type": "template",
+                "default": None,
+                "description": "Template path for the transform tracks of the animated "
+                "assets that do not deform. Should correspond to a template defined in "
+                "templates.yml.",
+            },
+            self.referenceInstances : {
+                "type": "bool",
+                "default": False,
+                "description": "Publish the animated assets that do not deform as transform "
+                "tracks referencing their published asset alembic, instead of baking "
+                "their geometry.",
+            },
         }
 
         # update the base settings
@@ -11,14 +11,15 @@ import inspect
 
 from tank_vendor import six
 
-# Import the maya module of the P3D framework.
-P3Dfw = sgtk.platform.current_engine().frameworks["tk-framework-P3D"].import_module("maya")
-publihTools = P3Dfw.PublishTools()
-
 # Inherit from {self}/publish_file.py 
 # Check config.env.includes.settings.tk-multi-publish2.yml
 HookBaseClass = sgtk.get_hook_baseclass()
 
+# The maya module of the P3D framework, imported on first use.
+P3D = sgtk.platform.current_engine().create_hook_instance("{config}/common/p3d_framework.py")
+P3Dfw = P3D.module("maya")
+publihTools = P3D.tools("maya", "PublishTools")
+
 
 class MayaPlayblastReviewPlugin(HookBaseClass):
     ''' Plugin for sending maya playblast to shotgrid for review.
@@ -53,11 +54,24 @@ class MayaPlayblastReviewPlugin(HookBaseClass):
 
     def publish(self, settings, item):
 
-        publihTools.hookUploadReviewPublish(
-            self,
-            settings,
-            item
+        reviewUploadQueue = self.parent.create_hook_instance(
+            "{config}/tk-multi-publish2/review_upload_queue.py"
         )
+        if(not reviewUploadQueue.enabled):
+            publihTools.hookUploadReviewPublish(
+                self,
+                settings,
+                item
+            )
+            return
+
+        # Create the version right away and upload the movie in the background.
+        with reviewUploadQueue.capture(self.parent.shotgun, self.parent.engine.shotgun):
+            publihTools.hookUploadReviewPublish(
+                self,
+                settings,
+                item
+            )
 
     def finalize(self, settings, item):
         ''' Execute the finalization pass. This pass executes once all the publish
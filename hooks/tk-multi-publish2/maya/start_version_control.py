@@ -93,6 +93,13 @@ class MayaStartVersionControlPlugin(HookBaseClass):
         """
         return {}
 
+    @property
+    def filePromotion(self):
+        """ :class:`FilePromotion`: The shared promotion of the saved files. """
+        if(not hasattr(self, "_filePromotion")):
+            self._filePromotion = self.parent.create_hook_instance("{config}/common/file_promotion.py")
+        return self._filePromotion
+
     def accept(self, settings, item):
         """
         Method called by the publisher to determine if an item is of any
@@ -205,14 +212,14 @@ class MayaStartVersionControlPlugin(HookBaseClass):
         # are appropriate for current os, no double separators, etc.
         path = sgtk.util.ShotgunPath.normalize(_session_path())
 
-        # ensure the session is saved in its current state
-        _save_session(path)
-
         # get the path to a versioned copy of the file.
         version_path = publisher.util.get_version_path(path, "v001")
 
-        # save to the new version path
+        # save the session once, to the new version path
         _save_session(version_path)
+
+        # and promote the saved file to keep the current path in its current state
+        self.filePromotion.promote(version_path, path)
         self.logger.info("A version number has been added to the Maya file...")
         self.logger.info("  Maya file path: %s" % (version_path,))
 
@@ -249,9 +256,12 @@ class MayaStartVersionControlPlugin(HookBaseClass):
 
         work_template = item.properties.get("work_template")
         if work_template:
-            if work_template.validate(path):
+            # Match the path with the template index, parsing it only once.
+            template_index = publisher.create_hook_instance("{config}/common/template_index.py")
+            matches = template_index.matches(path, [work_template.name])
+            if matches:
                 self.logger.debug("Using work template to determine version number.")
-                work_fields = work_template.get_fields(path)
+                work_fields = matches[0][1]
                 if "version" in work_fields:
                     version_number = work_fields.get("version")
             else:
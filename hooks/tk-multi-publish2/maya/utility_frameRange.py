@@ -6,12 +6,13 @@ import sgtk
 
 from tank_vendor import six
 
-# Import the maya module of the P3D framework.
-P3Dfw = sgtk.platform.current_engine().frameworks["tk-framework-P3D"].import_module("maya")
-publihTools = P3Dfw.PublishTools()
-
 HookBaseClass = sgtk.get_hook_baseclass()
 
+# The maya module of the P3D framework, imported on first use.
+P3D = sgtk.platform.current_engine().create_hook_instance("{config}/common/p3d_framework.py")
+P3Dfw = P3D.module("maya")
+publihTools = P3D.tools("maya", "PublishTools")
+
 class MayaSaveUtilityPublishPlugin(HookBaseClass):
 
     def accept(self, settings, item):
@@ -25,12 +26,8 @@ class MayaSaveUtilityPublishPlugin(HookBaseClass):
         # Get the current entity.
         entity = context.entity
 
-        # Get the shotgrid api.
-        sg = engine.shotgun
-        # Get the cut_in and cut_out of the current task.
-        filter = [["id", "is", entity["id"]]]
-        fields = ["sg_cut_in", "sg_cut_out"]
-        entityData = sg.find_one("Shot", filter, fields)
+        # Get the cut_in and cut_out of the current entity from the shared cache.
+        entityData = self.cutRangeCache.getCutRange(entity)
 
         # Check if the entity exist.
         if(not entityData):
@@ -55,12 +52,8 @@ class MayaSaveUtilityPublishPlugin(HookBaseClass):
         # Get the current entity.
         entity = context.entity
 
-        # Get the shotgrid api.
-        sg = engine.shotgun
-        # Get the cut_in and cut_out of the current task.
-        filter = [["id", "is", entity["id"]]]
-        fields = ["sg_cut_in", "sg_cut_out"]
-        entityData = sg.find_one("Shot", filter, fields)
+        # Get the cut_in and cut_out of the current entity from the shared cache.
+        entityData = self.cutRangeCache.getCutRange(entity)
 
         # Check if the entity exist.
         if(not entityData):
@@ -85,12 +78,8 @@ class MayaSaveUtilityPublishPlugin(HookBaseClass):
         # Get the current entity.
         entity = context.entity
 
-        # Get the shotgrid api.
-        sg = engine.shotgun
-        # Get the cut_in and cut_out of the current task.
-        filter = [["id", "is", entity["id"]]]
-        fields = ["sg_cut_in", "sg_cut_out"]
-        entityData = sg.find_one("Shot", filter, fields)
+        # Get the cut_in and cut_out of the current entity from the shared cache.
+        entityData = self.cutRangeCache.getCutRange(entity)
 
         in_frame = entityData["sg_cut_in"]
         out_frame = entityData["sg_cut_out"]
@@ -110,6 +99,10 @@ class MayaSaveUtilityPublishPlugin(HookBaseClass):
     def finalize(self, settings, item):
         return None        
 
+    @property
+    def cutRangeCache(self):
+        return self.parent.create_hook_instance("{config}/common/cut_range_cache.py")
+
     @property
     def description(self):
         return """
@@ -0,0 +1,369 @@
+"""
+Shared queue registering the publishes of a session in batched requests.
+
+Each publish plugin registers its PublishedFile when it is published, with
+a request for the publish type, one for the publish and one for its
+dependencies. When the batch registration is enabled, the registrations of
+the publish pass are queued instead and committed at the start of the
+finalize pass: the publishes are created in a single ``sg.batch()`` call and
+their dependencies in a second one, linked to the publishes of the queue
+they refer to.
+
+The plugins registering their publishes later than their publish method,
+like the alembic plugins waiting for their exports, add a callback run by
+the commit before the queue is sent, so their registrations are queued too.
+The queued publishes have no id until the commit.
+
+The batch registration is enabled by setting the ``P3D_PUBLISH_BATCH_REGISTER``
+environment variable to 1. The registrations are queued by the
+``batch_register_plugin.py`` hook, appended to the publish plugin hook
+chains. Load the queue from any hook with::
+
+    self.parent.create_hook_instance("{config}/tk-multi-publish2/publish_registration_queue.py")
+"""
+
+import collections
+import contextlib
+import os
+import threading
+import time
+
+import sgtk
+
+HookBaseClass = sgtk.get_hook_baseclass()
+
+# The environment variable enabling the batch registration.
+BATCH_REGISTER_ENV = "P3D_PUBLISH_BATCH_REGISTER"
+
+# The arguments of register_publish sent in later requests than the publish creation.
+_DEFERRED_ARGS = (
+    "published_file_type",
+    "dependency_paths",
+    "dependency_ids",
+    "thumbnail_path",
+    "update_entity_thumbnail",
+    "update_task_thumbnail",
+)
+
+# The queued registrations, shared by every hook of the session.
+_LOCK           = threading.Lock()
+_QUEUE          = []
+# The callbacks run before the next commit, by name.
+_BEFORE_COMMIT  = collections.OrderedDict()
+# The register_publish function of toolkit while a registration is captured,
+# and the number of nested captures.
+_REGISTER       = [None]
+_CAPTURES       = [0]
+
+
+def _normalizePath(path):
+    """ Get the key of a path to match the dependencies with the queued publishes. """
+    return os.path.normcase(os.path.normpath(path))
+
+
+class QueuedRegistration(object):
+    """
+    A publish registration waiting for the commit of the queue.
+    """
+
+    def __init__(self, arguments):
+        """
+        Args:
+            arguments   (dict)  : The arguments of the register_publish call.
+        """
+        self.arguments      = arguments
+        # The publish data returned to the plugin, updated in place once created.
+        self.publishData    = {
+            "type"              : "PublishedFile",
+            "id"                : None,
+            "code"              : os.path.basename(arguments["path"]),
+            "name"              : arguments["name"],
+            "version_number"    : arguments["version_number"],
+            "path"              : {"local_path": arguments["path"]},
+        }
+
+    @property
+    def path(self):
+        """ str: The path of the publish. """
+        return self.arguments["path"]
+
+
+class PublishRegistrationQueue(HookBaseClass):
+    """
+    Hook queuing the publish registrations and committing them in batches.
+    """
+
+    @property
+    def enabled(self):
+        """ bool: True if the batch registration is enabled. """
+        return os.environ.get(BATCH_REGISTER_ENV, "0") not in ("", "0")
+
+    @property
+    def pending(self):
+        """ int: The number of queued registrations. """
+        with _LOCK:
+            return len(_QUEUE)
+
+    def clear(self):
+        """ Forget the queued registrations, e.g. of a publish which failed. """
+        with _LOCK:
+            if(_QUEUE):
+                self.logger.warning("Dropped {} registrations of a previous publish.".format(len(_QUEUE)))
+            del _QUEUE[:]
+            _BEFORE_COMMIT.clear()
+
+    def beforeCommit(self, name, callback):
+        """ Run a callback before the next commit, e.g. to register the publishes deferred by a plugin.
+
+        The registrations done by the callback must be captured, see :meth:`capture`.
+
+        Args:
+            name        (str)       : The name of the callback, a callback replaces the one of the same name.
+            callback    (callable)  : The function to call.
+        """
+        with _LOCK:
+            _BEFORE_COMMIT[name] = callback
+
+    def _queueRegistration(self, **arguments):
+        """ Queue a publish registration, in place of sgtk.util.register_publish.
+
+        Returns:
+            dict    : The publish data, whose id is None until the queue is committed.
+        """
+        with _LOCK:
+            registration = QueuedRegistration(arguments)
+            _QUEUE.append(registration)
+        self.logger.debug("Queued the registration of {}.".format(registration.path))
+        return registration.publishData
+
+    @contextlib.contextmanager
+    def capture(self):
+        """ Queue the registrations done by sgtk.util.register_publish in the context.
+
+        The captures can be nested, e.g. for the deferred registrations run by a publish.
+        """
+        with _LOCK:
+            if(_CAPTURES[0] == 0):
+                _REGISTER[0] = sgtk.util.register_publish
+                sgtk.util.register_publish = self._queueRegistration
+            _CAPTURES[0] += 1
+        try:
+            yield
+        finally:
+            with _LOCK:
+                _CAPTURES[0] -= 1
+                if(_CAPTURES[0] == 0):
+                    sgtk.util.register_publish = _REGISTER[0]
+                    _REGISTER[0] = None
+
+    def commit(self):
+        """ Register the queued publishes in batched requests.
+
+        Returns:
+            list(dict)  : The created publishes.
+        """
+        # Queue the deferred registrations first.
+        with _LOCK:
+            callbacks = list(_BEFORE_COMMIT.values())
+            _BEFORE_COMMIT.clear()
+        for callback in callbacks:
+            callback()
+
+        with _LOCK:
+            registrations = list(_QUEUE)
+            del _QUEUE[:]
+        if(not registrations):
+            return []
+
+        startTime = time.time()
+        tk = registrations[0].arguments["tk"]
+        shotgun = tk.shotgun
+        publishEntityType = sgtk.util.get_published_file_entity_type(tk)
+
+        if(publishEntityType != "PublishedFile"):
+            # The legacy publish entities are registered one by one.
+            for registration in registrations:
+                registration.publishData.update(sgtk.util.register_publish(**registration.arguments))
+            return [registration.publishData for registration in registrations]
+
+        requestCount = 0
+        try:
+            # Find the publish types, creating the missing ones.
+            publishTypes, requests = self._publishTypes(shotgun, registrations)
+            requestCount += requests
+
+            # Create the publishes.
+            requests = []
+            for registration in registrations:
+                arguments = dict(
+                    (key, value) for key, value in registration.arguments.items()
+                    if key not in _DEFERRED_ARGS
+                )
+                # The dry run gives the data toolkit would create the publish with,
+                # once the before_register_publish core hook has run on it.
+                data = sgtk.util.register_publish(dry_run=True, **arguments)
+                data.pop("type", None)
+                publishType = registration.arguments.get("published_file_type")
+                if(publishType):
+                    data["published_file_type"] = publishTypes[publishType]
+                requests.append({"request_type": "create", "entity_type": publishEntityType, "data": data})
+            publishes = shotgun.batch(requests)
+            requestCount += 1
+
+            # Give the ids of the created publishes to the plugins.
+            for registration, publish in zip(registrations, publishes):
+                registration.publishData.clear()
+                registration.publishData.update(publish)
+
+            # Upload the thumbnails.
+            for registration in registrations:
+                requestCount += self._uploadThumbnails(shotgun, publishEntityType, registration)
+
+            # Link the dependencies.
+            requestCount += self._createDependencies(tk, shotgun, registrations)
+
+        except Exception as e:
+            self.logger.error("Failed to register the {} queued publishes: {}".format(len(registrations), e))
+            raise Exception("Failed to register the {} queued publishes: {}".format(len(registrations), e))
+
+        self.logger.debug(
+            "Registered {} publishes in {} requests in {:.2f}s.".format(
+                len(registrations), requestCount, time.time() - startTime
+            )
+        )
+        return [registration.publishData for registration in registrations]
+
+    def _uploadThumbnails(self, shotgun, publishEntityType, registration):
+        """ Upload the thumbnail of a created publish, and of its entity and task if requested.
+
+        Args:
+            shotgun             (:class:`Shotgun`)      : The ShotGrid connection.
+            publishEntityType   (str)                   : The entity type of the publishes.
+            registration        (QueuedRegistration)    : The committed registration.
+
+        Returns:
+            int     : The number of requests.
+        """
+        thumbnailPath = registration.arguments.get("thumbnail_path")
+        if(not thumbnailPath or not os.path.exists(thumbnailPath)):
+            return 0
+
+        shotgun.upload_thumbnail(publishEntityType, registration.publishData["id"], thumbnailPath)
+        requestCount = 1
+
+        # As register_publish, the entity and the task of the context can share the thumbnail.
+        context = registration.arguments["context"]
+        if(registration.arguments.get("update_entity_thumbnail") and context.entity):
+            shotgun.upload_thumbnail(context.entity["type"], context.entity["id"], thumbnailPath)
+            requestCount += 1
+        if(registration.arguments.get("update_task_thumbnail") and context.task):
+            shotgun.upload_thumbnail("Task", context.task["id"], thumbnailPath)
+            requestCount += 1
+        return requestCount
+
+    def _publishTypes(self, shotgun, registrations):
+        """ Find the publish types of the queued registrations, creating the missing ones.
+
+        Args:
+            shotgun         (:class:`Shotgun`)          : The ShotGrid connection.
+            registrations   (list(QueuedRegistration))  : The queued registrations.
+
+        Returns:
+            dict, int   : The publish types by code and the number of requests.
+        """
+        codes = sorted(set(
+            registration.arguments["published_file_type"] for registration in registrations
+            if registration.arguments.get("published_file_type")
+        ))
+        if(not codes):
+            return {}, 0
+
+        publishTypes = dict(
+            (publishType["code"], publishType)
+            for publishType in shotgun.find("PublishedFileType", [["code", "in", codes]], ["code"])
+        )
+        requests = 1
+
+        missingCodes = [code for code in codes if code not in publishTypes]
+        if(missingCodes):
+            createdTypes = shotgun.batch([
+                {"request_type": "create", "entity_type": "PublishedFileType", "data": {"code": code}}
+                for code in missingCodes
+            ])
+            requests += 1
+            for code, publishType in zip(missingCodes, createdTypes):
+                publishTypes[code] = publishType
+
+        # Only keep the entity link.
+        publishTypes = dict(
+            (code, {"type": publishType["type"], "id": publishType["id"]})
+            for code, publishType in publishTypes.items()
+        )
+        return publishTypes, requests
+
+    def _createDependencies(self, tk, shotgun, registrations):
+        """ Link the created publishes to their dependencies.
+
+        The dependencies on the publishes of the queue are linked to the created
+        publishes, the other ones to the publishes found in ShotGrid.
+
+        Args:
+            tk              (:class:`Sgtk`)             : The toolkit instance.
+            shotgun         (:class:`Shotgun`)          : The ShotGrid connection.
+            registrations   (list(QueuedRegistration))  : The committed registrations.
+
+        Returns:
+            int     : The number of requests.
+        """
+        # The created publishes by path.
+        queuedPublishes = {}
+        for registration in registrations:
+            queuedPublishes[_normalizePath(registration.path)] = registration.publishData
+
+        # Find the publishes of the other dependency paths in a single query.
+        otherPaths = set()
+        for registration in registrations:
+            for path in registration.arguments.get("dependency_paths") or []:
+                if(_normalizePath(path) not in queuedPublishes):
+                    otherPaths.add(path)
+        requestCount = 0
+        foundPublishes = {}
+        if(otherPaths):
+            foundPublishes = dict(
+                (_normalizePath(path), publish)
+                for path, publish in sgtk.util.find_publish(tk, sorted(otherPaths)).items()
+            )
+            requestCount += 1
+
+        requests = []
+        for registration in registrations:
+            dependencyIds = []
+            for path in registration.arguments.get("dependency_paths") or []:
+                publish = queuedPublishes.get(_normalizePath(path)) or foundPublishes.get(_normalizePath(path))
+                if(publish is None):
+                    self.logger.warning("No publish found for the dependency {}.".format(path))
+                    continue
+                dependencyIds.append(publish["id"])
+            for dependencyId in registration.arguments.get("dependency_ids") or []:
+                # The queued publishes have no id before the commit, they are found from their paths.
+                if(dependencyId is None):
+                    self.logger.warning(
+                        "A dependency of {} was queued without an id, use its path.".format(registration.path)
+                    )
+                    continue
+                dependencyIds.append(dependencyId)
+
+            for dependencyId in sorted(set(dependencyIds)):
+                requests.append({
+                    "request_type"  : "create",
+                    "entity_type"   : "PublishedFileDependency",
+                    "data"          : {
+                        "published_file"            : {"type": "PublishedFile", "id": registration.publishData["id"]},
+                        "dependent_published_file"  : {"type": "PublishedFile", "id": dependencyId},
+                    },
+                })
+
+        if(requests):
+            shotgun.batch(requests)
+            requestCount += 1
+        return requestCount
@@ -0,0 +1,243 @@
+"""
+Shared tracer recording the time spent in the publish hooks.
+
+The tracing is enabled by setting the ``P3D_PUBLISH_TRACE_DIR`` environment
+variable to a folder. Each publish then writes a JSON trace in the Chrome
+trace-event format to this folder, which can be opened in ``chrome://tracing``
+or Perfetto, or diffed between two runs.
+
+Every span records its wall time and the item it processed. Setting the
+``P3D_PUBLISH_TRACE_CALLS`` environment variable to 1 also records the
+number of ``maya.cmds`` calls, ``hou`` calls and ShotGrid requests of each
+span. The calls are counted by a profile function run on every Python call,
+which slows the publish down and inflates the wall times, so it is off by
+default.
+
+The spans are recorded by the ``trace_collector.py`` and ``trace_plugin.py``
+hooks, appended to the collector and publish plugin hook chains. Load the
+tracer from any hook with::
+
+    self.parent.create_hook_instance("{config}/tk-multi-publish2/publish_tracer.py")
+"""
+
+import contextlib
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+import sgtk
+
+HookBaseClass = sgtk.get_hook_baseclass()
+
+# The environment variable holding the folder the traces are written to.
+TRACE_DIR_ENV = "P3D_PUBLISH_TRACE_DIR"
+
+# The environment variable enabling the call counting.
+TRACE_CALLS_ENV = "P3D_PUBLISH_TRACE_CALLS"
+
+# The counters recorded by the spans.
+_COUNTERS = ("cmds", "hou", "shotgun")
+
+# The state of the current trace, shared by every hook of the session.
+_LOCK       = threading.Lock()
+_TRACE      = {
+    # The trace events.
+    "events"    : [],
+    # The time the trace started at.
+    "start"     : None,
+    # The path the trace is written to.
+    "path"      : None,
+}
+# The call counters, updated by the profile function while a span is open.
+_CALLS      = dict((counter, 0) for counter in _COUNTERS)
+# The number of spans currently open.
+_DEPTH      = [0]
+
+
+class PublishTracer(HookBaseClass):
+    """
+    Hook recording the spans of a publish in a trace file.
+    """
+
+    @property
+    def enabled(self):
+        """ bool: True if the tracing is enabled. """
+        return bool(os.environ.get(TRACE_DIR_ENV))
+
+    @property
+    def countCalls(self):
+        """ bool: True if the calls of the spans are counted. """
+        return os.environ.get(TRACE_CALLS_ENV, "0") not in ("", "0")
+
+    def tracedName(self, hookClass):
+        """ Get the name of the hook traced by a trace hook.
+
+        The traced hook is the next class of the hook chain which is not a
+        wrapper hook, i.e. a class with a true ``chainWrapper`` attribute.
+
+        Args:
+            hookClass   (type)  : The class of the trace hook instance.
+
+        Returns:
+            str                 : The name of the traced class.
+        """
+        for baseClass in hookClass.__mro__[1:]:
+            if(not baseClass.__dict__.get("chainWrapper", False)):
+                return baseClass.__name__
+        return hookClass.__name__
+
+    def start(self):
+        """ Start a new trace, discarding the spans of the previous publish. """
+        if(not self.enabled):
+            return
+
+        traceDir = os.environ[TRACE_DIR_ENV]
+        if(not os.path.isdir(traceDir)):
+            os.makedirs(traceDir)
+
+        now = time.time()
+        with _LOCK:
+            _TRACE["events"]    = []
+            _TRACE["start"]     = now
+            _TRACE["path"]      = os.path.join(
+                traceDir,
+                "publish_{}_{}.json".format(time.strftime("%Y%m%d_%H%M%S", time.localtime(now)), os.getpid())
+            )
+
+    @contextlib.contextmanager
+    def span(self, name, category, item=None, **args):
+        """ Record the time spent in a block of code.
+
+        Args:
+            name        (str)                               : The name of the span, e.g. the method name.
+            category    (str)                               : The category of the span, e.g. the hook name.
+            item        (:class:`PublishItem`, optional)    : The item processed by the block.
+            **args                                          : Extra arguments stored in the event.
+        """
+        if(not self.enabled):
+            yield
+            return
+
+        if(_TRACE["start"] is None):
+            self.start()
+
+        countCalls = self.countCalls
+        if(countCalls):
+            _openSpan()
+        callsBefore = dict(_CALLS)
+        startTime   = time.time()
+        try:
+            yield
+        finally:
+            endTime = time.time()
+            eventArgs = dict(args)
+            if(countCalls):
+                _closeSpan()
+                eventArgs.update(
+                    (counter, _CALLS[counter] - callsBefore[counter]) for counter in _COUNTERS
+                )
+            if(item is not None):
+                eventArgs["item"]       = getattr(item, "name", str(item))
+                eventArgs["item_type"]  = getattr(item, "type_spec", None)
+
+            with _LOCK:
+                _TRACE["events"].append(
+                    {
+                        "name"  : name,
+                        "cat"   : category,
+                        "ph"    : "X",
+                        "ts"    : int((startTime - _TRACE["start"]) * 1e6),
+                        "dur"   : int((endTime - startTime) * 1e6),
+                        "pid"   : os.getpid(),
+                        "tid"   : threading.current_thread().ident,
+                        "args"  : eventArgs,
+                    }
+                )
+
+    def wrap(self, function, category):
+        """ Wrap a function so each call is recorded as a span.
+
+        The first argument looking like a publish item is stored in the span.
+
+        Args:
+            function    (callable)  : The function to wrap.
+            category    (str)       : The category of the spans.
+
+        Returns:
+            callable                : The wrapped function.
+        """
+        @functools.wraps(function)
+        def tracedFunction(*args, **kwargs):
+            item = None
+            for arg in list(args) + list(kwargs.values()):
+                if(hasattr(arg, "type_spec")):
+                    item = arg
+                    break
+            with self.span(function.__name__, category, item):
+                return function(*args, **kwargs)
+
+        return tracedFunction
+
+    def write(self):
+        """ Write the trace file.
+
+        Returns:
+            str : The path of the trace file, None if the tracing is disabled.
+        """
+        if(not self.enabled or _TRACE["path"] is None):
+            return None
+
+        with _LOCK:
+            trace = {
+                "traceEvents"       : sorted(_TRACE["events"], key=lambda event: event["ts"]),
+                "displayTimeUnit"   : "ms",
+            }
+            path = _TRACE["path"]
+
+        with open(path, "w") as traceFile:
+            json.dump(trace, traceFile, indent=1, sort_keys=True)
+
+        self.logger.debug("Publish trace written to {}".format(path))
+        return path
+
+
+def _openSpan():
+    """
+    Install the profile function counting the calls when the first span opens.
+    """
+    _DEPTH[0] += 1
+    if(_DEPTH[0] == 1):
+        sys.setprofile(_countCalls)
+
+
+def _closeSpan():
+    """
+    Remove the profile function when the last span closes.
+    """
+    _DEPTH[0] -= 1
+    if(_DEPTH[0] == 0):
+        sys.setprofile(None)
+
+
+def _countCalls(frame, event, arg):
+    """
+    Profile function counting the maya.cmds and hou calls and the ShotGrid requests.
+    """
+    if(event == "c_call"):
+        # The maya.cmds commands are builtin functions.
+        module = getattr(arg, "__module__", None) or getattr(getattr(arg, "__self__", None), "__name__", None)
+        if(module == "maya.cmds"):
+            _CALLS["cmds"] += 1
+
+    elif(event == "call"):
+        moduleName = frame.f_globals.get("__name__", "")
+        if(moduleName == "hou"):
+            # Only count the calls made from outside the hou module.
+            caller = frame.f_back
+            if(caller is None or caller.f_globals.get("__name__") != "hou"):
+                _CALLS["hou"] += 1
+        elif(frame.f_code.co_name == "_call_rpc" and moduleName.endswith("shotgun_api3.shotgun")):
+            _CALLS["shotgun"] += 1
@@ -0,0 +1,172 @@
+"""
+Index of the review folders, keyed by scene name and version.
+
+The collectors look in the entity review folder for the files named after the
+current scene, ``<scene>[_<suffix>].v<version>.<ext>``. On long running assets
+this folder holds thousands of playblasts on a network share, so the index
+keeps the file names of each folder for the whole session and only lists the
+folder again when its modification time changed. A new listing only parses
+the file names that were not known yet and forgets the removed ones.
+
+Load the index from any hook with::
+
+    self.parent.create_hook_instance("{config}/tk-multi-publish2/review_folder_index.py")
+"""
+
+import os
+import re
+import threading
+import time
+
+import sgtk
+
+HookBaseClass = sgtk.get_hook_baseclass()
+
+# Split a file name without extension into its name and version.
+_REVIEW_FILE_REGEX = re.compile(r"^(?P<name>.+)[.]v(?P<version>.+)$")
+
+# The delay in seconds under which a folder modification time is not trusted,
+# as network shares store it with a coarse resolution.
+_MTIME_RESOLUTION = 2.0
+
+# The indexed folders by path, shared by every hook of the session.
+_LOCK       = threading.Lock()
+_FOLDERS    = {}
+
+
+def _listFiles(folder):
+    """ List the names of the files of a folder.
+
+    Args:
+        folder  (str)   : The path of the folder.
+
+    Returns:
+        list(str)       : The file names.
+    """
+    # scandir gives the entry type without an extra stat call.
+    if(hasattr(os, "scandir")):
+        return [entry.name for entry in os.scandir(folder) if entry.is_file()]
+    return [name for name in os.listdir(folder) if os.path.isfile(os.path.join(folder, name))]
+
+
+def _reviewKeys(fileName):
+    """ Get the keys a review file is found with.
+
+    A file ``anim_shot_cam.v003.mov`` is found for the scenes ``anim``,
+    ``anim_shot`` and ``anim_shot_cam`` at version ``003``.
+
+    Args:
+        fileName    (str)       : The name of the file.
+
+    Returns:
+        list(tuple(str, str))   : The scene names and version.
+    """
+    match = _REVIEW_FILE_REGEX.match(os.path.splitext(fileName)[0])
+    if(not match):
+        return []
+
+    name    = match.group("name")
+    version = match.group("version")
+    keys    = [(name, version)]
+    # Every part before an underscore can be the scene name.
+    position = name.find("_")
+    while(position > 0):
+        keys.append((name[:position], version))
+        position = name.find("_", position + 1)
+    return keys
+
+
+class ReviewFolder(object):
+    """
+    The review files of a folder, by scene name and version.
+    """
+
+    def __init__(self, path):
+        self.path       = path
+        # The modification time of the folder at the last listing.
+        self.mtime      = None
+        # The time of the last listing.
+        self.listedAt   = None
+        # The keys of each known file.
+        self.files      = {}
+        # The file names by scene name and version.
+        self.byScene    = {}
+
+    def refresh(self):
+        """ List the folder again if it was modified since the last listing.
+
+        Returns:
+            bool    : True if the folder was listed.
+        """
+        mtime = os.stat(self.path).st_mtime
+        # A folder modified right before the last listing may have been
+        # modified again within the same mtime tick.
+        if(mtime == self.mtime and mtime < self.listedAt - _MTIME_RESOLUTION):
+            return False
+
+        listedAt    = time.time()
+        fileNames   = set(_listFiles(self.path))
+
+        # Forget the removed files.
+        for fileName in set(self.files) - fileNames:
+            for key in self.files.pop(fileName):
+                self.byScene[key].discard(fileName)
+                if(not self.byScene[key]):
+                    del self.byScene[key]
+
+        # Parse the new files only.
+        for fileName in fileNames - set(self.files):
+            keys = _reviewKeys(fileName)
+            self.files[fileName] = keys
+            for key in keys:
+                self.byScene.setdefault(key, set()).add(fileName)
+
+        self.mtime      = mtime
+        self.listedAt   = listedAt
+        return True
+
+    def find(self, sceneName, version):
+        """ Get the review files of a scene version.
+
+        Args:
+            sceneName   (str)   : The scene name, without version.
+            version     (str)   : The scene version, as written in the file name.
+
+        Returns:
+            list(str)           : The file names, sorted.
+        """
+        return sorted(self.byScene.get((sceneName, version), ()))
+
+
+class ReviewFolderIndex(HookBaseClass):
+    """
+    Hook giving access to the review folders index.
+    """
+
+    def find(self, folder, sceneName, version):
+        """ Get the review files of a scene version in a folder.
+
+        Args:
+            folder      (str)   : The path of the review folder.
+            sceneName   (str)   : The scene name, without version.
+            version     (str)   : The scene version, as written in the file name.
+
+        Returns:
+            list(str)           : The file names, sorted.
+        """
+        folder = os.path.normpath(folder)
+        with _LOCK:
+            if(folder not in _FOLDERS):
+                _FOLDERS[folder] = ReviewFolder(folder)
+            reviewFolder = _FOLDERS[folder]
+
+            if(reviewFolder.refresh()):
+                self.logger.debug(
+                    "Listed the review folder {} ({} files).".format(folder, len(reviewFolder.files))
+                )
+            return reviewFolder.find(sceneName, version)
+
+    def clear(self):
+        """ Forget the indexed folders. """
+        with _LOCK:
+            _FOLDERS.clear()
@@ -0,0 +1,666 @@
+"""
+Shared queue uploading the review movies in the background.
+
+The review plugins create their Version and upload the movie to it while the
+publisher waits, which blocks the UI for the whole upload of a large
+playblast. The queue captures the uploads done while the review is
+published: the Version is still created right away, and the movie is
+uploaded afterwards by worker threads.
+
+Each upload is persisted as a JSON job in a spool folder of the user, so the
+uploads left when the session closes are resumed by the next session. The
+session uploading a job owns it through a lock file holding its process id
+and host, refreshed while the session runs: the other sessions only resume
+the jobs whose owner is gone. A failed upload is retried with an increasing
+delay.
+
+By default the movie is uploaded to the Version through the ShotGrid API,
+which splits the large files itself and transcodes the movie. The
+attachment only exists once the movie is uploaded, so the captured upload
+returns None instead of its id: the review publish of the framework, as the
+one of tk-multi-publish2, does not use it. The publish does not wait for the
+upload.
+
+When an upload endpoint is configured, the movie is sent in chunks and a
+retried or resumed upload starts from the last chunk the endpoint received.
+The field of the Version is linked to the endpoint url right away, so the
+captured upload returns the attachment id as the ShotGrid API does, and the
+attachment is patched with the uploaded movie. ShotGrid does not transcode
+the movies of an endpoint, it only links them.
+
+The spool root folder is set with the ``P3D_REVIEW_SPOOL_DIR`` environment
+variable, the upload endpoint with ``P3D_REVIEW_UPLOAD_URL``. Setting
+``P3D_REVIEW_UPLOAD_SYNC`` to 1 uploads the movies while the publisher
+waits, as before. Load it from any hook with::
+
+    self.parent.create_hook_instance("{config}/tk-multi-publish2/review_upload_queue.py")
+"""
+
+import contextlib
+import errno
+import functools
+import getpass
+import glob
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+try:
+    from urllib.request import Request, urlopen
+    from urllib.error import HTTPError
+except ImportError:
+    from urllib2 import Request, urlopen, HTTPError
+
+import sgtk
+
+HookBaseClass = sgtk.get_hook_baseclass()
+
+# The environment variables configuring the queue.
+SPOOL_DIR_ENV   = "P3D_REVIEW_SPOOL_DIR"
+UPLOAD_URL_ENV  = "P3D_REVIEW_UPLOAD_URL"
+SYNC_ENV        = "P3D_REVIEW_UPLOAD_SYNC"
+
+# The size of the chunks sent to the upload endpoint.
+CHUNK_SIZE = 8 * 1024 * 1024
+
+# The number of failed attempts of an upload without progress before it is
+# marked as failed.
+MAX_ATTEMPTS = 5
+
+# The maximum delay in seconds before an upload is retried.
+MAX_RETRY_DELAY = 60
+
+# The delay in seconds between two refreshes of the lock files of the session.
+LOCK_REFRESH_DELAY = 60
+
+# The age in seconds of a lock file not refreshed by its session, which is
+# then considered closed.
+LOCK_STALE_AGE = 5 * 60
+
+# The number of threads uploading the movies.
+_MAX_WORKERS = 2
+
+# The state of the queue, shared by every hook of the session.
+_LOCK       = threading.Lock()
+# The jobs waiting for a worker.
+_PENDING    = queue.Queue()
+# The jobs not uploaded yet, by id.
+_JOBS       = {}
+# The worker threads, and the thread refreshing the lock files.
+_WORKERS    = []
+# True once the uploads of the previous sessions are resumed.
+_RESUMED    = [False]
+# The condition notified when a job is done or failed.
+_DONE       = threading.Condition(_LOCK)
+# The ShotGrid connection of each worker.
+_LOCAL      = threading.local()
+
+
+def _userName():
+    """ Get the name of the user of the session, used to name its spool folder. """
+    try:
+        userName = getpass.getuser()
+    except Exception:
+        userName = None
+    return "".join(char if char.isalnum() else "_" for char in (userName or "unknown"))
+
+
+def _spoolDir():
+    """ Get the spool folder of the user, creating it if needed.
+
+    The jobs are uploaded with the credentials of the session, they are not
+    shared between users.
+    """
+    root = os.environ.get(SPOOL_DIR_ENV) or os.path.join(tempfile.gettempdir(), "p3d_review_spool")
+    folder = os.path.join(root, _userName())
+    if(not os.path.isdir(folder)):
+        try:
+            os.makedirs(folder, 0o700)
+        except OSError:
+            # Created by another session.
+            if(not os.path.isdir(folder)):
+                raise
+    return folder
+
+
+def _processAlive(pid):
+    """ Check if a process of the current host is running.
+
+    Args:
+        pid (int)   : The id of the process.
+
+    Returns:
+        bool        : True if the process is running.
+    """
+    if(not pid):
+        return False
+    if(sys.platform == "win32"):
+        # os.kill terminates the process on Windows.
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)
+        if(not handle):
+            # The process exists if it can not be opened.
+            return kernel32.GetLastError() == 5
+        exitCode = ctypes.c_ulong()
+        try:
+            kernel32.GetExitCodeProcess(handle, ctypes.byref(exitCode))
+        finally:
+            kernel32.CloseHandle(handle)
+        return exitCode.value == 259
+    try:
+        os.kill(pid, 0)
+    except OSError as e:
+        return e.errno == errno.EPERM
+    return True
+
+
+def _shotgun():
+    """ Get a ShotGrid connection for the current thread.
+
+    The connections of the API can not be shared between threads, each
+    worker opens its own connection.
+    """
+    connection = getattr(_LOCAL, "shotgun", None)
+    if(connection is None):
+        connection = _LOCAL.shotgun = sgtk.get_authenticated_user().create_sg_connection()
+    return connection
+
+
+class UploadJob(object):
+    """
+    An upload of a movie to a field of an entity, persisted in the spool folder.
+    """
+
+    # The attributes saved in the job file.
+    _FIELDS = (
+        "id", "entityType", "entityId", "path", "fieldName", "displayName", "tagList",
+        "size", "mtime", "offset", "attempts", "status", "error", "attachmentId",
+    )
+
+    def __init__(self, entityType, entityId, path, fieldName=None, displayName=None, tagList=None):
+        """
+        Args:
+            entityType  (str)               : The type of the entity, e.g. Version.
+            entityId    (int)               : The id of the entity.
+            path        (str)               : The path of the movie.
+            fieldName   (str, optional)     : The field to upload the movie to.
+            displayName (str, optional)     : The name displayed for the movie.
+            tagList     (str, optional)     : The tags of the movie.
+        """
+        self.id             = uuid.uuid4().hex
+        self.entityType     = entityType
+        self.entityId       = entityId
+        self.path           = path
+        self.fieldName      = fieldName
+        self.displayName    = displayName
+        self.tagList        = tagList
+        # The movie must not change while it is uploaded.
+        self.size           = os.path.getsize(path)
+        self.mtime          = os.path.getmtime(path)
+        # The number of bytes received by the upload endpoint.
+        self.offset         = 0
+        # The number of failed attempts since the upload last progressed.
+        self.attempts       = 0
+        # pending, done or failed.
+        self.status         = "pending"
+        self.error          = None
+        # The attachment of the movie, once linked to the entity.
+        self.attachmentId   = None
+
+    @property
+    def jobPath(self):
+        """ str: The path of the job file in the spool folder. """
+        return os.path.join(_spoolDir(), "{}.json".format(self.id))
+
+    @property
+    def lockPath(self):
+        """ str: The path of the lock file of the session owning the job. """
+        return os.path.join(_spoolDir(), "{}.lock".format(self.id))
+
+    def acquire(self):
+        """ Take the ownership of the job, unless another running session owns it.
+
+        Returns:
+            bool    : True if the session owns the job.
+        """
+        owner = {"pid": os.getpid(), "host": socket.gethostname()}
+        for attempt in range(2):
+            try:
+                lockFile = os.open(self.lockPath, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except OSError as e:
+                if(e.errno != errno.EEXIST):
+                    raise
+                if(attempt or not self._staleLock()):
+                    return False
+                # The owner is gone, take its place.
+                try:
+                    os.remove(self.lockPath)
+                except OSError:
+                    return False
+                continue
+            with os.fdopen(lockFile, "w") as lockFile:
+                json.dump(owner, lockFile)
+            return True
+        return False
+
+    def refresh(self):
+        """ Mark the lock file as used by a running session. """
+        try:
+            os.utime(self.lockPath, None)
+        except OSError:
+            pass
+
+    def release(self):
+        """ Remove the lock file. """
+        if(os.path.exists(self.lockPath)):
+            os.remove(self.lockPath)
+
+    def _staleLock(self):
+        """ Check if the session owning the job is gone.
+
+        Returns:
+            bool    : True if the lock file was not refreshed for a while, or
+                    its process is not running on the current host.
+        """
+        try:
+            age = time.time() - os.path.getmtime(self.lockPath)
+            with open(self.lockPath, "r") as lockFile:
+                owner = json.load(lockFile)
+        except (IOError, OSError, ValueError):
+            # Being written by its owner, unless it is old.
+            try:
+                return time.time() - os.path.getmtime(self.lockPath) > LOCK_STALE_AGE
+            except OSError:
+                return True
+        if(age > LOCK_STALE_AGE):
+            return True
+        if(owner.get("host") == socket.gethostname()):
+            return not _processAlive(owner.get("pid"))
+        return False
+
+    @classmethod
+    def load(cls, jobPath):
+        """ Load a job from its file.
+
+        Args:
+            jobPath (str)   : The path of the job file.
+
+        Returns:
+            :class:`UploadJob`  : The job.
+        """
+        with open(jobPath, "r") as jobFile:
+            data = json.load(jobFile)
+        job = cls.__new__(cls)
+        for field in cls._FIELDS:
+            setattr(job, field, data.get(field))
+        return job
+
+    def save(self):
+        """ Write the job file, replacing it at once. """
+        data = dict((field, getattr(self, field)) for field in self._FIELDS)
+        tempPath = "{}.tmp".format(self.jobPath)
+        with open(tempPath, "w") as jobFile:
+            json.dump(data, jobFile, indent=2, sort_keys=True)
+        if(os.path.exists(self.jobPath)):
+            os.remove(self.jobPath)
+        os.rename(tempPath, self.jobPath)
+
+    def remove(self):
+        """ Remove the job file. """
+        if(os.path.exists(self.jobPath)):
+            os.remove(self.jobPath)
+
+    def movieChanged(self):
+        """ Check if the movie changed since the upload was queued.
+
+        Returns:
+            bool    : True if the movie was removed or modified.
+        """
+        if(not os.path.exists(self.path)):
+            return True
+        return os.path.getsize(self.path) != self.size or os.path.getmtime(self.path) != self.mtime
+
+
+class ShotgunUploadTransport(object):
+    """
+    Upload of the movies through the ShotGrid API.
+    """
+
+    def attach(self, job, shotgun):
+        """ Link the attachment of a job to its entity before the upload.
+
+        The ShotGrid API creates the attachment with the uploaded movie, the job
+        has no attachment until then.
+
+        Args:
+            job     (:class:`UploadJob`)    : The job.
+            shotgun (:class:`Shotgun`)      : The ShotGrid connection of the session.
+        """
+        pass
+
+    def upload(self, job, progress):
+        """ Upload the movie of a job to its entity.
+
+        Args:
+            job         (:class:`UploadJob`)    : The job.
+            progress    (callable)              : Called with the job when a chunk is sent.
+        """
+        job.attachmentId = _shotgun().upload(
+            job.entityType, job.entityId, job.path, job.fieldName, job.displayName, job.tagList
+        )
+        job.offset = job.size
+        progress(job)
+
+
+class HttpChunkedTransport(object):
+    """
+    Upload of the movies in chunks to an upload endpoint.
+
+    The chunks are sent with ``PUT <url>/<job id>`` and a ``Content-Range``
+    header. ``HEAD <url>/<job id>`` answers the number of bytes received in
+    the ``Upload-Offset`` header. The response to the last chunk holds the
+    url of the movie, ``{"url": ...}``, which is set on the field of the entity.
+    An empty chunk at the end of the movie asks for the url again, when the
+    whole movie was received before the upload was interrupted.
+    """
+
+    def __init__(self, url, timeout=60):
+        """
+        Args:
+            url     (str)           : The url of the upload endpoint.
+            timeout (int, optional) : The timeout of a request in seconds.
+        """
+        self.url        = url.rstrip("/")
+        self.timeout    = timeout
+
+    def _jobUrl(self, job):
+        return "{}/{}".format(self.url, job.id)
+
+    def _movieField(self, job, url):
+        return {"url": url, "name": job.displayName or os.path.basename(job.path)}
+
+    def attach(self, job, shotgun):
+        """ Link the field of the entity to the movie on the endpoint before the upload.
+
+        Args:
+            job     (:class:`UploadJob`)    : The job.
+            shotgun (:class:`Shotgun`)      : The ShotGrid connection of the session.
+        """
+        fieldName = job.fieldName or "sg_uploaded_movie"
+        shotgun.update(job.entityType, job.entityId, {fieldName: self._movieField(job, self._jobUrl(job))})
+        entity = shotgun.find_one(job.entityType, [["id", "is", job.entityId]], [fieldName]) or {}
+        job.attachmentId = (entity.get(fieldName) or {}).get("id")
+
+    def offset(self, job):
+        """ Get the number of bytes of a job received by the endpoint.
+
+        Args:
+            job     (:class:`UploadJob`)    : The job.
+
+        Returns:
+            int                             : The number of bytes.
+        """
+        request = Request(self._jobUrl(job))
+        request.get_method = lambda: "HEAD"
+        try:
+            response = urlopen(request, timeout=self.timeout)
+        except HTTPError as e:
+            if(e.code == 404):
+                return 0
+            raise
+        return int(response.headers.get("Upload-Offset") or 0)
+
+    def upload(self, job, progress):
+        """ Send the movie of a job in chunks, from the last chunk received.
+
+        Args:
+            job         (:class:`UploadJob`)    : The job.
+            progress    (callable)              : Called with the job when a chunk is sent.
+        """
+        job.offset = self.offset(job)
+        with open(job.path, "rb") as movieFile:
+            movieFile.seek(job.offset)
+            while(True):
+                chunk = movieFile.read(CHUNK_SIZE)
+                end = job.offset + len(chunk)
+                request = Request(self._jobUrl(job), data=chunk)
+                request.get_method = lambda: "PUT"
+                request.add_header("Content-Type", "application/octet-stream")
+                request.add_header(
+                    "Content-Range", "bytes {}-{}/{}".format(job.offset, max(end - 1, job.offset), job.size)
+                )
+                body = urlopen(request, timeout=self.timeout).read()
+                job.offset = end
+                progress(job)
+                if(end >= job.size):
+                    break
+
+        result = json.loads(body.decode("utf-8")) if body else {"url": self._jobUrl(job)}
+
+        # Patch the attachment linked to the entity with the uploaded movie.
+        if(job.attachmentId):
+            _shotgun().update("Attachment", job.attachmentId, {"this_file": self._movieField(job, result["url"])})
+            return
+        _shotgun().update(
+            job.entityType,
+            job.entityId,
+            {job.fieldName or "sg_uploaded_movie": self._movieField(job, result["url"])},
+        )
+
+
+class ReviewUploadQueue(HookBaseClass):
+    """
+    Hook uploading the review movies in the background.
+    """
+
+    @property
+    def enabled(self):
+        """ bool: True if the movies are uploaded in the background. """
+        return os.environ.get(SYNC_ENV, "0") in ("", "0")
+
+    @property
+    def transport(self):
+        """ The transport uploading the movies, the upload endpoint if one is configured. """
+        url = os.environ.get(UPLOAD_URL_ENV)
+        if(url):
+            return HttpChunkedTransport(url)
+        return ShotgunUploadTransport()
+
+    @property
+    def pending(self):
+        """ int: The number of uploads not done yet. """
+        with _LOCK:
+            return sum(1 for job in _JOBS.values() if job.status == "pending")
+
+    def jobs(self):
+        """ Get the uploads of the session not done yet.
+
+        Returns:
+            list(:class:`UploadJob`)    : The pending and failed uploads.
+        """
+        with _LOCK:
+            return list(_JOBS.values())
+
+    def start(self):
+        """ Start the workers and resume the uploads left in the spool folder by the closed sessions. """
+        with _LOCK:
+            for index in range(len(_WORKERS), _MAX_WORKERS + 1):
+                if(index < _MAX_WORKERS):
+                    worker = threading.Thread(target=self._work, name="ReviewUpload{}".format(index))
+                else:
+                    worker = threading.Thread(target=self._refreshLocks, name="ReviewUploadLocks")
+                # The uploads left when the session closes are resumed by the next one.
+                worker.daemon = True
+                worker.start()
+                _WORKERS.append(worker)
+
+            if(_RESUMED[0]):
+                return
+            _RESUMED[0] = True
+
+        for jobPath in sorted(glob.glob(os.path.join(_spoolDir(), "*.json"))):
+            try:
+                job = UploadJob.load(jobPath)
+            except (IOError, OSError, ValueError) as e:
+                self.logger.warning("Can not read the review upload {}: {}".format(jobPath, e))
+                continue
+            with _LOCK:
+                if(job.status != "pending" or job.id in _JOBS):
+                    continue
+                # Uploaded by another running session.
+                if(not job.acquire()):
+                    continue
+                _JOBS[job.id] = job
+            self.logger.info("Resuming the review upload of {}.".format(job.path))
+            _PENDING.put(job)
+
+    def enqueue(self, entityType, entityId, path, fieldName=None, displayName=None, tagList=None, shotgun=None):
+        """ Upload a movie to a field of an entity in the background.
+
+        Args:
+            entityType  (str)                           : The type of the entity, e.g. Version.
+            entityId    (int)                           : The id of the entity.
+            path        (str)                           : The path of the movie.
+            fieldName   (str, optional)                 : The field to upload the movie to.
+            displayName (str, optional)                 : The name displayed for the movie.
+            tagList     (str, optional)                 : The tags of the movie.
+            shotgun     (:class:`Shotgun`, optional)    : The connection linking the attachment
+                                                        to the entity, the one of the session by default.
+
+        Returns:
+            :class:`UploadJob`                          : The job of the upload.
+        """
+        job = UploadJob(entityType, entityId, path, fieldName, displayName, tagList)
+        self.transport.attach(job, shotgun or self.parent.shotgun)
+        # Registered and owned before it is saved, not to be resumed from the spool folder as well.
+        with _LOCK:
+            _JOBS[job.id] = job
+        job.acquire()
+        job.save()
+        self.start()
+        _PENDING.put(job)
+        self.logger.info("Queued the upload of {} to {} {}.".format(path, entityType, entityId))
+        return job
+
+    def _queueUpload(self, shotgun, entity_type, entity_id, path, field_name=None, display_name=None, tag_list=None):
+        """ Queue an upload, in place of the upload method of a ShotGrid connection.
+
+        Returns:
+            int     : The id of the attachment, as the upload method, None until the upload
+                    creates it when the movie is uploaded through the ShotGrid API.
+        """
+        job = self.enqueue(entity_type, entity_id, path, field_name, display_name, tag_list, shotgun=shotgun)
+        return job.attachmentId
+
+    @contextlib.contextmanager
+    def capture(self, *connections):
+        """ Queue the uploads done through the ShotGrid connections in the context.
+
+        Args:
+            connections (list(:class:`Shotgun`))    : The ShotGrid connections.
+        """
+        patched = []
+        for connection in connections:
+            if(any(connection is other for other in patched)):
+                continue
+            connection.upload = functools.partial(self._queueUpload, connection)
+            patched.append(connection)
+        try:
+            yield
+        finally:
+            for connection in patched:
+                del connection.upload
+
+    def wait(self, timeout=None, jobs=None):
+        """ Wait for the uploads of the session to be done or failed.
+
+        Args:
+            timeout (float, optional)               : The maximum time to wait in seconds.
+            jobs    (list(:class:`UploadJob`))      : The uploads to wait for, all of them by default.
+
+        Returns:
+            bool                                    : True if no upload is pending.
+        """
+        endTime = None if timeout is None else time.time() + timeout
+        with _DONE:
+            while(any(job.status == "pending" for job in (_JOBS.values() if jobs is None else jobs))):
+                remaining = None if endTime is None else endTime - time.time()
+                if(remaining is not None and remaining <= 0):
+                    return False
+                _DONE.wait(remaining)
+        return True
+
+    def _work(self):
+        """ Upload the queued jobs, until the session closes. """
+        while(True):
+            job = _PENDING.get()
+            self._upload(job, self.transport)
+
+    def _refreshLocks(self):
+        """ Refresh the lock files of the jobs of the session, until the session closes. """
+        while(True):
+            time.sleep(LOCK_REFRESH_DELAY)
+            for job in self.jobs():
+                if(job.status == "pending"):
+                    job.refresh()
+
+    def _upload(self, job, transport):
+        """ Upload a job, retrying it later if the upload fails.
+
+        Args:
+            job         (:class:`UploadJob`)    : The job.
+            transport   (object)                : The transport uploading the movie.
+        """
+        def progress(job):
+            # The upload progressed, it can fail again as many times.
+            job.attempts = 0
+            job.save()
+
+        try:
+            if(job.movieChanged()):
+                # Uploading it again would not help.
+                job.attempts = MAX_ATTEMPTS
+                raise Exception("The movie changed since the upload was queued.")
+            transport.upload(job, progress)
+
+        except Exception as e:
+            job.error = str(e)
+            job.attempts += 1
+            if(job.attempts < MAX_ATTEMPTS):
+                delay = min(MAX_RETRY_DELAY, 2 ** job.attempts)
+                self.logger.warning(
+                    "Failed to upload {}, retrying in {}s: {}".format(job.path, delay, e)
+                )
+                job.save()
+                timer = threading.Timer(delay, _PENDING.put, args=(job,))
+                timer.daemon = True
+                timer.start()
+                return
+
+            # The job file is kept to inspect the failure.
+            self.logger.error("Failed to upload {}: {}".format(job.path, e))
+            job.status = "failed"
+            job.save()
+            job.release()
+            with _DONE:
+                _DONE.notify_all()
+            return
+
+        self.logger.info("Uploaded {} to {} {}.".format(job.path, job.entityType, job.entityId))
+        job.status = "done"
+        job.remove()
+        job.release()
+        with _DONE:
+            _JOBS.pop(job.id, None)
+            _DONE.notify_all()
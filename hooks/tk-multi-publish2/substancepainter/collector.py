@@ -98,6 +98,9 @@ class SubstancePainterSessionCollector(HookBaseClass):
 
         """
 
+        # Check the files on disk again for the new publish session.
+        self.parent.create_hook_instance("{config}/common/filesystem_probe.py").reset()
+
         # create an item representing the current substance painter session
         item = self.collect_current_substancepainter_session(settings, parent_item)
 
@@ -204,20 +207,28 @@ class SubstancePainterSessionCollector(HookBaseClass):
 
         icon_path = os.path.join(self.disk_location, os.pardir, "icons", "texture.png")
 
-        for texture_set_name, texture_set in map_export_info.iteritems():
-            for texture_id, texture_file in texture_set.iteritems():
-                if os.path.exists(texture_file):
-                    _, filenamefile = os.path.split(texture_file)
-                    texture_name, _ = os.path.splitext(filenamefile)
-
-                    self.logger.debug("texture: %s" % texture_file)
-                    textures_item = parent_item.create_item(
-                        "substancepainter.texture", "Texture", texture_name
-                    )
-                    textures_item.set_icon_from_path(icon_path)
+        # check the exported textures on disk in a single batch
+        texture_files = [
+            texture_file
+            for texture_set in map_export_info.values()
+            for texture_file in texture_set.values()
+        ]
+        filesystem_probe = self.parent.create_hook_instance("{config}/common/filesystem_probe.py")
+        existing = filesystem_probe.existsMany(texture_files)
+
+        for texture_file in texture_files:
+            if existing[texture_file]:
+                _, filenamefile = os.path.split(texture_file)
+                texture_name, _ = os.path.splitext(filenamefile)
+
+                self.logger.debug("texture: %s" % texture_file)
+                textures_item = parent_item.create_item(
+                    "substancepainter.texture", "Texture", texture_name
+                )
+                textures_item.set_icon_from_path(icon_path)
 
-                    textures_item.properties["path"] = texture_file
-                    textures_item.properties["publish_type"] = "Texture"
+                textures_item.properties["path"] = texture_file
+                textures_item.properties["publish_type"] = "Texture"
 
     def collect_current_substancepainter_session(self, settings, parent_item):
         """
@@ -0,0 +1,63 @@
+"""
+Collector hook recording the collect methods of the collector it is appended
+to in the publish tracer. Each collection starts a new trace.
+
+Append it at the end of a collector hook chain::
+
+    collector: "{self}/collector.py:{config}/tk-multi-publish2/maya/collector.py:{config}/tk-multi-publish2/trace_collector.py"
+"""
+
+import sgtk
+
+HookBaseClass = sgtk.get_hook_baseclass()
+
+
+class TraceCollector(HookBaseClass):
+    """
+    Hook recording the time spent in the methods of a collector.
+    """
+
+    @property
+    def tracer(self):
+        """ :class:`PublishTracer`: The shared publish tracer. """
+        if(not hasattr(self, "_tracer")):
+            self._tracer = self.parent.create_hook_instance(
+                "{config}/tk-multi-publish2/publish_tracer.py"
+            )
+        return self._tracer
+
+    @property
+    def collectorName(self):
+        """ str: The name of the traced collector class. """
+        # The traced collector is the next class of the hook chain, past the wrapper hooks.
+        return self.tracer.tracedName(type(self))
+
+    def process_current_session(self, settings, parent_item):
+        if(not self.tracer.enabled):
+            return super(TraceCollector, self).process_current_session(settings, parent_item)
+
+        self.tracer.start()
+        self._traceCollectMethods()
+        with self.tracer.span("process_current_session", self.collectorName, parent_item):
+            return super(TraceCollector, self).process_current_session(settings, parent_item)
+
+    def process_file(self, settings, parent_item, path):
+        if(not self.tracer.enabled):
+            return super(TraceCollector, self).process_file(settings, parent_item, path)
+
+        self._traceCollectMethods()
+        with self.tracer.span("process_file", self.collectorName, parent_item, path=path):
+            return super(TraceCollector, self).process_file(settings, parent_item, path)
+
+    def _traceCollectMethods(self):
+        """ Replace the collect_* methods of the instance by traced ones. """
+        if(getattr(self, "_collectMethodsTraced", False)):
+            return
+        self._collectMethodsTraced = True
+
+        for name in dir(type(self)):
+            if(not name.startswith("collect_")):
+                continue
+            method = getattr(self, name)
+            if(callable(method)):
+                setattr(self, name, self.tracer.wrap(method, self.collectorName))
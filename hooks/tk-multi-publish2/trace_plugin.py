@@ -0,0 +1,53 @@
+"""
+Publish plugin hook recording the accept, validate, publish and finalize
+methods of the plugin it is appended to in the publish tracer.
+
+Append it at the end of a publish plugin hook chain::
+
+    hook: "{self}/publish_file.py:{config}/tk-multi-publish2/maya/publish_session.py:{config}/tk-multi-publish2/trace_plugin.py"
+"""
+
+import sgtk
+
+HookBaseClass = sgtk.get_hook_baseclass()
+
+
+class TracePublishPlugin(HookBaseClass):
+    """
+    Hook recording the time spent in the methods of a publish plugin.
+    """
+
+    @property
+    def tracer(self):
+        """ :class:`PublishTracer`: The shared publish tracer. """
+        if(not hasattr(self, "_tracer")):
+            self._tracer = self.parent.create_hook_instance(
+                "{config}/tk-multi-publish2/publish_tracer.py"
+            )
+        return self._tracer
+
+    @property
+    def pluginName(self):
+        """ str: The name of the traced plugin class. """
+        # The traced plugin is the next class of the hook chain, past the wrapper hooks.
+        return self.tracer.tracedName(type(self))
+
+    def accept(self, settings, item):
+        with self.tracer.span("accept", self.pluginName, item):
+            return super(TracePublishPlugin, self).accept(settings, item)
+
+    def validate(self, settings, item):
+        with self.tracer.span("validate", self.pluginName, item):
+            return super(TracePublishPlugin, self).validate(settings, item)
+
+    def publish(self, settings, item):
+        with self.tracer.span("publish", self.pluginName, item):
+            return super(TracePublishPlugin, self).publish(settings, item)
+
+    def finalize(self, settings, item):
+        with self.tracer.span("finalize", self.pluginName, item):
+            result = super(TracePublishPlugin, self).finalize(settings, item)
+
+        # Write the trace as it stands, the last finalize gives the complete trace.
+        self.tracer.write()
+        return result
@@ -0,0 +1,92 @@
+"""
+Index of the versions of a work file found on disk.
+
+The session plugins look for the next free version of the work file before
+publishing. Instead of testing the existence of each version in turn, the
+work folder is listed once and the file names are parsed with the work
+template.
+
+Load it from any hook with::
+
+    self.parent.create_hook_instance("{config}/tk-multi-publish2/work_version_index.py")
+"""
+
+import os
+
+import sgtk
+
+HookBaseClass = sgtk.get_hook_baseclass()
+
+# The template key holding the version.
+VERSION_KEY = "version"
+
+
+class WorkVersionIndex(HookBaseClass):
+    """
+    Hook finding the versions of a work file with a single folder listing.
+    """
+
+    def findVersions(self, path, workTemplate):
+        """ Get the versions of a work file existing on disk.
+
+        Args:
+            path            (str)                   : The path of a version of the work file.
+            workTemplate    (:class:`TemplatePath`) : The work template.
+
+        Returns:
+            dict                                    : The paths by version number, None if the
+                                                    versions can not be found from the folder
+                                                    of the file.
+        """
+        fields = workTemplate.validate_and_get_fields(path)
+        if(not fields or VERSION_KEY not in fields):
+            return None
+
+        folder = os.path.dirname(path)
+        # The versions are only listed when they share the same folder.
+        otherFields = dict(fields)
+        otherFields[VERSION_KEY] = fields[VERSION_KEY] + 1
+        if(os.path.dirname(workTemplate.apply_fields(otherFields)) != folder):
+            return None
+
+        if(not os.path.isdir(folder)):
+            return {}
+
+        versions = {}
+        for fileName in os.listdir(folder):
+            filePath = os.path.join(folder, fileName)
+            fileFields = workTemplate.validate_and_get_fields(filePath)
+            if(not fileFields or VERSION_KEY not in fileFields):
+                continue
+            # Keep the versions of the same work file only.
+            version = fileFields.pop(VERSION_KEY)
+            if(all(fields.get(key) == value for key, value in fileFields.items())):
+                versions[version] = filePath
+
+        self.logger.debug("Found {} versions of {} on disk.".format(len(versions), path))
+        return versions
+
+    def nextFreeVersion(self, path, workTemplate):
+        """ Get the first version above the one of a work file not existing on disk.
+
+        Args:
+            path            (str)                   : The path of a version of the work file.
+            workTemplate    (:class:`TemplatePath`) : The work template.
+
+        Returns:
+            str, int, int   : The path and number of the next free version and the
+                            highest version on disk, None, None, None if the versions
+                            can not be found from the folder of the file.
+        """
+        versions = self.findVersions(path, workTemplate)
+        if(versions is None):
+            return None, None, None
+
+        fields = workTemplate.get_fields(path)
+        version = fields[VERSION_KEY] + 1
+        while(version in versions):
+            version += 1
+
+        fields[VERSION_KEY] = version
+        maxVersion = max(versions) if versions else None
+        return workTemplate.apply_fields(fields), version, maxVersion
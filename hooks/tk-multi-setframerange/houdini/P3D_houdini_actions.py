@@ -42,6 +42,12 @@ class FrameOperation(HookBaseClass):
             (e.g. the current shot, current asset etc)
 
         """
+
+        # Share the cut range with the other hooks.
+        in_frame, out_frame = self.parent.create_hook_instance(
+            "{config}/common/cut_range_cache.py"
+        ).resolveFrameRange(self.parent.context.entity, in_frame, out_frame)
+
         # Get the current engine.
         currentEngine = sgtk.platform.current_engine()
         # Get the current context.
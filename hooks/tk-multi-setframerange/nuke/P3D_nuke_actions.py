@@ -44,6 +44,11 @@ class FrameOperation(HookBaseClass):
 
         """
 
+        # Share the cut range with the other hooks.
+        in_frame, out_frame = self.parent.create_hook_instance(
+            "{config}/common/cut_range_cache.py"
+        ).resolveFrameRange(self.parent.context.entity, in_frame, out_frame)
+
         # unlock
         locked = nuke.root()["lock_range"].value()
         if locked: